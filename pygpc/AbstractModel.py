@@ -4,6 +4,8 @@ import h5py
 import copy
 from abc import ABCMeta, abstractmethod
 from .misc import display_fancy_bar
+from .misc import ten2mat
+from .misc import mat2ten
 
 
 class AbstractModel:
@@ -52,6 +54,7 @@ class AbstractModel:
                 - i_subiter   : current sub-iteration
                 - coords      : parameters of particular simulation in original parameter space
                 - coords_norm : parameters of particular simulation in normalized parameter space
+                - gradient_scale : derivative of the original w.r.t. the normalized random parameters [dim]
         """
 
         self.p = p
@@ -105,7 +108,47 @@ class AbstractModel:
                             else:
                                 return None
 
-                    except (KeyError, ValueError):
+                    except (KeyError, ValueError, IndexError):
+                        return None
+            finally:
+                if self.lock:
+                    self.lock.release()
+
+        return None
+
+    def read_previous_gradient_results(self):
+        """
+        This functions reads the gradient of previous results from the hard disk (if present), which were
+        provided by the model (see simulate). The gradients are stored in model_evaluations/gradient_results
+        in matrix form [n_grid * dim x n_out] (see ten2mat).
+
+        Returns
+        -------
+            None :
+                if no serialized gradients could be found
+            ndarray of float [n_sims x n_out x dim] :
+                gradient of results at coords w.r.t. the normalized random parameters
+        """
+        if self.fn_results:
+            if self.lock:
+                self.lock.acquire()
+            try:
+                if os.path.exists(self.fn_results + ".hdf5"):
+                    try:
+                        with h5py.File(self.fn_results + ".hdf5", 'r') as f:
+                            dim = self.coords.shape[1]
+
+                            if type(self.i_grid) is list:
+                                grad = f['model_evaluations/gradient_results'][self.i_grid[0]*dim:self.i_grid[1]*dim, :]
+                            else:
+                                grad = f['model_evaluations/gradient_results'][self.i_grid*dim:(self.i_grid+1)*dim, :]
+
+                            if grad.shape[0] == self.coords.shape[0] * dim:
+                                return mat2ten(mat=grad, incr=dim)
+                            else:
+                                return None
+
+                    except (KeyError, ValueError, IndexError):
                         return None
             finally:
                 if self.lock:
@@ -138,6 +181,24 @@ class AbstractModel:
                     require_size = self.i_grid + 1
 
                 with h5py.File(self.fn_results + ".hdf5", 'a') as f:
+                    # gradient of results [n_sim x n_out x dim] is saved in matrix form [n_sim * dim x n_out]
+                    if "model_evaluations/gradient_results" in data_dict:
+                        gradient_results = data_dict.pop("model_evaluations/gradient_results")
+                        dim = gradient_results.shape[2]
+                        i_start = (self.i_grid[0] if type(self.i_grid) is list else self.i_grid) * dim
+
+                        try:
+                            ds = f["model_evaluations/gradient_results"]
+                            if ds.shape[0] < require_size * dim:
+                                ds.resize(require_size * dim, axis=0)
+                        except KeyError:
+                            ds = f.create_dataset("model_evaluations/gradient_results",
+                                                  (require_size * dim, gradient_results.shape[1]),
+                                                  maxshape=(None, gradient_results.shape[1]),
+                                                  dtype="float64")
+
+                        ds[i_start:(i_start + gradient_results.shape[0] * dim), :] = ten2mat(gradient_results)
+
                     for d in data_dict:
                         # # change list or single str to np.array
                         # if type(data_dict[d]) is list or type(data_dict[d]) is str:
@@ -265,6 +326,17 @@ class AbstractModel:
             A unique identifier; no two processes of the pool will run concurrently with the same identifier
         matlab_engine : Matlab engine object
             Matlab engine to run Matlab models
+
+        Returns
+        -------
+        res : ndarray of float [n_sim x n_out]
+            Results of the model
+        additional_data : dict or list of dict [n_sim], optional
+            Additional data of the model (saved in fn_results.hdf5)
+        gradient_results : ndarray of float [n_sim x n_out x dim], optional
+            Gradient of the results w.r.t. the random parameters in original parameter space (e.g. adjoint
+            gradients). Return a tuple (res, additional_data, gradient_results) with additional_data=None
+            if not present. The gradients are used by options["gradient_calculation"]="model".
         """
         pass
 
@@ -1,10 +1,13 @@
 import copy
 import h5py
+import itertools
 import os
 import time
 import shutil
 import numpy as np
+import scipy.stats
 from .Classifier import Classifier
+from .OutputReduction import OutputReduction
 from .Gradient import get_gradient
 from .misc import determine_projection_matrix
 from .misc import get_num_coeffs_sparse
@@ -14,6 +17,12 @@ from .misc import get_gradient_idx_domain
 from .misc import get_coords_discontinuity
 from .misc import increment_basis
 from .misc import get_num_coeffs_sparse
+from .misc import nrmsd
+from .misc import get_cartesian_product
+from .misc import append_rows
+from .Quadrature import get_quadrature_clenshaw_curtis_1d
+from .Quadrature import get_quadrature_fejer2_1d
+from .Quadrature import get_quadrature_patterson_1d
 from .Grid import *
 from .MEGPC import *
 from .Problem import *
@@ -79,6 +88,8 @@ class Algorithm(object):
             - "FD_1st": Finite difference approximation of 1st order accuracy using only the available samples [1]
             - "FD_2nd": Finite difference approximation of 2nd order accuracy using only the available samples [1]
             - "FD_1st2nd": Finite difference approximation of 1st and (where possible) 2nd order accuracy
+            - "model": Gradient provided by the model with the results (e.g. adjoint gradients), which requires no
+            additional model evaluations (see AbstractModel.simulate)
         options["gradient_calculation_options"] : dict, optional, default: {"dx": 0.01, "distance_weight": -2}
             Options for gradient calculation (details in get_gradient() function in Gradient.py)
         options["backend"] : str, optional, default: "python"
@@ -97,9 +108,27 @@ class Algorithm(object):
             GPC method to apply ['Reg', 'Quad']
         options["n_cpu"] : int, optional, default=1
             Number of threads to use for parallel evaluation of the model function.
+        options["n_cpu_domains"] : int, optional, default=1
+            Number of sub-gPCs (domains) of multi-element gPCs, which are processed concurrently (gPC matrices,
+            solves and validation). The BLAS threads are limited such that the total number of threads does not
+            exceed the number of CPUs (-1: use one worker per CPU).
+        options["output_reduction"] : boolean, optional, default: False
+            Compress the output space using a truncated singular value decomposition of the results matrix and
+            determine the gPC coefficients of the leading modes only (Static and RegAdaptive algorithms).
+            The returned coefficients are given in the reduced output space [n_basis x n_modes] and are mapped
+            back to the output quantities in gpc.get_approximation().
+        options["output_reduction_options"] : dict, optional, default: {"lambda_eps": 0.999, "n_modes_max": None,
+                                                                        "method": "svd", "seed": None}
+            Options of the output reduction (details in OutputReduction class)
         options["n_samples_validation"] : int, optional, default: 1e4
             Number of validation points used to determine the NRMSD if chosen as "error_type". Does not create a
             validation set if there is already one present in the Problem instance (problem.validation).
+        options["validation_cache_folder"] : str, optional, default: None
+            Folder of the on-disk cache of validation sets. Validation sets of the same problem are loaded from the
+            cache instead of evaluating the model again (and topped up if more samples are requested).
+        options["validation_matrix_max_mb"] : float, optional, default: 500
+            Maximum size of the cached gPC matrix of the validation set in MB. Larger validation sets are
+            evaluated blockwise when determining the NRMSD.
         options["print_func_time"] : boolean, optional, default: False
             Print function evaluation time for every single run
         options["projection"] : boolean, optional, default: False
@@ -110,10 +139,16 @@ class Algorithm(object):
             Solver to determine the gPC coefficients
             - 'Moore-Penrose' ... Pseudoinverse of gPC matrix (SGPC.Reg, EGPC)
             - 'OMP' ... Orthogonal Matching Pursuit, sparse recovery approach (SGPC.Reg, EGPC)
+            - 'OMP-CV' ... OMP with number of coefficients selected by cross validation (SGPC.Reg, EGPC)
+            - 'LARS-CV' ... Least squares on the LAR path selected by cross validation (hybrid LAR) (SGPC.Reg, EGPC)
+            - 'TSQR' ... Least squares solution by a QR decomposition of blocks of rows (out-of-core) (SGPC.Reg, EGPC)
         options["settings"]: dict
             Solver settings
             - 'Moore-Penrose' ... None
             - 'OMP' ... {"n_coeffs_sparse": int} Number of gPC coefficients != 0
+            - 'OMP-CV', 'LARS-CV' ... {"n_coeffs_sparse": int} Maximum number of gPC coefficients != 0,
+              {"n_folds": int} Number of folds (default: leave-one-out)
+            - 'TSQR' ... {"n_rows_block": int} Number of rows read at once, {"loocv": bool} Leave-one-out error
         options["verbose"] : boolean, optional, default=True
             Print output of iterations and sub-iterations (True/False)
         options["backend"] : str
@@ -167,15 +202,34 @@ class Algorithm(object):
                 self.options["settings"] = None
             elif self.options["method"] == "reg" and not (self.options["solver"] == "Moore-Penrose" or
                                                           self.options["solver"] == "OMP" or
-                                                          self.options["solver"] == "LarsLasso"):
-                raise AssertionError("Please specify 'Moore-Penrose' or 'OMP' as solver for 'reg' method")
+                                                          self.options["solver"] == "LarsLasso" or
+                                                          self.options["solver"] == "OMP-CV" or
+                                                          self.options["solver"] == "LARS-CV" or
+                                                          self.options["solver"] == "TSQR"):
+                raise AssertionError("Please specify 'Moore-Penrose', 'OMP', 'LarsLasso', 'OMP-CV', 'LARS-CV' or "
+                                     "'TSQR' as solver for 'reg' method")
 
         if "n_cpu" in self.options.keys():
             self.n_cpu = self.options["n_cpu"]
 
+        if "n_cpu_domains" not in self.options.keys():
+            self.options["n_cpu_domains"] = 1
+
         if "n_samples_validation" not in self.options.keys():
             self.options["n_samples_validation"] = 1e4
 
+        if "validation_cache_folder" not in self.options.keys():
+            self.options["validation_cache_folder"] = None
+
+        if "output_reduction" not in self.options.keys():
+            self.options["output_reduction"] = False
+
+        if "output_reduction_options" not in self.options.keys() or self.options["output_reduction_options"] is None:
+            self.options["output_reduction_options"] = dict()
+
+        if "lambda_eps" not in self.options["output_reduction_options"]:
+            self.options["output_reduction_options"]["lambda_eps"] = 0.999
+
         if "save_session_format" not in self.options.keys():
             self.options["save_session_format"] = ".hdf5"
         elif self.options["save_session_format"] not in [".hdf5", ".pkl"]:
@@ -213,6 +267,10 @@ class Algorithm(object):
                 "sparsity" not in self.options["settings"].keys())):
             raise AssertionError("Please specify correct solver settings for OMP in 'settings'")
 
+        if self.options["solver"] in ["OMP-CV", "LARS-CV", "TSQR"]:
+            if "settings" not in self.options.keys() or self.options["settings"] is None:
+                self.options["settings"] = dict()
+
         if self.options["solver"] == "LarsLasso":
             if "settings" in self.options.keys():
                 if self.options["settings"] is dict():
@@ -399,12 +457,23 @@ class Static(Algorithm):
             iprint('Gradient evaluation: ' + str(time.time() - start_time) + ' sec',
                    tab=0, verbose=self.options["verbose"])
 
+        # compress output space
+        if self.options["output_reduction"]:
+            gpc.output_reduction = OutputReduction(verbose=self.options["verbose"],
+                                                   **self.options["output_reduction_options"])
+            gpc.output_reduction.fit(res)
+            res_solve = gpc.output_reduction.transform(res)
+            grad_res_3D_solve = gpc.output_reduction.transform_gradient(grad_res_3D)
+        else:
+            res_solve = res
+            grad_res_3D_solve = grad_res_3D
+
         # Initialize gpc matrix
         gpc.init_gpc_matrix(gradient_idx=gradient_idx)
 
         # Compute gpc coefficients
-        coeffs = gpc.solve(results=res,
-                           gradient_results=grad_res_3D,
+        coeffs = gpc.solve(results=res_solve,
+                           gradient_results=grad_res_3D_solve,
                            solver=self.options["solver"],
                            settings=self.options["settings"],
                            verbose=True)
@@ -412,10 +481,11 @@ class Static(Algorithm):
         # create validation set if necessary
         if self.options["error_type"] == "nrmsd" and gpc.validation is None:
             gpc.create_validation_set(n_samples=self.options["n_samples_validation"],
-                                      n_cpu=self.options["n_cpu"])
+                                      n_cpu=self.options["n_cpu"],
+                                      cache_folder=self.options["validation_cache_folder"])
 
         # validate gpc approximation (determine nrmsd or loocv specified in options["error_type"])
-        eps = gpc.validate(coeffs=coeffs, results=res, gradient_results=grad_res_3D)
+        eps = gpc.validate(coeffs=coeffs, results=res_solve, gradient_results=grad_res_3D_solve)
 
         iprint("-> {} {} error = {}".format(self.options["error_norm"],
                                             self.options["error_type"],
@@ -466,6 +536,9 @@ class Static(Algorithm):
                     f.create_dataset("validation/grid/coords_norm", data=gpc.validation.grid.coords_norm,
                                      maxshape=None, dtype="float64")
 
+            if gpc.output_reduction is not None:
+                gpc.output_reduction.write(fname=fn_results + ".hdf5", folder="output_reduction")
+
         com.close()
 
         return gpc, coeffs, res
@@ -661,7 +734,7 @@ class MEStatic(Algorithm):
                                  validation=self.validation)
 
             # Write grid in gpc object
-            megpc[i_qoi].grid = copy.deepcopy(grid)
+            megpc[i_qoi].grid = copy.copy(grid)
 
             # determine gpc domains
             megpc[i_qoi].init_classifier(coords=megpc[i_qoi].grid.coords_norm,
@@ -697,9 +770,10 @@ class MEStatic(Algorithm):
             # create validation set if necessary
             if self.options["error_type"] == "nrmsd" and megpc[0].validation is None:
                 megpc[0].create_validation_set(n_samples=self.options["n_samples_validation"],
-                                               n_cpu=self.options["n_cpu"])
+                                               n_cpu=self.options["n_cpu"],
+                                               cache_folder=self.options["validation_cache_folder"])
             elif self.options["error_type"] == "nrmsd" and megpc[0].validation is not None:
-                megpc[i_qoi].validation = copy.deepcopy(megpc[0].validation)
+                megpc[i_qoi].validation = megpc[0].validation
 
             # validate gpc approximation (determine nrmsd or loocv specified in options["error_type"])
             eps = megpc[i_qoi].validate(coeffs=coeffs[i_qoi], results=res, gradient_results=grad_res_3D)
@@ -709,12 +783,9 @@ class MEStatic(Algorithm):
                                                 eps), tab=0, verbose=self.options["verbose"])
 
             # domain specific error
-            eps_domain = [0 for _ in range(len(np.unique(megpc[i_qoi].domains)))]
-            for i_gpc, d in enumerate(np.unique(megpc[i_qoi].domains)):
-                eps_domain[d] = megpc[i_qoi].validate(coeffs=coeffs[i_qoi],
-                                                      results=res,
-                                                      domain=d,
-                                                      output_idx=output_idx_passed_validation)
+            eps_domain = megpc[i_qoi].validate_domains(coeffs=coeffs[i_qoi],
+                                                       results=res,
+                                                       output_idx=output_idx_passed_validation)
 
             # save data
             if self.options["fn_results"] is not None:
@@ -1040,7 +1111,7 @@ class StaticProjection(Algorithm):
                                   fn_results=None,
                                   print_func_time=self.options["print_func_time"])
 
-                res_all = np.vstack((res_all, res_new))
+                res_all = append_rows(res_all, res_new)
 
                 iprint('Total function evaluation: ' + str(time.time() - start_time) + ' sec',
                        tab=0, verbose=self.options["verbose"])
@@ -1076,21 +1147,17 @@ class StaticProjection(Algorithm):
                     res = res_all[:, q_idx][:, np.newaxis]
                     grad_res_3D = grad_res_3D_all[:, q_idx, :][:, np.newaxis, :]
 
-            # copy grid to gPC object and initialize transformed grid
-            gpc[i_qoi].grid_original = copy.deepcopy(grid_original)
-            gpc[i_qoi].grid = copy.deepcopy(grid_original)
+            # share (snapshot of) original grid with gPC object and initialize transformed grid
+            gpc[i_qoi].grid_original = copy.copy(grid_original)
 
             # transform variables of original grid to reduced parameter space
-            gpc[i_qoi].grid.coords = np.matmul(gpc[i_qoi].grid_original.coords,
-                                            gpc[i_qoi].p_matrix.transpose())
-            gpc[i_qoi].grid.coords_norm = np.matmul(gpc[i_qoi].grid_original.coords_norm,
-                                                 gpc[i_qoi].p_matrix.transpose() /
-                                                 gpc[i_qoi].p_matrix_norm[np.newaxis, :])
+            gpc[i_qoi].grid = grid_original.get_projected_grid(p_matrix=gpc[i_qoi].p_matrix,
+                                                               p_matrix_norm=gpc[i_qoi].p_matrix_norm)
 
             # gpc_red.interaction_order_current = 1
             # self.options_red = copy.deepcopy(self.options)
             # self.options_red["interaction_order"] = 1
-            gpc[i_qoi].options = copy.deepcopy(self.options)
+            gpc[i_qoi].options = copy.copy(self.options)
 
             # Initialize gpc matrix
             gpc[i_qoi].init_gpc_matrix(gradient_idx=gradient_idx)
@@ -1111,9 +1178,10 @@ class StaticProjection(Algorithm):
             # validate gpc approximation (determine nrmsd or loocv specified in options["error_type"])
             if self.options["error_type"] == "nrmsd" and gpc[0].validation is None:
                 gpc[0].create_validation_set(n_samples=self.options["n_samples_validation"],
-                                             n_cpu=self.options["n_cpu"])
+                                             n_cpu=self.options["n_cpu"],
+                                             cache_folder=self.options["validation_cache_folder"])
             elif self.options["error_type"] == "nrmsd" and gpc[0].validation is not None:
-                gpc[i_qoi].validation = copy.deepcopy(gpc[0].validation)
+                gpc[i_qoi].validation = gpc[0].validation
 
             eps = gpc[i_qoi].validate(coeffs=coeffs[i_qoi], results=res, gradient_results=grad_res_3D_passed)
 
@@ -1379,7 +1447,7 @@ class MEStaticProjection(Algorithm):
                                  options=self.options,
                                  validation=self.validation)
 
-            megpc[i_qoi].grid = copy.deepcopy(grid)
+            megpc[i_qoi].grid = copy.copy(grid)
 
             # determine gpc domains
             megpc[i_qoi].init_classifier(coords=megpc[i_qoi].grid.coords_norm,
@@ -1466,7 +1534,7 @@ class MEStaticProjection(Algorithm):
                                       fn_results=None,
                                       print_func_time=self.options["print_func_time"])
 
-                    res_all = np.vstack((res_all, res_new))
+                    res_all = append_rows(res_all, res_new)
 
                     iprint('Total function evaluation: ' + str(time.time() - start_time) + ' sec',
                            tab=0, verbose=self.options["verbose"])
@@ -1517,10 +1585,10 @@ class MEStaticProjection(Algorithm):
                                          options=self.options["classifier_options"])
 
             # copy grid to gPC object and initialize transformed grid
-            megpc[i_qoi].grid = copy.deepcopy(grid)
+            megpc[i_qoi].grid = copy.copy(grid)
 
             # copy options to MEGPC object
-            megpc[i_qoi].options = copy.deepcopy(self.options)
+            megpc[i_qoi].options = copy.copy(self.options)
 
             # assign grids to sub-gPCs (rotate sub-grids in case of projection)
             megpc[i_qoi].assign_grids(gradient_idx=gradient_idx)
@@ -1544,9 +1612,10 @@ class MEStaticProjection(Algorithm):
             # validate gpc approximation (determine nrmsd or loocv specified in options["error_type"])
             if self.options["error_type"] == "nrmsd" and megpc[0].validation is None:
                 megpc[0].create_validation_set(n_samples=self.options["n_samples_validation"],
-                                               n_cpu=self.options["n_cpu"])
+                                               n_cpu=self.options["n_cpu"],
+                                               cache_folder=self.options["validation_cache_folder"])
             elif self.options["error_type"] == "nrmsd" and megpc[0].validation is not None:
-                megpc[i_qoi].validation = copy.deepcopy(megpc[0].validation)
+                megpc[i_qoi].validation = megpc[0].validation
 
             eps = megpc[i_qoi].validate(coeffs=coeffs[i_qoi], results=res, gradient_results=grad_res_3D_passed)
 
@@ -1555,12 +1624,9 @@ class MEStaticProjection(Algorithm):
                                                 eps), tab=0, verbose=self.options["verbose"])
 
             # domain specific error
-            eps_domain = [0 for _ in range(len(np.unique(megpc[i_qoi].domains)))]
-            for i_gpc, d in enumerate(np.unique(megpc[i_qoi].domains)):
-                eps_domain[d] = megpc[i_qoi].validate(coeffs=coeffs[i_qoi],
-                                                      results=res,
-                                                      domain=d,
-                                                      output_idx=output_idx_passed_validation)
+            eps_domain = megpc[i_qoi].validate_domains(coeffs=coeffs[i_qoi],
+                                                       results=res,
+                                                       output_idx=output_idx_passed_validation)
             # save data
             if self.options["fn_results"] is not None:
 
@@ -1675,6 +1741,13 @@ class RegAdaptive(Algorithm):
     options["adaptive_sampling"] : boolean, optional, default: True
         Adds samples adaptively to the expansion until the error is converged and continues by
         adding new basis functions.
+    options["early_stopping"] : boolean, optional, default: False
+        Update the gPC coefficients and the error (recursive least squares) while the results of the model
+        evaluations arrive and cancel the outstanding model evaluations once the error is below options["eps"].
+        Only available for the "Moore-Penrose" solver without gradient enhancement.
+    options["n_block_early_stopping"] : int, optional, default: None
+        Number of model evaluations after which the coefficients and the error are updated.
+        (default: 1 for n_cpu > 0, all grid points at once for n_cpu = 0)
 
     Examples
     --------
@@ -1709,6 +1782,102 @@ class RegAdaptive(Algorithm):
         if "adaptive_sampling" not in self.options.keys():
             self.options["adaptive_sampling"] = True
 
+        if "early_stopping" not in self.options.keys():
+            self.options["early_stopping"] = False
+
+        if "n_block_early_stopping" not in self.options.keys():
+            self.options["n_block_early_stopping"] = None
+
+        if self.options["early_stopping"] and (self.options["solver"] != "Moore-Penrose" or
+                                               self.options["gradient_enhanced"]):
+            raise AssertionError("Early stopping is only available for the 'Moore-Penrose' solver without "
+                                 "gradient enhancement")
+
+    def get_callback_early_stopping(self, gpc, res, i_grid):
+        """
+        Creates the callback function passed to Computation.run(), which updates the gPC coefficients and the
+        error with the streamed results of the new grid points using recursive least squares.
+        The callback returns True when the error is below options["eps"] to cancel the outstanding model evaluations.
+
+        callback = RegAdaptive.get_callback_early_stopping(gpc, res, i_grid)
+
+        Parameters
+        ----------
+        gpc : GPC object instance
+            GPC object with extended grid
+        res : ndarray of float [i_grid x n_out] or None
+            Results of the already evaluated grid points
+        i_grid : int
+            Number of already evaluated grid points
+
+        Returns
+        -------
+        callback : function
+            Callback function with the results of the finished model evaluations [n_finished x n_out] as argument
+        """
+        state = {"n_finished": 0, "coeffs": None, "matrix": None, "results": None}
+
+        if i_grid > 0:
+            if gpc.gpc_matrix is not None and gpc.gpc_matrix.shape == (i_grid, gpc.basis.n_basis):
+                state["matrix"] = gpc.gpc_matrix
+            else:
+                state["matrix"] = gpc.create_gpc_matrix(b=gpc.basis.b, x=gpc.grid.coords_norm[:i_grid, :])
+
+            if gpc.output_reduction is not None:
+                state["results"] = gpc.output_reduction.transform(res)
+            else:
+                state["results"] = res
+
+        def callback(res_finished):
+            idx_new = np.arange(i_grid + state["n_finished"], i_grid + res_finished.shape[0])
+            res_new = res_finished[state["n_finished"]:, :]
+            state["n_finished"] = res_finished.shape[0]
+
+            if gpc.output_reduction is not None:
+                res_new = gpc.output_reduction.transform(res_new)
+
+            matrix_new = gpc.create_gpc_matrix(b=gpc.basis.b, x=gpc.grid.coords_norm[idx_new, :])
+
+            if state["matrix"] is None:
+                state["matrix"] = matrix_new
+                state["results"] = res_new
+            else:
+                state["matrix"] = append_rows(state["matrix"], matrix_new)
+                state["results"] = append_rows(state["results"], res_new)
+
+            # the recursive update is not possible for NaN results and is started with a margin of samples
+            # (n_grid >= 2 * n_basis) to obtain a well conditioned initial system
+            if np.isnan(state["results"]).any() or state["matrix"].shape[0] < 2 * state["matrix"].shape[1]:
+                return False
+
+            if state["coeffs"] is None:
+                state["coeffs"] = gpc.init_rls(matrix=state["matrix"], results=state["results"])
+
+                if state["coeffs"] is None:
+                    return False
+            else:
+                state["coeffs"] = gpc.update_rls(matrix=matrix_new, results=res_new, coeffs=state["coeffs"])
+
+            if self.options["error_type"] == "loocv":
+                eps = gpc.get_loocv_rls(matrix=state["matrix"],
+                                        results=state["results"],
+                                        coeffs=state["coeffs"],
+                                        error_norm=self.options["error_norm"])
+            else:
+                gpc_results = gpc.get_approximation_validation(state["coeffs"])
+
+                if gpc_results.ndim == 1:
+                    gpc_results = gpc_results[:, np.newaxis]
+
+                eps = float(np.mean(nrmsd(gpc_results,
+                                          gpc.validation.results,
+                                          error_norm=self.options["error_norm"],
+                                          x_axis=False)))
+
+            return eps < self.options["eps"]
+
+        return callback
+
     def run(self):
         """
         Runs adaptive gPC algorithm to solve problem.
@@ -1763,7 +1932,8 @@ class RegAdaptive(Algorithm):
         # Add a validation set if nrmsd is chosen and no validation set is yet present
         if self.options["error_type"] == "nrmsd" and not isinstance(self.validation, ValidationSet):
             gpc.create_validation_set(n_samples=self.options["n_samples_validation"],
-                                      n_cpu=self.options["n_cpu"])
+                                      n_cpu=self.options["n_cpu"],
+                                      cache_folder=self.options["validation_cache_folder"])
 
         # Initialize Grid object
         if self.options["solver"] == "Moore-Penrose":
@@ -1861,6 +2031,13 @@ class RegAdaptive(Algorithm):
 
                         start_time = time.time()
 
+                        if self.options["early_stopping"]:
+                            callback = self.get_callback_early_stopping(gpc=gpc,
+                                                                        res=res if i_grid > 0 else None,
+                                                                        i_grid=i_grid)
+                        else:
+                            callback = None
+
                         res_new = com.run(model=gpc.problem.model,
                                           problem=gpc.problem,
                                           coords=gpc.grid.coords[int(i_grid):int(len(gpc.grid.coords))],
@@ -1868,16 +2045,31 @@ class RegAdaptive(Algorithm):
                                           i_iter=basis_order[0],
                                           i_subiter=basis_order[1],
                                           fn_results=gpc.fn_results,
-                                          print_func_time=self.options["print_func_time"])
+                                          print_func_time=self.options["print_func_time"],
+                                          callback=callback,
+                                          n_block=self.options["n_block_early_stopping"])
 
                         iprint('Total parallel function evaluation: ' + str(time.time() - start_time) + ' sec',
                                tab=0, verbose=self.options["verbose"])
 
+                        # remove grid points of cancelled model evaluations
+                        if res_new.shape[0] < gpc.grid.n_grid - i_grid:
+                            iprint("Early stopping: error criterion met, cancelled {} simulations".format(
+                                gpc.grid.n_grid - i_grid - res_new.shape[0]), tab=0, verbose=self.options["verbose"])
+                            gpc.grid.delete(idx=np.arange(i_grid + res_new.shape[0], gpc.grid.n_grid))
+
                         # Append result to solution matrix (RHS)
                         if i_grid == 0:
                             res = res_new
                         else:
-                            res = np.vstack([res, res_new])
+                            res = append_rows(res, res_new)
+
+                        # update compression of output space with new results
+                        if self.options["output_reduction"]:
+                            if gpc.output_reduction is None:
+                                gpc.output_reduction = OutputReduction(verbose=self.options["verbose"],
+                                                                       **self.options["output_reduction_options"])
+                            gpc.output_reduction.update(res_new)
 
                         if self.options["gradient_enhanced"]:
                             start_time = time.time()
@@ -1899,7 +2091,7 @@ class RegAdaptive(Algorithm):
                                                                      ["gradient_calculation_options"]
                                                                      ["distance_weight"])
 
-                            if self.options["gradient_calculation"] == "FD_fwd":
+                            if self.options["gradient_calculation"] in ["FD_fwd", "model"]:
                                 gradient_idx_FD_fwd = gradient_idx
                                 grad_res_3D_FD_fwd = grad_res_3D
 
@@ -1911,17 +2103,25 @@ class RegAdaptive(Algorithm):
                     # update gpc matrix
                     gpc.init_gpc_matrix(gradient_idx=gradient_idx)
 
+                    # project results to reduced output space
+                    if gpc.output_reduction is not None:
+                        res_solve = gpc.output_reduction.transform(res)
+                        grad_res_3D_solve = gpc.output_reduction.transform_gradient(grad_res_3D)
+                    else:
+                        res_solve = res
+                        grad_res_3D_solve = grad_res_3D
+
                     # determine gpc coefficients
-                    coeffs = gpc.solve(results=res,
-                                       gradient_results=grad_res_3D,
+                    coeffs = gpc.solve(results=res_solve,
+                                       gradient_results=grad_res_3D_solve,
                                        solver=gpc.solver,
                                        settings=gpc.settings,
                                        verbose=True)
 
                     # validate gpc approximation (determine nrmsd or loocv specified in options["error_type"])
                     eps = gpc.validate(coeffs=coeffs,
-                                       results=res,
-                                       gradient_results=grad_res_3D)
+                                       results=res_solve,
+                                       gradient_results=grad_res_3D_solve)
 
                     if extended_basis:
                         eps_ref = copy.deepcopy(eps)
@@ -1972,26 +2172,15 @@ class RegAdaptive(Algorithm):
                         f.create_dataset("model_evaluations/gradient_results_idx", data=gpc.gradient_idx,
                                          maxshape=None, dtype="int64")
 
-                    try:
-                        del f["gpc_matrix"]
-                    except KeyError:
-                        pass
-                    f.create_dataset("gpc_matrix",
-                                     data=gpc.gpc_matrix,
-                                     maxshape=None, dtype="float64")
+                    # append new rows and columns of gpc matrices
+                    gpc.write_gpc_matrix_hdf5(f=f, hdf5_path="gpc_matrix", gradient=False)
 
                     if gpc.gpc_matrix_gradient is not None:
-                        try:
-                            del f["gpc_matrix_gradient"]
-                        except KeyError:
-                            pass
-                        f.create_dataset("gpc_matrix_gradient",
-                                         data=gpc.gpc_matrix_gradient,
-                                         maxshape=None, dtype="float64")
+                        gpc.write_gpc_matrix_hdf5(f=f, hdf5_path="gpc_matrix_gradient", gradient=True)
 
         # determine gpc coefficients
-        coeffs = gpc.solve(results=res,
-                           gradient_results=grad_res_3D,
+        coeffs = gpc.solve(results=res_solve,
+                           gradient_results=grad_res_3D_solve,
                            solver=gpc.solver,
                            settings=gpc.settings,
                            verbose=True)
@@ -2006,22 +2195,10 @@ class RegAdaptive(Algorithm):
                     del f['coeffs']
                 f.create_dataset("coeffs", data=coeffs, maxshape=None, dtype="float64")
 
-                try:
-                    del f["gpc_matrix"]
-                except KeyError:
-                    pass
-                f.create_dataset("gpc_matrix",
-                                 data=gpc.gpc_matrix,
-                                 maxshape=None, dtype="float64")
+                gpc.write_gpc_matrix_hdf5(f=f, hdf5_path="gpc_matrix", gradient=False)
 
                 if gpc.gpc_matrix_gradient is not None:
-                    try:
-                        del f["gpc_matrix_gradient"]
-                    except KeyError:
-                        pass
-                    f.create_dataset("gpc_matrix_gradient",
-                                     data=gpc.gpc_matrix_gradient,
-                                     maxshape=None, dtype="float64")
+                    gpc.write_gpc_matrix_hdf5(f=f, hdf5_path="gpc_matrix_gradient", gradient=True)
 
                 # misc
                 f.create_dataset("misc/fn_session",
@@ -2045,6 +2222,10 @@ class RegAdaptive(Algorithm):
                     f.create_dataset("grid/coords_gradient_norm", data=gpc.grid.coords_gradient_norm,
                                      maxshape=None, dtype="float64")
 
+            if gpc.output_reduction is not None:
+                gpc.output_reduction.write(fname=os.path.splitext(self.options["fn_results"])[0] + ".hdf5",
+                                           folder="output_reduction")
+
         com.close()
 
         return gpc, coeffs, res
@@ -2074,6 +2255,9 @@ class MERegAdaptiveProjection(Algorithm):
         adding new basis functions.
     options["n_samples_discontinuity"] : int, optional, default: 10
         Number of grid points close to discontinuity to refine its location
+    options["n_samples_discontinuity_border"] : int, optional, default: 1e4
+        Number of points of the structured grid the classifier is evaluated on to detect the discontinuity
+        (may be increased in higher dimensions)
     options["n_grid_init"] : int, optional, default: 10
         Number of initial simulations to explore the parameter space
 
@@ -2111,6 +2295,9 @@ class MERegAdaptiveProjection(Algorithm):
         if "n_samples_discontinuity" not in self.options.keys():
             self.options["n_samples_discontinuity"] = 10
 
+        if "n_samples_discontinuity_border" not in self.options.keys():
+            self.options["n_samples_discontinuity_border"] = 1e4
+
         if "n_grid_init" not in self.options.keys():
             self.options["n_grid_init"] = 10
 
@@ -2218,7 +2405,7 @@ class MERegAdaptiveProjection(Algorithm):
                                                          dx=dx,
                                                          distance_weight=distance_weight)
 
-            if method == "FD_fwd":
+            if method in ["FD_fwd", "model"]:
                 gradient_idx_FD_fwd = gradient_idx
                 grad_res_3D_all_FD_fwd = grad_res_3D_all
             else:
@@ -2261,7 +2448,7 @@ class MERegAdaptiveProjection(Algorithm):
                                  validation=self.validation)
 
             # Write grid in gpc object
-            megpc[i_qoi].grid = copy.deepcopy(grid)
+            megpc[i_qoi].grid = copy.copy(grid)
 
             # determine gpc domains
             iprint("Determining gPC domains ...", tab=0, verbose=self.options["verbose"])
@@ -2314,7 +2501,7 @@ class MERegAdaptiveProjection(Algorithm):
                                          validation=None)
 
                 # save original problem in gpc object
-                megpc[i_qoi].gpc[d].problem_original = copy.deepcopy(problem_original)
+                megpc[i_qoi].gpc[d].problem_original = problem_original
 
                 # save projection matrix in gPC object
                 megpc[i_qoi].gpc[d].p_matrix = copy.deepcopy(p_matrix[d])
@@ -2348,7 +2535,7 @@ class MERegAdaptiveProjection(Algorithm):
                                             seed=None,
                                             domain=d)
 
-                    megpc[i_qoi].grid = copy.deepcopy(grid)
+                    megpc[i_qoi].grid = copy.copy(grid)
 
             if grid.n_grid > i_grid:
 
@@ -2369,7 +2556,7 @@ class MERegAdaptiveProjection(Algorithm):
                                   print_func_time=self.options["print_func_time"])
 
                 # add results to results array
-                res_all = np.vstack((res_all, res_new))
+                res_all = append_rows(res_all, res_new)
                 i_grid = grid.n_grid
 
                 iprint('Total function evaluation: ' + str(time.time() - start_time) + ' sec',
@@ -2402,7 +2589,7 @@ class MERegAdaptiveProjection(Algorithm):
                                                                  dx=dx,
                                                                  distance_weight=distance_weight)
 
-                    if method == "FD_fwd":
+                    if method in ["FD_fwd", "model"]:
                         gradient_idx_FD_fwd = gradient_idx
                         grad_res_3D_all_FD_fwd = grad_res_3D_all
                     else:
@@ -2412,7 +2599,7 @@ class MERegAdaptiveProjection(Algorithm):
                     iprint('Gradient evaluation: ' + str(time.time() - start_time) + ' sec',
                            tab=0, verbose=self.options["verbose"])
 
-                megpc[i_qoi].grid = copy.deepcopy(grid)
+                megpc[i_qoi].grid = copy.copy(grid)
 
                 # update classifier
                 iprint("Updating classifier ...", tab=0, verbose=self.options["verbose"])
@@ -2426,10 +2613,11 @@ class MERegAdaptiveProjection(Algorithm):
                        tab=0, verbose=self.options["verbose"])
                 megpc[0].create_validation_set(n_samples=self.options["n_samples_validation"],
                                                n_cpu=self.options["n_cpu"],
+                                               cache_folder=self.options["validation_cache_folder"],
                                                gradient=self.options["gradient_enhanced"])
 
             elif self.options["error_type"] == "nrmsd" and megpc[0].validation is not None:
-                megpc[i_qoi].validation = copy.deepcopy(megpc[0].validation)
+                megpc[i_qoi].validation = megpc[0].validation
 
             extended_basis = True
 
@@ -2459,62 +2647,67 @@ class MERegAdaptiveProjection(Algorithm):
                                                             x_min=[-1 for _ in range(megpc[i_qoi].problem.dim)],
                                                             x_max=[+1 for _ in range(megpc[i_qoi].problem.dim)],
                                                             n_coords_disc=self.options["n_samples_discontinuity"],
-                                                            border_sampling="structured")
+                                                            border_sampling="structured",
+                                                            n_samples_border=self.options[
+                                                                "n_samples_discontinuity_border"])
 
-                coords_disc = grid.get_denormalized_coordinates(coords_norm_disc)
+                # refine only if neighboring points in different domains were found
+                if coords_norm_disc.shape[0] > 0:
+                    coords_disc = grid.get_denormalized_coordinates(coords_norm_disc)
 
-                # add grid points close to discontinuity to global grid
-                grid.extend_random_grid(coords=coords_disc,
-                                        coords_norm=coords_norm_disc,
-                                        gradient=self.options["gradient_enhanced"])
+                    # add grid points close to discontinuity to global grid
+                    grid.extend_random_grid(coords=coords_disc,
+                                            coords_norm=coords_norm_disc,
+                                            gradient=self.options["gradient_enhanced"])
 
-                # run simulations close to discontinuity
-                iprint("Performing {} simulations to refine discontinuity location!".format(
-                    self.options["n_samples_discontinuity"]), tab=0, verbose=self.options["verbose"])
+                    # run simulations close to discontinuity
+                    iprint("Performing {} simulations to refine discontinuity location!".format(
+                        coords_disc.shape[0]), tab=0, verbose=self.options["verbose"])
 
-                start_time = time.time()
+                    start_time = time.time()
 
-                res_disc = com.run(model=self.problem.model,
-                                   problem=self.problem,
-                                   coords=coords_disc,
-                                   coords_norm=coords_norm_disc,
-                                   i_iter="Domain boundary",
-                                   i_subiter=None,
-                                   fn_results=self.options["fn_results"],
-                                   print_func_time=self.options["print_func_time"])
+                    res_disc = com.run(model=self.problem.model,
+                                       problem=self.problem,
+                                       coords=coords_disc,
+                                       coords_norm=coords_norm_disc,
+                                       i_iter="Domain boundary",
+                                       i_subiter=None,
+                                       fn_results=self.options["fn_results"],
+                                       print_func_time=self.options["print_func_time"])
 
-                iprint('Total function evaluation: ' + str(time.time() - start_time) + ' sec',
-                       tab=0, verbose=self.options["verbose"])
+                    iprint('Total function evaluation: ' + str(time.time() - start_time) + ' sec',
+                           tab=0, verbose=self.options["verbose"])
 
-                # add results to results array
-                res_all = np.vstack((res_all, res_disc))
+                    # add results to results array
+                    res_all = append_rows(res_all, res_disc)
 
-                # Determine gradient [n_grid x n_out x dim]
-                if self.options["gradient_enhanced"] or self.options["projection"]:
-                    start_time = time.time()
+                    # Determine gradient [n_grid x n_out x dim]
+                    if self.options["gradient_enhanced"] or self.options["projection"]:
+                        start_time = time.time()
 
-                    grad_res_3D_all, gradient_idx = get_gradient(model=self.problem.model,
-                                                                 problem=self.problem,
-                                                                 grid=grid,
-                                                                 results=res_all,
-                                                                 com=com,
-                                                                 method=self.options["gradient_calculation"],
-                                                                 gradient_results_present=grad_res_3D_all_FD_fwd,
-                                                                 gradient_idx_skip=gradient_idx_FD_fwd,
-                                                                 i_iter="Domain boundary",
-                                                                 i_subiter=None,
-                                                                 print_func_time=self.options["print_func_time"],
-                                                                 dx=self.options["gradient_calculation_options"]["dx"],
-                                                                 distance_weight=self.options
-                                                                 ["gradient_calculation_options"]
-                                                                 ["distance_weight"])
+                        grad_res_3D_all, gradient_idx = get_gradient(model=self.problem.model,
+                                                                     problem=self.problem,
+                                                                     grid=grid,
+                                                                     results=res_all,
+                                                                     com=com,
+                                                                     method=self.options["gradient_calculation"],
+                                                                     gradient_results_present=grad_res_3D_all_FD_fwd,
+                                                                     gradient_idx_skip=gradient_idx_FD_fwd,
+                                                                     i_iter="Domain boundary",
+                                                                     i_subiter=None,
+                                                                     print_func_time=self.options["print_func_time"],
+                                                                     dx=self.options["gradient_calculation_options"]
+                                                                     ["dx"],
+                                                                     distance_weight=self.options
+                                                                     ["gradient_calculation_options"]
+                                                                     ["distance_weight"])
 
-                    if self.options["gradient_calculation"] == "FD_fwd":
-                        gradient_idx_FD_fwd = gradient_idx
-                        grad_res_3D_all_FD_fwd = grad_res_3D_all
+                        if self.options["gradient_calculation"] in ["FD_fwd", "model"]:
+                            gradient_idx_FD_fwd = gradient_idx
+                            grad_res_3D_all_FD_fwd = grad_res_3D_all
 
-                    iprint('Gradient evaluation: ' + str(time.time() - start_time) + ' sec',
-                           tab=0, verbose=self.options["verbose"])
+                        iprint('Gradient evaluation: ' + str(time.time() - start_time) + ' sec',
+                               tab=0, verbose=self.options["verbose"])
 
                 i_grid = grid.n_grid
 
@@ -2530,7 +2723,7 @@ class MERegAdaptiveProjection(Algorithm):
                         grad_res_3D = grad_res_3D_all[:, q_idx, :][:, np.newaxis, :]
 
                 # Write grid in gpc object
-                megpc[i_qoi].grid = copy.deepcopy(grid)
+                megpc[i_qoi].grid = copy.copy(grid)
 
                 # update classifier
                 iprint("Updating classifier ...", tab=0, verbose=self.options["verbose"])
@@ -2570,7 +2763,7 @@ class MERegAdaptiveProjection(Algorithm):
                                                  validation=None)
 
                         # save original problem in gpc object
-                        megpc[i_qoi].gpc[d].problem_original = copy.deepcopy(problem_original)
+                        megpc[i_qoi].gpc[d].problem_original = problem_original
 
                         # initialize domain specific interaction order and other settings
                         megpc[i_qoi].gpc[i_gpc].solver = self.options["solver"]
@@ -2609,7 +2802,7 @@ class MERegAdaptiveProjection(Algorithm):
                                                  validation=None)
 
                         # save original problem in gpc object
-                        megpc[i_qoi].gpc[d].problem_original = copy.deepcopy(problem_original)
+                        megpc[i_qoi].gpc[d].problem_original = problem_original
 
                         # save projection matrix in gPC object
                         megpc[i_qoi].gpc[d].p_matrix = copy.deepcopy(p_matrix[d])
@@ -2639,11 +2832,12 @@ class MERegAdaptiveProjection(Algorithm):
                                                    verbose=True)
 
                 # domain specific error
+                eps_domain = megpc[i_qoi].validate_domains(coeffs=coeffs[i_qoi],
+                                                           results=res,
+                                                           output_idx=output_idx_passed_validation)
+
                 for i_gpc, d in enumerate(np.unique(megpc[i_qoi].domains)):
-                    eps[d] = megpc[i_qoi].validate(coeffs=coeffs[i_qoi],
-                                                   results=res,
-                                                   domain=d,
-                                                   output_idx=output_idx_passed_validation)
+                    eps[d] = eps_domain[d]
                     error[i_qoi][d].append(eps[d])
 
                     iprint("-> Domain: {} {} {} "
@@ -2787,7 +2981,7 @@ class MERegAdaptiveProjection(Algorithm):
                                         tab=0, verbose=self.options["verbose"])
 
                                     # append to results array containing all qoi
-                                    res_all = np.vstack([res_all, res_new])
+                                    res_all = append_rows(res_all, res_new)
 
                                     if self.options["gradient_enhanced"] or self.options["projection"]:
                                         start_time = time.time()
@@ -2806,7 +3000,7 @@ class MERegAdaptiveProjection(Algorithm):
                                                                                      dx=self.options["gradient_calculation_options"]["dx"],
                                                                                      distance_weight=self.options["gradient_calculation_options"]["distance_weight"])
 
-                                        if self.options["gradient_calculation"] == "FD_fwd":
+                                        if self.options["gradient_calculation"] in ["FD_fwd", "model"]:
                                             gradient_idx_FD_fwd = gradient_idx
                                             grad_res_3D_all_FD_fwd = grad_res_3D_all
 
@@ -2866,7 +3060,7 @@ class MERegAdaptiveProjection(Algorithm):
                                                                      validation=None)
 
                                             # save original problem in gpc object
-                                            megpc[i_qoi].gpc[d].problem_original = copy.deepcopy(problem_original)
+                                            megpc[i_qoi].gpc[d].problem_original = problem_original
 
                                             # save projection matrix in gPC object
                                             megpc[i_qoi].gpc[d].p_matrix = copy.deepcopy(p_matrix[d])
@@ -2877,7 +3071,7 @@ class MERegAdaptiveProjection(Algorithm):
                                             megpc[i_qoi].gpc[d].settings = self.options["settings"]
 
                                     # update and assign grids
-                                    megpc[i_qoi].grid = copy.deepcopy(grid)
+                                    megpc[i_qoi].grid = copy.copy(grid)
 
                                     # assign grids to sub-gPCs (rotate sub-grids in case of projection)
                                     megpc[i_qoi].assign_grids(gradient_idx=gradient_idx)
@@ -2956,14 +3150,9 @@ class MERegAdaptiveProjection(Algorithm):
                             f.create_dataset("domains" + hdf5_subfolder,
                                              data=megpc[i_qoi].domains, maxshape=None, dtype="int64")
 
-                            # save gpc matrix
-                            try:
-                                del f["gpc_matrix" + hdf5_subfolder + "/dom_" + str(d)]
-                            except KeyError:
-                                pass
-                            f.create_dataset("gpc_matrix" + hdf5_subfolder + "/dom_" + str(d),
-                                             data=megpc[i_qoi].gpc[d].gpc_matrix,
-                                             maxshape=None, dtype="float64")
+                            # save gpc matrix (append new rows and columns)
+                            megpc[i_qoi].gpc[d].write_gpc_matrix_hdf5(
+                                f=f, hdf5_path="gpc_matrix" + hdf5_subfolder + "/dom_" + str(d), gradient=False)
 
                             if megpc[i_qoi].gpc[d].p_matrix is not None:
                                 try:
@@ -2976,14 +3165,15 @@ class MERegAdaptiveProjection(Algorithm):
 
                             # save gradient gpc matrix
                             if megpc[i_qoi].gpc[0].gpc_matrix_gradient is not None:
-                                try:
-                                    del f["gpc_matrix_gradient" + hdf5_subfolder + "/dom_" + str(d)]
-                                except KeyError:
-                                    pass
                                 if self.options["gradient_enhanced"]:
-                                    f.create_dataset("gpc_matrix_gradient" + hdf5_subfolder + "/dom_" + str(d),
-                                                     data=megpc[i_qoi].gpc[d].gpc_matrix_gradient,
-                                                     maxshape=None, dtype="float64")
+                                    megpc[i_qoi].gpc[d].write_gpc_matrix_hdf5(
+                                        f=f, hdf5_path="gpc_matrix_gradient" + hdf5_subfolder + "/dom_" + str(d),
+                                        gradient=True)
+                                else:
+                                    try:
+                                        del f["gpc_matrix_gradient" + hdf5_subfolder + "/dom_" + str(d)]
+                                    except KeyError:
+                                        pass
 
                             # save results
                             try:
@@ -3121,24 +3311,20 @@ class MERegAdaptiveProjection(Algorithm):
 
                     # save gpc matrix
                     for i_gpc, d in enumerate(np.unique(megpc[i_qoi].domains)):
-                        try:
-                            del f["gpc_matrix" + hdf5_subfolder + "/dom_" + str(d)]
-                        except KeyError:
-                            pass
-                        f.create_dataset("gpc_matrix" + hdf5_subfolder + "/dom_" + str(d),
-                                         data=megpc[i_qoi].gpc[d].gpc_matrix,
-                                         maxshape=None, dtype="float64")
+                        megpc[i_qoi].gpc[d].write_gpc_matrix_hdf5(
+                            f=f, hdf5_path="gpc_matrix" + hdf5_subfolder + "/dom_" + str(d), gradient=False)
 
                         # save gradient gpc matrix
                         if megpc[i_qoi].gpc[0].gpc_matrix_gradient is not None:
-                            try:
-                                del f["gpc_matrix_gradient" + hdf5_subfolder + "/dom_" + str(d)]
-                            except KeyError:
-                                pass
                             if self.options["gradient_enhanced"]:
-                                f.create_dataset("gpc_matrix_gradient" + hdf5_subfolder + "/dom_" + str(d),
-                                                 data=megpc[i_qoi].gpc[d].gpc_matrix_gradient,
-                                                 maxshape=None, dtype="float64")
+                                megpc[i_qoi].gpc[d].write_gpc_matrix_hdf5(
+                                    f=f, hdf5_path="gpc_matrix_gradient" + hdf5_subfolder + "/dom_" + str(d),
+                                    gradient=True)
+                            else:
+                                try:
+                                    del f["gpc_matrix_gradient" + hdf5_subfolder + "/dom_" + str(d)]
+                                except KeyError:
+                                    pass
 
                     try:
                         for i_gpc in range(megpc[i_qoi].n_gpc):
@@ -3392,18 +3578,12 @@ class RegAdaptiveProjection(Algorithm):
             gpc[i_qoi].p_matrix = copy.deepcopy(p_matrix)
             gpc[i_qoi].p_matrix_norm = copy.deepcopy(p_matrix_norm)
 
-            # transformed grid
-            grid[i_qoi] = copy.deepcopy(grid_original)
-
-            # transform variables of original grid to reduced parameter space
-            grid[i_qoi].coords = np.matmul(grid_original.coords,
-                                        gpc[i_qoi].p_matrix.transpose())
-            grid[i_qoi].coords_norm = np.matmul(grid_original.coords_norm,
-                                             gpc[i_qoi].p_matrix.transpose() /
-                                             gpc[i_qoi].p_matrix_norm[np.newaxis, :])
+            # transform variables of original grid to reduced parameter space (arrays are shared)
+            grid[i_qoi] = grid_original.get_projected_grid(p_matrix=gpc[i_qoi].p_matrix,
+                                                            p_matrix_norm=gpc[i_qoi].p_matrix_norm)
 
             # assign transformed grid
-            gpc[i_qoi].grid = copy.deepcopy(grid[i_qoi])
+            gpc[i_qoi].grid = grid[i_qoi]
 
             # Initialize gpc matrix
             gpc[i_qoi].init_gpc_matrix(gradient_idx=gradient_idx)
@@ -3500,7 +3680,7 @@ class RegAdaptiveProjection(Algorithm):
                                               fn_results=gpc[i_qoi].fn_results,
                                               print_func_time=self.options["print_func_time"])
 
-                            res_all = np.vstack((res_all, res_new))
+                            res_all = append_rows(res_all, res_new)
 
                             iprint('Total parallel function evaluation: ' + str(time.time() - start_time) + ' sec',
                                    tab=0, verbose=self.options["verbose"])
@@ -3524,7 +3704,7 @@ class RegAdaptiveProjection(Algorithm):
                                                                              dx=self.options["gradient_calculation_options"]["dx"],
                                                                              distance_weight=self.options["gradient_calculation_options"]["distance_weight"])
 
-                                if self.options["gradient_calculation"] == "FD_fwd":
+                                if self.options["gradient_calculation"] in ["FD_fwd", "model"]:
                                     gradient_idx_FD_fwd = gradient_idx
                                     grad_res_3D_all_FD_fwd = grad_res_3D_all
 
@@ -3577,23 +3757,17 @@ class RegAdaptiveProjection(Algorithm):
                                     # Save settings and options in gpc object
                                     gpc[i_qoi].solver = self.options["solver"]
                                     gpc[i_qoi].settings = self.options["settings"]
-                                    gpc[i_qoi].options = copy.deepcopy(self.options)
+                                    gpc[i_qoi].options = copy.copy(self.options)
                                     gpc[i_qoi].error = error
                                     gpc[i_qoi].relative_error_nrmsd = nrmsd
                                     gpc[i_qoi].relative_error_loocv = loocv
 
-                    # transformed grid
-                    grid[i_qoi] = copy.deepcopy(grid_original)
-
-                    # transform variables of original grid to reduced parameter space
-                    grid[i_qoi].coords = np.matmul(grid_original.coords,
-                                                   gpc[i_qoi].p_matrix.transpose())
-                    grid[i_qoi].coords_norm = np.matmul(grid_original.coords_norm,
-                                                        gpc[i_qoi].p_matrix.transpose() /
-                                                        gpc[i_qoi].p_matrix_norm[np.newaxis, :])
+                    # transform variables of original grid to reduced parameter space (arrays are shared)
+                    grid[i_qoi] = grid_original.get_projected_grid(p_matrix=gpc[i_qoi].p_matrix,
+                                                                    p_matrix_norm=gpc[i_qoi].p_matrix_norm)
 
                     # assign transformed grid
-                    gpc[i_qoi].grid = copy.deepcopy(grid[i_qoi])
+                    gpc[i_qoi].grid = grid[i_qoi]
 
                     # crop results to considered qoi
                     if self.options["qoi"] != "all":
@@ -3621,10 +3795,11 @@ class RegAdaptiveProjection(Algorithm):
                     # Add a validation set if nrmsd is chosen and no validation set is yet present
                     if self.options["error_type"] == "nrmsd" and not isinstance(gpc[0].validation, ValidationSet):
                         gpc[0].create_validation_set(n_samples=self.options["n_samples_validation"],
-                                                     n_cpu=self.options["n_cpu"])
+                                                     n_cpu=self.options["n_cpu"],
+                                                     cache_folder=self.options["validation_cache_folder"])
 
                     elif self.options["error_type"] == "nrmsd" and isinstance(gpc[0].validation, ValidationSet):
-                        gpc[i_qoi].validation = copy.deepcopy(gpc[0].validation)
+                        gpc[i_qoi].validation = gpc[0].validation
 
                     # validate gpc approximation (determine nrmsd or loocv specified in options["error_type"])
                     eps = gpc[i_qoi].validate(coeffs=coeffs[i_qoi],
@@ -3699,22 +3874,12 @@ class RegAdaptiveProjection(Algorithm):
                                              dtype="int64",
                                              data=gradient_idx)
 
-                        try:
-                            del f["gpc_matrix" + hdf5_subfolder]
-                        except KeyError:
-                            pass
-                        f.create_dataset("gpc_matrix" + hdf5_subfolder,
-                                         data=gpc[i_qoi].gpc_matrix,
-                                         maxshape=None, dtype="float64")
+                        # append new rows and columns of gpc matrices
+                        gpc[i_qoi].write_gpc_matrix_hdf5(f=f, hdf5_path="gpc_matrix" + hdf5_subfolder, gradient=False)
 
                         if gpc[i_qoi].gpc_matrix_gradient is not None:
-                            try:
-                                del f["gpc_matrix_gradient" + hdf5_subfolder]
-                            except KeyError:
-                                pass
-                            f.create_dataset("gpc_matrix_gradient" + hdf5_subfolder,
-                                             data=gpc[i_qoi].gpc_matrix_gradient,
-                                             maxshape=None, dtype="float64")
+                            gpc[i_qoi].write_gpc_matrix_hdf5(f=f, hdf5_path="gpc_matrix_gradient" + hdf5_subfolder,
+                                                             gradient=True)
 
                         try:
                             del f["error" + hdf5_subfolder]
@@ -3786,3 +3951,512 @@ class RegAdaptiveProjection(Algorithm):
         com.close()
 
         return gpc, coeffs, res
+
+
+class QuadAdaptive(Algorithm):
+    """
+    Dimension adaptive sparse grid quadrature algorithm [1]. The Smolyak index set is grown adaptively according to
+    error indicators, which are determined from the hierarchical surpluses of the first and second moment of the
+    model output. Nested quadrature rules are used, such that the model evaluations of earlier increments are
+    reused and only the new nodes of each increment are simulated. The gPC coefficients are determined by Smolyak
+    pseudo-spectral projection (combination technique) on the final index set [2].
+
+    Parameters
+    ----------
+    problem : Problem object
+        Object instance of gPC problem to investigate (beta distributed random parameters)
+    options["grid_type"] : str or list of str [dim], optional, default: "clenshaw_curtis"
+        Nested quadrature rule of the parameters ('clenshaw_curtis', 'fejer2', 'patterson')
+    options["level_max"] : int or list of int [dim], optional, default: 8
+        Maximum level of the quadrature rules in each dimension (Gauss-Patterson: 4)
+    options["n_grid_max"] : int, optional, default: 1e4
+        Maximum number of model evaluations
+    options["eps"] : float, optional, default: 1e-3
+        Bound of the sum of the relative error indicators of the active indices
+
+    Notes
+    -----
+    .. [1] Gerstner, T., & Griebel, M. (2003). Dimension-adaptive tensor-product quadrature.
+       Computing, 71(1), 65-87.
+
+    .. [2] Conrad, P. R., & Marzouk, Y. M. (2013). Adaptive Smolyak pseudospectral approximations.
+       SIAM Journal on Scientific Computing, 35(6), A2643-A2670.
+
+    Examples
+    --------
+    >>> import pygpc
+    >>> # initialize adaptive quadrature algorithm
+    >>> algorithm = pygpc.QuadAdaptive(problem=problem, options=options)
+    >>> # run algorithm
+    >>> gpc, coeffs, results = algorithm.run()
+    """
+
+    def __init__(self, problem, options, validation=None):
+        """
+        Constructor; Initializes dimension adaptive quadrature algorithm
+        """
+        options["method"] = "quad"
+
+        super(QuadAdaptive, self).__init__(problem=problem, options=options, validation=validation)
+        self.qoi_specific = False
+
+        # check contents of settings dict and set defaults
+        if "grid_type" not in self.options.keys():
+            self.options["grid_type"] = "clenshaw_curtis"
+
+        if type(self.options["grid_type"]) is str:
+            self.options["grid_type"] = [self.options["grid_type"]] * self.problem.dim
+
+        if "level_max" not in self.options.keys():
+            self.options["level_max"] = [4 if g == "patterson" else 8 for g in self.options["grid_type"]]
+
+        if not isinstance(self.options["level_max"], (list, tuple, np.ndarray)):
+            self.options["level_max"] = [self.options["level_max"]] * self.problem.dim
+
+        if "n_grid_max" not in self.options.keys():
+            self.options["n_grid_max"] = 1e4
+
+        for g in self.options["grid_type"]:
+            if g not in ["clenshaw_curtis", "fejer2", "patterson"]:
+                raise AssertionError("Please specify a nested quadrature rule ('clenshaw_curtis', 'fejer2' or "
+                                     "'patterson') in options['grid_type']")
+
+        for p in self.problem.parameters_random:
+            if self.problem.parameters_random[p].pdf_type != "beta":
+                raise AssertionError("QuadAdaptive supports beta distributed random parameters only")
+
+        # 1-D rules of the parameters and levels (keys, knots, weights, difference weights)
+        self.rules = dict()
+
+    @staticmethod
+    def get_n_nodes(grid_type, level):
+        """
+        Number of nodes of the nested quadrature rules
+
+        Parameters
+        ----------
+        grid_type : str
+            Quadrature rule ('clenshaw_curtis', 'fejer2', 'patterson')
+        level : int
+            Level of the quadrature rule (starting with 0)
+
+        Returns
+        -------
+        n : int
+            Number of nodes
+        """
+        if grid_type == "clenshaw_curtis":
+            return 1 if level == 0 else 2 ** level + 1
+        else:
+            return 2 ** (level + 1) - 1
+
+    def get_order_max(self, i_p, level):
+        """
+        Maximum polynomial order, whose projection is integrated exactly by the quadrature rule of a given level
+        (with uniform weight function).
+
+        Parameters
+        ----------
+        i_p : int
+            Index of the random parameter
+        level : int
+            Level of the quadrature rule (starting with 0)
+
+        Returns
+        -------
+        order : int
+            Maximum polynomial order
+        """
+        n = self.get_n_nodes(self.options["grid_type"][i_p], level)
+
+        if self.options["grid_type"][i_p] == "patterson" and n > 1:
+            exactness = (3 * n + 1) // 2
+        else:
+            exactness = n
+
+        return exactness // 2
+
+    def get_rule(self, i_p, level):
+        """
+        Determines the nodes, integer keys, weights (multiplied with the pdf) and weights of the difference rule
+        Q_l - Q_(l-1) of a parameter. The rules are memoised.
+
+        Parameters
+        ----------
+        i_p : int
+            Index of the random parameter
+        level : int
+            Level of the quadrature rule (starting with 0)
+
+        Returns
+        -------
+        rule : dict
+            "keys", "knots", "weights", "weights_pdf", "weights_diff_pdf" of the nodes of the level
+        """
+        if (i_p, level) not in self.rules.keys():
+            grid_type = self.options["grid_type"][i_p]
+            p = list(self.problem.parameters_random.keys())[i_p]
+            n = self.get_n_nodes(grid_type, level)
+
+            if grid_type == "clenshaw_curtis":
+                knots, weights = get_quadrature_clenshaw_curtis_1d(n)
+            elif grid_type == "fejer2":
+                knots, weights = get_quadrature_fejer2_1d(n)
+            else:
+                knots, weights = get_quadrature_patterson_1d(n)
+
+            knots = np.atleast_1d(np.asarray(knots, dtype=float))
+            weights = np.atleast_1d(np.asarray(weights, dtype=float))
+            keys = np.round(knots / 1e-10).astype(np.int64)
+            # normalized beta pdf on [-1, 1] including the boundaries (Clenshaw-Curtis nodes)
+            pdf_shape = self.problem.parameters_random[p].pdf_shape
+            weights_pdf = weights * scipy.stats.beta.pdf((knots + 1) / 2., a=pdf_shape[0], b=pdf_shape[1]) / 2.
+
+            # weights of the difference rule on the (nested) nodes of this level
+            weights_diff_pdf = copy.deepcopy(weights_pdf)
+
+            if level > 0:
+                rule_1 = self.get_rule(i_p, level - 1)
+                idx = {k: i for i, k in enumerate(keys.tolist())}
+
+                for k, w in zip(rule_1["keys"].tolist(), rule_1["weights_pdf"]):
+                    if k not in idx.keys():
+                        raise AssertionError("Quadrature rules of parameter {} are not nested".format(p))
+                    weights_diff_pdf[idx[k]] -= w
+
+            self.rules[(i_p, level)] = {"keys": keys,
+                                        "knots": knots,
+                                        "weights": weights,
+                                        "weights_pdf": weights_pdf,
+                                        "weights_diff_pdf": weights_diff_pdf}
+
+        return self.rules[(i_p, level)]
+
+    def get_tensor_grid(self, level):
+        """
+        Determines the keys, nodes and weights of the tensor product grid of a multi-index of levels
+
+        Parameters
+        ----------
+        level : tuple of int [dim]
+            Multi-index of levels
+
+        Returns
+        -------
+        keys : list of tuple of int [n_nodes]
+            Integer keys of the nodes
+        knots : ndarray of float [n_nodes x dim]
+            Nodes (normalized coordinates)
+        weights : ndarray of float [n_nodes]
+            Tensor product weights of the quadrature rules
+        weights_pdf : ndarray of float [n_nodes]
+            Tensor product weights multiplied with the joint pdf
+        weights_diff_pdf : ndarray of float [n_nodes]
+            Tensor product weights of the difference rules multiplied with the joint pdf
+        """
+        rules = [self.get_rule(i_p, l) for i_p, l in enumerate(level)]
+
+        keys = list(map(tuple, get_cartesian_product([r["keys"] for r in rules]).tolist()))
+        knots = get_cartesian_product([r["knots"] for r in rules])
+        weights = np.prod(get_cartesian_product([r["weights"] for r in rules]), axis=1)
+        weights_pdf = np.prod(get_cartesian_product([r["weights_pdf"] for r in rules]), axis=1)
+        weights_diff_pdf = np.prod(get_cartesian_product([r["weights_diff_pdf"] for r in rules]), axis=1)
+
+        return keys, knots, weights, weights_pdf, weights_diff_pdf
+
+    def run(self):
+        """
+        Runs dimension adaptive quadrature algorithm to solve problem.
+
+        Returns
+        -------
+        gpc : GPC object instance
+            GPC object containing all information i.e., Problem, Model, Grid, Basis, RandomParameter instances
+        coeffs: ndarray of float [n_basis x n_out]
+            GPC coefficients
+        res : ndarray of float [n_grid x n_out]
+            Simulation results at n_grid points of the n_out output variables
+        """
+        if self.options["fn_results"] is not None:
+            fn_results = os.path.splitext(self.options["fn_results"])[0]
+
+            if os.path.exists(fn_results + ".hdf5"):
+                os.remove(fn_results + ".hdf5")
+        else:
+            fn_results = None
+
+        dim = self.problem.dim
+
+        # Initialize parallel Computation class
+        com = Computation(n_cpu=self.n_cpu, matlab_model=self.options["matlab_model"])
+
+        # grid points (hashed by their integer keys) and results
+        point_index = dict()
+        coords_norm = np.zeros((0, dim))
+        res = None
+
+        # surpluses of the first and second moment of the active and old indices
+        surplus = dict()
+        active = []
+        old = set()
+        integral = 0.
+        integral_2 = 0.
+        eps = np.inf
+        candidates = [tuple([0] * dim)]
+        i_iter = 0
+
+        while True:
+            # collect new nodes of all candidate indices
+            keys_new = []
+            knots_new = []
+
+            for level in candidates:
+                keys, knots, _, _, _ = self.get_tensor_grid(level)
+
+                for i_key, key in enumerate(keys):
+                    if key not in point_index.keys():
+                        point_index[key] = coords_norm.shape[0] + len(keys_new)
+                        keys_new.append(key)
+                        knots_new.append(knots[i_key, :])
+
+            # run simulations of the new nodes only
+            if len(keys_new) > 0:
+                coords_norm_new = np.array(knots_new)
+
+                iprint("Performing {} simulations!".format(len(keys_new)), tab=0, verbose=self.options["verbose"])
+
+                start_time = time.time()
+
+                res_new = com.run(model=self.problem.model,
+                                  problem=self.problem,
+                                  coords=self.grid_denormalize(coords_norm_new),
+                                  coords_norm=coords_norm_new,
+                                  i_iter=i_iter,
+                                  i_subiter=None,
+                                  fn_results=fn_results,
+                                  print_func_time=self.options["print_func_time"])
+
+                iprint('Total parallel function evaluation: ' + str(time.time() - start_time) + ' sec',
+                       tab=0, verbose=self.options["verbose"])
+
+                coords_norm = append_rows(coords_norm, coords_norm_new)
+
+                if res is None:
+                    res = res_new
+                else:
+                    res = append_rows(res, res_new)
+
+            # hierarchical surpluses of the candidates
+            for level in candidates:
+                keys, _, _, _, weights_diff_pdf = self.get_tensor_grid(level)
+                idx = np.array([point_index[key] for key in keys])
+                surplus[level] = (np.dot(weights_diff_pdf, res[idx, :]), np.dot(weights_diff_pdf, res[idx, :] ** 2))
+                integral = integral + surplus[level][0]
+                integral_2 = integral_2 + surplus[level][1]
+                active.append(level)
+
+            # error indicators of the active indices
+            norm = np.max([np.linalg.norm(integral), 1e-12])
+            norm_2 = np.max([np.linalg.norm(integral_2), 1e-12])
+            error_indicator = np.array([max(np.linalg.norm(surplus[level][0]) / norm,
+                                            np.linalg.norm(surplus[level][1]) / norm_2) for level in active])
+            eps = np.sum(error_indicator)
+
+            iprint("Iteration #{}: {} indices, {} grid points, error indicator = {}".format(
+                i_iter, len(active) + len(old), coords_norm.shape[0], eps), tab=0, verbose=self.options["verbose"])
+
+            # the root index is always refined (its surplus may vanish by symmetry of the model)
+            if (len(old) > 0 and eps < self.options["eps"]) or len(active) == 0:
+                break
+
+            # refine the active index with the largest error indicator
+            level_refine = active.pop(int(np.argmax(error_indicator)))
+            old.add(level_refine)
+
+            # admissible forward neighbors (all backward neighbors are old indices)
+            candidates = []
+
+            for i_dim in range(dim):
+                level = list(level_refine)
+                level[i_dim] += 1
+
+                if level[i_dim] > self.options["level_max"][i_dim]:
+                    continue
+
+                admissible = True
+                for j_dim in range(dim):
+                    if j_dim != i_dim and level[j_dim] > 0:
+                        level_back = copy.deepcopy(level)
+                        level_back[j_dim] -= 1
+                        if tuple(level_back) not in old:
+                            admissible = False
+                            break
+
+                if admissible:
+                    candidates.append(tuple(level))
+
+            # check budget of model evaluations
+            n_grid_new = len(set([key for level in candidates for key in self.get_tensor_grid(level)[0]
+                                  if key not in point_index.keys()]))
+
+            if coords_norm.shape[0] + n_grid_new > self.options["n_grid_max"]:
+                iprint("Maximum number of model evaluations reached", tab=0, verbose=self.options["verbose"])
+                break
+
+            i_iter += 1
+
+        # Smolyak pseudo-spectral projection (combination technique) on the final index set
+        index_set = set(active) | old
+        combination_coeffs = dict()
+
+        for level in index_set:
+            # forward neighbors in the index set (only subsets of them can contribute)
+            forward = [i_dim for i_dim in range(dim)
+                       if tuple(np.array(level) + np.eye(dim, dtype=int)[i_dim]) in index_set]
+            c = 0
+
+            for z in itertools.product([0, 1], repeat=len(forward)):
+                level_z = np.array(level)
+                level_z[forward] += np.array(z, dtype=int)
+
+                if tuple(level_z) in index_set:
+                    c += (-1) ** int(np.sum(z))
+
+            if c != 0:
+                combination_coeffs[level] = c
+
+        # basis functions, which are projected exactly on the tensor grids
+        multi_indices_level = dict()
+        multi_indices = set()
+
+        for level in combination_coeffs.keys():
+            multi_indices_level[level] = list(map(tuple, get_cartesian_product(
+                [np.arange(self.get_order_max(i_p, l) + 1) for i_p, l in enumerate(level)]).tolist()))
+            multi_indices.update(multi_indices_level[level])
+
+        multi_indices = sorted(multi_indices, key=lambda m: (sum(m), [-_m for _m in m]))
+        basis_index = {m: i for i, m in enumerate(multi_indices)}
+
+        # Create gPC object
+        gpc = Quad(problem=self.problem,
+                   order=[0] * dim,
+                   order_max=0,
+                   order_max_norm=1.,
+                   interaction_order=dim,
+                   interaction_order_current=dim,
+                   options=self.options,
+                   validation=self.validation)
+
+        gpc.basis.init_basis_multi_indices(problem=self.problem, multi_indices=np.array(multi_indices))
+        gpc.order = list(np.max(np.array(multi_indices), axis=0))
+        gpc.order_max = int(np.max(np.sum(np.array(multi_indices), axis=1)))
+        gpc.backend = self.options["backend"]
+        gpc.solver = self.options["solver"]
+        gpc.settings = self.options["settings"]
+        gpc.options = copy.deepcopy(self.options)
+
+        # quadrature weights of the sparse grid (combination of the tensor grids)
+        weights = np.zeros(coords_norm.shape[0])
+
+        for level in combination_coeffs.keys():
+            keys, _, weights_level, _, _ = self.get_tensor_grid(level)
+            idx = np.array([point_index[key] for key in keys])
+            weights[idx] += combination_coeffs[level] * weights_level
+
+        level_all = np.array(list(index_set))
+
+        gpc.grid = SparseGrid(parameters_random=self.problem.parameters_random,
+                              options={"grid_type": self.options["grid_type"],
+                                       "level": list(np.max(level_all, axis=0)),
+                                       "level_max": int(np.max(np.sum(level_all, axis=1))),
+                                       "interaction_order": dim,
+                                       "order_sequence_type": "exp"},
+                              coords=self.grid_denormalize(coords_norm),
+                              coords_norm=coords_norm,
+                              weights=weights / 2 ** dim)
+        gpc.grid.n_grid = coords_norm.shape[0]
+
+        # Initialize gpc matrix
+        gpc.init_gpc_matrix()
+
+        # determine gpc coefficients by combining the tensor projections
+        coeffs = np.zeros((gpc.basis.n_basis, res.shape[1]))
+
+        for level in combination_coeffs.keys():
+            keys, _, _, weights_pdf, _ = self.get_tensor_grid(level)
+            idx = np.array([point_index[key] for key in keys])
+            idx_basis = np.array([basis_index[m] for m in multi_indices_level[level]])
+
+            coeffs[idx_basis, :] += combination_coeffs[level] * np.matmul(
+                gpc.gpc_matrix[idx[:, np.newaxis], idx_basis[np.newaxis, :]].transpose(),
+                weights_pdf[:, np.newaxis] * res[idx, :])
+
+        # validate gpc approximation
+        if self.options["error_type"] == "nrmsd":
+            if gpc.validation is None:
+                gpc.create_validation_set(n_samples=self.options["n_samples_validation"],
+                                          n_cpu=self.options["n_cpu"],
+                                          cache_folder=self.options["validation_cache_folder"])
+
+            eps = gpc.validate(coeffs=coeffs, results=res)
+        else:
+            # error estimate of the adaptive algorithm
+            gpc.error.append(eps)
+
+        iprint("-> {} error = {} ({} model evaluations)".format(self.options["error_type"]
+                                                                if self.options["error_type"] == "nrmsd"
+                                                                else "quadrature", eps, res.shape[0]),
+               tab=0, verbose=self.options["verbose"])
+
+        # save gpc object and gpc coeffs
+        if self.options["fn_results"] is not None:
+
+            with h5py.File(fn_results + ".hdf5", "a") as f:
+
+                # overwrite the grid and results written by the workers during the model evaluations
+                for d in ["grid/coords", "grid/coords_norm", "model_evaluations/results"]:
+                    try:
+                        del f[d]
+                    except KeyError:
+                        pass
+
+                f.create_dataset("misc/fn_session",
+                                 data=np.array([os.path.split(self.options["fn_session"])[1]]).astype("|S"))
+                f.create_dataset("misc/fn_session_folder",
+                                 data=np.array([self.options["fn_session_folder"]]).astype("|S"))
+                f.create_dataset("misc/error_type", data=self.options["error_type"])
+                f.create_dataset("error", data=eps, maxshape=None, dtype="float64")
+                f.create_dataset("grid/coords", data=gpc.grid.coords, maxshape=None, dtype="float64")
+                f.create_dataset("grid/coords_norm", data=gpc.grid.coords_norm, maxshape=None, dtype="float64")
+                f.create_dataset("grid/weights", data=gpc.grid.weights, maxshape=None, dtype="float64")
+                f.create_dataset("coeffs", data=coeffs, maxshape=None, dtype="float64")
+                f.create_dataset("gpc_matrix", data=gpc.gpc_matrix, maxshape=None, dtype="float64")
+                f.create_dataset("model_evaluations/results", data=res, maxshape=None, dtype="float64")
+
+                if gpc.validation is not None:
+                    f.create_dataset("validation/model_evaluations/results", data=gpc.validation.results,
+                                     maxshape=None, dtype="float64")
+                    f.create_dataset("validation/grid/coords", data=gpc.validation.grid.coords,
+                                     maxshape=None, dtype="float64")
+                    f.create_dataset("validation/grid/coords_norm", data=gpc.validation.grid.coords_norm,
+                                     maxshape=None, dtype="float64")
+
+        com.close()
+
+        return gpc, coeffs, res
+
+    def grid_denormalize(self, coords_norm):
+        """
+        Denormalizes grid points from [-1, 1] to the parameter space of the problem
+
+        Parameters
+        ----------
+        coords_norm : ndarray of float [n_grid x dim]
+            Normalized coordinates
+
+        Returns
+        -------
+        coords : ndarray of float [n_grid x dim]
+            Coordinates in parameter space
+        """
+        return Grid(parameters_random=self.problem.parameters_random).get_denormalized_coordinates(coords_norm)
@@ -185,6 +185,32 @@ class Basis:
         # initialize normalization factor (self.b_norm and self.b_norm_basis)
         self.init_basis_norm()
 
+    def init_basis_multi_indices(self, problem, multi_indices):
+        """
+        Initializes basis functions from a given set of multi-indices (e.g. determined by an adaptive algorithm).
+
+        Parameters
+        ----------
+        problem : Problem object
+            GPC Problem to analyze
+        multi_indices : ndarray of int [n_basis x dim]
+            Multi-indices of polynomial basis functions
+        """
+        self.dim = problem.dim
+        self.multi_indices = np.array(multi_indices, dtype=int)
+        self.n_basis = self.multi_indices.shape[0]
+
+        out = [self.set_basis(i_basis, problem) for i_basis in range(self.n_basis)]
+        self.b = [o[0] for o in out]
+        self.b_array = np.concatenate([o[1] for o in out])
+        self.b_array_grad = np.concatenate([o[2] for o in out])
+
+        # Generate unique IDs of basis functions
+        self.b_id = [uuid.uuid4() for _ in range(self.n_basis)]
+
+        # initialize normalization factor (self.b_norm and self.b_norm_basis)
+        self.init_basis_norm()
+
     def init_basis_norm(self):
         """
         Construct array of scaling factors self.b_norm [n_basis x dim] and self.b_norm_basis [n_basis x 1]
@@ -49,6 +49,11 @@ class ClassifierLearning(object):
         - options["n_clusters"] ... Number of clusters in case of "KMeans"
         - options["classifier"] ... Classification algorithm (e.g. "MLPClassifier")
         - options["classifier_solver"] ... Classification algorithm (e.g. "adam" or "lbfgs")
+        - options["incremental"] ... Warm start clusterer and classifier when the grid grows (default: False)
+        - options["n_replay"] ... Number of previous grid points replayed to the classifier in incremental
+          updates (default: 1000)
+        - options["drift_tol"] ... Fraction of previous grid points changing their domain, above which the
+          clusterer and classifier are refitted from scratch in incremental mode (default: 0.05)
 
     Attributes
     ----------
@@ -60,6 +65,10 @@ class ClassifierLearning(object):
         Classifier options
     clf: Classifier object
         Classifier object
+    n_refit: int
+        Number of full refits of clusterer and classifier during the updates
+    version: int
+        Number of updates of the classifier (used to invalidate cached domain assignments)
     """
     def __init__(self, coords, results, options=None):
         """
@@ -67,35 +76,38 @@ class ClassifierLearning(object):
         """
         self.results = results
         self.coords = coords
-        self.options = options
 
         # set defaults
         if options is None:
             options = dict()
+
+        if "clusterer" not in options.keys():
             options["clusterer"] = "KMeans"
+
+        if "n_clusters" not in options.keys():
             options["n_clusters"] = 2
+
+        if "classifier" not in options.keys():
             options["classifier"] = "MLPClassifier"
+
+        if "classifier_solver" not in options.keys():
             options["classifier_solver"] = "lbfgs"
 
-        # setup clusterer to determine domains (unsupervised learning)
-        if options["clusterer"] == "KMeans":
-            self.clusterer = KMeans(n_clusters=options["n_clusters"],
-                                    random_state=42,
-                                    n_jobs=-1,
-                                    n_init=100)
+        if "incremental" not in options.keys():
+            options["incremental"] = False
 
-        elif options["clusterer"] == "spectral_clustering":
-            raise NotImplementedError("spectral projection not implemented yet")
-            adjacency_matrix = None
-            self.clusterer = spectral_clustering(adjacency_matrix,
-                                                 n_clusters=options["n_clusters"],
-                                                 random_state=0,
-                                                 eigen_solver='arpack',
-                                                 assign_labels="discretize")
+        if "n_replay" not in options.keys():
+            options["n_replay"] = 1000
 
-        else:
-            raise AttributeError("Please specify correct clusterer: {""KMeans"", ""spectral_clustering""...}")
+        if "drift_tol" not in options.keys():
+            options["drift_tol"] = 0.05
 
+        self.options = options
+        self.n_refit = 0
+        self.version = 0
+
+        # setup clusterer to determine domains (unsupervised learning)
+        self.clusterer = self.init_clusterer()
         self.clusterer.fit(results)
         self.domains = self.clusterer.labels_
         self.swap_idx = np.arange(len(np.unique(self.domains)))
@@ -111,28 +123,62 @@ class ClassifierLearning(object):
 
         self.clf.fit(coords, self.domains)
 
-    def update(self, coords, results):
+    def init_clusterer(self, init=None):
         """
-        Updates classifier using the previous results
+        Initializes the clusterer
 
         Parameters
         ----------
-        coords: ndarray of float [n_grid, n_dim]
-            Grid points to train the classifier
-        results: ndarray [n_grid x n_out]
-            Results of the model evaluation
+        init : ndarray of float [n_clusters x n_out], optional, default: None
+            Initial cluster centers (warm start with a single initialization)
+
+        Returns
+        -------
+        clusterer : object
+            Clusterer object (not fitted)
         """
-        self.coords = coords
-        self.results = results
+        if self.options["clusterer"] == "KMeans":
+            if init is None:
+                clusterer = KMeans(n_clusters=self.options["n_clusters"],
+                                   random_state=42,
+                                   n_init=100)
+            else:
+                clusterer = KMeans(n_clusters=self.options["n_clusters"],
+                                   init=init,
+                                   n_init=1)
 
-        domains_old = copy.deepcopy(self.domains)
+        elif self.options["clusterer"] == "spectral_clustering":
+            raise NotImplementedError("spectral projection not implemented yet")
+            adjacency_matrix = None
+            clusterer = spectral_clustering(adjacency_matrix,
+                                            n_clusters=self.options["n_clusters"],
+                                            random_state=0,
+                                            eigen_solver='arpack',
+                                            assign_labels="discretize")
 
-        # rerun clusterer
-        self.clusterer.fit(self.results)
-        self.domains = self.clusterer.labels_
+        else:
+            raise AttributeError("Please specify correct clusterer: {""KMeans"", ""spectral_clustering""...}")
 
-        # check if domain labels are swapped and change it back to initial order
-        domains_new = self.domains[:len(domains_old)]
+        return clusterer
+
+    def swap_domains(self, domains_old, labels):
+        """
+        Checks if the domain labels of the clusterer are swapped and changes them back to the initial order.
+        Sets self.swap_idx.
+
+        Parameters
+        ----------
+        domains_old : ndarray of int [n_grid_old]
+            Domains of the previous grid points
+        labels : ndarray of int [n_grid]
+            Labels of the clusterer of all grid points (previous grid points first)
+
+        Returns
+        -------
+        domains : ndarray of int [n_grid]
+            Domains of all grid points in the initial order
+        """
+        domains_new = labels[:len(domains_old)]
         domains_unique = np.unique(domains_old)
 
         self.swap_idx = np.arange(len(domains_unique))
@@ -147,17 +193,99 @@ class ClassifierLearning(object):
                 else:
                     self.swap_idx[d] = d
 
-        domains_temp = np.zeros(self.domains.shape)
+        domains_temp = np.zeros(labels.shape)
 
         for d in domains_unique:
-            domains_temp[self.domains == d] = self.swap_idx[d]
+            domains_temp[labels == d] = self.swap_idx[d]
 
-        self.domains = domains_temp.astype(int)
+        return domains_temp.astype(int)
+
+    def update(self, coords, results):
+        """
+        Updates classifier using the previous results.
+
+        In incremental mode (options["incremental"]), the clusterer is warm started from the previous cluster
+        centers and the classifier continues its training (warm start) on the new grid points together with a
+        replay buffer of previous grid points. Clusterer and classifier are refitted from scratch when more than
+        options["drift_tol"] of the previous grid points change their domain.
+
+        Parameters
+        ----------
+        coords: ndarray of float [n_grid, n_dim]
+            Grid points to train the classifier (previous grid points first)
+        results: ndarray [n_grid x n_out]
+            Results of the model evaluation
+        """
+        n_grid_old = self.coords.shape[0]
+
+        self.version += 1
+        self.coords = coords
+        self.results = results
+
+        domains_old = copy.deepcopy(self.domains)
+
+        if self.options["incremental"] and self.options["clusterer"] == "KMeans":
+            # rerun clusterer starting from the previous cluster centers
+            clusterer = self.init_clusterer(init=self.clusterer.cluster_centers_)
+            clusterer.fit(self.results)
+            domains = self.swap_domains(domains_old, clusterer.labels_)
+
+            # cheap re-cluster check: refit from scratch if the domain assignments drift
+            if np.mean(domains[:len(domains_old)] != domains_old) <= self.options["drift_tol"]:
+                self.clusterer = clusterer
+                self.domains = domains
+
+                if self.update_classifier_incremental(n_grid_old=n_grid_old):
+                    return
+
+                self.clf.warm_start = False
+                self.clf.fit(self.coords, self.domains)
+                return
+
+            self.n_refit += 1
+            self.clusterer = self.init_clusterer()
+
+        # rerun clusterer
+        self.clusterer.fit(self.results)
+        self.domains = self.swap_domains(domains_old, self.clusterer.labels_)
 
         # rerun classifier
+        self.clf.warm_start = False
         self.clf.fit(self.coords, self.domains)
 
-    def predict(self, coords):
+    def update_classifier_incremental(self, n_grid_old):
+        """
+        Continues the training of the classifier (warm start) on the new grid points and a replay buffer of
+        options["n_replay"] randomly selected previous grid points, which contains all domains.
+
+        Parameters
+        ----------
+        n_grid_old : int
+            Number of previous grid points
+
+        Returns
+        -------
+        success : bool
+            False, if the training data does not contain all domains of the classifier (full fit necessary)
+        """
+        idx_old = np.random.permutation(n_grid_old)[:int(self.options["n_replay"])]
+
+        # make sure that all domains are contained in the replay buffer
+        for d in np.unique(self.domains[:n_grid_old]):
+            if not (self.domains[idx_old] == d).any():
+                idx_old = np.append(idx_old, np.where(self.domains[:n_grid_old] == d)[0][0])
+
+        idx = np.append(idx_old, np.arange(n_grid_old, self.coords.shape[0])).astype(int)
+
+        if not np.array_equal(np.unique(self.domains[idx]), self.clf.classes_):
+            return False
+
+        self.clf.warm_start = True
+        self.clf.fit(self.coords[idx, :], self.domains[idx])
+
+        return True
+
+    def predict(self, coords, n_chunk=10000):
         """
         Predict domains from new coordinates
 
@@ -165,13 +293,18 @@ class ClassifierLearning(object):
         ----------
         coords: ndarray of float [n_grid, n_dim]
             Grid points to classify (has to be a 2D array)
+        n_chunk: int, optional, default: 10000
+            Number of grid points classified at once
 
         Returns
         -------
         domains: ndarray of float [n_grid, n_dim]
             Domain IDs of grid-points
         """
+        if coords.shape[0] <= n_chunk:
+            return self.clf.predict(coords)
 
-        domains = self.clf.predict(coords)
+        domains = np.hstack([self.clf.predict(coords[i:i + n_chunk, :])
+                             for i in range(0, coords.shape[0], n_chunk)])
 
         return domains
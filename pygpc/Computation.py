@@ -10,6 +10,7 @@ import multiprocessing.pool
 from collections import OrderedDict
 from pygpc import Worker
 from .io import iprint
+from .Grid import Grid
 from .RandomParameter import *
 
 
@@ -38,6 +39,32 @@ def Computation(n_cpu, matlab_model=False):
         return ComputationPoolMap(n_cpu, matlab_model=matlab_model)
 
 
+def get_gradient_scale(problem):
+    """
+    Determines the derivatives of the original random parameters w.r.t. the normalized random parameters,
+    which are used to transform gradients provided by the model to the normalized parameter space.
+
+    gradient_scale = get_gradient_scale(problem)
+
+    Parameters
+    ----------
+    problem : Problem class instance
+        GPC Problem under investigation
+
+    Returns
+    -------
+    gradient_scale : ndarray of float [dim]
+        Derivatives dx/dxi of the original random parameters w.r.t. the normalized random parameters
+    """
+    grid = Grid(parameters_random=problem.parameters_random)
+
+    # the transformation between both parameter spaces is linear
+    gradient_scale = grid.get_denormalized_coordinates(np.ones((1, problem.dim))) - \
+                     grid.get_denormalized_coordinates(np.zeros((1, problem.dim)))
+
+    return gradient_scale[0, :]
+
+
 class ComputationPoolMap:
     """
     Computation sub-class to run the model using a processing pool for parallelization
@@ -59,6 +86,7 @@ class ComputationPoolMap:
         self.n_cpu = min(n_cpu, n_cpu_available)
 
         self.i_grid = 0
+        self.gradient_results = None
 
         # Use a process queue to assign persistent, unique IDs to the processes in the pool
         self.process_manager = multiprocessing.Manager()
@@ -83,7 +111,7 @@ class ComputationPoolMap:
             self.matlab_engine = matlab.engine.start_matlab()
 
     def run(self, model, problem, coords, coords_norm=None, i_iter=None, i_subiter=None, fn_results=None,
-            print_func_time=False, increment_grid=True):
+            print_func_time=False, increment_grid=True, callback=None, n_block=None):
         """
         Runs model evaluations for parameter combinations specified in coords array
 
@@ -107,11 +135,19 @@ class ComputationPoolMap:
             Print time of single function evaluation
         increment_grid : bool
             Increment grid counter (not done in case of gradient calculation)
+        callback : function, optional, default: None
+            Function called with the results of the simulations finished so far (in order of coords)
+            [n_finished x n_out]. If it returns True, the remaining model evaluations are cancelled.
+        n_block : int, optional, default: None
+            Number of finished simulations after which the callback is called (default: 1 for
+            ComputationPoolMap, all simulations at once for ComputationFuncPar)
 
         Returns
         -------
         res: ndarray of float [n_sims x n_out]
             n_sims simulation results of the n_out output quantities of the model under investigation.
+            In case of cancelled model evaluations, only the results of the first n_sims finished
+            parameter combinations are returned.
         """
         if i_iter is None:
             i_iter = "N/A"
@@ -141,6 +177,8 @@ class ComputationPoolMap:
         model_ = copy.deepcopy(model)
         model_.__clean__()
 
+        gradient_scale = get_gradient_scale(problem)
+
         for j, random_var_instances in enumerate(grid_new):
 
             if coords_norm is None:
@@ -160,7 +198,8 @@ class ComputationPoolMap:
                 'fn_results': fn_results,
                 'coords': np.array(random_var_instances)[np.newaxis, :],
                 'coords_norm': c_norm,
-                'print_func_time': print_func_time
+                'print_func_time': print_func_time,
+                'gradient_scale': gradient_scale
             }
 
             # deepcopy parameters
@@ -198,7 +237,16 @@ class ComputationPoolMap:
             seq_num += 1
 
         # start model evaluations
-        if self.n_cpu == 1:
+        if callback is not None:
+            res_new_list = self.run_callback(worker_objs=worker_objs, callback=callback, n_block=n_block)
+
+            # reset grid counter to the simulations, which were actually performed
+            if increment_grid:
+                self.i_grid -= n_grid_new - len(res_new_list)
+
+            n_grid_new = len(res_new_list)
+
+        elif self.n_cpu == 1:
             res_new_list = []
 
             for i in range(len(worker_objs)):
@@ -211,13 +259,79 @@ class ComputationPoolMap:
         # Initialize the result array with the correct size and set the elements according to their order
         # (the first element in 'res' might not necessarily be the result of the first Process/i_grid)
         res = [None] * n_grid_new
+        gradient_results = [None] * n_grid_new
         for result in res_new_list:
             res[result[0]] = result[1]
+            gradient_results[result[0]] = result[2]
 
         res = np.vstack(res)
 
+        # gradient of results provided by the model [n_sims x n_out x dim]
+        if n_grid_new > 0 and all(g is not None for g in gradient_results):
+            self.gradient_results = np.vstack(gradient_results)
+        else:
+            self.gradient_results = None
+
         return res
 
+    def run_callback(self, worker_objs, callback, n_block=None):
+        """
+        Evaluates the worker objects in order and passes the results to the callback function as they arrive.
+        At most n_cpu simulations are submitted to the pool at a time, such that the remaining simulations
+        can be cancelled when the callback returns True. Simulations, which are already running, are finished.
+
+        res_new_list = ComputationPoolMap.run_callback(worker_objs, callback, n_block=None)
+
+        Parameters
+        ----------
+        worker_objs : list of Model objects [n_sims]
+            Model objects with set parameters and context
+        callback : function
+            Function called with the results of the simulations finished so far [n_finished x n_out].
+            If it returns True, the remaining model evaluations are cancelled.
+        n_block : int, optional, default: None
+            Number of finished simulations after which the callback is called (default: 1)
+
+        Returns
+        -------
+        res_new_list : list of [seq_number, res] [n_finished]
+            Results of the finished simulations in order of the worker objects
+        """
+        if n_block is None:
+            n_block = 1
+
+        res_new_list = []
+        pending = []
+        n_passed = 0
+        i_submit = 0
+        stop = False
+
+        while len(res_new_list) < len(worker_objs):
+
+            if self.n_cpu == 1:
+                if stop:
+                    break
+
+                res_new_list.append(Worker.run(obj=worker_objs[len(res_new_list)], matlab_engine=self.matlab_engine))
+
+            else:
+                # keep the pool busy without queueing all simulations at once
+                while not stop and i_submit < len(worker_objs) and len(pending) < self.n_cpu:
+                    pending.append(self.process_pool.apply_async(Worker.run, (worker_objs[i_submit],
+                                                                              self.matlab_engine)))
+                    i_submit += 1
+
+                if len(pending) == 0:
+                    break
+
+                res_new_list.append(pending.pop(0).get())
+
+            if not stop and len(res_new_list) - n_passed >= n_block:
+                n_passed = len(res_new_list)
+                stop = bool(callback(np.vstack([r[1] for r in res_new_list])))
+
+        return res_new_list
+
     def close(self):
         """ Closes the pool """
         self.process_pool.close()
@@ -245,6 +359,7 @@ class ComputationFuncPar:
         self.n_cpu = min(n_cpu, n_cpu_available)
 
         self.i_grid = 0
+        self.gradient_results = None
 
         # Global counter used by all threads to keep track of the progress
         self.global_task_counter = 0
@@ -258,7 +373,7 @@ class ComputationFuncPar:
             self.matlab_engine = matlab.engine.start_matlab()
 
     def run(self, model, problem, coords, coords_norm=None, i_iter=None, i_subiter=None, fn_results=None,
-            print_func_time=False, increment_grid=True):
+            print_func_time=False, increment_grid=True, callback=None, n_block=None):
         """
         Runs model evaluations for parameter combinations specified in coords array
 
@@ -282,11 +397,19 @@ class ComputationFuncPar:
             Print time of single function evaluation
         increment_grid : bool
             Increment grid counter (not done in case of gradient calculation)
+        callback : function, optional, default: None
+            Function called with the results of the simulations finished so far (in order of coords)
+            [n_finished x n_out]. If it returns True, the remaining model evaluations are cancelled.
+        n_block : int, optional, default: None
+            Number of finished simulations after which the callback is called (default: 1 for
+            ComputationPoolMap, all simulations at once for ComputationFuncPar)
 
         Returns
         -------
         res: ndarray of float [n_sims x n_out]
             n_sims simulation results of the n_out output quantities of the model under investigation.
+            In case of cancelled model evaluations, only the results of the first n_sims finished
+            parameter combinations are returned.
         """
         if i_iter is None:
             i_iter = "N/A"
@@ -296,6 +419,35 @@ class ComputationFuncPar:
 
         n_grid = coords.shape[0]
 
+        # evaluate the model blockwise and pass the results to the callback function
+        if callback is not None:
+            if n_block is None:
+                n_block = n_grid
+
+            res = []
+            gradient_results = []
+
+            for i_start in range(0, n_grid, n_block):
+                if coords_norm is None:
+                    c_norm = None
+                else:
+                    c_norm = coords_norm[i_start:(i_start + n_block), ]
+
+                res.append(self.run(model=model, problem=problem, coords=coords[i_start:(i_start + n_block), ],
+                                    coords_norm=c_norm, i_iter=i_iter, i_subiter=i_subiter, fn_results=fn_results,
+                                    print_func_time=print_func_time, increment_grid=increment_grid))
+                gradient_results.append(self.gradient_results)
+
+                if callback(np.vstack(res)):
+                    break
+
+            if all(g is not None for g in gradient_results):
+                self.gradient_results = np.vstack(gradient_results)
+            else:
+                self.gradient_results = None
+
+            return np.vstack(res)
+
         # i_grid indices is now a range [min_idx, max_idx]
         if increment_grid:
             self.i_grid = [np.max(self.i_grid), np.max(self.i_grid) + n_grid]
@@ -325,7 +477,8 @@ class ComputationFuncPar:
             'fn_results': fn_results,
             'coords': coords,
             'coords_norm': c_norm,
-            'print_func_time': print_func_time
+            'print_func_time': print_func_time,
+            'gradient_scale': get_gradient_scale(problem)
         }
 
         parameters = OrderedDict()
@@ -354,6 +507,9 @@ class ComputationFuncPar:
         # start model evaluations
         res = Worker.run(obj=worker_objs, matlab_engine=self.matlab_engine)
 
+        # gradient of results provided by the model [n_sims x n_out x dim]
+        self.gradient_results = res[2]
+
         res = np.array(res[1])
 
         return res
@@ -1,23 +1,27 @@
 import numpy as np
-import fastmat as fm
 import scipy.stats
 import copy
+import os
 import h5py
 import time
 import random
 import sys
-from sklearn import linear_model
 from scipy.signal import savgol_filter
+from scipy.linalg import solve_triangular
 from .misc import get_cartesian_product
 from .misc import display_fancy_bar
 from .misc import nrmsd
 from .misc import mat2ten
 from .misc import ten2mat
+from .misc import append_rows
+from .misc import get_id_index
+from .io import write_matrix_to_hdf5
 from .pygpc_extensions import create_gpc_matrix_cpu
 from .pygpc_extensions import create_gpc_matrix_omp
 from .ValidationSet import *
 from .Computation import *
 from .Grid import *
+from .Solver import *
 
 
 try:
@@ -61,6 +65,25 @@ class GPC(object):
         Derivative of generalized polynomial chaos matrix
     matrix_inv: [N_poly (+ N_gradient) x N_samples] ndarray of float
         Pseudo inverse of the generalized polynomial chaos matrix (with or without gradient)
+    validation_matrix: [N_validation x N_poly] ndarray of float
+        Cached gPC matrix of the validation set, extended column-wise when the basis grows
+    validation_matrix_b_id: list of UUID objects (version 4) [N_poly]
+        Unique IDs of the basis functions in the columns of the validation gPC matrix
+    validation_matrix_coords_id: ndarray of int64 [N_validation]
+        Unique IDs of the validation points in the rows of the validation gPC matrix
+    validation_matrix_p_matrix: ndarray of float [dim_red x dim]
+        Normalized projection matrix (p_matrix / p_matrix_norm) the validation gPC matrix was computed with
+    validation_matrix_max_mb: float
+        Maximum size of the cached validation gPC matrix in MB. Larger validation sets are evaluated blockwise.
+    gram_matrix: GramMatrix object
+        Gram matrix Psi^T Psi and correlation vectors Psi^T y of the sparse solvers, updated incrementally
+    error_cv: ndarray of float [n_out]
+        Cross validation errors of the solutions selected by the 'OMP-CV' and 'LARS-CV' solvers
+        (leave-one-out errors of the 'TSQR' solver)
+    n_coeffs_cv: ndarray of int [n_out]
+        Numbers of non-zero gPC coefficients selected by the 'OMP-CV' and 'LARS-CV' solvers
+    rls_p: [N_poly x N_poly] ndarray of float
+        Inverse of the information matrix (Psi^T Psi)^-1 of the recursive least squares estimation (early stopping)
     p_matrix: [dim_red x dim] ndarray of float
         Projection matrix to reduce number of efficient dimensions (\\eta = p_matrix * \\xi)
     p_matrix_norm: [dim_red] ndarray of float
@@ -68,10 +91,22 @@ class GPC(object):
         the normalized space between [-1, 1], the transformed coordinates need to be scaled.
     nan_elm: ndarray of int
         Indices of NaN elements of model output
-    gpc_matrix_coords_id: list of UUID4()
-        UUID4() IDs of grid points the gPC matrix derived with
+    gpc_matrix_coords_id: ndarray of int64 [N_samples]
+        IDs of grid points the gPC matrix derived with
     gpc_matrix_b_id: list of UUID4()
         UUID4() IDs of basis functions the gPC matrix derived with
+    gpc_matrix_hdf5_state: dict
+        Path in .hdf5 file, grid point IDs and basis function IDs of the gPC matrices saved by
+        write_gpc_matrix_hdf5(), keys: version attributes of the datasets
+    basis_active_mask: ndarray of bool [n_basis x n_out]
+        Active (non-zero) basis functions of each output quantity determined by GPC.prune_basis()
+        (None if the gPC is not pruned)
+    basis_active_b_id: list of UUID4()
+        UUID4() IDs of the basis functions the pruning was derived with
+    output_reduction: OutputReduction object
+        Compression of the output space. If set, all gPC coefficients passed to the postprocessing methods are
+        given in the reduced output space [n_basis x n_modes] (None if the gPC coefficients are determined for all
+        output quantities)
     n_basis: int or list of int
         Number of basis functions (for iterative solvers, this is a list of its history)
     n_grid: int or list of int
@@ -81,6 +116,9 @@ class GPC(object):
         - 'Moore-Penrose' ... Pseudoinverse of gPC matrix (SGPC.Reg, EGPC)
         - 'OMP' ... Orthogonal Matching Pursuit, sparse recovery approach (SGPC.Reg, EGPC)
         - 'LarsLasso' ... {"alpha": float 0...1} Regularization parameter
+        - 'OMP-CV' ... OMP with number of coefficients selected by cross validation (SGPC.Reg, EGPC)
+        - 'LARS-CV' ... Least squares on the LAR path selected by cross validation (hybrid LAR) (SGPC.Reg, EGPC)
+        - 'TSQR' ... Least squares solution by a QR decomposition of blocks of rows (out-of-core) (SGPC.Reg, EGPC)
         - 'NumInt' ... Numerical integration, spectral projection (SGPC.Quad)
     verbose: bool
         Boolean value to determine if to print out the progress into the standard output
@@ -109,6 +147,10 @@ class GPC(object):
         self.gpc_matrix = None
         self.gpc_matrix_gradient = None
         self.matrix_inv = None
+        self.gram_matrix = GramMatrix()
+        self.error_cv = None
+        self.n_coeffs_cv = None
+        self.rls_p = None
         self.p_matrix = None
         self.p_matrix_norm = None
         self.nan_elm = []
@@ -116,6 +158,17 @@ class GPC(object):
         self.gpc_matrix_b_id = None
         self.gpc_matrix_gradient_coords_id = None
         self.gpc_matrix_gradient_b_id = None
+        self.gpc_matrix_hdf5_state = dict()
+        self.basis_active_mask = None
+        self.basis_active_b_id = None
+        self.basis_active_eps = 0.
+        self._basis_active_idx = None
+        self._basis_active_b_array = None
+        self.output_reduction = None
+        self.validation_matrix = None
+        self.validation_matrix_b_id = None
+        self.validation_matrix_coords_id = None
+        self.validation_matrix_p_matrix = None
         self.n_basis = []
         self.n_grid = []
         self.relative_error_nrmsd = []
@@ -138,16 +191,21 @@ class GPC(object):
             if "backend" not in options.keys():
                 options["backend"] = "python"
 
+            if "validation_matrix_max_mb" not in options.keys():
+                options["validation_matrix_max_mb"] = 500
+
             self.gradient = options["gradient_enhanced"]
             self.fn_results = options["fn_results"]
             self.matlab_model = options["matlab_model"]
             self.backend = options["backend"]
+            self.validation_matrix_max_mb = options["validation_matrix_max_mb"]
 
         else:
             self.gradient = None
             self.fn_results = None
             self.matlab_model = None
             self.backend = "python"
+            self.validation_matrix_max_mb = 500
 
         self.solver = None
         self.settings = None
@@ -168,12 +226,15 @@ class GPC(object):
         if self.gradient_idx is None or gradient_idx is not None:
             self.gradient_idx = gradient_idx
 
+        # the matrices are rebuilt (e.g. with a new projection and the same ids), saved matrices can not be extended
+        self.gpc_matrix_hdf5_state = dict()
+
         self.gpc_matrix = self.create_gpc_matrix(b=self.basis.b,
                                                  x=self.grid.coords_norm,
                                                  gradient=False)
         self.n_grid.append(self.gpc_matrix.shape[0])
         self.n_basis.append(self.gpc_matrix.shape[1])
-        self.gpc_matrix_coords_id = copy.deepcopy(self.grid.coords_id)
+        self.gpc_matrix_coords_id = self.grid.coords_id
         self.gpc_matrix_b_id = copy.deepcopy(self.basis.b_id)
 
         if self.gradient and self.gradient_idx is not None:
@@ -181,7 +242,7 @@ class GPC(object):
                                                               x=self.grid.coords_norm,
                                                               gradient=True)
             self.gpc_matrix_gradient = ten2mat(self.gpc_matrix_gradient)
-            self.gpc_matrix_gradient_coords_id = copy.deepcopy(self.grid.coords_id)
+            self.gpc_matrix_gradient_coords_id = self.grid.coords_id
             self.gpc_matrix_gradient_b_id = copy.deepcopy(self.basis.b_id)
 
     def create_gpc_matrix(self, b, x, gradient=False, gradient_idx=None, verbose=False):
@@ -394,6 +455,111 @@ class GPC(object):
 
         return relative_error_loocv
 
+    def init_rls(self, matrix, results):
+        """
+        Initializes the recursive least squares (RLS) estimation of the gPC coefficients.
+        Determines the inverse of the information matrix P = (Psi^T Psi)^-1 and the least squares solution from the
+        QR decomposition Psi = QR, i.e. P = R^-1 R^-T, without forming Psi^T Psi. Requires an overdetermined and
+        well conditioned system (cond(R) <= 1e8), otherwise the RLS is not initialized and None is returned.
+
+        coeffs = GPC.init_rls(matrix, results)
+
+        Parameters
+        ----------
+        matrix : ndarray of float [n_grid x n_basis]
+            GPC matrix
+        results : ndarray of float [n_grid x n_out]
+            Results from n_grid simulations with n_out output quantities
+
+        Returns
+        -------
+        coeffs : ndarray of float [n_basis x n_out] or None
+            GPC coefficients (None if the system is underdetermined or ill conditioned)
+        """
+        self.rls_p = None
+
+        if matrix.shape[0] < matrix.shape[1]:
+            return None
+
+        q, r = np.linalg.qr(matrix)
+
+        # ill conditioned system: wait for more samples
+        if np.linalg.cond(r) > 1e8:
+            return None
+
+        r_inv = solve_triangular(r, np.eye(r.shape[0]))
+        self.rls_p = np.matmul(r_inv, r_inv.transpose())
+        coeffs = np.matmul(r_inv, np.matmul(q.transpose(), results))
+
+        return coeffs
+
+    def update_rls(self, matrix, results, coeffs):
+        """
+        Updates the gPC coefficients with the rows of newly evaluated grid points using recursive least squares
+        (block update of P = (Psi^T Psi)^-1 using the Woodbury identity). The update scales with
+        O(n_new * n_basis^2) instead of re-solving the complete system.
+
+        coeffs = GPC.update_rls(matrix, results, coeffs)
+
+        Parameters
+        ----------
+        matrix : ndarray of float [n_new x n_basis]
+            Rows of the gPC matrix of the new grid points
+        results : ndarray of float [n_new x n_out]
+            Results of the new grid points
+        coeffs : ndarray of float [n_basis x n_out]
+            GPC coefficients before the update
+
+        Returns
+        -------
+        coeffs : ndarray of float [n_basis x n_out]
+            Updated gPC coefficients
+        """
+        p_matrix_t = np.matmul(self.rls_p, matrix.transpose())
+        gain = np.linalg.solve(np.eye(matrix.shape[0]) + np.matmul(matrix, p_matrix_t), p_matrix_t.transpose())
+        gain = gain.transpose()
+
+        coeffs = coeffs + np.matmul(gain, results - np.matmul(matrix, coeffs))
+        self.rls_p = self.rls_p - np.matmul(gain, p_matrix_t.transpose())
+
+        return coeffs
+
+    def get_loocv_rls(self, matrix, results, coeffs, error_norm="relative"):
+        """
+        Determines the leave-one-out cross validation error from the RLS estimate. The leave-one-out residuals of
+        the least squares solution are given analytically by r_i / (1 - h_i) with h = diag(Psi P Psi^T).
+        The error is averaged over all grid points and corresponds to the error determined by GPC.get_loocv.
+
+        relative_error_loocv = GPC.get_loocv_rls(matrix, results, coeffs, error_norm="relative")
+
+        Parameters
+        ----------
+        matrix : ndarray of float [n_grid x n_basis]
+            GPC matrix
+        results : ndarray of float [n_grid x n_out]
+            Results from n_grid simulations with n_out output quantities
+        coeffs : ndarray of float [n_basis x n_out]
+            GPC coefficients
+        error_norm : str, optional, default="relative"
+            Decide if error is determined "relative" or "absolute"
+
+        Returns
+        -------
+        relative_error_loocv : float
+            Relative mean error of leave one out cross validation
+        """
+        h = np.sum(np.matmul(matrix, self.rls_p) * matrix, axis=1)
+        residuals = (results - np.matmul(matrix, coeffs)) / (1 - h)[:, np.newaxis]
+
+        if error_norm == "relative":
+            norm = np.linalg.norm(results, axis=1)
+        else:
+            norm = 1.
+
+        relative_error_loocv = float(np.mean(np.linalg.norm(residuals, axis=1) / norm))
+
+        return relative_error_loocv
+
     def validate(self, coeffs, results=None, gradient_results=None, qoi_idx=None):
         """
         Validate gPC approximation using the ValidationSet object contained in the Problem object.
@@ -417,7 +583,10 @@ class GPC(object):
             Estimated difference between gPC approximation and original model
         """
         if qoi_idx is None:
-            qoi_idx = np.arange(0, results.shape[1])
+            if self.output_reduction is not None:
+                qoi_idx = np.arange(0, self.output_reduction.n_out)
+            else:
+                qoi_idx = np.arange(0, results.shape[1])
 
         # Determine QOIs with NaN in results and exclude them from validation
         non_nan_mask = np.where(np.all(~np.isnan(results), axis=0))[0]
@@ -435,7 +604,7 @@ class GPC(object):
         # always determine nrmsd if a validation set is present
         if isinstance(self.validation, ValidationSet):
 
-            gpc_results = self.get_approximation(coeffs, self.validation.grid.coords_norm, output_idx=None)
+            gpc_results = self.get_approximation_validation(coeffs)
 
             if gpc_results.ndim == 1:
                 gpc_results = gpc_results[:, np.newaxis]
@@ -553,7 +722,10 @@ class GPC(object):
 
         # if output index list is not provided, sample all gpc outputs
         if output_idx is None:
-            n_out = 1 if coeffs.ndim == 1 else coeffs.shape[1]
+            if self.output_reduction is not None:
+                n_out = self.output_reduction.n_out
+            else:
+                n_out = 1 if coeffs.ndim == 1 else coeffs.shape[1]
             output_idx = np.arange(n_out)
             # output_idx = output_idx[np.newaxis, :]
 
@@ -570,7 +742,7 @@ class GPC(object):
         Parameters
         ----------
         coeffs: ndarray of float [n_basis x n_out]
-            GPC coefficients for each output variable
+            GPC coefficients for each output variable (or [n_basis x n_modes] in case of output reduction)
         x: ndarray of float [n_x x n_dim]
             Coordinates of x = (x1, x2, ..., x_dim) where the rows of the gPC matrix are evaluated (normalized [-1, 1]).
             The coordinates will be transformed in case of projected gPC.
@@ -597,6 +769,17 @@ class GPC(object):
             # convert to 1d array
             output_idx = np.asarray(output_idx).flatten().astype(int)
 
+        # coefficients of the reduced output space are mapped back to the requested output quantities at the end
+        if self.output_reduction is not None:
+            self.output_reduction.check_coeffs(coeffs)
+            output_idx_reduced = output_idx
+            output_idx = None
+            reduced = True
+        else:
+            output_idx_reduced = None
+            reduced = False
+
+        if output_idx is not None:
             # crop coeffs array if output index is specified
             coeffs = coeffs[:, output_idx]
 
@@ -607,7 +790,14 @@ class GPC(object):
         if self.p_matrix is not None:
             x = np.matmul(x, self.p_matrix.transpose() / self.p_matrix_norm[np.newaxis, :])
 
-        if self.backend == 'python' or self.backend == 'cpu' or self.backend == 'omp':
+        # use only the active basis functions if the gPC was pruned and the coefficients still fit
+        idx_active = self.get_active_basis_idx(coeffs=coeffs, output_idx=output_idx)
+
+        if idx_active is not None:
+            # determine gPC matrix of active basis functions at coordinates x and multiply with active gPC coeffs
+            pce = np.matmul(self.create_gpc_matrix_active(x=x, idx_active=idx_active), coeffs[idx_active, :])
+
+        elif self.backend == 'python' or self.backend == 'cpu' or self.backend == 'omp':
             # determine gPC matrix at coordinates x
             gpc_matrix = self.create_gpc_matrix(self.basis.b, x, gradient=False)
 
@@ -625,8 +815,260 @@ class GPC(object):
         else:
             raise NotImplementedError
 
+        if reduced:
+            pce = self.output_reduction.inverse_transform(pce, output_idx=output_idx_reduced)
+
+        return pce
+
+    def get_approximation_validation(self, coeffs):
+        """
+        Calculates the gPC approximation in the points of the validation set. The gPC matrix of the validation set
+        is cached and extended column-wise by the basis functions added since the last call (identified by their
+        unique IDs), such that the approximation is a single matrix product. If the gPC matrix exceeds
+        self.validation_matrix_max_mb, the validation points are evaluated blockwise without caching.
+
+        pce = GPC.get_approximation_validation(coeffs)
+
+        Parameters
+        ----------
+        coeffs: ndarray of float [n_basis x n_out]
+            GPC coefficients for each output variable (or [n_basis x n_modes] in case of output reduction)
+
+        Returns
+        -------
+        pce: ndarray of float [n_validation x n_out]
+            GPC approximation at the validation points
+        """
+        n_x = self.validation.grid.coords_norm.shape[0]
+        n_basis = len(self.basis.b)
+        n_block = max(int(self.validation_matrix_max_mb * 1e6 / 8 / n_basis), 1)
+
+        # evaluate large validation sets blockwise to bound the memory
+        if n_x > n_block:
+            self.validation_matrix = None
+            self.validation_matrix_b_id = None
+            self.validation_matrix_coords_id = None
+            self.validation_matrix_p_matrix = None
+
+            return np.vstack([self.get_approximation(coeffs, self.validation.grid.coords_norm[i:(i + n_block), :])
+                              for i in range(0, n_x, n_block)])
+
+        if coeffs.ndim == 1:
+            coeffs = coeffs[:, np.newaxis]
+
+        # reset cache if the validation set or the projection has changed
+        p_matrix = None if self.p_matrix is None else self.p_matrix / self.p_matrix_norm[:, np.newaxis]
+
+        if self.validation_matrix is None or \
+                not np.array_equal(self.validation_matrix_coords_id, self.validation.grid.coords_id) or \
+                (p_matrix is None) != (self.validation_matrix_p_matrix is None) or \
+                (p_matrix is not None and not np.array_equal(p_matrix, self.validation_matrix_p_matrix)):
+            self.validation_matrix = np.zeros((n_x, 0))
+            self.validation_matrix_b_id = []
+            self.validation_matrix_coords_id = self.validation.grid.coords_id
+            self.validation_matrix_p_matrix = p_matrix
+
+        b_id_col = dict(zip(self.validation_matrix_b_id, range(len(self.validation_matrix_b_id))))
+        idx_new = np.array([i for i, _b_id in enumerate(self.basis.b_id) if _b_id not in b_id_col], dtype=int)
+
+        # extend cached gPC matrix by the new basis functions
+        if idx_new.size > 0:
+            x = np.array(self.validation.grid.coords_norm, copy=True)
+
+            # crop coordinates to gPC boundaries (values outside do not yield meaningful values)
+            for i_dim, key in enumerate(list(self.problem.parameters_random.keys())):
+                xmin = self.problem.parameters_random[key].pdf_limits_norm[0]
+                xmax = self.problem.parameters_random[key].pdf_limits_norm[1]
+                x[x[:, i_dim] < xmin, i_dim] = xmin
+                x[x[:, i_dim] > xmax, i_dim] = xmax
+
+            # transform variables from xi to eta space if gpc model is reduced
+            if p_matrix is not None:
+                x = np.matmul(x, p_matrix.transpose())
+
+            for i in idx_new:
+                b_id_col[self.basis.b_id[i]] = len(self.validation_matrix_b_id)
+                self.validation_matrix_b_id.append(self.basis.b_id[i])
+
+            self.validation_matrix = np.hstack((self.validation_matrix,
+                                                self.create_gpc_matrix_active(x=x, idx_active=idx_new)))
+
+        # bring columns in order of the current basis (removed basis functions are dropped)
+        idx_col = np.array([b_id_col[_b_id] for _b_id in self.basis.b_id], dtype=int)
+
+        if not np.array_equal(idx_col, np.arange(len(self.validation_matrix_b_id))):
+            self.validation_matrix = self.validation_matrix[:, idx_col]
+            self.validation_matrix_b_id = [self.validation_matrix_b_id[i] for i in idx_col]
+
+        pce = np.matmul(self.validation_matrix, coeffs)
+
+        if self.output_reduction is not None:
+            pce = self.output_reduction.inverse_transform(pce)
+
         return pce
 
+    def prune_basis(self, coeffs, eps=0.):
+        """
+        Determines the active basis functions of a sparse gPC (e.g. after solving with "OMP" or "LarsLasso").
+        Basis functions with |coeffs| <= eps are skipped in subsequent calls of GPC.get_approximation(), which
+        also affects GPC.get_samples(), GPC.get_pdf() and the sampling based sensitivity analysis.
+        The basis itself is not modified, i.e. the dropped columns are restored automatically if the basis is
+        extended or coefficients are passed, which are non-zero outside of the active set.
+
+        GPC.prune_basis(coeffs, eps=0.)
+
+        Parameters
+        ----------
+        coeffs: ndarray of float [n_basis x n_out]
+            GPC coefficients
+        eps: float, optional, default: 0.
+            Coefficients with an absolute value smaller or equal than eps are considered to be zero
+
+        Returns
+        -------
+        n_active: int
+            Number of basis functions, which are active in at least one output quantity
+        """
+        if coeffs.ndim == 1:
+            coeffs = coeffs[:, np.newaxis]
+
+        if coeffs.shape[0] != len(self.basis.b):
+            raise AssertionError("Number of gPC coefficients ({}) does not match the number of basis functions "
+                                 "({})!".format(coeffs.shape[0], len(self.basis.b)))
+
+        self.basis_active_mask = np.abs(coeffs) > eps
+        self.basis_active_b_id = copy.deepcopy(self.basis.b_id)
+        self.basis_active_eps = eps
+        self._basis_active_idx = None
+        self._basis_active_b_array = None
+
+        n_active = int(np.sum(np.any(self.basis_active_mask, axis=1)))
+
+        iprint("Pruned gPC basis to {}/{} active basis functions".format(n_active, len(self.basis.b)),
+               tab=0, verbose=self.verbose)
+
+        return n_active
+
+    def restore_basis(self):
+        """
+        Discards the active set of basis functions determined by GPC.prune_basis(). Subsequent evaluations of the
+        gPC consider all basis functions again.
+        """
+        self.basis_active_mask = None
+        self.basis_active_b_id = None
+        self._basis_active_idx = None
+        self._basis_active_b_array = None
+
+    def get_active_basis_idx(self, coeffs, output_idx=None):
+        """
+        Returns the indices of the active basis functions for the given coefficients and output quantities.
+        The active set is the union over the active basis functions of the considered output quantities.
+        The pruning is discarded if the basis has changed since GPC.prune_basis() was called.
+
+        Parameters
+        ----------
+        coeffs: ndarray of float [n_basis x n_out_idx]
+            GPC coefficients (already cropped to output_idx)
+        output_idx: ndarray of int, optional, default=None [n_out_idx]
+            Indices of output quantities the coefficients belong to (Default: all)
+
+        Returns
+        -------
+        idx_active: ndarray of int [n_active] or None
+            Indices of the active basis functions (None if all basis functions have to be evaluated)
+        """
+        if self.basis_active_mask is None:
+            return None
+
+        # the basis was modified after pruning -> restore full basis
+        if self.basis.b_id != self.basis_active_b_id:
+            self.restore_basis()
+            return None
+
+        # coefficients do not belong to pruned gPC
+        if coeffs.shape[0] != self.basis_active_mask.shape[0]:
+            return None
+
+        if output_idx is None:
+            if coeffs.shape[1] != self.basis_active_mask.shape[1]:
+                return None
+            mask = self.basis_active_mask
+        else:
+            mask = self.basis_active_mask[:, output_idx]
+
+        mask = np.any(mask, axis=1)
+
+        # coefficients are non-zero outside of the active set (e.g. new solution) -> evaluate full basis
+        if np.any(np.abs(coeffs[~mask, :]) > self.basis_active_eps):
+            return None
+
+        return np.where(mask)[0]
+
+    def create_gpc_matrix_active(self, x, idx_active):
+        """
+        Construct the gPC matrix for a subset of active basis functions. In case of the python backend,
+        every univariate polynomial order required by the active basis functions is evaluated only once per
+        random variable.
+
+        Parameters
+        ----------
+        x : ndarray of float [n_x x n_dim]
+            Coordinates of x = (x1, x2, ..., x_dim) where the rows of the gPC matrix are evaluated (normalized [-1, 1])
+        idx_active : ndarray of int [n_active]
+            Indices of the active basis functions
+
+        Returns
+        -------
+        gpc_matrix: ndarray of float [n_x x n_active]
+            GPC matrix where the columns correspond to the active basis functions
+        """
+        b_active = [self.basis.b[i] for i in idx_active]
+
+        if self.backend == "python":
+            gpc_matrix = np.ones([x.shape[0], len(b_active)])
+
+            for i_dim in range(self.problem.dim):
+                orders = np.array([_b[i_dim].p["i"] for _b in b_active])
+                orders_unique, idx_first, idx_inverse = np.unique(orders, return_index=True, return_inverse=True)
+
+                # evaluate required univariate polynomials of this random variable once
+                poly = np.column_stack([b_active[i][i_dim](x[:, i_dim]) for i in idx_first])
+                gpc_matrix *= poly[:, idx_inverse]
+
+        elif self.backend in ["cpu", "omp", "cuda"]:
+            # cache polynomial coefficient array of active basis functions
+            if self._basis_active_idx is None or not np.array_equal(self._basis_active_idx, idx_active):
+                _b_array = []
+                for _b in b_active:
+                    for i_dim in range(self.problem.dim):
+                        _b_array = _b_array + [np.array([_b[i_dim].fun.order]), _b[i_dim].fun.c]
+
+                self._basis_active_idx = idx_active
+                self._basis_active_b_array = np.concatenate(_b_array)
+
+            # the third dimension is important and should not be removed
+            # otherwise the code could produce undefined behaviour
+            gpc_matrix = np.empty([x.shape[0], len(b_active), 1])
+
+            if self.backend == "cpu":
+                create_gpc_matrix_cpu(x, self._basis_active_b_array, gpc_matrix)
+            elif self.backend == "omp":
+                create_gpc_matrix_omp(x, self._basis_active_b_array, gpc_matrix)
+            else:
+                try:
+                    from .pygpc_extensions_cuda import create_gpc_matrix_cuda
+                except ImportError:
+                    raise NotImplementedError("The CUDA-extension is not installed. Use the build script to install.")
+                else:
+                    create_gpc_matrix_cuda(x, self._basis_active_b_array, gpc_matrix)
+
+            gpc_matrix = gpc_matrix[:, :, 0]
+
+        else:
+            raise NotImplementedError
+
+        return gpc_matrix
+
     def replace_gpc_matrix_samples(self, idx, seed=None):
         """
         Replace distinct sample points from the gPC matrix with new ones.
@@ -647,14 +1089,25 @@ class GPC(object):
                                  n_grid=idx.size,
                                  seed=seed)
 
-        # replace old grid points
-        self.grid.coords[idx, :] = new_grid_points.coords
-        self.grid.coords_norm[idx, :] = new_grid_points.coords_norm
-
-        # replace old IDs of grid points with new ones
-        for i in idx:
-            self.grid.coords_id[i] = uuid.uuid4()
-            self.gpc_matrix_coords_id[i] = copy.deepcopy(self.grid.coords_id[i])
+        # replace old grid points (on copies, the rows may be shared with snapshots of the grid)
+        coords = np.array(self.grid.coords, copy=True)
+        coords_norm = np.array(self.grid.coords_norm, copy=True)
+        coords[idx, :] = new_grid_points.coords
+        coords_norm[idx, :] = new_grid_points.coords_norm
+        self.grid.coords = coords
+        self.grid.coords_norm = coords_norm
+
+        # replace old IDs of grid points with new ones (on copies, the ids may be shared with the gPC matrix)
+        coords_id_new = get_grid_ids(idx.size)
+        coords_id = np.array(self.grid.coords_id, copy=True)
+        coords_id[idx] = coords_id_new
+        self.grid.coords_id = coords_id
+        gpc_matrix_coords_id = np.array(self.gpc_matrix_coords_id, copy=True)
+        gpc_matrix_coords_id[idx] = coords_id_new
+        self.gpc_matrix_coords_id = gpc_matrix_coords_id
+
+        # rows of the matrix are overwritten, saved matrices can not be extended
+        self.gpc_matrix_hdf5_state = dict()
 
         # determine new rows of gpc matrix and overwrite rows of gpc matrix
         self.gpc_matrix[idx, :] = self.create_gpc_matrix(b=self.basis.b,
@@ -676,18 +1129,38 @@ class GPC(object):
 
     def _update_gpc_matrix(self, gradient=False):
         """
-        Update gPC matrix or gPC gradient matrix
+        Update gPC matrix or gPC gradient matrix. If only grid points were appended and the basis is unchanged,
+        the new rows of the gPC matrix are appended to its buffer (see misc.append_rows). The gPC gradient matrix
+        is always reassembled from its old entries and the new rows and columns.
         """
-        if self.backend == "python":
+        # grid points were appended and the basis is unchanged: only the new rows are computed and appended
+        if not gradient and self.gpc_matrix is not None and self.gpc_matrix_b_id == self.basis.b_id and \
+                self.gpc_matrix_coords_id is not None and \
+                np.array_equal(self.grid.coords_id[:len(self.gpc_matrix_coords_id)], self.gpc_matrix_coords_id):
+            n_grid_old = len(self.gpc_matrix_coords_id)
+
+            if len(self.grid.coords_id) > n_grid_old:
+                iprint('Adding {} rows to gPC matrix ...'.format(len(self.grid.coords_id) - n_grid_old),
+                       tab=0, verbose=True)
+                self.gpc_matrix = append_rows(self.gpc_matrix,
+                                              self.create_gpc_matrix(b=self.basis.b,
+                                                                     x=self.grid.coords_norm[n_grid_old:, :],
+                                                                     gradient=False,
+                                                                     verbose=False))
+
+            self.gpc_matrix_coords_id = self.grid.coords_id
+            self.n_grid.append(self.gpc_matrix.shape[0])
+            self.n_basis.append(self.gpc_matrix.shape[1])
+
+        elif self.backend == "python":
             # initialize updated matrix and variables
             if gradient:
                 # reshape gpc gradient matrix from 2D to 3D representation [n_grid x n_basis x n_dim]
                 matrix = mat2ten(mat=self.gpc_matrix_gradient, incr=self.problem.dim)
                 matrix_updated = np.zeros((len(self.gradient_idx), len(self.basis.b_id), self.problem.dim))
                 # self.gpc_matrix_gradient_coords_id
-                coords_id = self.gpc_matrix_gradient_coords_id[self.gradient_idx]
-                # np.array(self.grid.coords_gradient_id).flatten()
-                coords_id_ref = self.grid.coords_gradient_id[self.gradient_idx]
+                coords_id = np.asarray(self.gpc_matrix_gradient_coords_id)[self.gradient_idx]
+                coords_id_ref = np.asarray(self.grid.coords_gradient_id)[self.gradient_idx]
                 b_id = self.gpc_matrix_gradient_b_id
                 b_id_ref = self.basis.b_id
                 coords_norm = self.grid.coords_norm[self.gradient_idx]
@@ -703,36 +1176,20 @@ class GPC(object):
                 coords_norm = self.grid.coords_norm
                 ge_str = ""
 
-            # # determine indices of new basis functions and grid_points
-            # idx_coords_new = [i for i, _id in enumerate(self.grid.coords_id) if _id not in self.gpc_matrix_coords_id]
-            # idx_basis_new = [i for i, _id in enumerate(self.basis.b_id) if _id not in self.gpc_matrix_b_id]
-
-            # determine indices of old grid points in updated gpc matrix
-            idx_coords_old = np.empty(len(coords_id)) * np.nan
-            for i, coords_id_old in enumerate(coords_id):
-                for j, coords_id_new in enumerate(coords_id_ref):
-                    if coords_id_old == coords_id_new:
-                        idx_coords_old[i] = j
-                        break
-
-            # determine indices of old basis functions in updated gpc matrix
-            idx_b_old = np.empty(len(b_id))*np.nan
-            for i, b_id_old in enumerate(b_id):
-                for j, b_id_new in enumerate(b_id_ref):
-                    if b_id_old == b_id_new:
-                        idx_b_old[i] = j
-                        break
+            # determine indices of old grid points and basis functions in updated gpc matrix (-1: removed)
+            idx_coords_old = get_id_index(ids_ref=coords_id_ref, ids=coords_id)
+            idx_b_old = get_id_index(ids_ref=b_id_ref, ids=b_id)
 
             # filter out non-existent rows and columns
-            matrix = matrix[~np.isnan(idx_coords_old), :, ]
-            matrix = matrix[:, ~np.isnan(idx_b_old), ]
+            matrix = matrix[idx_coords_old >= 0, :, ]
+            matrix = matrix[:, idx_b_old >= 0, ]
 
-            idx_coords_old = idx_coords_old[~np.isnan(idx_coords_old)].astype(int)
-            idx_b_old = idx_b_old[~np.isnan(idx_b_old)].astype(int)
+            idx_coords_old = idx_coords_old[idx_coords_old >= 0]
+            idx_b_old = idx_b_old[idx_b_old >= 0]
 
             # indices of new coords and basis in updated gpc matrix (values have to be computed there)
-            idx_coords_new = np.array(list(set(np.arange(len(coords_id_ref))) - set(idx_coords_old))).astype(int)
-            idx_b_new = np.array(list(set(np.arange(len(b_id_ref))) - set(idx_b_old))).astype(int)
+            idx_coords_new = np.setdiff1d(np.arange(len(coords_id_ref)), idx_coords_old)
+            idx_b_new = np.setdiff1d(np.arange(len(b_id_ref)), idx_b_old)
 
             # write old results at correct location in updated gpc matrix
             idx = get_cartesian_product([idx_coords_old, idx_b_old]).astype(int)
@@ -771,11 +1228,11 @@ class GPC(object):
             if gradient:
                 # reshape from 3D to 2D
                 self.gpc_matrix_gradient = ten2mat(matrix_updated)
-                self.gpc_matrix_gradient_coords_id = copy.deepcopy(self.grid.coords_id)
+                self.gpc_matrix_gradient_coords_id = self.grid.coords_id
                 self.gpc_matrix_gradient_b_id = copy.deepcopy(self.basis.b_id)
             else:
                 self.gpc_matrix = matrix_updated
-                self.gpc_matrix_coords_id = copy.deepcopy(self.grid.coords_id)
+                self.gpc_matrix_coords_id = self.grid.coords_id
                 self.gpc_matrix_b_id = copy.deepcopy(self.basis.b_id)
                 self.n_grid.append(self.gpc_matrix.shape[0])
                 self.n_basis.append(self.gpc_matrix.shape[1])
@@ -783,11 +1240,11 @@ class GPC(object):
         else:
             self.init_gpc_matrix()
 
-    def save_gpc_matrix_hdf5(self, hdf5_path_gpc_matrix=None, hdf5_path_gpc_matrix_gradient=None):
+    def save_gpc_matrix_hdf5(self, hdf5_path_gpc_matrix=None, hdf5_path_gpc_matrix_gradient=None, fn_hdf5=None):
         """
         Save gPC matrix and gPC gradient matrix in .hdf5 file <"fn_results" + ".hdf5"> under the key "gpc_matrix"
-        and "gpc_matrix_gradient". If matrices are already present, check for equality and save only appended
-        rows and columns.
+        and "gpc_matrix_gradient". If matrices are already present, only appended rows and columns are saved
+        (see write_gpc_matrix_hdf5).
 
         Parameters
         ----------
@@ -795,6 +1252,8 @@ class GPC(object):
             Path in .hdf5 file, where the gPC matrix is saved in
         hdf5_path_gpc_matrix_gradient : str
             Path in .hdf5 file, where the gPC gradient matrix is saved in
+        fn_hdf5 : str, optional, default: None
+            Filename of .hdf5 file (default: "fn_results" + ".hdf5")
         """
 
         if hdf5_path_gpc_matrix is None:
@@ -803,77 +1262,67 @@ class GPC(object):
         if hdf5_path_gpc_matrix_gradient is None:
             hdf5_path_gpc_matrix_gradient = "gpc_matrix_gradient"
 
-        with h5py.File(self.fn_results + ".hdf5", "a") as f:
-            try:
-                # write gpc matrix
-                gpc_matrix_hdf5 = f[hdf5_path_gpc_matrix][:]
-                n_rows_hdf5 = gpc_matrix_hdf5.shape[0]
-                n_cols_hdf5 = gpc_matrix_hdf5.shape[1]
+        if fn_hdf5 is None:
+            fn_hdf5 = self.fn_results + ".hdf5"
 
-                n_rows_current = self.gpc_matrix.shape[0]
-                n_cols_current = self.gpc_matrix.shape[1]
+        with h5py.File(fn_hdf5, "a") as f:
+            self.write_gpc_matrix_hdf5(f=f, hdf5_path=hdf5_path_gpc_matrix, gradient=False)
 
-                # save only new rows and cols if current matrix > saved matrix
-                if n_rows_current >= n_rows_hdf5 and n_cols_current >= n_cols_hdf5 and \
-                        (self.gpc_matrix[0:n_rows_hdf5, 0:n_cols_hdf5] == gpc_matrix_hdf5).all():
-                    # resize dataset and save new columns and rows
-                    f[hdf5_path_gpc_matrix].resize(self.gpc_matrix.shape[1], axis=1)
-                    f[hdf5_path_gpc_matrix][:, n_cols_hdf5:] = self.gpc_matrix[0:n_rows_hdf5, n_cols_hdf5:]
+            # write gpc gradient matrix if available
+            if self.gpc_matrix_gradient is not None:
+                self.write_gpc_matrix_hdf5(f=f, hdf5_path=hdf5_path_gpc_matrix_gradient, gradient=True)
 
-                    f[hdf5_path_gpc_matrix].resize(self.gpc_matrix.shape[0], axis=0)
-                    f[hdf5_path_gpc_matrix][n_rows_hdf5:, :] = self.gpc_matrix[n_rows_hdf5:, :]
+    def write_gpc_matrix_hdf5(self, f, hdf5_path, gradient=False):
+        """
+        Write gPC matrix or gPC gradient matrix into a chunked and resizable dataset of an opened .hdf5 file.
+        The IDs of the grid points and basis functions saved in the dataset are tracked in
+        self.gpc_matrix_hdf5_state under a unique version attribute of the dataset. If the saved matrix is the
+        leading block of the current matrix, only the new rows and columns are written. The saved matrix is never
+        read back. If the dataset was changed elsewhere or grid points or basis functions were removed, the matrix
+        is written completely.
 
-                else:
-                    del f[hdf5_path_gpc_matrix]
-                    f.create_dataset(hdf5_path_gpc_matrix, (self.gpc_matrix.shape[0],
-                                                            self.gpc_matrix.shape[1]),
-                                     maxshape=(None, None),
-                                     dtype="float64",
-                                     data=self.gpc_matrix)
-
-                # write gpc gradient matrix if available
-                if self.gpc_matrix_gradient is not None:
-                    gpc_matrix_gradient_hdf5 = f[hdf5_path_gpc_matrix_gradient][:]
-                    n_rows_hdf5 = gpc_matrix_gradient_hdf5.shape[0]
-                    n_cols_hdf5 = gpc_matrix_gradient_hdf5.shape[1]
-
-                    n_rows_current = self.gpc_matrix_gradient.shape[0]
-                    n_cols_current = self.gpc_matrix_gradient.shape[1]
-
-                    # save only new rows and cols if current matrix > saved matrix
-                    if n_rows_current >= n_rows_hdf5 and n_cols_current >= n_cols_hdf5 and \
-                            (self.gpc_matrix_gradient[0:n_rows_hdf5, 0:n_cols_hdf5] == gpc_matrix_gradient_hdf5).all():
-                        # resize dataset and save new columns and rows
-                        f[hdf5_path_gpc_matrix_gradient].resize(self.gpc_matrix_gradient.shape[1], axis=1)
-                        f[hdf5_path_gpc_matrix_gradient][:, n_cols_hdf5:] = self.gpc_matrix_gradient[0:n_rows_hdf5,
-                                                                                                     n_cols_hdf5:]
-
-                        f[hdf5_path_gpc_matrix_gradient].resize(self.gpc_matrix_gradient.shape[0], axis=0)
-                        f[hdf5_path_gpc_matrix_gradient][n_rows_hdf5:, :] = self.gpc_matrix_gradient[n_rows_hdf5:, :]
+        Parameters
+        ----------
+        f : h5py.File object
+            Opened .hdf5 file
+        hdf5_path : str
+            Path in .hdf5 file, where the gPC matrix is saved in
+        gradient : bool, optional, default: False
+            Write gPC gradient matrix instead of gPC matrix
+        """
+        if gradient:
+            matrix = self.gpc_matrix_gradient
+            coords_id = np.asarray(self.gpc_matrix_gradient_coords_id)[self.gradient_idx]
+            b_id = self.gpc_matrix_gradient_b_id
+            n_rows_id = self.problem.dim
+        else:
+            matrix = self.gpc_matrix
+            coords_id = self.gpc_matrix_coords_id
+            b_id = self.gpc_matrix_b_id
+            n_rows_id = 1
 
-                    else:
-                        del f[hdf5_path_gpc_matrix_gradient]
-                        f.create_dataset(hdf5_path_gpc_matrix_gradient, (self.gpc_matrix_gradient.shape[0],
-                                                                         self.gpc_matrix_gradient.shape[1]),
-                                         maxshape=(None, None),
-                                         dtype="float64",
-                                         data=self.gpc_matrix_gradient)
-
-            except KeyError:
-                # save whole matrix if not existent
-                f.create_dataset(hdf5_path_gpc_matrix, (self.gpc_matrix.shape[0],
-                                                        self.gpc_matrix.shape[1]),
-                                 maxshape=(None, None),
-                                 dtype="float64",
-                                 data=self.gpc_matrix)
-
-                # save whole gradient matrix if not existent and available
-                if self.gpc_matrix_gradient is not None:
-                    f.create_dataset(hdf5_path_gpc_matrix_gradient, (self.gpc_matrix_gradient.shape[0],
-                                                                     self.gpc_matrix_gradient.shape[1]),
-                                     maxshape=(None, None),
-                                     dtype="float64",
-                                     data=self.gpc_matrix_gradient)
+        n_rows_saved = 0
+        n_cols_saved = 0
+        state = None
+
+        if hdf5_path in f:
+            state = self.gpc_matrix_hdf5_state.pop(f[hdf5_path].attrs.get("version"), None)
+
+        # determine size of the saved block if the dataset is unchanged since it was written last by this gPC
+        if state is not None and state[0] == hdf5_path and matrix.shape[0] == len(coords_id) * n_rows_id:
+            _, coords_id_saved, b_id_saved = state
+
+            if np.array_equal(coords_id[:len(coords_id_saved)], coords_id_saved) and \
+                    list(b_id[:len(b_id_saved)]) == list(b_id_saved):
+                n_rows_saved = len(coords_id_saved) * n_rows_id
+                n_cols_saved = len(b_id_saved)
+
+        write_matrix_to_hdf5(f=f, arr_name=hdf5_path, data=matrix, n_rows_saved=n_rows_saved,
+                             n_cols_saved=n_cols_saved)
+
+        version = uuid.uuid4().hex
+        f[hdf5_path].attrs["version"] = version
+        self.gpc_matrix_hdf5_state[version] = (hdf5_path, coords_id, copy.copy(b_id))
 
     def solve(self, results, gradient_results=None, solver=None, settings=None, matrix=None, verbose=False):
         """
@@ -890,27 +1339,55 @@ class GPC(object):
             - 'Moore-Penrose' ... Pseudoinverse of gPC matrix (SGPC.Reg, EGPC)
             - 'OMP' ... Orthogonal Matching Pursuit, sparse recovery approach (SGPC.Reg, EGPC)
             - 'LarsLasso' ... Least-Angle Regression using Lasso model (SGPC.Reg, EGPC)
+            - 'OMP-CV' ... OMP with number of coefficients selected by cross validation (SGPC.Reg, EGPC)
+            - 'LARS-CV' ... Least squares on the LAR path selected by cross validation (hybrid LAR) (SGPC.Reg, EGPC)
+            - 'TSQR' ... Least squares solution (Moore-Penrose) by a QR decomposition accumulated over blocks of rows,
+              for gPC matrices larger than the memory (SGPC.Reg, EGPC)
             - 'NumInt' ... Numerical integration, spectral projection (SGPC.Quad)
         settings : dict
             Solver settings
             - 'Moore-Penrose' ... None
             - 'OMP' ... {"n_coeffs_sparse": int} Number of gPC coefficients != 0 or "sparsity": float 0...1
+              (the basis functions are selected by their correlation with the residual normalized by the norm of
+              the columns of the gPC matrix, see Solver.omp_gram)
             - 'LarsLasso' ... {"alpha": float 0...1} Regularization parameter
+              (or "n_coeffs_sparse"/"sparsity" to select the solution from the path)
+            - 'OMP-CV', 'LARS-CV' ... {"n_coeffs_sparse": int or "sparsity": float 0...1} Maximum number of gPC
+              coefficients != 0 (default: n_grid - 1), {"n_folds": int} Number of folds (default: None, i.e.
+              leave-one-out). The cross validation errors and the selected number of coefficients of the outputs are
+              stored in self.error_cv and self.n_coeffs_cv.
+            - 'TSQR' ... {"n_rows_block": int} Number of rows read at once (default: blocks of 2^24 elements),
+              {"loocv": bool} Determine the normalized leave-one-out errors of the outputs, which are stored in
+              self.error_cv (default: True)
             - 'NumInt' ... None
+            A list of sparsity levels or regularization parameters returns a list of coefficient arrays, which are
+            read from the same OMP or LARS path. The outputs are distributed to "n_cpu" processes (default: 1).
         matrix : ndarray of float, optional, default: self.gpc_matrix or [self.gpc_matrix, self.gpc_matrix_gradient]
             Matrix to invert. Depending on gradient_enhanced option, this matrix consist of the standard gPC matrix and
-            their derivatives.
+            their derivatives. The 'TSQR' solver also accepts h5py datasets or memory mapped arrays and lists of
+            matrices, which are stacked vertically.
         verbose : bool
             boolean value to determine if to print out the progress into the standard output
 
         Returns
         -------
-        coeffs: ndarray of float [n_coeffs x n_out]
+        coeffs: ndarray of float [n_coeffs x n_out] or list of ndarray
             gPC coefficients
         """
 
         ge_str = ""
 
+        # use default solver if not specified
+        if solver is None:
+            solver = self.solver
+
+        # use default solver settings if not specified
+        if solver is None:
+            settings = self.settings
+
+        # the Gram matrix of the own gPC matrix is kept and updated incrementally
+        cache = matrix is None
+
         if matrix is None:
             matrix = self.gpc_matrix
 
@@ -920,21 +1397,17 @@ class GPC(object):
             else:
                 if not solver == 'NumInt':
                     if self.gpc_matrix_gradient is not None:
-                        matrix = np.vstack((self.gpc_matrix, self.gpc_matrix_gradient))
+                        # the TSQR solver reads the matrices blockwise and does not stack them
+                        if solver == 'TSQR':
+                            matrix = [self.gpc_matrix, self.gpc_matrix_gradient]
+                        else:
+                            matrix = np.vstack((self.gpc_matrix, self.gpc_matrix_gradient))
                     else:
                         matrix = self.gpc_matrix
                     ge_str = "(gradient enhanced)"
                 else:
                     Warning("Gradient enhanced version not applicable in case of numerical integration (quadrature).")
 
-        # use default solver if not specified
-        if solver is None:
-            solver = self.solver
-
-        # use default solver settings if not specified
-        if solver is None:
-            settings = self.settings
-
         iprint("Determine gPC coefficients using '{}' solver {}...".format(solver, ge_str),
                tab=0, verbose=verbose)
 
@@ -966,21 +1439,15 @@ class GPC(object):
         # Orthogonal Matching Pursuit #
         ###############################
         elif solver == 'OMP':
-            # transform gPC matrix to fastmat format
-            matrix_fm = fm.Matrix(matrix)
-
             if results_complete.ndim == 1:
                 results_complete = results_complete[:, np.newaxis]
 
-            # determine gPC-coefficients of extended basis using OMP
-            if "n_coeffs_sparse" in settings.keys():
-                n_coeffs_sparse = int(settings["n_coeffs_sparse"])
-            elif "sparsity" in settings.keys():
-                n_coeffs_sparse = int(np.ceil(matrix.shape[1]*settings["sparsity"]))
-            else:
-                raise AttributeError("Please specify 'n_coeffs_sparse' or 'sparsity' in solver settings dictionary!")
+            n_coeffs_sparse = get_n_coeffs_sparse(settings=settings, n_coeffs=matrix.shape[1])
+            gram, corr = self.get_gram_matrix(matrix=matrix, results=results_complete, cache=cache)
 
-            coeffs = fm.algs.OMP(matrix_fm, results_complete, n_coeffs_sparse)
+            # determine gPC-coefficients of extended basis using batch OMP
+            coeffs = omp_gram(gram=gram, corr=corr, n_coeffs_sparse=n_coeffs_sparse,
+                              n_cpu=settings["n_cpu"] if "n_cpu" in settings.keys() else 1)
 
         ################################
         # Least-Angle Regression Lasso #
@@ -990,58 +1457,173 @@ class GPC(object):
             if results_complete.ndim == 1:
                 results_complete = results_complete[:, np.newaxis]
 
-            # determine gPC-coefficients of extended basis using LarsLasso
-            reg = linear_model.LassoLars(alpha=settings["alpha"], fit_intercept=False)
-            reg.fit(matrix, results_complete)
-            coeffs = reg.coef_
+            if "alpha" in settings.keys():
+                alpha = settings["alpha"]
+                n_coeffs_sparse = None
+            else:
+                alpha = None
+                n_coeffs_sparse = get_n_coeffs_sparse(settings=settings, n_coeffs=matrix.shape[1])
+
+            gram, corr = self.get_gram_matrix(matrix=matrix, results=results_complete, cache=cache)
+
+            # determine gPC-coefficients of extended basis using LarsLasso paths of the outputs
+            coeffs = lars_gram(gram=gram, corr=corr, n_samples=matrix.shape[0], alpha=alpha,
+                               n_coeffs_sparse=n_coeffs_sparse,
+                               n_cpu=settings["n_cpu"] if "n_cpu" in settings.keys() else 1)
+
+        #####################################
+        # Cross validated sparse solutions #
+        #####################################
+        elif solver in ['OMP-CV', 'LARS-CV']:
+
+            if results_complete.ndim == 1:
+                results_complete = results_complete[:, np.newaxis]
+
+            if settings is None:
+                settings = dict()
 
-            if coeffs.ndim == 1:
-                coeffs = coeffs[:, np.newaxis]
+            # maximum number of non-zero coefficients (length of the path)
+            if "n_coeffs_sparse" in settings.keys() or "sparsity" in settings.keys():
+                n_max = np.max(get_n_coeffs_sparse(settings=settings, n_coeffs=matrix.shape[1]))
             else:
-                coeffs = coeffs.transpose()
+                n_max = min(matrix.shape[1], matrix.shape[0] - 1)
+
+            gram, corr = self.get_gram_matrix(matrix=matrix, results=results_complete, cache=cache)
+
+            # select the number of coefficients of every output by cross validation along the OMP or LAR path
+            coeffs, self.error_cv, self.n_coeffs_cv = ols_path_cv(
+                matrix=matrix,
+                results=results_complete,
+                gram=gram,
+                corr=corr,
+                n_max=n_max,
+                path="OMP" if solver == 'OMP-CV' else "LAR",
+                n_folds=settings["n_folds"] if "n_folds" in settings.keys() else None,
+                n_cpu=settings["n_cpu"] if "n_cpu" in settings.keys() else 1)
+
+        ##########################################
+        # Out-of-core least squares (blockwise) #
+        ##########################################
+        elif solver == 'TSQR':
+
+            if settings is None:
+                settings = dict()
+
+            n_rows_block = settings["n_rows_block"] if "n_rows_block" in settings.keys() else None
+
+            # stream row blocks of the (stacked) gPC matrix, which may be memory mapped or hdf5 datasets
+            coeffs, self.error_cv = lstsq_tsqr(
+                blocks=lambda: get_row_blocks(matrix=matrix, results=results_complete, n_rows_block=n_rows_block),
+                loocv=settings["loocv"] if "loocv" in settings.keys() else True)
+            self.n_coeffs_cv = None
 
         # TODO: @Lucas: add GPU support
         #########################
         # Numerical Integration #
         #########################
         elif solver == 'NumInt':
-            # check if quadrature rule (grid) fits to the probability density distribution (pdf)
-            grid_pdf_fit = True
-            for i_p, p in enumerate(self.problem.parameters_random):
-                if self.problem.parameters_random[p].pdf_type == 'beta':
-                    if not (self.grid.grid_type[i_p] == 'jacobi'):
-                        grid_pdf_fit = False
-                        break
-                elif self.problem.parameters_random[p].pdf_type in ['norm', 'normal']:
-                    if not (self.grid.grid_type[i_p] == 'hermite'):
-                        grid_pdf_fit = False
-                        break
-
-            # if not, calculate joint pdf
-            if not grid_pdf_fit:
-                joint_pdf = np.ones(self.grid.coords_norm.shape)
+            # scale rows of results with quadrature weights (and joint pdf) by broadcasting
+            weights = self.get_weights_numint(coords_norm=self.grid.coords_norm, weights=self.grid.weights)
 
-                for i_p, p in enumerate(self.problem.parameters_random):
-                    joint_pdf[:, i_p] = \
-                        self.problem.parameters_random[p].pdf_norm(x=self.grid.coords_norm[:, i_p])
-
-                joint_pdf = np.array([np.prod(joint_pdf, axis=1)]).transpose()
-
-                # weight sim_results with the joint pdf
-                results_complete = results_complete * joint_pdf * 2 ** self.problem.dim
-
-            # scale rows of gpc matrix with quadrature weights
-            matrix_weighted = np.matmul(np.diag(self.grid.weights), matrix)
+            if results_complete.ndim == 1:
+                results_complete = results_complete[:, np.newaxis]
 
             # determine gpc coefficients [n_coeffs x n_output]
-            coeffs = np.matmul(results_complete.transpose(), matrix_weighted).transpose()
+            coeffs = np.matmul(matrix.transpose(), weights[:, np.newaxis] * results_complete)
 
         else:
             raise AttributeError("Unknown solver: '{}'!")
 
         return coeffs
 
-    def create_validation_set(self, n_samples, n_cpu=1):
+    def get_gram_matrix(self, matrix, results, cache=True):
+        """
+        Determines the Gram matrix Psi^T Psi and the correlation vectors Psi^T y used by the sparse solvers.
+        If cache is True, they are stored in self.gram_matrix and only the blocks of appended grid points and basis
+        functions are computed in subsequent calls.
+
+        Parameters
+        ----------
+        matrix : ndarray of float [n_grid x n_coeffs]
+            gPC matrix
+        results : ndarray of float [n_grid x n_out]
+            Results
+        cache : bool, optional, default: True
+            Use and update the stored Gram matrix (False for temporary matrices, e.g. in leave-one-out cross validation)
+
+        Returns
+        -------
+        gram : ndarray of float [n_coeffs x n_coeffs]
+            Gram matrix Psi^T Psi
+        corr : ndarray of float [n_coeffs x n_out]
+            Correlation vectors Psi^T y
+        """
+        if cache:
+            if self.gram_matrix is None:
+                self.gram_matrix = GramMatrix()
+
+            # the gPC matrix is identified by the IDs of the grid points (also of the stacked gradient rows) and the
+            # basis functions as well as the projection matrix
+            row_id = self.gpc_matrix_coords_id
+            col_id = self.gpc_matrix_b_id
+
+            if row_id is not None and matrix.shape[0] > len(row_id):
+                if self.gpc_matrix_gradient is not None and self.gradient_idx is not None and \
+                        self.gpc_matrix_gradient_b_id == col_id:
+                    row_id_gradient = np.asarray(self.gpc_matrix_gradient_coords_id)[self.gradient_idx]
+                    row_id = np.hstack((row_id, np.repeat(row_id_gradient, self.problem.dim)))
+                else:
+                    row_id = None
+
+            if row_id is None or col_id is None or matrix.shape != (len(row_id), len(col_id)):
+                row_id = None
+                col_id = None
+
+            return self.gram_matrix.update(matrix=matrix, results=results, row_id=row_id, col_id=col_id,
+                                           matrix_key=self.p_matrix)
+
+        return np.matmul(matrix.T, matrix), np.matmul(matrix.T, results)
+
+    def get_weights_numint(self, coords_norm, weights):
+        """
+        Determines the weights of the numerical integration (spectral projection) in the given grid points.
+        If the quadrature rule of a random parameter does not fit to its probability density function,
+        the weights are multiplied by the joint pdf.
+
+        Parameters
+        ----------
+        coords_norm : ndarray of float [n_grid x dim]
+            Normalized coordinates of the grid points
+        weights : ndarray of float [n_grid]
+            Quadrature weights of the grid points
+
+        Returns
+        -------
+        weights_numint : ndarray of float [n_grid]
+            Weights of the numerical integration
+        """
+        weights_numint = np.array(weights, dtype=float).flatten()
+
+        # check if quadrature rule (grid) fits to the probability density distribution (pdf)
+        grid_pdf_fit = True
+        for i_p, p in enumerate(self.problem.parameters_random):
+            if self.problem.parameters_random[p].pdf_type == 'beta':
+                if not (self.grid.grid_type[i_p] == 'jacobi'):
+                    grid_pdf_fit = False
+                    break
+            elif self.problem.parameters_random[p].pdf_type in ['norm', 'normal']:
+                if not (self.grid.grid_type[i_p] == 'hermite'):
+                    grid_pdf_fit = False
+                    break
+
+        # if not, weight with the joint pdf
+        if not grid_pdf_fit:
+            for i_p, p in enumerate(self.problem.parameters_random):
+                weights_numint *= 2 * self.problem.parameters_random[p].pdf_norm(x=coords_norm[:, i_p])[1]
+
+        return weights_numint
+
+    def create_validation_set(self, n_samples, n_cpu=1, seed=None, cache_folder=None):
         """
         Creates a ValidationSet instance (calls the model)
 
@@ -1052,24 +1634,164 @@ class GPC(object):
         n_cpu: int
             Number of parallel function evaluations to evaluate validation set (n_cpu=0 assumes that the
             model is capable to evaluate all grid points in parallel)
+        seed: int, optional, default: None
+            Seed of the random grid of the validation set
+        cache_folder: str, optional, default: None
+            Folder of the validation set cache. If a validation set of the same problem and seed is present,
+            it is loaded from the cache and topped up with new model evaluations if more samples are requested.
         """
         # create set of validation points
-        n_samples = n_samples
+        n_samples = int(n_samples)
 
         if self.problem_original is not None:
             problem = self.problem_original
         else:
             problem = self.problem
 
-        grid = Random(parameters_random=problem.parameters_random,
-                      n_grid=n_samples,
-                      seed=None)
+        validation_cached = None
+        n_cached = 0
+
+        # load validation set from cache
+        if cache_folder is not None:
+            fn_cache = get_validation_set_cache_fn(problem=problem, folder=cache_folder, seed=seed)
+
+            if os.path.exists(fn_cache):
+                iprint("Loading validation set from cache: {}".format(fn_cache), tab=0, verbose=self.verbose)
+                validation_cached = ValidationSet().read(fname=fn_cache, folder="validation")
+                n_cached = validation_cached.results.shape[0]
+
+        if n_cached < n_samples:
+            grid = Random(parameters_random=problem.parameters_random,
+                          n_grid=n_samples - n_cached,
+                          seed=seed if seed is None or n_cached == 0 else seed + n_cached)
+
+            # Evaluate original model at grid points
+            com = Computation(n_cpu=n_cpu, matlab_model=self.matlab_model)
+            results = com.run(model=problem.model, problem=problem, coords=grid.coords)
+            com.close()
+
+            if results.ndim == 1:
+                results = results[:, np.newaxis]
 
-        # Evaluate original model at grid points
-        com = Computation(n_cpu=n_cpu, matlab_model=self.matlab_model)
-        results = com.run(model=problem.model, problem=problem, coords=grid.coords)
+            validation = ValidationSet(grid=grid, results=results)
+
+            if validation_cached is not None:
+                validation = validation_cached.append(validation)
+
+            # save extended validation set in cache
+            if cache_folder is not None:
+                if not os.path.exists(cache_folder):
+                    os.makedirs(cache_folder)
+
+                if os.path.exists(fn_cache):
+                    os.remove(fn_cache)
+
+                validation.write(fname=fn_cache, folder="validation")
+        else:
+            validation = validation_cached
+
+        self.validation = validation.get_subset(n_samples)
+
+
+class NumIntAccumulator(object):
+    """
+    Streaming accumulator of the gPC coefficients determined by numerical integration (spectral projection).
+    The weighted contributions of the model results are added to the coefficients as they arrive, such that
+    only the coefficients [n_basis x n_out] are kept in memory. It can be passed as callback to Computation.run()
+    to report partial coefficients while the model evaluations continue.
+
+    Parameters
+    ----------
+    gpc : GPC object instance
+        GPC object with basis and quadrature grid (SGPC.Quad)
+    i_grid : int, optional, default: 0
+        Index of the grid point corresponding to the first result passed to the callback
+
+    Attributes
+    ----------
+    coeffs : ndarray of float [n_basis x n_out] or None
+        Partial gPC coefficients (sum over the contributions of the added grid points)
+    n_added : int
+        Number of added grid points
+
+    Examples
+    --------
+    >>> import pygpc
+    >>> accumulator = pygpc.NumIntAccumulator(gpc=gpc)
+    >>> res = com.run(model=problem.model, problem=problem, coords=gpc.grid.coords,
+    >>>               coords_norm=gpc.grid.coords_norm, callback=accumulator)
+    >>> coeffs = accumulator.coeffs
+    """
+
+    def __init__(self, gpc, i_grid=0):
+        """
+        Constructor; Initializes NumIntAccumulator class
+        """
+        self.gpc = gpc
+        self.i_grid = i_grid
+        self.coeffs = None
+        self.n_added = 0
+        self.n_finished = 0
+
+    def add(self, results, idx):
+        """
+        Adds the weighted contributions of the results of the given grid points to the coefficients.
+
+        Parameters
+        ----------
+        results : ndarray of float [n_idx x n_out]
+            Model results of the grid points
+        idx : ndarray of int [n_idx]
+            Indices of the grid points
+
+        Returns
+        -------
+        coeffs : ndarray of float [n_basis x n_out]
+            Partial gPC coefficients
+        """
+        idx = np.atleast_1d(idx)
 
         if results.ndim == 1:
             results = results[:, np.newaxis]
 
-        self.validation = ValidationSet(grid=grid, results=results)
+        if self.gpc.output_reduction is not None:
+            results = self.gpc.output_reduction.transform(results)
+
+        coords_norm = self.gpc.grid.coords_norm[idx, :]
+        weights = self.gpc.get_weights_numint(coords_norm=coords_norm, weights=self.gpc.grid.weights[idx])
+        matrix = self.gpc.create_gpc_matrix(b=self.gpc.basis.b, x=coords_norm)
+
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(len(idx), len(self.gpc.basis.b))
+
+        coeffs = np.matmul(matrix.transpose(), weights[:, np.newaxis] * results)
+
+        if self.coeffs is None:
+            self.coeffs = coeffs
+        else:
+            self.coeffs += coeffs
+
+        self.n_added += len(idx)
+
+        return self.coeffs
+
+    def __call__(self, res_finished):
+        """
+        Callback of Computation.run(). Adds the results of the newly finished simulations.
+
+        Parameters
+        ----------
+        res_finished : ndarray of float [n_finished x n_out]
+            Results of all finished simulations (in order of the grid points)
+
+        Returns
+        -------
+        stop : bool
+            False (the model evaluations are never cancelled)
+        """
+        if res_finished.shape[0] > self.n_finished:
+            idx = np.arange(self.i_grid + self.n_finished, self.i_grid + res_finished.shape[0])
+            self.add(results=res_finished[self.n_finished:, :], idx=idx)
+            self.n_finished = res_finished.shape[0]
+
+        return False
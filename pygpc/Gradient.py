@@ -1,6 +1,8 @@
 import numpy as np
+from scipy.spatial import cKDTree
 from .misc import ten2mat
 from .misc import mat2ten
+from .misc import append_rows
 from .misc import get_all_combinations
 
 
@@ -34,6 +36,8 @@ def get_gradient(model, problem, grid, results, com,  method="FD_fwd",
         - "FD_2nd": Finite difference approximation of 2nd order accuracy using only the available samples [1]
         - "FD_1st2nd": Finite difference approximation of 1st and (where possible) 2nd order accuracy
         using only the available samples [1]
+        - "model": Gradient provided by the model together with the results of the last model evaluations
+        (see AbstractModel.simulate) without additional model evaluations (stored in com.gradient_results)
     gradient_results_present : ndarray of float [n_grid_old x n_out x dim], optional, default: None
         Gradient of model function in grid points, already determined in previous calculations.
         Those values will not be updated!
@@ -118,31 +122,21 @@ def get_gradient(model, problem, grid, results, com,  method="FD_fwd",
         # Finite difference approximation (1st order accuracy)  #
         #########################################################
         elif method == "FD_1st":
-            delta = dx
+            # determine neighbors within radius dx of the grid points, which were not computed previously
+            neighbors = get_neighbors(coords_norm=grid.coords_norm, coord_idx=gradient_idx_compute, dx=dx)
+            n_neighbors = np.array([len(n) for n in neighbors], dtype=int)
 
-            # number of sampling points to sacrifice for 2nd order accuracy
-            gradient_results_idx_can_compute = []
-
-            for i, x0 in enumerate(grid.coords_norm):
-
-                # determine neighbors within radius delta
-                mask = np.linalg.norm(grid.coords_norm-x0, axis=1) < delta
-                mask[i] = False
+            # only determine gradient if we have enough neighboring sampling points
+            mask = n_neighbors >= problem.dim
+            gradient_results_idx_can_compute = gradient_idx_compute[mask]
 
-                # only determine gradient if we have enough neighboring sampling points
-                # and if it was not computed previously
-                if np.sum(mask) >= problem.dim and i in gradient_idx_compute:
-                    gradient_results_idx_can_compute.append(i)
-
-            # determine gradient not in skipped points
-            gradient_results_idx_can_compute = np.array(gradient_results_idx_can_compute)
-
-            if gradient_results_idx_can_compute.any():
+            if gradient_results_idx_can_compute.size > 0:
                 gradient_results_new = FD_1st(coords_norm=grid.coords_norm,
                                               coord_idx=gradient_results_idx_can_compute,
                                               results=results,
                                               dx=dx,
-                                              distance_weight=distance_weight)
+                                              distance_weight=distance_weight,
+                                              neighbors=[n for n, m in zip(neighbors, mask) if m])
 
             gradient_results_idx = np.hstack((gradient_idx_skip, gradient_results_idx_can_compute)).astype(int)
 
@@ -150,32 +144,24 @@ def get_gradient(model, problem, grid, results, com,  method="FD_fwd",
         # Finite difference approximation (2nd order accuracy)  #
         #########################################################
         elif method == "FD_2nd":
-            delta = dx
-
             # number of sampling points to sacrifice for 2nd order accuracy
             n_2nd_order = np.sum(np.arange(problem.dim+1))
-            gradient_results_idx_can_compute = []
 
-            for i, x0 in enumerate(grid.coords_norm):
+            # determine neighbors within radius dx of the grid points, which were not computed previously
+            neighbors = get_neighbors(coords_norm=grid.coords_norm, coord_idx=gradient_idx_compute, dx=dx)
+            n_neighbors = np.array([len(n) for n in neighbors], dtype=int)
 
-                # determine neighbors within radius delta
-                mask = np.linalg.norm(grid.coords_norm-x0, axis=1) < delta
-                mask[i] = False
+            # only determine gradient if we have enough neighboring sampling points
+            mask = n_neighbors >= (n_2nd_order + problem.dim)
+            gradient_results_idx_can_compute = gradient_idx_compute[mask]
 
-                # only determine gradient if we have enough neighboring sampling points
-                # and if it was not computed previously
-                if np.sum(mask) >= (n_2nd_order + problem.dim) and i in gradient_idx_compute:
-                    gradient_results_idx_can_compute.append(i)
-
-            # determine gradient not in skipped points
-            gradient_results_idx_can_compute = np.array(gradient_results_idx_can_compute)
-
-            if gradient_results_idx_can_compute.any():
+            if gradient_results_idx_can_compute.size > 0:
                 gradient_results_new = FD_2nd(coords_norm=grid.coords_norm,
                                               coord_idx=gradient_results_idx_can_compute,
                                               results=results,
                                               dx=dx,
-                                              distance_weight=distance_weight)
+                                              distance_weight=distance_weight,
+                                              neighbors=[n for n, m in zip(neighbors, mask) if m])
 
             gradient_results_idx = np.hstack((gradient_idx_skip, gradient_results_idx_can_compute)).astype(int)
 
@@ -183,63 +169,73 @@ def get_gradient(model, problem, grid, results, com,  method="FD_fwd",
         # Finite difference approximation (1st and 2nd order accuracy)  #
         #################################################################
         elif method == "FD_1st2nd":
-            delta = dx
-
             # number of sampling points to sacrifice for 2nd order accuracy
             n_2nd_order = np.sum(np.arange(problem.dim+1))
-            coord_idx_1st = []
-            coord_idx_2nd = []
 
-            for i, x0 in enumerate(grid.coords_norm):
+            # determine neighbors within radius dx of the grid points, which were not computed previously
+            neighbors = get_neighbors(coords_norm=grid.coords_norm, coord_idx=gradient_idx_compute, dx=dx)
+            n_neighbors = np.array([len(n) for n in neighbors], dtype=int)
 
-                # determine neighbors within radius delta
-                mask = np.linalg.norm(grid.coords_norm-x0, axis=1) < delta
-                mask[i] = False
-
-                # choose method depending on number of neighboring sampling points
-                # and if it was not computed previously
-                if np.sum(mask) >= (n_2nd_order + problem.dim) and i in gradient_idx_compute:
-                    coord_idx_2nd.append(i)
-                elif np.sum(mask) >= problem.dim and i in gradient_idx_compute:
-                    coord_idx_1st.append(i)
-
-            coord_idx_1st = np.array(coord_idx_1st)
-            coord_idx_2nd = np.array(coord_idx_2nd)
+            # choose method depending on number of neighboring sampling points
+            mask_2nd = n_neighbors >= (n_2nd_order + problem.dim)
+            mask_1st = np.logical_and(n_neighbors >= problem.dim, np.logical_not(mask_2nd))
+            coord_idx_1st = gradient_idx_compute[mask_1st]
+            coord_idx_2nd = gradient_idx_compute[mask_2nd]
 
             # estimate gradients with 1st order accuracy
             gradient_results_1st = None
-            if coord_idx_1st.any():
+            if coord_idx_1st.size > 0:
                 gradient_results_1st = FD_1st(coords_norm=grid.coords_norm,
                                               coord_idx=coord_idx_1st,
                                               results=results,
                                               dx=dx,
-                                              distance_weight=distance_weight)
+                                              distance_weight=distance_weight,
+                                              neighbors=[n for n, m in zip(neighbors, mask_1st) if m])
 
             # estimate gradients with 2nd order accuracy
             gradient_results_2nd = None
-            if coord_idx_2nd.any():
+            if coord_idx_2nd.size > 0:
                 gradient_results_2nd = FD_2nd(coords_norm=grid.coords_norm,
                                               coord_idx=coord_idx_2nd,
                                               results=results,
                                               dx=dx,
-                                              distance_weight=distance_weight)
+                                              distance_weight=distance_weight,
+                                              neighbors=[n for n, m in zip(neighbors, mask_2nd) if m])
 
             # concatenate results
             if gradient_results_1st is not None and gradient_results_2nd is not None:
                 gradient_results_new = np.vstack((gradient_results_1st, gradient_results_2nd))
             elif gradient_results_1st is not None and gradient_results_2nd is None:
                 gradient_results_new = gradient_results_1st
-            elif gradient_results_1st is not None and gradient_results_2nd is None:
+            elif gradient_results_1st is None and gradient_results_2nd is not None:
                 gradient_results_new = gradient_results_2nd
 
             gradient_results_idx = np.hstack((gradient_idx_skip, coord_idx_1st, coord_idx_2nd)).astype(int)
 
+        ##########################################
+        # Gradient provided by the model itself  #
+        ##########################################
+        elif method == "model":
+            if com.gradient_results is None:
+                raise AssertionError("The model does not provide the gradient of the results. Please return a tuple "
+                                     "(res, additional_data, gradient_results) in simulate().")
+
+            # the gradients of the last model evaluations belong to the last grid points
+            idx_run = np.arange(grid.coords.shape[0] - com.gradient_results.shape[0], grid.coords.shape[0])
+
+            if not np.isin(gradient_idx_compute, idx_run).all():
+                raise AssertionError("The gradient provided by the model is only available for the grid points of "
+                                     "the last model evaluations.")
+
+            gradient_results_new = com.gradient_results[gradient_idx_compute - idx_run[0], :, :]
+            gradient_results_idx = np.hstack((gradient_idx_skip, gradient_idx_compute)).astype(int)
+
         else:
             raise NotImplementedError("Please provide a valid gradient estimation method!")
 
     # concatenate old with new results
     if gradient_results_present is not None and gradient_results_new is not None:
-        gradient_results = np.vstack((gradient_results_present, gradient_results_new))
+        gradient_results = append_rows(gradient_results_present, gradient_results_new)
     elif gradient_results_present is None and gradient_results_new is not None:
         gradient_results = gradient_results_new
     elif gradient_results_present is not None and gradient_results_new is None:
@@ -253,10 +249,44 @@ def get_gradient(model, problem, grid, results, com,  method="FD_fwd",
     return gradient_results, gradient_results_idx
 
 
-def FD_1st(coords_norm, coord_idx, results, dx, distance_weight):
+def get_neighbors(coords_norm, coord_idx, dx):
+    """
+    Determines the neighboring grid points within radius dx (excluding the point itself) using a KD-tree.
+    The KD-tree is built once and all ball queries are performed in one call, such that the computational
+    cost scales with O(n_grid log(n_grid)) instead of O(n_grid^2).
+
+    Parameters
+    ----------
+    coords_norm : ndarray of float [n_grid x dim]
+        Normalized coordinates xi
+    coord_idx : ndarray of int [n_coords_idx]
+        Indices of coordinates (row idx in coords_norm) where the neighbors are determined
+    dx : float
+        Radius around grid points to include adjacent grid-points
+
+    Returns
+    -------
+    neighbors : list of ndarray of int [n_coords_idx][n_neighbors]
+        Indices of neighboring grid points
+    """
+    coord_idx = np.asarray(coord_idx, dtype=int)
+
+    if coord_idx.size == 0:
+        return []
+
+    tree = cKDTree(coords_norm)
+
+    # neighbors with distance < dx
+    neighbors = tree.query_ball_point(coords_norm[coord_idx, :], r=np.nextafter(dx, 0))
+
+    return [np.setdiff1d(np.asarray(n, dtype=int), i_c) for n, i_c in zip(neighbors, coord_idx)]
+
+
+def FD_1st(coords_norm, coord_idx, results, dx, distance_weight, neighbors=None):
     """
     Determines the gradients of "results" in coords_norm[coords_idx, :] using a finite difference
-    regression approach of first order accuracy.
+    regression approach of first order accuracy. The weighted least squares problems of grid points with
+    the same number of neighbors are solved together.
 
     Parameters
     ----------
@@ -270,48 +300,49 @@ def FD_1st(coords_norm, coord_idx, results, dx, distance_weight):
         Radius around grid points to include adjacent grid-points in gradient approximation
     distance_weight : float, optional, default: 1
         Distance weight factor (exponent) adjacent grid points
+    neighbors : list of ndarray of int [n_coords_idx][n_neighbors], optional, default: None
+        Indices of neighboring grid points within radius dx (determined with get_neighbors() if not provided)
 
     Returns
     -------
     gradient_results : ndarray of float [n_coords_idx x n_qoi x dim]
         Gradient of model function in grid points
     """
-
+    coord_idx = np.asarray(coord_idx, dtype=int)
     n_dim = coords_norm.shape[1]
     gradient_results = np.zeros((len(coord_idx), results.shape[1], n_dim))*np.nan
 
-    for i, i_c in enumerate(coord_idx):
-        x0 = coords_norm[i_c, :]
-
-        # determine neighbors within radius dx
-        mask = np.linalg.norm(coords_norm-x0, axis=1) < dx
-        mask[i_c] = False
+    if neighbors is None:
+        neighbors = get_neighbors(coords_norm=coords_norm, coord_idx=coord_idx, dx=dx)
 
-        coords_norm_selected = coords_norm[mask, ]
+    for i_group, idx_neighbors in get_neighbor_groups(neighbors=neighbors, n_qoi=results.shape[1]):
+        i_c = coord_idx[i_group]
+        x0 = coords_norm[i_c, np.newaxis, :]
 
-        # distance matrix (1st order)
-        D = coords_norm_selected-x0
+        # distance matrices (1st order) [n_group x n_neighbors x dim]
+        D = coords_norm[idx_neighbors, :] - x0
 
-        # rhs
-        df = results[mask, ]-results[i_c, ]
+        # rhs [n_group x n_neighbors x n_out]
+        df = results[idx_neighbors, :] - results[i_c, np.newaxis, :]
 
-        # weight matrix (distance**distance_weight)
-        W = np.diag(np.linalg.norm(D, axis=1)**distance_weight)
+        # weights (distance**distance_weight)
+        w = np.linalg.norm(D, axis=2)[:, :, np.newaxis]**distance_weight
 
-        # apply weight matrix
-        D = np.matmul(W, D)
-        df = np.matmul(W, df)
+        # apply weights
+        D = w * D
+        df = w * df
 
-        # gradient [n_grid x n_out x dim]
-        gradient_results[i, :, :] = np.matmul(np.linalg.pinv(D), df).transpose()
+        # gradient [n_group x n_out x dim]
+        gradient_results[i_group, :, :] = np.matmul(np.linalg.pinv(D), df).transpose(0, 2, 1)
 
     return gradient_results
 
 
-def FD_2nd(coords_norm, coord_idx, results, dx, distance_weight):
+def FD_2nd(coords_norm, coord_idx, results, dx, distance_weight, neighbors=None):
     """
     Determines the gradients of "results" in coords_norm[coords_idx, :] using a finite difference
-    regression approach of second order accuracy.
+    regression approach of second order accuracy. The weighted least squares problems of grid points with
+    the same number of neighbors are solved together.
 
     Parameters
     ----------
@@ -325,63 +356,99 @@ def FD_2nd(coords_norm, coord_idx, results, dx, distance_weight):
         Radius around grid points to include adjacent grid-points in gradient approximation
     distance_weight : float, optional, default: 1
         Distance weight factor (exponent) adjacent grid points.
+    neighbors : list of ndarray of int [n_coords_idx][n_neighbors], optional, default: None
+        Indices of neighboring grid points within radius dx (determined with get_neighbors() if not provided)
 
     Returns
     -------
     gradient_results : ndarray of float [n_coords_idx x n_qoi x dim]
         Gradient of model function in grid points
     """
+    coord_idx = np.asarray(coord_idx, dtype=int)
     n_dim = coords_norm.shape[1]
     gradient_results = np.zeros((len(coord_idx), results.shape[1], n_dim))*np.nan
 
     # number of sampling points to sacrifice for 2nd order accuracy
     n_2nd_order = np.sum(np.arange(coords_norm.shape[1]+1))
 
-    for i, i_c in enumerate(coord_idx):
-        x0 = coords_norm[i_c, :]
+    # mixed linear terms
+    idx = get_all_combinations(np.arange(n_dim), 2)
 
-        # determine neighbors within radius dx
-        mask = np.linalg.norm(coords_norm-x0, axis=1) < dx
-        mask[i_c] = False
+    if neighbors is None:
+        neighbors = get_neighbors(coords_norm=coords_norm, coord_idx=coord_idx, dx=dx)
 
-        coords_norm_selected = coords_norm[mask, ]
+    for i_group, idx_neighbors in get_neighbor_groups(neighbors=neighbors, n_qoi=results.shape[1]):
+        i_c = coord_idx[i_group]
+        x0 = coords_norm[i_c, np.newaxis, :]
 
-        # distance matrix (1st order)
-        D = coords_norm_selected-x0
+        # distance matrices (1st order) [n_group x n_neighbors x dim]
+        D = coords_norm[idx_neighbors, :] - x0
 
-        # distance matrix (2nd order)
-        M = np.zeros((coords_norm_selected.shape[0], n_2nd_order))
+        # distance matrices (2nd order) [n_group x n_neighbors x n_2nd_order]
+        M = np.zeros((D.shape[0], D.shape[1], n_2nd_order))
 
         # quadratic terms
-        for i_dim in range(n_dim):
-            M[:, i_dim] = 0.5 * (coords_norm_selected[:, i_dim]-x0[i_dim])**2
-
-        # mixed linear terms
-        idx = get_all_combinations(np.arange(n_dim), 2)
+        M[:, :, :n_dim] = 0.5 * D**2
 
         for j, idx_row in enumerate(idx):
-            M[:, j+n_dim] = (coords_norm_selected[:, idx_row[0]] - x0[idx_row[0]]) * \
-                            (coords_norm_selected[:, idx_row[1]] - x0[idx_row[1]])
+            M[:, :, j+n_dim] = D[:, :, idx_row[0]] * D[:, :, idx_row[1]]
 
-        # rhs
-        df = results[mask, ]-results[i_c, ]
+        # rhs [n_group x n_neighbors x n_out]
+        df = results[idx_neighbors, :] - results[i_c, np.newaxis, :]
 
-        # weight matrix (distance**distance_weight)
-        W = np.diag(np.linalg.norm(D, axis=1)**distance_weight)
+        # weights (distance**distance_weight)
+        w = np.linalg.norm(D, axis=2)[:, :, np.newaxis]**distance_weight
 
-        # apply weight matrix
-        D = np.matmul(W, D)
-        M = np.matmul(W, M)
-        df = np.matmul(W, df)
+        # apply weights
+        D = w * D
+        M = w * M
+        df = w * df
 
         # derive orthogonal reduction of M
         Q, T = np.linalg.qr(M, mode="complete")
+        Qt = Q.transpose(0, 2, 1)
 
-        # gradient [n_grid x n_out x dim]
-        QtD_inv = np.linalg.pinv(np.matmul(Q.transpose(), D)[n_2nd_order:, ])
+        # gradient [n_group x n_out x dim]
+        QtD_inv = np.linalg.pinv(np.matmul(Qt, D)[:, n_2nd_order:, :])
 
-        rhs = np.matmul(Q.transpose(), df)[n_2nd_order:, ]
+        rhs = np.matmul(Qt, df)[:, n_2nd_order:, :]
 
-        gradient_results[i, :, :] = np.matmul(QtD_inv, rhs).transpose()
+        gradient_results[i_group, :, :] = np.matmul(QtD_inv, rhs).transpose(0, 2, 1)
 
     return gradient_results
+
+
+def get_neighbor_groups(neighbors, n_qoi, n_max=int(1e7)):
+    """
+    Groups the grid points by their number of neighbors, such that their local least squares problems can be
+    solved together. Large groups are split into chunks to bound the memory.
+
+    Parameters
+    ----------
+    neighbors : list of ndarray of int [n_coords_idx][n_neighbors]
+        Indices of neighboring grid points
+    n_qoi : int
+        Number of QOIs
+    n_max : int, optional, default: 1e7
+        Maximum number of elements of the gathered results of one chunk [n_group x n_neighbors x n_qoi]
+
+    Yields
+    ------
+    i_group : ndarray of int [n_group]
+        Indices of the grid points in the group (w.r.t. neighbors)
+    idx_neighbors : ndarray of int [n_group x n_neighbors]
+        Indices of neighboring grid points
+    """
+    n_neighbors = np.array([len(n) for n in neighbors], dtype=int)
+
+    for n in np.unique(n_neighbors):
+        if n == 0:
+            continue
+
+        i_group_all = np.where(n_neighbors == n)[0]
+        n_chunk = max(1, int(n_max / (n * n_qoi)))
+
+        for i_start in range(0, len(i_group_all), n_chunk):
+            i_group = i_group_all[i_start:(i_start + n_chunk)]
+
+            yield i_group, np.vstack([neighbors[i] for i in i_group])
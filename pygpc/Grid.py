@@ -1,12 +1,62 @@
 import uuid
 import copy
+import time
 import numpy as np
 import scipy.stats
 from .io import iprint
 from .misc import get_multi_indices
 from .misc import get_cartesian_product
+from .misc import append_rows
 from.Quadrature import *
 
+# last grid point id handed out in this session (see get_grid_ids)
+_grid_id_last = np.int64(0)
+
+# random 64 bit prefix of the UUIDs derived from the grid point ids in this session (see get_grid_uuids)
+_grid_uuid_prefix = uuid.uuid4().int >> 64
+
+
+def get_grid_ids(n_grid):
+    """
+    Generates unique IDs of grid points. The ids are consecutive int64 numbers, which are increasing monotonically
+    within a session and start at the current time in ns, such that ids of grids loaded from previous sessions are
+    not reused.
+
+    Parameters
+    ----------
+    n_grid : int
+        Number of ids to generate
+
+    Returns
+    -------
+    coords_id : ndarray of int64 [n_grid]
+        Unique IDs of grid points
+    """
+    global _grid_id_last
+
+    start = max(_grid_id_last + 1, np.int64(time.time_ns()))
+    _grid_id_last = np.int64(start + n_grid - 1)
+
+    return np.arange(start, start + n_grid, dtype=np.int64)
+
+
+def get_grid_uuids(coords_id):
+    """
+    Converts IDs of grid points to UUID objects, e.g. to export them. The UUIDs are unique for the ids of one session
+    and are only generated on demand.
+
+    Parameters
+    ----------
+    coords_id : ndarray of int64 [n_grid]
+        Unique IDs of grid points
+
+    Returns
+    -------
+    coords_uuid : list of UUID objects [n_grid]
+        UUIDs of grid points
+    """
+    return [uuid.UUID(int=(_grid_uuid_prefix << 64) | int(_id)) for _id in coords_id]
+
 
 class Grid():
     """
@@ -26,7 +76,7 @@ class Grid():
         Denormalized coordinates xi
     coords_gradient_norm: ndarray of float [n_grid x dim x dim]
         Normalized coordinates xi
-    coords_id: list of UUID objects (version 4) [n_grid]
+    coords_id: ndarray of int64 [n_grid]
         Unique IDs of grid points
     n_grid: int
         Total number of nodes in grid.
@@ -47,7 +97,7 @@ class Grid():
         Denormalized coordinates xi
     _coords_gradient_norm: ndarray of float [n_grid x dim x dim]
         Normalized coordinates xi
-    coords_id: list of UUID objects (version 4) [n_grid]
+    coords_id: ndarray of int64 [n_grid]
         Unique IDs of grid points
     n_grid: int
         Total number of nodes in grid.
@@ -59,8 +109,8 @@ class Grid():
         """
         self._coords = coords                         # Coordinates of gpc model calculation in the system space
         self._coords_norm = coords_norm               # Coordinates of gpc model calculation in the gpc space
-        self.coords_id = coords_id                    # Unique IDs of grid points
-        self.coords_gradient_id = coords_gradient_id  # Unique IDs of grid gradient points
+        self.coords_id = coords_id                    # Unique IDs of grid points (int64)
+        self.coords_gradient_id = coords_gradient_id  # Unique IDs of grid gradient points (int64)
         self._weights = None                          # Weights for numerical integration
         self.parameters_random = parameters_random    # OrderedDict of RandomParameter instances
         self.dim = len(self.parameters_random)        # Number of random variables
@@ -74,11 +124,11 @@ class Grid():
             self.n_grid_gradient = self.coords_gradient.shape[0]  # Total number of grid points for gradient calculation
 
         if coords_id is None and coords is not None:
-            self.coords_id = self.coords_id = [uuid.uuid4() for _ in range(self.n_grid)]
+            self.coords_id = get_grid_ids(self.n_grid)
             self.n_grid = self._coords.shape[0]
 
         if coords_gradient_id is None and coords_gradient is not None:
-            self.coords_gradient_id = [uuid.uuid4() for _ in range(self.n_grid)]
+            self.coords_gradient_id = get_grid_ids(self.n_grid)
             self.n_grid_gradient = self._coords_gradient.shape[0]
 
     @property
@@ -92,7 +142,7 @@ class Grid():
 
         # Generate unique IDs of grid points
         if self.coords_id is None:
-            self.coords_id = [uuid.uuid4() for _ in range(self.n_grid)]
+            self.coords_id = get_grid_ids(self.n_grid)
 
     @property
     def coords_norm(self):
@@ -105,7 +155,7 @@ class Grid():
 
         # Generate unique IDs of grid points
         if self.coords_id is None:
-            self.coords_id = [uuid.uuid4() for _ in range(self.n_grid)]
+            self.coords_id = get_grid_ids(self.n_grid)
 
     @property
     def coords_gradient(self):
@@ -118,7 +168,7 @@ class Grid():
 
         # Generate unique IDs of grid gradient points
         if self.coords_gradient_id is None:
-            self.coords_gradient_id = [uuid.uuid4() for _ in range(self.n_grid_gradient)]
+            self.coords_gradient_id = get_grid_ids(self.n_grid_gradient)
 
     @property
     def coords_gradient_norm(self):
@@ -131,7 +181,7 @@ class Grid():
 
         # Generate unique IDs of grid gradient points
         if self.coords_gradient_id is None:
-            self.coords_gradient_id = [uuid.uuid4() for _ in range(self.n_grid_gradient)]
+            self.coords_gradient_id = get_grid_ids(self.n_grid_gradient)
 
     @property
     def weights(self):
@@ -214,6 +264,32 @@ class Grid():
 
         return coords_norm
 
+    def get_projected_grid(self, p_matrix, p_matrix_norm):
+        """
+        Returns a grid with the coordinates transformed to the reduced parameter space of a projection gPC.
+        All other arrays (ids, gradient grid, weights, ...) are shared with this grid and not copied.
+        Since grid extensions only append behind the current arrays (see misc.append_rows), the returned grid is a
+        snapshot of the current grid.
+
+        Parameters
+        ----------
+        p_matrix : ndarray of float [dim_red x dim]
+            Projection matrix
+        p_matrix_norm : ndarray of float [dim_red]
+            Normalization factors of the projection matrix
+
+        Returns
+        -------
+        grid : Grid object instance
+            Grid with projected coordinates (coords, coords_norm) [n_grid x dim_red]
+        """
+        grid = copy.copy(self)
+        grid._coords = np.matmul(self.coords, p_matrix.transpose())
+        grid._coords_norm = np.matmul(self.coords_norm, p_matrix.transpose() / p_matrix_norm[np.newaxis, :])
+        grid.n_grid = grid._coords_norm.shape[0]
+
+        return grid
+
     def create_gradient_grid(self, delta=1e-3):
         """
         Creates new grid points to determine gradient of model function.
@@ -230,10 +306,10 @@ class Grid():
         # Create or update the gradient grid [n_grid x dim x dim]
         if self.coords_gradient is not None:
             n_grid_gradient = self.coords_gradient_norm.shape[0]
-            self.coords_gradient = np.vstack((self.coords_gradient,
-                                              np.zeros((self.n_grid-n_grid_gradient, self.dim, self.dim))))
-            self.coords_gradient_norm = np.vstack((self.coords_gradient_norm,
-                                                   np.zeros((self.n_grid-n_grid_gradient, self.dim, self.dim))))
+            self.coords_gradient = append_rows(self.coords_gradient,
+                                               np.zeros((self.n_grid-n_grid_gradient, self.dim, self.dim)))
+            self.coords_gradient_norm = append_rows(self.coords_gradient_norm,
+                                                    np.zeros((self.n_grid-n_grid_gradient, self.dim, self.dim)))
         else:
             n_grid_gradient = 0
             self.coords_gradient = np.zeros((self.n_grid, self.dim, self.dim))
@@ -253,7 +329,30 @@ class Grid():
             self.n_grid_gradient = self.coords_gradient.shape[0]*self.coords_gradient.shape[2]
 
             # Generate unique IDs of grid points [n_grid]
-            self.coords_gradient_id = copy.deepcopy(self.coords_id)
+            self.coords_gradient_id = self.coords_id
+
+    def delete(self, idx):
+        """
+        Deletes grid points (e.g. in case of cancelled model evaluations).
+        Updates self.coords, self.coords_norm, self.coords_id and the gradient grid if present.
+
+        Parameters
+        ----------
+        idx : np.ndarray of int [n_delete]
+            Indices of grid points to delete
+        """
+        idx_keep = np.setdiff1d(np.arange(self.n_grid), idx)
+
+        self.coords_id = np.asarray(self.coords_id)[idx_keep]
+        self.coords = self.coords[idx_keep, :]
+        self.coords_norm = self.coords_norm[idx_keep, :]
+
+        if self.coords_gradient is not None:
+            idx_keep_gradient = idx_keep[idx_keep < self.coords_gradient.shape[0]]
+            self.coords_gradient_id = np.asarray(self.coords_gradient_id)[idx_keep_gradient]
+            self.coords_gradient = self.coords_gradient[idx_keep_gradient, ]
+            self.coords_gradient_norm = self.coords_gradient_norm[idx_keep_gradient, ]
+            self.n_grid_gradient = self.coords_gradient.shape[0] * self.coords_gradient.shape[2]
 
 
 class TensorGrid(Grid):
@@ -276,9 +375,9 @@ class TensorGrid(Grid):
         Denormalized coordinates xi
     coords_gradient_norm : ndarray of float [n_grid x dim x dim]
         Normalized coordinates xi
-    coords_id : list of UUID objects (version 4) [n_grid]
+    coords_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
-    coords_gradient_id : list of UUID objects (version 4) [n_grid]
+    coords_gradient_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
     knots_dim_list : list of float [dim][n_knots]
         Knots of polynomials in each dimension
@@ -310,9 +409,9 @@ class TensorGrid(Grid):
         Denormalized coordinates xi
     coords_gradient_norm : ndarray of float [n_grid x dim x dim]
         Normalized coordinates xi
-    coords_id : list of UUID objects (version 4) [n_grid]
+    coords_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
-    coords_gradient_id : list of UUID objects (version 4) [n_grid]
+    coords_gradient_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
     knots_dim_list : list of float [dim][n_knots]
         Knots of polynomials in each dimension
@@ -412,7 +511,7 @@ class TensorGrid(Grid):
             self.n_grid = self.coords.shape[0]
 
             # Generate and append unique IDs of grid points
-            self.coords_id = [uuid.uuid4() for _ in range(self.n_grid)]
+            self.coords_id = get_grid_ids(self.n_grid)
 
 
 class SparseGrid(Grid):
@@ -443,9 +542,9 @@ class SparseGrid(Grid):
         Denormalized coordinates xi
     coords_gradient_norm : ndarray of float [n_grid x dim x dim]
         Normalized coordinates xi
-    coords_id : list of UUID objects (version 4) [n_grid]
+    coords_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
-    coords_gradient_id : list of UUID objects (version 4) [n_grid]
+    coords_gradient_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
     level_sequence: list of int
         Integer sequence of levels
@@ -488,9 +587,9 @@ class SparseGrid(Grid):
         Denormalized coordinates xi
     coords_gradient_norm : ndarray of float [n_grid x dim x dim]
         Normalized coordinates xi
-    coords_id : list of UUID objects (version 4) [n_grid]
+    coords_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
-    coords_gradient_id : list of UUID objects (version 4) [n_grid]
+    coords_gradient_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
     weights : ndarray of float [n_grid]
             Quadrature weights for each grid point
@@ -524,6 +623,8 @@ class SparseGrid(Grid):
         # output while grid generation on/off
         if "verbose" not in options.keys():
             self.verbose = False
+        else:
+            self.verbose = options["verbose"]
 
         # Generate grid if not specified
         if coords is not None and coords_norm is not None:
@@ -545,7 +646,7 @@ class SparseGrid(Grid):
             self.n_grid = self.coords.shape[0]
 
             # Generate unique IDs of grid points
-            self.coords_id = [uuid.uuid4() for _ in range(self.n_grid)]
+            self.coords_id = get_grid_ids(self.n_grid)
 
     def calc_multi_indices(self):
         """
@@ -562,11 +663,11 @@ class SparseGrid(Grid):
             if self.order_sequence_type == 'exp':         # order = 2**level + 1
 
                 if self.grid_type[i_p] == 'fejer2':       # start with order = 1 @ level = 1
-                    self.order_sequence.append((np.power(2, np.arange(1, self.level[i_p])) - 1).tolist())
+                    self.order_sequence.append((np.power(2, np.arange(1, self.level[i_p] + 1)) - 1).tolist())
                     self.order_sequence[i_p][0] = 1
 
                 elif self.grid_type[i_p] == 'patterson':  # start with order = 1 @ level = 0 [1,3,7,15,31,...]
-                    self.order_sequence.append((np.power(2, np.arange(0, self.level[i_p])) + 1).tolist())
+                    self.order_sequence.append((np.power(2, np.arange(1, self.level[i_p] + 2)) - 1).tolist())
 
                 else:                                     # start with order = 1 @ level = 0
                     self.order_sequence.append(
@@ -598,7 +699,11 @@ class SparseGrid(Grid):
             if self.dim == 1:
                 l_level = np.array([np.linspace(1, self.level_max, self.level_max)]).transpose()
             else:
-                l_level = get_multi_indices(self.dim, self.level_max - self.dim)
+                l_level = get_multi_indices(order=[self.level_max - self.dim] * self.dim,
+                                            order_max=self.level_max - self.dim,
+                                            interaction_order=self.dim,
+                                            order_max_norm=1.,
+                                            interaction_order_current=None)
                 l_level = l_level + 1
         else:
             if self.dim == 1:
@@ -640,54 +745,60 @@ class SparseGrid(Grid):
         iprint("Generating difference grids...", tab=0, verbose=self.verbose)
         dl_k = [[0 for _ in range(self.dim)] for _ in range(int(np.amax(self.level) + 1))]
         dl_w = [[0 for _ in range(self.dim)] for _ in range(int(np.amax(self.level) + 1))]
-        knots_l, weights_l, knots_l_1, weights_l_1 = 0, 0, 0, 0
 
-        for i_p, p in enumerate(self.parameters_random):
+        # 1-D rules are memoised because the rule of level l is needed again as rule l-1 of the next level
+        rules = dict()
 
-            for i_level in self.level_sequence[i_p]:
+        def get_rule(i_p, p, order):
+            if self.grid_type[i_p] == 'jacobi':
+                key = ('jacobi', order, self.parameters_random[p].pdf_shape[0], self.parameters_random[p].pdf_shape[1])
+            else:
+                key = (self.grid_type[i_p], order)
 
+            if key not in rules.keys():
                 # Jacobi polynomials
                 if self.grid_type[i_p] == 'jacobi':
-                    knots_l, weights_l = get_quadrature_jacobi_1d(self.order_sequence[i_p][i_level],
-                                                                  self.parameters_random[p].pdf_shape[0] - 1,
-                                                                  self.parameters_random[p].pdf_shape[1] - 1)
-                    knots_l_1, weights_l_1 = get_quadrature_jacobi_1d(self.order_sequence[i_p][i_level - 1],
-                                                                      self.parameters_random[p].pdf_shape[0] - 1,
-                                                                      self.parameters_random[p].pdf_shape[1] - 1)
+                    rules[key] = get_quadrature_jacobi_1d(order,
+                                                          self.parameters_random[p].pdf_shape[0] - 1,
+                                                          self.parameters_random[p].pdf_shape[1] - 1)
 
                 # Hermite polynomials
-                if self.grid_type[i_p] == 'hermite':
-                    knots_l, weights_l = get_quadrature_hermite_1d(
-                        self.order_sequence[i_p][i_level])
-                    knots_l_1, weights_l_1 = get_quadrature_hermite_1d(
-                        self.order_sequence[i_p][i_level - 1])
+                elif self.grid_type[i_p] == 'hermite':
+                    rules[key] = get_quadrature_hermite_1d(order)
 
                 # Gauss-Patterson
-                if self.grid_type[i_p] == 'patterson':
-                    knots_l, weights_l = get_quadrature_patterson_1d(
-                        self.order_sequence[i_p][i_level])
-                    knots_l_1, weights_l_1 = get_quadrature_patterson_1d(
-                        self.order_sequence[i_p][i_level - 1])
+                elif self.grid_type[i_p] == 'patterson':
+                    rules[key] = get_quadrature_patterson_1d(order)
 
                 # Clenshaw Curtis
-                if self.grid_type[i_p] == 'clenshaw_curtis':
-                    knots_l, weights_l = get_quadrature_clenshaw_curtis_1d(
-                        self.order_sequence[i_p][i_level])
-                    knots_l_1, weights_l_1 = get_quadrature_clenshaw_curtis_1d(
-                        self.order_sequence[i_p][i_level - 1])
+                elif self.grid_type[i_p] == 'clenshaw_curtis':
+                    rules[key] = get_quadrature_clenshaw_curtis_1d(order)
 
                 # Fejer type 2
+                elif self.grid_type[i_p] == 'fejer2':
+                    rules[key] = get_quadrature_fejer2_1d(order)
+
+            return rules[key]
+
+        for i_p, p in enumerate(self.parameters_random):
+
+            for i_level in self.level_sequence[i_p]:
+
                 if self.grid_type[i_p] == 'fejer2':
-                    knots_l, weights_l = get_quadrature_fejer2_1d(
-                        self.order_sequence[i_p][i_level - 1])
-                    knots_l_1, weights_l_1 = get_quadrature_fejer2_1d(
-                        self.order_sequence[i_p][i_level - 2])
+                    knots_l, weights_l = get_rule(i_p, p, self.order_sequence[i_p][i_level - 1])
+                else:
+                    knots_l, weights_l = get_rule(i_p, p, self.order_sequence[i_p][i_level])
 
                 if (i_level == 0 and not self.grid_type[i_p] == 'fejer2') or \
                    (i_level == 1 and (self.grid_type[i_p] == 'fejer2')):
                     dl_k[i_level][i_p] = knots_l
                     dl_w[i_level][i_p] = weights_l
                 else:
+                    if self.grid_type[i_p] == 'fejer2':
+                        knots_l_1, weights_l_1 = get_rule(i_p, p, self.order_sequence[i_p][i_level - 2])
+                    else:
+                        knots_l_1, weights_l_1 = get_rule(i_p, p, self.order_sequence[i_p][i_level - 1])
+
                     # noinspection PyTypeChecker
                     dl_k[i_level][i_p] = np.hstack((knots_l, knots_l_1))
                     # noinspection PyTypeChecker
@@ -721,8 +832,8 @@ class SparseGrid(Grid):
             weights = []
 
             for i_p in range(self.dim):
-                knots.append(np.asarray(dl_k[np.int(l_level[i_l_level, i_p])][i_p], dtype=float))
-                weights.append(np.asarray(dl_w[np.int(l_level[i_l_level, i_p])][i_p], dtype=float))
+                knots.append(np.asarray(dl_k[int(l_level[i_l_level, i_p])][i_p], dtype=float))
+                weights.append(np.asarray(dl_w[int(l_level[i_l_level, i_p])][i_p], dtype=float))
 
             # tensor product of knots
             dll_k.append(get_cartesian_product(knots))
@@ -739,31 +850,58 @@ class SparseGrid(Grid):
         """
         Determine coords and weights of sparse grid by generating, merging and subtracting sub-grids.
         """
-        # find similar points in grid and formulate Point list
-        dll_k, dll_w = self.calc_tensor_products()
-        point_number_list = np.zeros(dll_w.shape[0]) - 1
-        point_no = 0
-        epsilon_k = 1E-6
+        # knots are snapped to integer keys, such that equal points of different sub-grids are merged by hashing
+        epsilon_k = 1E-10
+
+        # 1-D difference rules: merge knots of rule l and l-1 in advance (tensor products are multilinear)
+        dl_k, dl_w = self.calc_grid()
+        dl_key = [[0 for _ in range(self.dim)] for _ in range(len(dl_k))]
+
+        for i_level in range(len(dl_k)):
+            for i_p in range(self.dim):
+                if isinstance(dl_k[i_level][i_p], int):
+                    continue
+                knots = np.asarray(dl_k[i_level][i_p], dtype=float).flatten()
+                weights = np.asarray(dl_w[i_level][i_p], dtype=float).flatten()
+                keys = np.round(knots / epsilon_k).astype(np.int64)
+                keys_unique, idx, inv = np.unique(keys, return_index=True, return_inverse=True)
+
+                # keep order of first appearance
+                order = np.argsort(idx)
+                rank = np.empty_like(order)
+                rank[order] = np.arange(len(order))
+
+                dl_k[i_level][i_p] = knots[idx[order]]
+                dl_key[i_level][i_p] = keys_unique[order]
+                dl_w[i_level][i_p] = np.bincount(rank[inv.flatten()], weights=weights, minlength=len(order))
+
+        # stream sub-grids and accumulate weights of merged points
+        iprint("Generating and merging sub-grids...", tab=0, verbose=self.verbose)
+        l_level = self.calc_l_level()
+        point_number = dict()
         coords_norm = []
+        weights = []
 
-        iprint("Merging sub-grids...", tab=0, verbose=self.verbose)
+        for i_l_level in range(l_level.shape[0]):
+            levels = [int(l) for l in l_level[i_l_level, :]]
 
-        while any(point_number_list < 0):
-            not_found = point_number_list < 0
-            dll_k_nf = dll_k[not_found]
-            point_temp = np.zeros(dll_k_nf.shape[0]) - 1
-            point_temp[np.sum(np.abs(dll_k_nf - dll_k_nf[0]), axis=1) < epsilon_k] = point_no
-            point_number_list[not_found] = point_temp
-            point_no = point_no + 1
-            coords_norm.append(dll_k_nf[0, :])
+            keys = get_cartesian_product([dl_key[levels[i_p]][i_p] for i_p in range(self.dim)])
+            knots = get_cartesian_product([dl_k[levels[i_p]][i_p] for i_p in range(self.dim)])
+            weights_sub = np.prod(get_cartesian_product([dl_w[levels[i_p]][i_p] for i_p in range(self.dim)]),
+                                  axis=1)
 
-        coords_norm = np.array(coords_norm)
-        point_number_list = np.asarray(point_number_list, dtype=int)
+            for i_point, key in enumerate(map(tuple, keys.tolist())):
+                i_merged = point_number.get(key)
 
-        weights = np.zeros(np.amax(point_number_list) + 1) - 999
+                if i_merged is None:
+                    point_number[key] = len(weights)
+                    coords_norm.append(knots[i_point, :])
+                    weights.append(weights_sub[i_point])
+                else:
+                    weights[i_merged] += weights_sub[i_point]
 
-        for i_point in range(np.amax(point_number_list) + 1):
-            weights[i_point] = np.sum(dll_w[point_number_list == i_point])
+        coords_norm = np.array(coords_norm)
+        weights = np.array(weights)
 
         # filter for very small weights
         iprint("Filter grid for very small weights...", tab=0, verbose=self.verbose)
@@ -810,9 +948,9 @@ class RandomGrid(Grid):
         Denormalized coordinates xi
     coords_gradient_norm : ndarray of float [n_grid x dim x dim]
         Normalized coordinates xi
-    coords_id : list of UUID objects (version 4) [n_grid]
+    coords_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
-    coords_gradient_id : list of UUID objects (version 4) [n_grid]
+    coords_gradient_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
 
     Examples
@@ -838,9 +976,9 @@ class RandomGrid(Grid):
         Denormalized coordinates xi
     coords_gradient_norm : ndarray of float [n_grid x dim x dim]
         Normalized coordinates xi
-    coords_id : list of UUID objects (version 4) [n_grid]
+    coords_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
-    coords_gradient_id : list of UUID objects (version 4) [n_grid]
+    coords_gradient_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
     """
 
@@ -904,58 +1042,29 @@ class RandomGrid(Grid):
                                           options=self.options)
 
                         # append points to existing grid
-                        self.coords = np.vstack([self.coords, new_grid.coords])
-                        self.coords_norm = np.vstack([self.coords_norm, new_grid.coords_norm])
+                        self.coords = append_rows(self.coords, new_grid.coords)
+                        self.coords_norm = append_rows(self.coords_norm, new_grid.coords_norm)
 
                     elif isinstance(self, LHS):
-                        # append points to existing grid
-                        # lhs_extend(self.coords_reservoir, n_grid_add)
-                        self.coords = self.lhs_extend(self.coords, n_grid_add)
-                        self.coords_norm = np.vstack([self.coords_norm, self.get_normalized_coordinates(
-                            self.coords[self.coords.shape[0]-n_grid_add:, :])])
+                        # extend the LHS reservoir and append points to existing grid
+                        coords, coords_norm = self.get_samples_domain(n_grid_add=n_grid_add,
+                                                                      classifier=None,
+                                                                      domain=None,
+                                                                      seed=seed)
 
-                else:
-                    coords = np.zeros((n_grid_add, len(self.parameters_random)))
-                    coords_norm = np.zeros((n_grid_add, len(self.parameters_random)))
+                        self.coords = append_rows(self.coords, coords)
+                        self.coords_norm = append_rows(self.coords_norm, coords_norm)
 
-                    # add grid points one by one because we are looking for samples in the right domain
-                    for i in range(n_grid_add):
-                        resample = True
-                        while resample:
-                            if isinstance(self, Random):
-                                new_grid = Random(parameters_random=self.parameters_random,
-                                                  n_grid=1,
-                                                  seed=seed,
-                                                  options=self.options)
-
-                                # test if grid point lies in right domain
-                                if classifier.predict(new_grid.coords_norm)[0] == domain:
-                                    coords[i, :] = new_grid.coords
-                                    coords_norm[i, :] = new_grid.coords_norm
-                                    resample = False
-
-                            elif isinstance(self, LHS):
-                                # check if gridpoint exceeds sampling reservoir
-                                # if self.n_grid > max(10000, self.n_grid_lhs * 10)
-                                # coords.np.append(pygpc.LSH( seed=seed+1))
-                                coords_norm_test = self.lhs_extend(self.coords_norm_reservoir, 1)
-                                # test if next grid point lies in right domain
-                                if classifier.predict(coords_norm_test[len(coords_norm_test) - 1]) == domain:
-                                    self.coords_norm_reservoir = coords_norm_test
-                                    coords[i, :] = self.coords_reservoir[self.n_grid]
-                                    coords_norm[i, :] = self.coords_norm_reservoir[self.n_grid]
-                                    self.n_grid += 1
-                                    resample = False
-
-                                #else:
-                                    # delete tested point
-                                    # self.coords_norm_reservoir = np.delete(self.coords_norm_reservoir, self.n_grid, 0)
-                                    # self.coords_reservoir = np.delete(self.coords_reservoir, self.n_grid, 0)
-                                    # self.lhs_reservoir = np.delete(self.lhs_reservoir, self.n_grid, 0)
+                else:
+                    # draw candidates blockwise and keep the ones lying in the right domain
+                    coords, coords_norm = self.get_samples_domain(n_grid_add=n_grid_add,
+                                                                  classifier=classifier,
+                                                                  domain=domain,
+                                                                  seed=seed)
 
                     # append points to existing grid
-                    self.coords = np.vstack([self.coords, coords])
-                    self.coords_norm = np.vstack([self.coords_norm, coords_norm])
+                    self.coords = append_rows(self.coords, coords)
+                    self.coords_norm = append_rows(self.coords_norm, coords_norm)
 
         elif coords is not None and coords_norm is not None:
             # Number of new grid points
@@ -967,14 +1076,14 @@ class RandomGrid(Grid):
                     raise AssertionError("Specified coordinates are not lying in right domain!")
 
             # append points to existing grid
-            self.coords = np.vstack([self.coords, coords])
-            self.coords_norm = np.vstack([self.coords_norm, coords_norm])
+            self.coords = append_rows(self.coords, coords)
+            self.coords_norm = append_rows(self.coords_norm, coords_norm)
 
         else:
             raise ValueError("Specify either n_grid_new or coords and coords_norm")
 
         # Generate and append unique IDs of new grid points
-        self.coords_id = self.coords_id + [uuid.uuid4() for _ in range(n_grid_add)]
+        self.coords_id = append_rows(self.coords_id, get_grid_ids(n_grid_add))
 
         self.n_grid = self.coords.shape[0]
 
@@ -982,6 +1091,105 @@ class RandomGrid(Grid):
             self.create_gradient_grid()
 
 
+    def get_samples_domain(self, n_grid_add, classifier, domain, seed=None, n_block_max=100000,
+                           n_candidates_max=int(1e7)):
+        """
+        Draws sample points, which are lying in a specified domain of the classifier, by batched rejection sampling.
+        The candidates are drawn in blocks, whose size is determined from the running acceptance rate, and are
+        classified with a single call of classifier.predict() per block. LHS grids extend their sampling reservoir
+        in the unit hypercube (accepted and rejected candidates), such that the stratification is kept.
+        Without classifier, all candidates are accepted (e.g. to extend LHS grids).
+
+        coords, coords_norm = get_samples_domain(n_grid_add, classifier, domain, seed=None, n_block_max=100000,
+                                                 n_candidates_max=int(1e7))
+
+        Parameters
+        ----------
+        n_grid_add : int
+            Number of grid points to draw in the specified domain
+        classifier : Classifier object or None
+            Classifier (needs a predict() method), if None, the candidates are not classified
+        domain : int or None
+            Domain the grid points have to lie in
+        seed : float, optional, default=None
+            Seeding point to replicate the candidates (the random number generator is seeded once)
+        n_block_max : int, optional, default=100000
+            Maximum number of candidates classified at once
+        n_candidates_max : int, optional, default=1e7
+            Maximum total number of candidates before giving up
+
+        Returns
+        -------
+        coords : ndarray of float [n_grid_add x dim]
+            Grid points in specified domain (model space)
+        coords_norm : ndarray of float [n_grid_add x dim]
+            Grid points in specified domain (normalized space)
+        """
+        if seed is not None:
+            np.random.seed(seed)
+
+        coords_norm = np.zeros((0, self.dim))
+        n_drawn = 0
+        n_accepted = 0
+
+        while coords_norm.shape[0] < n_grid_add:
+            n_missing = n_grid_add - coords_norm.shape[0]
+
+            if n_drawn >= n_candidates_max:
+                raise AssertionError("Could not find {} grid points in domain {} after testing {} candidates".format(
+                    n_grid_add, domain, n_drawn))
+
+            # block size from the running acceptance rate (Laplace smoothed)
+            if classifier is None:
+                n_block = n_missing
+            else:
+                acc_rate = (n_accepted + 1.) / (n_drawn + 2.)
+                n_block = int(np.clip(np.ceil(1.2 * n_missing / acc_rate), n_missing, n_block_max))
+
+            # draw candidates
+            if isinstance(self, LHS) and self.lhs_reservoir is not None:
+                self.lhs_reservoir = self.lhs_extend(self.lhs_reservoir, n_block,
+                                                     crit="maximin" if self.options in ["maximin", "m", "ese"]
+                                                     else None)
+                candidates_norm = np.zeros((n_block, self.dim))
+                perc_mask = np.ones(n_block, dtype=bool)
+
+                for i_p, p in enumerate(self.parameters_random):
+                    candidates_norm[:, i_p] = self.parameters_random[p].icdf(self.lhs_reservoir[-n_block:, i_p])
+                    perc_mask = np.logical_and(perc_mask, np.logical_and(
+                        self.parameters_random[p].pdf_limits_norm[0] < candidates_norm[:, i_p],
+                        candidates_norm[:, i_p] < self.parameters_random[p].pdf_limits_norm[1]))
+
+                candidates_norm = candidates_norm[perc_mask, :]
+
+                self.coords_norm_reservoir = append_rows(self.coords_norm_reservoir, candidates_norm)
+                self.coords_reservoir = append_rows(self.coords_reservoir,
+                                                    self.get_denormalized_coordinates(candidates_norm))
+            else:
+                candidates_norm = Random(parameters_random=self.parameters_random,
+                                         n_grid=n_block,
+                                         seed=None,
+                                         options=self.options).coords_norm
+
+            n_drawn += n_block
+
+            if candidates_norm.shape[0] == 0:
+                continue
+
+            # classify the whole block at once and keep the candidates lying in the right domain
+            if classifier is None:
+                mask = np.ones(candidates_norm.shape[0], dtype=bool)
+            else:
+                mask = np.asarray(classifier.predict(candidates_norm)).flatten() == domain
+            n_accepted += np.sum(mask)
+
+            coords_norm = append_rows(coords_norm, candidates_norm[mask, :][:n_missing, :])
+
+        coords = self.get_denormalized_coordinates(coords_norm)
+
+        return coords, coords_norm
+
+
 class Random(RandomGrid):
     """
     Random grid object
@@ -1004,9 +1212,9 @@ class Random(RandomGrid):
         Denormalized coordinates xi
     coords_gradient_norm : ndarray of float [n_grid x dim x dim]
         Normalized coordinates xi
-    coords_id : list of UUID objects (version 4) [n_grid]
+    coords_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
-    coords_gradient_id : list of UUID objects (version 4) [n_grid]
+    coords_gradient_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
 
     Examples
@@ -1032,9 +1240,9 @@ class Random(RandomGrid):
         Denormalized coordinates xi
     coords_gradient_norm : ndarray of float [n_grid x dim x dim]
         Normalized coordinates xi
-    coords_id : list of UUID objects (version 4) [n_grid]
+    coords_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
-    coords_gradient_id : list of UUID objects (version 4) [n_grid]
+    coords_gradient_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
     """
 
@@ -1150,7 +1358,7 @@ class Random(RandomGrid):
             self.coords = self.get_denormalized_coordinates(self.coords_norm)
 
             # Generate unique IDs of grid points
-            self.coords_id = [uuid.uuid4() for _ in range(self.n_grid)]
+            self.coords_id = get_grid_ids(self.n_grid)
 
 
 class LHS(RandomGrid):
@@ -1178,9 +1386,9 @@ class LHS(RandomGrid):
         Denormalized coordinates xi
     coords_gradient_norm : ndarray of float [n_grid x dim x dim]
         Normalized coordinates xi
-    coords_id : list of UUID objects (version 4) [n_grid]
+    coords_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
-    coords_gradient_id : list of UUID objects (version 4) [n_grid]
+    coords_gradient_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
 
     Examples
@@ -1209,9 +1417,9 @@ class LHS(RandomGrid):
         Denormalized coordinates xi
     coords_gradient_norm : ndarray of float [n_grid x dim x dim]
         Normalized coordinates xi
-    coords_id : list of UUID objects (version 4) [n_grid]
+    coords_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
-    coords_gradient_id : list of UUID objects (version 4) [n_grid]
+    coords_gradient_id : ndarray of int64 [n_grid]
         Unique IDs of grid points
     """
 
@@ -1262,7 +1470,7 @@ class LHS(RandomGrid):
             Grid points to add (model space)
         coords_norm : ndarray of float [n_grid_add x dim]
             Grid points to add (normalized space)
-        coords_id : list of UUID objects (version 4) [n_grid]
+        coords_id : ndarray of int64 [n_grid]
             Unique IDs of grid points
         """
         if n_grid > 0:
@@ -1300,35 +1508,79 @@ class LHS(RandomGrid):
             self.coords_reservoir = self.get_denormalized_coordinates(self.coords_norm_reservoir)
 
             # Generate unique IDs of grid points
-            self.coords_id = [uuid.uuid4() for _ in range(self.n_grid)]
+            self.coords_id = get_grid_ids(self.n_grid)
 
         else:
             pass
 
-    def lhs_extend(self, array, n_extend):
-        dim = np.shape(array)[1]
-        n_old = np.shape(array)[0]
+    def lhs_extend(self, array, n_extend, crit=None, iterations=100):
+        """
+        Extends an LHS design in the unit hypercube by n_extend samples. The extended design consists of
+        n_old + n_extend strata in each dimension. The new samples are placed with random jitter in strata, which are
+        not occupied by the existing samples, such that the Latin Hypercube property is kept as good as possible.
+
+        Parameters
+        ----------
+        array : ndarray of float [n_old x dim]
+            Existing design in the unit hypercube
+        n_extend : int
+            Number of samples to add
+        crit : str, optional, default: None
+            Criterion to assign the new strata over the dimensions:
+            - None - random assignment
+            - 'maximin' or 'm' - exchanges elements between the new samples if the Phi-P criterion improves
+        iterations : int, optional, default: 100
+            Number of exchange steps for crit='maximin'
+
+        Returns
+        -------
+        design : ndarray of float [n_old + n_extend x dim]
+            Extended design
+        """
+        n_old, dim = np.shape(array)
         n_new = n_old + n_extend
-        a_new = np.zeros([n_extend, np.shape(array)[1]])
-        u = np.random.rand(n_new, np.shape(array)[1])
-        # array = np.insert(array, n_old, np.zeros([n_extend ,np.shape(array)[1]]), axis=0)
+
+        if n_extend < 1:
+            return array
+
+        # determine empty strata of the extended design (n_new strata per dimension) and place jittered samples in
+        # n_extend of them
+        strata = np.floor(array * n_new).astype(int).clip(0, n_new - 1)
+        strata_new = np.zeros((n_extend, dim), dtype=int)
+
         for d in range(dim):
-            k = 0
-            s = 0
-            for j in range(n_new - 1):
-                if not float(j / n_new) < float(np.sort(array[:, d])[min((j + s), len(array) - 1)]) < float(
-                        (j + 1) / n_new):
-                    if float((j + 1) / n_new) <= float(np.sort(array[:, d])[min((j + s), len(array) - 1)]):
-                        s = s - 1
-                    else:
-                        j = j - 1
-                        s = s + 1
-                    k = k + 1
-                    if k is np.shape(a_new)[0] + 1:
-                        k = 1
-                    a_new[k - 1, d] = float((j + u[j, d]) / n_new)
-            np.random.shuffle(a_new[:, d])
-        return np.insert(array, n_old, a_new, axis=0)
+            empty = np.flatnonzero(np.bincount(strata[:, d], minlength=n_new) == 0)
+            strata_new[:, d] = np.random.permutation(empty)[:n_extend]
+
+        a_new = (strata_new + np.random.rand(n_extend, dim)) / n_new
+
+        design = np.vstack([array, a_new])
+
+        if crit in ["maximin", "m"] and n_extend > 1:
+            # exchange elements between the new samples if the Phi-P criterion improves (evaluated incrementally).
+            # The distances between the existing samples are not altered by the exchanges, such that the criterion
+            # is determined from the pairs including at least one new sample only (new vs. old and new vs. new)
+            p = 10
+            n_block = max(1, int(1e7 // max(1, n_old)))
+            phi = (scipy.spatial.distance.pdist(a_new) ** (-p)).sum()
+
+            for i_start in range(0, n_extend, n_block):
+                i_stop = min(i_start + n_block, n_extend)
+                phi += (scipy.spatial.distance.cdist(a_new[i_start:i_stop, :], array) ** (-p)).sum()
+
+            phi = phi ** (1.0 / p)
+
+            for i in range(iterations):
+                l_phi, l_i1, l_i2 = self.PhiP_exchange_dist(design, None, k=i % dim, Phi=phi, p=p, n_exchange=25,
+                                                            fixed_index=np.arange(n_old))
+                j = np.argmin(l_phi)
+
+                if l_phi[j] < phi:
+                    phi = l_phi[j]
+                    design[l_i1[j], i % dim], design[l_i2[j], i % dim] = \
+                        design[l_i2[j], i % dim], design[l_i1[j], i % dim]
+
+        return design
 
     def CL2(self, array):
         """
@@ -1351,20 +1603,25 @@ class LHS(RandomGrid):
         .. [1] Hickernell, F. (1998). A generalized discrepancy and quadrature error bound.
            Mathematics of computation, 67(221), 299-322.
         """
-        subtract = np.ones([np.shape(array)[0], np.shape(array)[1]])
-        array = array - 0.5 * subtract
-        prod_array_1 = np.zeros(np.shape(array)[0])
-        for n in range(0, np.shape(array)[0]):
-            prod_array_1[n] = (np.ones(np.shape(array)[1]) + (1 / 2 * (np.abs(array[n, :]))) - (
-                    1 / 2 * ((array[n, :]) ** 2))).prod()
-        prod_array_2 = np.zeros([np.shape(array)[0], np.shape(array)[0]])
-        for i in range(0, np.shape(array)[0]):
-            for j in range(0, np.shape(array)[0]):
-                prod_array_2[i, j] = (np.ones(np.shape(array)[1]) + (1 / 2 * (np.abs(array[i, :]))) - (
-                        1 / 2 * np.abs(array[j, :]) - 1 / 2 * np.abs(array[i, :] - array[j, :]))).prod()
-        cl2d_crit = ((13 / 12) ** 2) - (2 / (np.shape(array)[0]) * prod_array_1.sum()) + (1 / (
-                np.shape(array)[0] ** 2) * prod_array_2.sum())
+        n, dim = array.shape
+        array_abs = np.abs(array - 0.5)
+
+        prod_array_1 = np.prod(1 + 0.5 * array_abs - 0.5 * array_abs ** 2, axis=1)
+
+        # sum over all pairs of points (blockwise to limit memory usage)
+        n_block = max(1, int(1e7 // max(1, n * dim)))
+        sum_array_2 = 0.
+
+        for i_start in range(0, n, n_block):
+            i_stop = min(i_start + n_block, n)
+            sum_array_2 += np.sum(np.prod(1 + 0.5 * array_abs[i_start:i_stop, np.newaxis, :]
+                                          + 0.5 * array_abs[np.newaxis, :, :]
+                                          - 0.5 * np.abs(array[i_start:i_stop, np.newaxis, :] -
+                                                         array[np.newaxis, :, :]), axis=2))
+
         # centered L2 discrepancy criteria
+        cl2d_crit = (13. / 12.) ** dim - 2. / n * prod_array_1.sum() + 1. / n ** 2 * sum_array_2
+
         return cl2d_crit
 
     def log_R(self, array):
@@ -1387,9 +1644,12 @@ class LHS(RandomGrid):
         """
         # R will be [m x m]
         R = np.corrcoef(array.T)
-        for i in range(0, np.shape(array)[1]):
-            for j in range(0, np.shape(array)[1]):
-                R[i, j] = np.exp((R[i, :] * np.abs(array[i, :] - array[j, :]) ** 2).sum())
+        m = np.shape(array)[1]
+
+        # the columns are updated successively (all rows at once), because R is updated in place
+        for j in range(0, m):
+            R[:, j] = np.exp((R * np.abs(array[:m, :] - array[j, :]) ** 2).sum(axis=1))
+
         log_R = np.log(np.linalg.norm(R))
 
         return (log_R)
@@ -1416,7 +1676,20 @@ class LHS(RandomGrid):
            Journal of statistical planning and inference, 43(3), 381-402.
         """
 
-        phip = ((scipy.spatial.distance.pdist(x) ** (-p)).sum()) ** (1.0 / p)
+        n = x.shape[0]
+        n_block = max(1, int(1e7 // max(1, n)))
+
+        if n <= n_block:
+            phip = ((scipy.spatial.distance.pdist(x) ** (-p)).sum()) ** (1.0 / p)
+        else:
+            # determine the distances blockwise to limit memory usage
+            phip = 0.
+            for i_start in range(0, n - 1, n_block):
+                i_stop = min(i_start + n_block, n)
+                dist = scipy.spatial.distance.cdist(x[i_start:i_stop, :], x[i_start:, :])
+                mask = np.arange(dist.shape[1])[np.newaxis, :] > np.arange(dist.shape[0])[:, np.newaxis]
+                phip += (dist[mask] ** (-p)).sum()
+            phip = phip ** (1.0 / p)
 
         return phip
 
@@ -1465,6 +1738,74 @@ class LHS(RandomGrid):
         P[i1, k], P[i2, k] = P[i2, k], P[i1, k]
         return res
 
+    def PhiP_exchange_dist(self, P, D, k, Phi, p, n_exchange=1, fixed_index=None):
+        """
+        Evaluates the Phi-p criterion of n_exchange candidate designs, each derived from P by exchanging the
+        elements of two random rows in column k. The candidates are evaluated at once using the pairwise
+        distance matrix D of P, i.e. only the distances of the two affected rows are updated. P and D are not altered.
+
+        Parameters
+        ----------
+        P : ndarray of float [n x dim]
+            The design to perform the exchanges on
+        D : ndarray of float [n x n] or None
+            Pairwise distance matrix of the design P, if None, the distances of the affected rows are computed
+        k : int
+            Column of the design, whose elements are exchanged
+        Phi : float
+            The PhiP criterion of the design P
+        p : int
+            The power used for the calculation of PhiP
+        n_exchange : int, optional, default: 1
+            Number of candidate exchanges
+        fixed_index : list of int, optional, default: None
+            Rows, which are not exchanged
+
+        Returns
+        -------
+        phip : ndarray of float [n_exchange]
+            Phi-p criterion of the candidate designs
+        i1 : ndarray of int [n_exchange]
+            First rows of the exchanges
+        i2 : ndarray of int [n_exchange]
+            Second rows of the exchanges
+        """
+        n = P.shape[0]
+
+        if fixed_index is None or len(fixed_index) == 0:
+            idx = np.arange(n)
+        else:
+            idx = np.setdiff1d(np.arange(n), fixed_index)
+
+        # choose two (different) random rows for every exchange
+        pos1 = np.random.randint(len(idx), size=n_exchange)
+        pos2 = np.random.randint(len(idx) - 1, size=n_exchange)
+        pos2[pos2 >= pos1] += 1
+        i1 = idx[pos1]
+        i2 = idx[pos2]
+
+        # distances of the affected rows to all other rows before and after the exchange [n_exchange x n]
+        mask = np.ones((n_exchange, n), dtype=bool)
+        mask[np.arange(n_exchange), i1] = False
+        mask[np.arange(n_exchange), i2] = False
+
+        delta = (P[i2, k][:, np.newaxis] - P[:, k][np.newaxis, :]) ** 2 - \
+                (P[i1, k][:, np.newaxis] - P[:, k][np.newaxis, :]) ** 2
+
+        if D is None:
+            dist1 = np.where(mask, scipy.spatial.distance.cdist(P[i1, :], P), 1.)
+            dist2 = np.where(mask, scipy.spatial.distance.cdist(P[i2, :], P), 1.)
+        else:
+            dist1 = np.where(mask, D[i1, :], 1.)
+            dist2 = np.where(mask, D[i2, :], 1.)
+        d1 = np.where(mask, np.sqrt(np.abs(dist1 ** 2 + delta)), 1.)
+        d2 = np.where(mask, np.sqrt(np.abs(dist2 ** 2 - delta)), 1.)
+
+        with np.errstate(divide="ignore"):
+            phip = (Phi ** p + (d1 ** (-p) - dist1 ** (-p) + d2 ** (-p) - dist2 ** (-p)).sum(axis=1)) ** (1.0 / p)
+
+        return phip, i1, i2
+
     def get_lhs_grid(self, dim, n, crit=None, random_state=None):
         """
         Create samples in an m*n matrix using Latin Hypercube Sampling [1].
@@ -1520,19 +1861,13 @@ class LHS(RandomGrid):
         design : ndarray of float [n, n_dim]
             LHS grid points
         """
-        design = np.zeros([n, dim])
-
         # u = matrix of uniform (0,1) that vary in n subareas
         u = np.random.rand(n, dim)
 
-        for i in range(0, dim):
-            for j in range(0, n):
-                design[j, i] = j + 1
-            np.random.shuffle(design[:, i])
+        # random permutation of the n subareas in each dimension
+        design = np.argsort(np.random.rand(n, dim), axis=0) + 1.
 
-        for i in range(0, dim):
-            for j in range(0, n):
-                design[j, i] = (design[j, i] - u[j, i]) / n
+        design = (design - u) / n
 
         return design
 
@@ -1598,7 +1933,7 @@ class LHS(RandomGrid):
 
         return design
 
-    def lhs_ese(self, dim, n, t0=None):
+    def lhs_ese(self, dim, n, t0=None, parallel=True):
         """
         Create optimized LHS grid using a enhanced stochastic evolutionary algorithm for the PhiP Maximin criterion [1]
 
@@ -1610,6 +1945,8 @@ class LHS(RandomGrid):
             Number of sampling points
         t0 : int, optional, default: None
             Threshold parameter
+        parallel : bool, optional, default: True
+            Evaluate the candidate exchanges of an inner iteration at once (vectorized) instead of one after another
 
         Returns
         -------
@@ -1634,11 +1971,14 @@ class LHS(RandomGrid):
             t0 = 0.005 * self.PhiP(P0, p=p)
 
         T = t0
-        P_ = P0[:]  # copy of initial design
-        P_best = P_[:]
+        P_ = P0.copy()  # copy of initial design
+        P_best = P_.copy()
         Phi = self.PhiP(P_best, p=p)
         Phi_best = Phi
 
+        # pairwise distance matrix of the current design (only the rows of exchanged elements are updated)
+        D = scipy.spatial.distance.squareform(scipy.spatial.distance.pdist(P_))
+
         # Outer loop
         for z in range(outer_loop):
             Phi_oldbest = Phi_best
@@ -1648,16 +1988,17 @@ class LHS(RandomGrid):
             # Inner loop
             for i in range(inner_loop):
                 modulo = (i + 1) % dim
-                l_P = list()
-                l_Phi = list()
 
-                # Build J different designs with a single exchanged rows
-                # See PhiP_exchange
-                for j in range(J):
-                    l_P.append(P_.copy())
-                    l_Phi.append(self.PhiP_exchange(l_P[j], k=modulo, Phi=Phi, p=p, fixed_index=fixed_index))
+                # Evaluate J different designs with a single exchanged rows (all at once or one after another)
+                if parallel:
+                    l_Phi, l_i1, l_i2 = self.PhiP_exchange_dist(P_, D, k=modulo, Phi=Phi, p=p, n_exchange=J,
+                                                                fixed_index=fixed_index)
+                else:
+                    l_Phi, l_i1, l_i2 = np.zeros(J), np.zeros(J, dtype=int), np.zeros(J, dtype=int)
+                    for j in range(J):
+                        l_Phi[j], l_i1[j], l_i2[j] = [r[0] for r in self.PhiP_exchange_dist(
+                            P_, D, k=modulo, Phi=Phi, p=p, n_exchange=1, fixed_index=fixed_index)]
 
-                l_Phi = np.asarray(l_Phi)
                 k = np.argmin(l_Phi)
                 Phi_try = l_Phi[k]
 
@@ -1665,11 +2006,18 @@ class LHS(RandomGrid):
                 if Phi_try - Phi <= T * np.random.rand(1)[0]:
                     Phi = Phi_try
                     n_acpt = n_acpt + 1
-                    P_ = l_P[k]
+
+                    # perform exchange and update distances of affected rows
+                    i1, i2 = l_i1[k], l_i2[k]
+                    P_[i1, modulo], P_[i2, modulo] = P_[i2, modulo], P_[i1, modulo]
+
+                    for i_row in [i1, i2]:
+                        D[i_row, :] = np.linalg.norm(P_ - P_[i_row, :], axis=1)
+                        D[:, i_row] = D[i_row, :]
 
                     # Best design retained
                     if Phi < Phi_best:
-                        P_best = P_
+                        P_best = P_.copy()
                         Phi_best = Phi
                         n_imp = n_imp + 1
 
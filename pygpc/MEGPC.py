@@ -1,10 +1,12 @@
 import numpy as np
-import fastmat as fm
 import scipy.stats
 import copy
+import os
 import h5py
 import time
 import random
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from sklearn import linear_model
 from .misc import get_cartesian_product
 from .misc import get_gradient_idx_domain
@@ -62,6 +64,11 @@ class MEGPC(object):
         If provided, model evaluations are saved in fn_results.hdf5 file and gpc object in fn_results.pkl file
     options : dict
         Options of gPC algorithm
+    n_cpu_domains : int
+        Number of sub-gPCs (domains), which are processed concurrently (-1: one worker per CPU)
+    domains_cache : list of dict
+        Cached domain assignments of coordinate sets ("version" of the classifier, "hash" of the coordinates,
+        "n_grid" and "domains")
     """
 
     def __init__(self, problem, options, validation=None):
@@ -77,6 +84,7 @@ class MEGPC(object):
         self.gpc = None
         self.classifier = None
         self.domains = None
+        self.domains_cache = []
 
         # arrays
         self.n_grid = []
@@ -98,6 +106,11 @@ class MEGPC(object):
         self.options = options
         self.matlab_model = options["matlab_model"]
 
+        if "n_cpu_domains" in options.keys():
+            self.n_cpu_domains = options["n_cpu_domains"]
+        else:
+            self.n_cpu_domains = 1
+
     def init_classifier(self, coords, results, algorithm, options):
         """
         Initializes Classifier object in MEGPC class
@@ -119,10 +132,69 @@ class MEGPC(object):
                                      results=results,
                                      algorithm=algorithm,
                                      options=options)
+        self.domains_cache = []
 
         self.domains = self.classifier.domains
         self.n_gpc = len(np.unique(self.domains))
 
+    def predict_domains(self, coords):
+        """
+        Predicts the domains of the given coordinates using the classifier. The domain assignments are cached by
+        the hash of the coordinates and the version of the classifier. If the coordinates extend a cached
+        coordinate set (appended grid points), only the domains of the appended points are predicted.
+
+        Parameters
+        ----------
+        coords : ndarray of float [n_grid, n_dim]
+            Normalized coordinates
+
+        Returns
+        -------
+        domains : ndarray of int [n_grid]
+            Domain IDs of the coordinates
+        """
+        n_cache_max = 8
+        version = getattr(self.classifier, "version", 0)
+        coords = np.ascontiguousarray(coords)
+
+        if not hasattr(self, "domains_cache") or self.domains_cache is None:
+            self.domains_cache = []
+
+        # remove entries of previous classifier versions
+        self.domains_cache = [c for c in self.domains_cache if c["version"] == version]
+
+        def get_hash(x):
+            return hashlib.sha1(x.view(np.uint8)).hexdigest() + str(x.shape)
+
+        coords_hash = get_hash(coords)
+
+        for c in self.domains_cache:
+            if c["hash"] == coords_hash:
+                return c["domains"]
+
+        # look for a cached coordinate set, which is extended by coords
+        domains = None
+        n_grid_prefix = 0
+
+        for c in self.domains_cache:
+            if n_grid_prefix < c["n_grid"] < coords.shape[0] and \
+                    c["hash"] == get_hash(np.ascontiguousarray(coords[:c["n_grid"], :])):
+                domains = c["domains"]
+                n_grid_prefix = c["n_grid"]
+
+        if domains is None:
+            domains = self.classifier.predict(coords)
+        else:
+            domains = np.hstack((domains, self.classifier.predict(coords[n_grid_prefix:, :])))
+
+        self.domains_cache.append({"version": version,
+                                   "hash": coords_hash,
+                                   "n_grid": coords.shape[0],
+                                   "domains": domains})
+        self.domains_cache = self.domains_cache[-n_cache_max:]
+
+        return domains
+
     def update_classifier(self, coords, results):
         """
         Updates self.classifier and keeps the existing class labels
@@ -161,14 +233,59 @@ class MEGPC(object):
                                options=options,
                                validation=validation)
 
+    def map_domains(self, fun, domains):
+        """
+        Applies a function to the given domains. The domains are processed concurrently in a thread pool of
+        self.n_cpu_domains workers (the BLAS solves release the GIL). The number of BLAS threads is limited
+        such that the total number of threads does not exceed the number of CPUs (if threadpoolctl is installed).
+
+        Parameters
+        ----------
+        fun : function
+            Function with the domain index as argument
+        domains : list or ndarray of int
+            Domain indices
+
+        Returns
+        -------
+        out : list [n_domains]
+            Return values of fun in the order of the domains
+        """
+        domains = list(domains)
+        n_cpu = os.cpu_count()
+
+        if self.n_cpu_domains == -1:
+            n_workers = n_cpu
+        else:
+            n_workers = self.n_cpu_domains
+
+        n_workers = int(np.min([n_workers, len(domains)]))
+
+        if n_workers <= 1:
+            return [fun(d) for d in domains]
+
+        try:
+            from threadpoolctl import threadpool_limits
+        except ImportError:
+            threadpool_limits = None
+
+        if threadpool_limits is None:
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                out = list(executor.map(fun, domains))
+        else:
+            with threadpool_limits(limits=int(np.max([1, n_cpu // n_workers])), user_api="blas"):
+                with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                    out = list(executor.map(fun, domains))
+
+        return out
+
     def init_gpc_matrices(self):
         """
         Sets self.gpc_matrix with given self.basis and self.grid
         The gradient_idx of the sub-gPCs are already assigned in assign_grids()
         """
 
-        for gpc in self.gpc:
-            gpc.init_gpc_matrix()
+        self.map_domains(lambda d: self.gpc[d].init_gpc_matrix(), range(len(self.gpc)))
 
     def assign_grids(self, gradient_idx=None):
         """
@@ -185,12 +302,12 @@ class MEGPC(object):
 
         # update domain indices if grid points were added
         if len(self.domains) != self.grid.coords_norm.shape[0]:
-            self.domains = self.classifier.predict(self.grid.coords_norm)
+            self.domains = self.predict_domains(self.grid.coords_norm)
 
         for d in np.unique(self.domains):
             coords = self.grid.coords[self.domains == d, :]
             coords_norm = self.grid.coords_norm[self.domains == d, :]
-            coords_id = np.array(self.grid.coords_id)[self.domains == d].tolist()
+            coords_id = np.asarray(self.grid.coords_id)[self.domains == d]
 
             # transform variables of original grid to reduced parameter space
             if self.gpc[d].p_matrix is not None:
@@ -201,7 +318,7 @@ class MEGPC(object):
             if self.grid.coords_gradient is not None:
                 coords_gradient = self.grid.coords_gradient[self.domains == d, :, :]
                 coords_gradient_norm = self.grid.coords_gradient_norm[self.domains == d, :, :]
-                coords_gradient_id = np.array(self.grid.coords_gradient_id)[self.domains == d].tolist()
+                coords_gradient_id = np.asarray(self.grid.coords_gradient_id)[self.domains == d]
             else:
                 coords_gradient = None
                 coords_gradient_norm = None
@@ -279,7 +396,7 @@ class MEGPC(object):
 
             if domain is None:
                 # determine domain of loocv point
-                domain_idx = int(self.classifier.predict(self.grid.coords_norm[loocv_point_idx[i]][np.newaxis, :]))
+                domain_idx = int(self.domains[loocv_point_idx[i]])
                 results_domain = results[self.domains == domain_idx, ]
 
             # determine row in sub-gPC matrix of loocv point
@@ -317,7 +434,8 @@ class MEGPC(object):
 
         return relative_error_loocv
 
-    def validate(self, coeffs, results=None, gradient_results=None, domain=None, output_idx=None):
+    def validate(self, coeffs, results=None, gradient_results=None, domain=None, output_idx=None,
+                 validation_domains=None):
         """
         Validate gPC approximation using the ValidationSet object contained in the Problem object.
         Determines the normalized root mean square deviation between the gpc approximation and the
@@ -336,6 +454,8 @@ class MEGPC(object):
         output_idx : int or list of int
             Index of the QOI the provided coeffs and results are referring to. The correct QOI will be
             selected from the validation set in case of nrmsd error.
+        validation_domains : ndarray of int [n_grid_val], optional, default: None
+            Domains of the validation points (predicted if None)
 
         Returns
         -------
@@ -371,7 +491,10 @@ class MEGPC(object):
                 mask_domain = np.ones(self.validation.grid.coords_norm.shape[0]).astype(bool)
                 gpc_results = self.get_approximation(coeffs, self.validation.grid.coords_norm, output_idx=None)
             else:
-                mask_domain = self.classifier.predict(self.validation.grid.coords_norm) == domain
+                if validation_domains is None:
+                    validation_domains = self.predict_domains(self.validation.grid.coords_norm)
+
+                mask_domain = validation_domains == domain
                 coords_domain = self.validation.grid.coords_norm[mask_domain, ]
                 gpc_results = self.gpc[domain].get_approximation(coeffs[domain],
                                                                  coords_domain,
@@ -538,14 +661,16 @@ class MEGPC(object):
         pce = np.zeros((x.shape[0], len(output_idx)))
 
         # get classes of grid-points
-        domains = self.classifier.predict(x)
+        domains = self.predict_domains(x)
 
         # determine gPC approximation for sub-domains
-        for d in np.unique(domains):
+        def get_approximation_domain(d):
             pce[domains == d, :] = self.gpc[d].get_approximation(coeffs=coeffs[d],
                                                                  x=x[(domains == d).flatten(), :],
                                                                  output_idx=output_idx)
 
+        self.map_domains(get_approximation_domain, np.unique(domains))
+
         return pce
 
     def update_gpc_matrices(self, gradient=False):
@@ -556,8 +681,7 @@ class MEGPC(object):
         The old gPC matrix with their self.gpc_matrix_b_id and self.gpc_matrix_coords_id is compared
         to self.basis.b_id and self.grid.coords_id. New rows and columns are computed when differences are found.
         """
-        for i, gpc in enumerate(self.gpc):
-            gpc.update_gpc_matrix(gradient=gradient)
+        self.map_domains(lambda d: self.gpc[d].update_gpc_matrix(gradient=gradient), range(len(self.gpc)))
 
     def save_gpc_matrices_hdf5(self):
         """
@@ -611,20 +735,66 @@ class MEGPC(object):
         coeffs = [0 for _ in range(self.n_gpc)]
 
         # determine coeffs of sub-gPCs
-        for d in np.unique(self.domains):
+        def solve_domain(d):
             if gradient_results is not None:
                 gradient_results_passed = gradient_results[self.domains[self.gradient_idx] == d, :, :]
             else:
                 gradient_results_passed = None
 
-            coeffs[d] = self.gpc[d].solve(results=results[self.domains == d, :],
-                                          gradient_results=gradient_results_passed,
-                                          solver=solver,
-                                          settings=settings,
-                                          verbose=verbose)
+            return self.gpc[d].solve(results=results[self.domains == d, :],
+                                     gradient_results=gradient_results_passed,
+                                     solver=solver,
+                                     settings=settings,
+                                     verbose=verbose)
+
+        domains = np.unique(self.domains)
+
+        for d, coeffs_domain in zip(domains, self.map_domains(solve_domain, domains)):
+            coeffs[d] = coeffs_domain
 
         return coeffs
 
+    def validate_domains(self, coeffs, results=None, output_idx=None):
+        """
+        Determines the domain specific errors of the sub-gPCs (see MEGPC.validate). The domains are
+        validated concurrently. The domains of the validation points are predicted once beforehand such that
+        the threads do not modify the domain cache.
+
+        Parameters
+        ----------
+        coeffs: list of ndarray of float [n_gpc][n_coeffs x n_out]
+            GPC coefficients
+        results: ndarray of float [n_grid x n_out]
+            Results from n_grid simulations with n_out output quantities
+        output_idx : int or list of int
+            Index of the QOI the provided coeffs and results are referring to. The correct QOI will be
+            selected from the validation set in case of nrmsd error.
+
+        Returns
+        -------
+        error: list of float [n_gpc]
+            Estimated difference between gPC approximation and original model in the domains
+        """
+        error = [0 for _ in range(self.n_gpc)]
+        domains = np.unique(self.domains)
+
+        if isinstance(self.validation, ValidationSet):
+            validation_domains = self.predict_domains(self.validation.grid.coords_norm)
+        else:
+            validation_domains = None
+
+        def validate_domain(d):
+            return self.validate(coeffs=coeffs,
+                                 results=results,
+                                 domain=d,
+                                 output_idx=output_idx,
+                                 validation_domains=validation_domains)
+
+        for d, error_domain in zip(domains, self.map_domains(validate_domain, domains)):
+            error[d] = error_domain
+
+        return error
+
     # def extract_domain(self, data, domain):
     #     """
     #     Extract data from dataset of specified domain
@@ -650,7 +820,7 @@ class MEGPC(object):
     #
     #     return data[mask.flatten(), :]
 
-    def create_validation_set(self, n_samples, n_cpu=1, gradient=False):
+    def create_validation_set(self, n_samples, n_cpu=1, gradient=False, seed=None, cache_folder=None):
         """
         Creates a ValidationSet instance (calls the model)
 
@@ -663,13 +833,35 @@ class MEGPC(object):
             model is capable to evaluate all grid points in parallel)
         gradient : bool, optional, default: False
             Determine gradient of results in each grid points
+        seed : int, optional, default: None
+            Seed of the random grid of the validation set
+        cache_folder : str, optional, default: None
+            Folder of the validation set cache. If a validation set of the same problem and seed is present,
+            it is loaded from the cache and topped up with new model evaluations if more samples are requested.
         """
         # create set of validation points
-        n_samples = n_samples
+        n_samples = int(n_samples)
+
+        validation_cached = None
+        n_cached = 0
+
+        # load validation set from cache
+        if cache_folder is not None:
+            fn_cache = get_validation_set_cache_fn(problem=self.problem, folder=cache_folder, seed=seed,
+                                                   gradient=gradient)
+
+            if os.path.exists(fn_cache):
+                iprint("Loading validation set from cache: {}".format(fn_cache), tab=0, verbose=self.verbose)
+                validation_cached = ValidationSet().read(fname=fn_cache, folder="validation")
+                n_cached = validation_cached.results.shape[0]
+
+        if n_cached >= n_samples:
+            self.validation = validation_cached.get_subset(n_samples)
+            return
 
         grid = Random(parameters_random=self.problem.parameters_random,
-                      n_grid=n_samples,
-                      seed=None,
+                      n_grid=n_samples - n_cached,
+                      seed=seed if seed is None or n_cached == 0 else seed + n_cached,
                       options=None)
 
         # Evaluate original model at grid points
@@ -698,10 +890,25 @@ class MEGPC(object):
             gradient_results = None
             gradient_idx = None
 
-        self.validation = ValidationSet(grid=grid,
-                                        results=results,
-                                        gradient_results=gradient_results,
-                                        gradient_idx=gradient_idx)
+        validation = ValidationSet(grid=grid,
+                                   results=results,
+                                   gradient_results=gradient_results,
+                                   gradient_idx=gradient_idx)
+
+        if validation_cached is not None:
+            validation = validation_cached.append(validation)
+
+        # save extended validation set in cache
+        if cache_folder is not None:
+            if not os.path.exists(cache_folder):
+                os.makedirs(cache_folder)
+
+            if os.path.exists(fn_cache):
+                os.remove(fn_cache)
+
+            validation.write(fname=fn_cache, folder="validation")
+
+        self.validation = validation.get_subset(n_samples)
 
     @staticmethod
     def get_mean(samples):
@@ -882,7 +1089,7 @@ class MEGPC(object):
             x = np.zeros(self.problem.dim)[np.newaxis, :]
 
         # classify coordinates
-        domains = self.classifier.predict(x)
+        domains = self.predict_domains(x)
 
         local_sens = np.zeros((x.shape[0], coeffs[0].shape[1], self.problem.dim))
 
@@ -0,0 +1,443 @@
+import h5py
+import numpy as np
+from .io import iprint
+
+
+class OutputReduction(object):
+    """
+    OutputReduction object to compress the output space of high dimensional QOIs (e.g. fields) using a truncated
+    singular value decomposition (principal component analysis) of the results matrix. The gPC coefficients are
+    determined for the leading modes only and are mapped back to the original output space on demand.
+    Output quantities with NaN results are excluded from the decomposition (their mean is NaN and their
+    components are zero).
+
+    results ~ results_reduced * components + mean
+
+    Parameters
+    ----------
+    lambda_eps : float, optional, default: 0.999
+        Bound of retained variance [0, 1]. All modes are included until lambda_eps of the total variance
+        of the results is captured.
+    n_modes_max : int, optional, default: None
+        Maximum number of retained modes (default: no limit)
+    method : str, optional, default: "svd"
+        Method to determine the initial decomposition
+        - "svd" ... Thin singular value decomposition using LAPACK
+        - "randomized" ... Randomized singular value decomposition (requires n_modes_max)
+    seed : int, optional, default: None
+        Seed of the randomized singular value decomposition
+    verbose : bool, optional, default: False
+        Print the number of retained modes
+
+    Attributes
+    ----------
+    mean : ndarray of float [n_out]
+        Mean of the results (NaN for output quantities with NaN results)
+    singular_values : ndarray of float [n_modes_all]
+        Singular values of the centered results matrix
+    components_all : ndarray of float [n_modes_all x n_out]
+        Right singular vectors (modes) of the centered results matrix
+    n_samples : int
+        Number of samples the decomposition is derived from
+    ss_total : float
+        Total sum of squares of the centered results matrix
+    n_modes : int
+        Number of retained modes
+    n_out : int
+        Number of output quantities
+    """
+
+    def __init__(self, lambda_eps=0.999, n_modes_max=None, method="svd", seed=None, verbose=False):
+        """
+        Initializes OutputReduction
+        """
+        self.lambda_eps = lambda_eps
+        self.n_modes_max = n_modes_max
+        self.method = method
+        self.seed = seed
+        self.verbose = verbose
+        self.mean = None
+        self.singular_values = None
+        self.components_all = None
+        self.n_samples = 0
+        self.ss_total = 0.
+        self.n_modes = None
+
+        if self.method not in ["svd", "randomized"]:
+            raise AttributeError("Unknown output reduction method: '{}'!".format(self.method))
+
+    @property
+    def n_out(self):
+        return self.mean.size
+
+    @property
+    def components(self):
+        return self.components_all[:self.n_modes, :]
+
+    @property
+    def non_nan_mask(self):
+        return ~np.isnan(self.mean)
+
+    def fit(self, results):
+        """
+        Determines the modes of the results matrix
+
+        Parameters
+        ----------
+        results : ndarray of float [n_grid x n_out]
+            Results of the model evaluations
+        """
+        if results.ndim == 1:
+            results = results[:, np.newaxis]
+
+        self.n_samples = results.shape[0]
+        self.mean = np.mean(results, axis=0)
+
+        # exclude output quantities with NaN results
+        results_centered = results - self.mean
+        results_centered[:, ~self.non_nan_mask] = 0.
+        self.ss_total = float(np.sum(results_centered ** 2))
+
+        if self.method == "randomized" and self.n_modes_max is not None:
+            from sklearn.utils.extmath import randomized_svd
+            _, self.singular_values, self.components_all = randomized_svd(results_centered,
+                                                                          n_components=self.n_modes_max,
+                                                                          random_state=self.seed)
+        else:
+            _, self.singular_values, self.components_all = np.linalg.svd(results_centered, full_matrices=False)
+
+        self.components_all[:, ~self.non_nan_mask] = 0.
+
+        self.truncate_rank()
+        self.set_n_modes()
+
+    def update(self, results):
+        """
+        Updates the decomposition with new rows of the results matrix (incremental PCA after Ross et al. [1])
+
+        Parameters
+        ----------
+        results : ndarray of float [n_grid_new x n_out]
+            Results of the new model evaluations
+
+        Notes
+        -----
+        .. [1] Ross, D. A., Lim, J., Lin, R. S., & Yang, M. H. (2008). Incremental learning for robust visual
+           tracking. International journal of computer vision, 77(1-3), 125-141.
+        """
+        if results.ndim == 1:
+            results = results[:, np.newaxis]
+
+        if self.mean is None or self.n_samples == 0:
+            self.fit(results)
+            return
+
+        n_samples_new = results.shape[0]
+        n_samples_total = self.n_samples + n_samples_new
+
+        mean_new = np.mean(results, axis=0)
+        results_centered = results - mean_new
+        mean_correction = np.sqrt(self.n_samples * n_samples_new / n_samples_total) * (self.mean - mean_new)
+        matrix_old = self.singular_values[:, np.newaxis] * self.components_all
+
+        # exclude output quantities with NaN results (also if the NaN values occur in the new results only)
+        mask = np.logical_and(self.non_nan_mask, ~np.isnan(mean_new))
+        self.ss_total -= float(np.sum(matrix_old[:, np.logical_and(self.non_nan_mask, ~mask)] ** 2))
+        matrix_old[:, ~mask] = 0.
+        results_centered[:, ~mask] = 0.
+        mean_correction[~mask] = 0.
+
+        # update total sum of squares (Chan et al.)
+        self.ss_total = self.ss_total + float(np.sum(results_centered ** 2)) + float(np.sum(mean_correction ** 2))
+
+        matrix = np.vstack((matrix_old,
+                            results_centered,
+                            mean_correction[np.newaxis, :]))
+
+        _, self.singular_values, self.components_all = np.linalg.svd(matrix, full_matrices=False)
+        self.components_all[:, ~mask] = 0.
+
+        # rank of the centered results matrix is limited by the number of samples
+        self.singular_values = self.singular_values[:n_samples_total]
+        self.components_all = self.components_all[:n_samples_total, :]
+
+        if self.n_modes_max is not None:
+            self.singular_values = self.singular_values[:self.n_modes_max]
+            self.components_all = self.components_all[:self.n_modes_max, :]
+
+        self.mean = (self.n_samples * self.mean + n_samples_new * mean_new) / n_samples_total
+        self.n_samples = n_samples_total
+
+        self.truncate_rank()
+        self.set_n_modes()
+
+    def truncate_rank(self):
+        """
+        Removes modes with numerically vanishing singular values (numerical rank of the results matrix)
+        """
+        if self.singular_values.size > 0 and self.singular_values[0] > 0:
+            tol = self.singular_values[0] * np.max(self.components_all.shape) * np.finfo(float).eps
+            n_rank = int(np.max((np.sum(self.singular_values > tol), 1)))
+            self.singular_values = self.singular_values[:n_rank]
+            self.components_all = self.components_all[:n_rank, :]
+
+    def set_n_modes(self):
+        """
+        Determines the number of modes, which are necessary to capture lambda_eps of the total variance
+        """
+        if self.ss_total > 0:
+            var_ratio = np.cumsum(self.singular_values ** 2) / self.ss_total
+            self.n_modes = int(np.min((np.sum(var_ratio < self.lambda_eps) + 1, self.singular_values.size)))
+        else:
+            self.n_modes = 1
+
+        if self.n_modes_max is not None:
+            self.n_modes = int(np.min((self.n_modes, self.n_modes_max)))
+
+        iprint("Output reduction: {} modes capture {:.2f}% of the variance of {} output quantities".format(
+            self.n_modes,
+            100 * np.sum(self.singular_values[:self.n_modes] ** 2) / self.ss_total if self.ss_total > 0 else 100.,
+            self.n_out), tab=0, verbose=self.verbose)
+
+    def check_coeffs(self, coeffs):
+        """
+        Checks that the coefficients are given in the reduced output space. The output space of the coefficients
+        is not inferred from their shape: a gPC with an OutputReduction object always operates on coefficients of
+        the reduced output space.
+
+        Parameters
+        ----------
+        coeffs : ndarray of float [n_basis x n_modes]
+            GPC coefficients of the reduced output space
+        """
+        if coeffs.ndim != 2 or coeffs.shape[1] != self.n_modes:
+            raise AssertionError("GPC coefficients of the reduced output space with {} modes expected, got shape {} "
+                                 "(set gpc.output_reduction = None for coefficients of the original output "
+                                 "space)".format(self.n_modes, coeffs.shape))
+
+    def transform(self, results):
+        """
+        Projects results to the reduced output space
+
+        Parameters
+        ----------
+        results : ndarray of float [n_grid x n_out]
+            Results of the model evaluations
+
+        Returns
+        -------
+        results_reduced : ndarray of float [n_grid x n_modes]
+            Results in the reduced output space
+        """
+        if results.ndim == 1:
+            results = results[:, np.newaxis]
+
+        mask = self.non_nan_mask
+
+        return np.matmul(results[:, mask] - self.mean[mask], self.components[:, mask].transpose())
+
+    def transform_gradient(self, gradient_results):
+        """
+        Projects gradients of the results to the reduced output space
+
+        Parameters
+        ----------
+        gradient_results : ndarray of float [n_grid x n_out x dim]
+            Gradient of results
+
+        Returns
+        -------
+        gradient_results_reduced : ndarray of float [n_grid x n_modes x dim]
+            Gradient of results in the reduced output space
+        """
+        if gradient_results is None:
+            return None
+
+        mask = self.non_nan_mask
+
+        return np.einsum("ijk,mj->imk", gradient_results[:, mask, :], self.components[:, mask])
+
+    def inverse_transform(self, results_reduced, output_idx=None, add_mean=True):
+        """
+        Maps results from the reduced output space back to the original output space.
+        Only the requested output quantities are determined.
+
+        Parameters
+        ----------
+        results_reduced : ndarray of float [n_grid x n_modes (x dim)]
+            Results (or their gradients) in the reduced output space
+        output_idx : ndarray of int, optional, default=None [n_out_idx]
+            Indices of output quantities to consider (Default: all)
+        add_mean : bool, optional, default: True
+            Add mean of results (disable for gradients and other linear functionals without offset)
+
+        Returns
+        -------
+        results : ndarray of float [n_grid x n_out_idx (x dim)]
+            Results in the original output space
+        """
+        if output_idx is None:
+            components = self.components
+            mean = self.mean
+        else:
+            output_idx = np.asarray(output_idx).flatten().astype(int)
+            components = self.components[:, output_idx]
+            mean = self.mean[output_idx]
+
+        if results_reduced.ndim == 3:
+            results = np.einsum("imk,mj->ijk", results_reduced, components)
+        else:
+            results = np.matmul(results_reduced, components)
+
+            if add_mean:
+                results = results + mean
+
+        return results
+
+    def get_coeffs(self, coeffs, output_idx=None):
+        """
+        Determines the gPC coefficients in the original output space
+
+        Parameters
+        ----------
+        coeffs : ndarray of float [n_basis x n_modes]
+            GPC coefficients of the reduced output space
+        output_idx : ndarray of int, optional, default=None [n_out_idx]
+            Indices of output quantities to consider (Default: all)
+
+        Returns
+        -------
+        coeffs : ndarray of float [n_basis x n_out_idx]
+            GPC coefficients of the original output space
+        """
+        coeffs_full = self.inverse_transform(coeffs, output_idx=output_idx, add_mean=False)
+
+        # the mean is represented by the first (constant) basis function
+        if output_idx is None:
+            coeffs_full[0, :] += self.mean
+        else:
+            coeffs_full[0, :] += self.mean[np.asarray(output_idx).flatten().astype(int)]
+
+        return coeffs_full
+
+    def get_mean(self, coeffs, output_idx=None):
+        """
+        Calculate the expected mean value from the gPC coefficients of the reduced output space
+
+        Parameters
+        ----------
+        coeffs : ndarray of float [n_basis x n_modes]
+            GPC coefficients of the reduced output space
+        output_idx : ndarray of int, optional, default=None [n_out_idx]
+            Indices of output quantities to consider (Default: all)
+
+        Returns
+        -------
+        mean: ndarray of float [1 x n_out_idx]
+            Expected value of output quantities
+        """
+        return self.inverse_transform(coeffs[0, :][np.newaxis, :], output_idx=output_idx)
+
+    def get_var(self, coeffs, output_idx=None):
+        """
+        Calculate the variance contribution of the given gPC coefficients of the reduced output space, i.e.
+        sum(coeffs_full**2, axis=0) without mapping the coefficients to the original output space
+
+        Parameters
+        ----------
+        coeffs : ndarray of float [n_basis_sub x n_modes]
+            GPC coefficients of the reduced output space
+        output_idx : ndarray of int, optional, default=None [n_out_idx]
+            Indices of output quantities to consider (Default: all)
+
+        Returns
+        -------
+        var: ndarray of float [n_out_idx]
+            Variance contribution of the coefficients in the original output space
+        """
+        if output_idx is None:
+            output_idx = np.arange(self.n_out)
+        else:
+            output_idx = np.asarray(output_idx).flatten().astype(int)
+
+        components = self.components[:, output_idx]
+        gram = np.matmul(coeffs.transpose(), coeffs)
+        var = np.sum(components * np.matmul(gram, components), axis=0)
+
+        # output quantities with NaN results
+        var[~self.non_nan_mask[output_idx]] = np.nan
+
+        return var
+
+    def get_std(self, coeffs, output_idx=None):
+        """
+        Calculate the standard deviation from the gPC coefficients of the reduced output space
+
+        Parameters
+        ----------
+        coeffs : ndarray of float [n_basis x n_modes]
+            GPC coefficients of the reduced output space
+        output_idx : ndarray of int, optional, default=None [n_out_idx]
+            Indices of output quantities to consider (Default: all)
+
+        Returns
+        -------
+        std: ndarray of float [1 x n_out_idx]
+            Standard deviation of output quantities
+        """
+        return np.sqrt(self.get_var(coeffs[1:, :], output_idx=output_idx))[np.newaxis, :]
+
+    def write(self, fname, folder):
+        """ Save OutputReduction in .hdf5 format
+
+        Parameters
+        ----------
+        fname : str
+            Filename of .hdf5 file
+        folder : str
+            Path in .hdf5 file containing the output reduction
+
+        Returns
+        -------
+        <file> : .hdf5 file
+            File containing the mean, the singular values and the modes of the results
+        """
+
+        with h5py.File(fname, 'a') as f:
+            if folder in f:
+                del f[folder]
+
+            f[folder + "/mean"] = self.mean
+            f[folder + "/singular_values"] = self.singular_values
+            f[folder + "/components"] = self.components_all
+            f[folder + "/n_modes"] = self.n_modes
+            f[folder + "/n_samples"] = self.n_samples
+            f[folder + "/ss_total"] = self.ss_total
+            f[folder + "/lambda_eps"] = self.lambda_eps
+
+    def read(self, fname, folder):
+        """ Load OutputReduction from .hdf5 format
+
+        Parameters
+        ----------
+        fname : str
+            Filename of .hdf5 file
+        folder : str
+            Path in .hdf5 file containing the output reduction
+
+        Returns
+        -------
+        output_reduction : OutputReduction object
+            OutputReduction object
+        """
+
+        with h5py.File(fname, 'r') as f:
+            self.mean = f[folder + "/mean"][:]
+            self.singular_values = f[folder + "/singular_values"][:]
+            self.components_all = f[folder + "/components"][:]
+            self.n_modes = int(f[folder + "/n_modes"][()])
+            self.n_samples = int(f[folder + "/n_samples"][()])
+            self.ss_total = float(f[folder + "/ss_total"][()])
+            self.lambda_eps = float(f[folder + "/lambda_eps"][()])
+
+        return self
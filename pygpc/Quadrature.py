@@ -1,8 +1,180 @@
+import inspect
 import numpy as np
+from collections import OrderedDict
+from functools import wraps
 from scipy.fftpack import ifft
+from scipy.linalg import eigh_tridiagonal
 from scipy.special import roots_genlaguerre
 
 
+class QuadratureCache(object):
+    """
+    Bounded least recently used (LRU) cache of 1D quadrature rules. The rules are stored by
+    (family, n, shape parameters) and are shared by all basis functions and grids.
+
+    Parameters
+    ----------
+    maxsize : int, optional, default: 1024
+        Maximum number of stored quadrature rules
+
+    Attributes
+    ----------
+    hits : int
+        Number of calls served from the cache
+    misses : int
+        Number of calls where the quadrature rule had to be computed
+    """
+
+    def __init__(self, maxsize=1024):
+        """
+        Constructor; Initializes QuadratureCache class
+        """
+        self.maxsize = maxsize
+        self.rules = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, fun):
+        """
+        Returns the quadrature rule of the given key and computes it with fun if it is not stored yet.
+        Copies of the stored arrays are returned, such that the callers can not modify the cache.
+
+        Parameters
+        ----------
+        key : tuple
+            (family, n, shape parameters) of the quadrature rule
+        fun : function
+            Function without arguments computing the knots and weights
+
+        Returns
+        -------
+        knots : np.ndarray or float
+            Knots of the grid
+        weights : np.ndarray or float
+            Weights of the grid
+        """
+        if key in self.rules:
+            self.hits += 1
+            self.rules.move_to_end(key)
+        else:
+            self.misses += 1
+            self.rules[key] = fun()
+
+            if len(self.rules) > self.maxsize:
+                self.rules.popitem(last=False)
+
+        knots, weights = self.rules[key]
+
+        return copy_rule(knots), copy_rule(weights)
+
+    def info(self):
+        """
+        Returns the statistics of the cache.
+
+        Returns
+        -------
+        info : dict
+            "hits", "misses", "hit_rate", "size" and "maxsize" of the cache
+        """
+        n_calls = self.hits + self.misses
+
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / n_calls if n_calls > 0 else 0.,
+                "size": len(self.rules),
+                "maxsize": self.maxsize}
+
+    def clear(self):
+        """
+        Removes all quadrature rules from the cache and resets the statistics.
+        """
+        self.rules.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def copy_rule(x):
+    """
+    Copies knots or weights of a quadrature rule (np.ndarray or scalar).
+
+    Parameters
+    ----------
+    x : np.ndarray or float
+        Knots or weights
+
+    Returns
+    -------
+    x_copy : np.ndarray or float
+        Copy of x
+    """
+    if isinstance(x, np.ndarray):
+        return x.copy()
+    else:
+        return x
+
+
+quadrature_cache = QuadratureCache()
+
+
+def get_quadrature_cache_info():
+    """
+    Returns the statistics of the cache of the 1D quadrature rules.
+
+    info = get_quadrature_cache_info()
+
+    Returns
+    -------
+    info : dict
+        "hits", "misses", "hit_rate", "size" and "maxsize" of the cache
+    """
+    return quadrature_cache.info()
+
+
+def clear_quadrature_cache(maxsize=None):
+    """
+    Clears the cache of the 1D quadrature rules and resets its statistics.
+
+    clear_quadrature_cache(maxsize=None)
+
+    Parameters
+    ----------
+    maxsize : int, optional, default: None
+        New maximum number of stored quadrature rules (unchanged if None)
+    """
+    quadrature_cache.clear()
+
+    if maxsize is not None:
+        quadrature_cache.maxsize = maxsize
+
+
+def memoize_quadrature(family):
+    """
+    Decorator memoising a 1D quadrature rule by (family, n, shape parameters) in the quadrature cache.
+
+    Parameters
+    ----------
+    family : str
+        Name of the quadrature rule
+
+    Returns
+    -------
+    decorator : function
+        Decorator of the quadrature function
+    """
+    def decorator(fun):
+        signature = inspect.signature(fun)
+
+        @wraps(fun)
+        def wrapper(*args, **kwargs):
+            # positional and keyword calls share the same key
+            arguments = signature.bind(*args, **kwargs).arguments
+            key = (family,) + tuple(float(arguments[a]) for a in signature.parameters)
+            return quadrature_cache.get(key, lambda: fun(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+@memoize_quadrature("jacobi")
 def get_quadrature_jacobi_1d(n, p, q):
     """
     Get knots and weights of Jacobi polynomials.
@@ -36,22 +208,16 @@ def get_quadrature_jacobi_1d(n, p, q):
     t2 = np.sqrt((4.0 * n_arr * (n_arr + q) * (n_arr + p) * (n_arr + q + p)) / (
             (2 * n_arr - 1 + q + p) * (2 * n_arr + q + p) ** 2 * (2 * n_arr + 1 + q + p)))
 
-    # compose companion matrix
-    t = np.diag(t1) + np.diag(t2, 1) + np.diag(t2, -1)
-
-    # evaluate roots of polynomials (the abscissas are the roots of the
-    # characteristic polynomial, i.d. the eigenvalues of the companion matrix)
-    # the weights can be derived from the corresponding eigenvectors.
-    eigvals, eigvecs = np.linalg.eig(t)
-    idx_sorted = np.argsort(eigvals)
-    eigvals_sorted = eigvals[idx_sorted]
-
-    weights = 2.0 * eigvecs[0, idx_sorted] ** 2
-    knots = eigvals_sorted
+    # evaluate roots of polynomials (the abscissas are the roots of the characteristic polynomial, i.d. the
+    # eigenvalues of the symmetric tridiagonal Jacobi matrix, Golub-Welsch algorithm)
+    # the weights can be derived from the first components of the corresponding eigenvectors.
+    knots, eigvecs = eigh_tridiagonal(t1, t2)
+    weights = 2.0 * eigvecs[0, :] ** 2
 
     return knots, weights
 
 
+@memoize_quadrature("hermite")
 def get_quadrature_hermite_1d(n):
     """
     Get knots and weights of Hermite polynomials (normal distribution).
@@ -70,13 +236,16 @@ def get_quadrature_hermite_1d(n):
     weights: np.ndarray
         weights of the grid
     """
-    n = np.int(n)
-    knots, weights = np.polynomial.hermite_e.hermegauss(n)
-    weights = np.array(list(2.0 * weights / np.sum(weights)))
+    n = int(n)
+
+    # Golub-Welsch algorithm using the recurrence relation of the probabilists' Hermite polynomials
+    knots, eigvecs = eigh_tridiagonal(np.zeros(n), np.sqrt(np.arange(1, n)))
+    weights = 2.0 * eigvecs[0, :] ** 2
 
     return knots, weights
 
 
+@memoize_quadrature("laguerre")
 def get_quadrature_laguerre_1d(n, alpha):
     """
     Get knots and weights of Laguerre polynomials (gamma distribution).
@@ -97,12 +266,14 @@ def get_quadrature_laguerre_1d(n, alpha):
     weights: np.ndarray
         weights of the grid
     """
-    n = np.int(n)
+    n = int(n)
     knots, weights = roots_genlaguerre(n=n, alpha=alpha)
 
     return knots, weights
 
+
 # TODO: review this
+@memoize_quadrature("clenshaw_curtis")
 def get_quadrature_clenshaw_curtis_1d(n):
     """
     Get the Clenshaw Curtis nodes and weights.
@@ -121,25 +292,30 @@ def get_quadrature_clenshaw_curtis_1d(n):
     weights: np.ndarray
         Weights of the grid
     """
-    n = np.int(n)
+    n = int(n)
 
     if n == 1:
         knots = 0
         weights = 2
+    elif n == 2:
+        # the mirrored coefficients of the FFT approach are empty for n = 2 (knots would be +-0.5)
+        knots = np.array([1., -1.])
+        weights = np.array([1., 1.])
     else:
         n = n - 1
-        c = np.zeros((n, 2))
+        c = np.zeros((n + 1, 2))
         k = 2 * (1 + np.arange(np.floor(n / 2)))
         c[::2, 0] = 2 / np.hstack((1, 1 - k * k))
-        c[1, 1] = -n
+        c[1, 1] = 1
         v = np.vstack((c, np.flipud(c[1:n, :])))
         f = np.real(ifft(v, n=None, axis=0))
-        knots = f[0:n, 1]
+        knots = n * f[0:n + 1, 1]
         weights = np.hstack((f[0, 0], 2 * f[1:n, 0], f[n, 0]))
 
     return knots, weights
 
 
+@memoize_quadrature("fejer1")
 def get_quadrature_fejer1_1d(n):
     """
     Computes the Fejer type 1 nodes and weights.
@@ -172,7 +348,7 @@ def get_quadrature_fejer1_1d(n):
     .. [3] Waldvogel, J. (2006). Fast construction of the Fejer and Clenshaw-Curtis quadrature rules.
        BIT Numerical Mathematics, 46(1), 195-202.
     """
-    n = np.int(n)
+    n = int(n)
 
     theta = np.zeros(n)
 
@@ -199,6 +375,7 @@ def get_quadrature_fejer1_1d(n):
     return knots, weights
 
 
+@memoize_quadrature("fejer2")
 def get_quadrature_fejer2_1d(n):
     """
     Computes the Fejer type 2 nodes and weights (Clenshaw Curtis without boundary nodes).
@@ -231,7 +408,7 @@ def get_quadrature_fejer2_1d(n):
     .. [3] Waldvogel, J. (2006). Fast construction of the Fejer and Clenshaw–Curtis quadrature rules.
        BIT Numerical Mathematics, 46(1), 195-202.
     """
-    n = np.int(n)
+    n = int(n)
 
     if n == 1:
         knots = np.array([0.0])
@@ -272,6 +449,7 @@ def get_quadrature_fejer2_1d(n):
     return knots, weights
 
 
+@memoize_quadrature("patterson")
 def get_quadrature_patterson_1d(n):
     """
     Computes the nested Gauss-Patterson nodes and weights for n = 1,3,7,15,31 nodes.
@@ -290,6 +468,7 @@ def get_quadrature_patterson_1d(n):
     weights: np.ndarray
         Weights of the grid
     """
+    n = int(n)
     x = np.zeros(n)
     w = np.zeros(n)
 
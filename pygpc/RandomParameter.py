@@ -181,7 +181,7 @@ class Beta(RandomParameter):
 
         y = np.zeros(x.shape)
 
-        mask = np.logical_and(self.pdf_limits[0] < x, x < self.pdf_limits[1])
+        mask = np.logical_and(a < x, x < b)
 
         y[mask] = (scipy.special.gamma(p) * scipy.special.gamma(q) / scipy.special.gamma(p + q)
                    * (b - a) ** (p + q - 1)) ** (-1) * (x[mask] - a) ** (p - 1) * (b - x[mask]) ** (q - 1)
@@ -209,7 +209,7 @@ class Beta(RandomParameter):
         if x is None:
             x = np.linspace(-1, 1, 200)
 
-        y = self.pdf(x, a=-1., b=1.)
+        _, y = self.pdf(x, a=-1., b=1.)
 
         return x, y
 
@@ -109,10 +109,10 @@ class SGPC(GPC):
                                    interaction_order=interaction_order,
                                    interaction_order_current=interaction_order_current)
 
-    @staticmethod
-    def get_mean(coeffs=None, samples=None):
+    def get_mean(self, coeffs=None, samples=None):
         """
         Calculate the expected mean value. Provide either gPC coeffs or a certain number of samples.
+        Coefficients of the reduced output space (output reduction) are mapped to the original output space.
 
         mean = SGPC.get_mean(coeffs)
 
@@ -128,6 +128,10 @@ class SGPC(GPC):
         mean: ndarray of float [1 x n_out]
             Expected value of output quantities
         """
+        if coeffs is not None and self.output_reduction is not None:
+            self.output_reduction.check_coeffs(coeffs)
+            return self.output_reduction.get_mean(coeffs=coeffs)
+
         if coeffs is not None:
             mean = coeffs[0, ]
 
@@ -141,10 +145,10 @@ class SGPC(GPC):
 
         return mean
 
-    @staticmethod
-    def get_std(coeffs=None, samples=None):
+    def get_std(self, coeffs=None, samples=None):
         """
         Calculate the standard deviation. Provide either gPC coeffs or a certain number of samples.
+        Coefficients of the reduced output space (output reduction) are mapped to the original output space.
 
         std = SGPC.get_std(coeffs)
 
@@ -160,6 +164,10 @@ class SGPC(GPC):
         std: ndarray of float [1 x n_out]
             Standard deviation of output quantities
         """
+        if coeffs is not None and self.output_reduction is not None:
+            self.output_reduction.check_coeffs(coeffs)
+            return self.output_reduction.get_std(coeffs=coeffs)
+
         if coeffs is not None:
             std = np.sqrt(np.sum(np.square(coeffs[1:]), axis=0))
 
@@ -224,9 +232,17 @@ class SGPC(GPC):
             if self.p_matrix is not None:
                 raise NotImplementedError("Please use algorithm='sampling' in case of reduced gPC (projection).")
 
+            # coefficients of reduced output space
+            reduced = self.output_reduction is not None
+
+            if reduced:
+                self.output_reduction.check_coeffs(coeffs)
+
             # handle (N,) arrays
             if len(coeffs.shape) == 1:
                 n_out = 1
+            elif reduced:
+                n_out = self.output_reduction.n_out
             else:
                 n_out = coeffs.shape[1]
 
@@ -262,7 +278,10 @@ class SGPC(GPC):
             sobol = np.zeros([n_sobol_available, n_out])
 
             for i_sobol in range(n_sobol_available):
-                sobol[i_sobol] = np.sum(np.square(coeffs[sobol_poly_idx[:, i_sobol] == 1]), axis=0)
+                if reduced:
+                    sobol[i_sobol] = self.output_reduction.get_var(coeffs[sobol_poly_idx[:, i_sobol] == 1])
+                else:
+                    sobol[i_sobol] = np.sum(np.square(coeffs[sobol_poly_idx[:, i_sobol] == 1]), axis=0)
 
             # sort sobol coefficients in descending order (w.r.t. first output only ...)
             idx_sort_descend_1st = np.argsort(sobol[:, 0], axis=0)[::-1]
@@ -366,6 +385,10 @@ class SGPC(GPC):
                 b_int_global[i_sens, :] = np.prod(tmp, axis=1)
 
             global_sens = np.matmul(b_int_global, coeffs) / (2 ** self.problem.dim)
+
+            # map back from reduced output space
+            if self.output_reduction is not None:
+                global_sens = self.output_reduction.inverse_transform(global_sens, add_mean=False)
             # global_sens = np.matmul(b_int_global, coeffs)
 
         elif algorithm == "sampling":
@@ -439,6 +462,10 @@ class SGPC(GPC):
 
         local_sens = np.matmul(gpc_matrix_gradient.transpose(2, 0, 1), coeffs).transpose(1, 2, 0)
 
+        # map back from reduced output space
+        if self.output_reduction is not None:
+            local_sens = self.output_reduction.inverse_transform(local_sens)
+
         # project the gradient back to the original space if necessary
         if self.p_matrix is not None:
             local_sens = np.matmul(local_sens, self.p_matrix / self.p_matrix_norm[:, np.newaxis])
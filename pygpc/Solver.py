@@ -0,0 +1,789 @@
+import numpy as np
+import multiprocessing
+from scipy.linalg import solve_triangular
+from sklearn.linear_model import lars_path_gram
+
+
+class GramMatrix(object):
+    """
+    Gram matrix Psi^T Psi and correlation vectors Psi^T y of a gPC matrix Psi and results y. They are shared by
+    all outputs of the sparse solvers (OMP, LarsLasso). If grid points (rows) or basis functions (columns) are
+    appended to the gPC matrix and results, only the new blocks are computed. Instead of copies of the gPC matrix
+    and the results, only their fingerprints are stored: the IDs of the rows and columns (plus a key of further data
+    the matrix depends on, e.g. the projection matrix) and a checksum of every row of the results.
+
+    Attributes
+    ----------
+    row_id : ndarray of int64 [n_grid]
+        IDs of the rows (grid points) of the gPC matrix the Gram matrix was computed from
+    col_id : list of UUID4() [n_coeffs]
+        IDs of the columns (basis functions) of the gPC matrix the Gram matrix was computed from
+    matrix_key : ndarray of float
+        Further data the gPC matrix depends on (e.g. the projection matrix)
+    results_checksum : ndarray of float [n_grid]
+        Checksums of the rows of the results the correlation vectors were computed from
+    results_weights : ndarray of float [n_out]
+        Random weights of the outputs to determine the checksums
+    gram : ndarray of float [n_coeffs x n_coeffs]
+        Gram matrix Psi^T Psi
+    corr : ndarray of float [n_coeffs x n_out]
+        Correlation vectors Psi^T y
+    n_full : int
+        Number of full (non-incremental) computations of the Gram matrix
+    """
+
+    def __init__(self):
+        """
+        Constructor; Initializes GramMatrix class
+        """
+        self.row_id = None
+        self.col_id = None
+        self.matrix_key = None
+        self.results_checksum = None
+        self.results_weights = None
+        self.gram = None
+        self.corr = None
+        self.n_full = 0
+
+    def __getstate__(self):
+        """
+        The stored arrays are not pickled with the gPC object. They are recomputed on the next update.
+        """
+        return {"n_full": self.n_full}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.n_full = state["n_full"]
+
+    def is_extension(self, matrix, row_id, col_id, matrix_key=None):
+        """
+        Checks if the given gPC matrix extends the stored one by appending rows and/or columns. The matrices are
+        compared by the IDs of their rows and columns and the matrix key only.
+
+        Parameters
+        ----------
+        matrix : ndarray of float [n_grid x n_coeffs]
+            gPC matrix
+        row_id : ndarray of int64 [n_grid]
+            IDs of the rows (grid points) of the gPC matrix
+        col_id : list of UUID4() [n_coeffs]
+            IDs of the columns (basis functions) of the gPC matrix
+        matrix_key : ndarray of float, optional, default: None
+            Further data the gPC matrix depends on (e.g. the projection matrix)
+
+        Returns
+        -------
+        extension : bool
+            True if the stored gPC matrix is the upper left block of the given one
+        """
+        if self.gram is None or self.row_id is None or row_id is None or col_id is None:
+            return False
+
+        n_rows = len(self.row_id)
+        n_cols = len(self.col_id)
+
+        if matrix.shape[0] != len(row_id) or matrix.shape[1] != len(col_id) or \
+                matrix.shape[0] < n_rows or matrix.shape[1] < n_cols:
+            return False
+
+        if (matrix_key is None) != (self.matrix_key is None) or \
+                (matrix_key is not None and not np.array_equal(matrix_key, self.matrix_key)):
+            return False
+
+        return np.array_equal(np.asarray(row_id)[:n_rows], self.row_id) and list(col_id[:n_cols]) == self.col_id
+
+    def get_results_checksum(self, results):
+        """
+        Determines the checksums of the rows of the results (random linear combination of the outputs).
+
+        Parameters
+        ----------
+        results : ndarray of float [n_grid x n_out]
+            Results
+
+        Returns
+        -------
+        checksum : ndarray of float [n_grid]
+            Checksums of the rows
+        """
+        if self.results_weights is None or self.results_weights.size != results.shape[1]:
+            self.results_weights = np.random.RandomState(results.shape[1]).rand(results.shape[1]) + 0.5
+
+        return np.matmul(results, self.results_weights)
+
+    def update(self, matrix, results, row_id=None, col_id=None, matrix_key=None):
+        """
+        Updates the Gram matrix and the correlation vectors for the given gPC matrix and results. Without row and
+        column IDs, they are computed completely.
+
+        Parameters
+        ----------
+        matrix : ndarray of float [n_grid x n_coeffs]
+            gPC matrix
+        results : ndarray of float [n_grid x n_out]
+            Results
+        row_id : ndarray of int64 [n_grid], optional, default: None
+            IDs of the rows (grid points) of the gPC matrix
+        col_id : list of UUID4() [n_coeffs], optional, default: None
+            IDs of the columns (basis functions) of the gPC matrix
+        matrix_key : ndarray of float, optional, default: None
+            Further data the gPC matrix depends on (e.g. the projection matrix)
+
+        Returns
+        -------
+        gram : ndarray of float [n_coeffs x n_coeffs]
+            Gram matrix Psi^T Psi
+        corr : ndarray of float [n_coeffs x n_out]
+            Correlation vectors Psi^T y
+        """
+        if results.ndim == 1:
+            results = results[:, np.newaxis]
+
+        if self.is_extension(matrix, row_id=row_id, col_id=col_id, matrix_key=matrix_key):
+            n_rows = len(self.row_id)
+            n_cols = len(self.col_id)
+            rows_new = matrix[n_rows:, :n_cols]
+
+            # correlation vectors can only be extended if the old results are unchanged
+            corr_extension = self.results_checksum is not None and \
+                self.results_weights.size == results.shape[1] and \
+                np.allclose(self.get_results_checksum(results[:n_rows, ]), self.results_checksum,
+                            rtol=1e-13, atol=0.)
+
+            if matrix.shape != (n_rows, n_cols):
+                gram = np.empty((matrix.shape[1], matrix.shape[1]))
+                gram[:n_cols, :n_cols] = self.gram + np.matmul(rows_new.T, rows_new)
+
+                if matrix.shape[1] > n_cols:
+                    cols_new = np.matmul(matrix.T, matrix[:, n_cols:])
+                    gram[:, n_cols:] = cols_new
+                    gram[n_cols:, :n_cols] = cols_new[:n_cols, :].T
+
+                self.gram = gram
+
+            if corr_extension:
+                if results.shape[0] != n_rows or matrix.shape[1] != n_cols:
+                    corr = np.empty((matrix.shape[1], results.shape[1]))
+                    corr[:n_cols, :] = self.corr + np.matmul(rows_new.T, results[n_rows:, ])
+
+                    if matrix.shape[1] > n_cols:
+                        corr[n_cols:, :] = np.matmul(matrix[:, n_cols:].T, results)
+
+                    self.corr = corr
+            else:
+                self.corr = np.matmul(matrix.T, results)
+        else:
+            self.gram = np.matmul(matrix.T, matrix)
+            self.corr = np.matmul(matrix.T, results)
+            self.n_full += 1
+
+        if row_id is None or col_id is None:
+            self.row_id = None
+            self.col_id = None
+            self.matrix_key = None
+            self.results_checksum = None
+        else:
+            self.row_id = np.array(row_id, copy=True)
+            self.col_id = list(col_id)
+            self.matrix_key = None if matrix_key is None else np.array(matrix_key, copy=True)
+            self.results_checksum = self.get_results_checksum(results)
+
+        return self.gram, self.corr
+
+
+def get_n_coeffs_sparse(settings, n_coeffs):
+    """
+    Reads the number(s) of non-zero gPC coefficients from the solver settings ("n_coeffs_sparse" or "sparsity").
+
+    Parameters
+    ----------
+    settings : dict
+        Solver settings containing "n_coeffs_sparse" (int or list of int) or "sparsity" (float or list of float 0...1)
+    n_coeffs : int
+        Number of basis functions
+
+    Returns
+    -------
+    n_coeffs_sparse : int or list of int
+        Number(s) of non-zero gPC coefficients
+    """
+    if settings is not None and "n_coeffs_sparse" in settings.keys():
+        n_coeffs_sparse = settings["n_coeffs_sparse"]
+
+        if isinstance(n_coeffs_sparse, (list, tuple, np.ndarray)):
+            return [int(n) for n in n_coeffs_sparse]
+        return int(n_coeffs_sparse)
+
+    elif settings is not None and "sparsity" in settings.keys():
+        sparsity = settings["sparsity"]
+
+        if isinstance(sparsity, (list, tuple, np.ndarray)):
+            return [int(np.ceil(n_coeffs * s)) for s in sparsity]
+        return int(np.ceil(n_coeffs * sparsity))
+
+    else:
+        raise AttributeError("Please specify 'n_coeffs_sparse' or 'sparsity' in solver settings dictionary!")
+
+
+def map_outputs(fun, data, args, n_cpu=1):
+    """
+    Applies a per-output solver to blocks of outputs using a multiprocessing.Pool.
+
+    Parameters
+    ----------
+    fun : function
+        Solver called by fun(*data_block, *args), returning a list of arrays [n_x x n_out_block]
+    data : list of ndarray [n_x x n_out]
+        Output dependent arrays (e.g. correlation vectors Psi^T y), which are split along the outputs (axis 1)
+    args : tuple
+        Additional arguments of fun (Gram matrix, sparsity levels, ...)
+    n_cpu : int, optional, default: 1
+        Number of processes (n_cpu=1 solves in serial, n_cpu=-1 uses all available CPUs)
+
+    Returns
+    -------
+    res : list of ndarray [n_x x n_out]
+        Results of fun (e.g. gPC coefficients for every requested sparsity level / regularization parameter)
+    """
+    if n_cpu is None or n_cpu < 1:
+        n_cpu = multiprocessing.cpu_count()
+
+    n_cpu = min(n_cpu, multiprocessing.cpu_count(), data[0].shape[1])
+
+    if n_cpu <= 1:
+        return fun(*(tuple(data) + tuple(args)))
+
+    blocks = np.array_split(np.arange(data[0].shape[1]), n_cpu)
+
+    with multiprocessing.Pool(n_cpu) as pool:
+        res_blocks = pool.starmap(fun, [tuple(d[:, b] for d in data) + tuple(args) for b in blocks])
+
+    return [np.hstack([r[i] for r in res_blocks]) for i in range(len(res_blocks[0]))]
+
+
+def _omp_gram(corr, gram, n_coeffs_sparse, return_order=False):
+    """
+    Batch orthogonal matching pursuit for a block of outputs (see omp_gram). All outputs are processed
+    simultaneously. The inverse Cholesky factors of the Gram matrices of the active sets are updated by one row
+    in every iteration. If return_order is True, the indices of the selected basis functions in order of their
+    selection [n_max x n_out] (-1 after termination) are returned instead of the coefficients.
+    """
+    n_coeffs = gram.shape[0]
+    n_max = min(max(n_coeffs_sparse), n_coeffs)
+    coeffs = [np.zeros((n_coeffs, corr.shape[1])) for _ in n_coeffs_sparse]
+    order = -np.ones((n_max, corr.shape[1]), dtype=int)
+
+    # column norms to select the basis functions by normalized correlation
+    norm = np.sqrt(np.diag(gram)).copy()
+    norm[norm == 0] = np.inf
+
+    # limit the size of the stacked Cholesky factors to 2^24 elements
+    n_block = max(1, 2 ** 24 // max(n_max ** 2, 1))
+
+    for i_start in range(0, corr.shape[1], n_block):
+        alpha_0 = corr[:, i_start:i_start + n_block]
+        n_out = alpha_0.shape[1]
+        out = np.arange(n_out)
+
+        alpha = alpha_0.copy()
+        x = np.zeros((n_coeffs, n_out))
+        idx = -np.ones((n_out, n_max), dtype=int)
+        chol_inv = np.zeros((n_out, n_max, n_max))
+        active = np.ones(n_out, dtype=bool)
+        tol = 1e-14 * np.max(np.abs(alpha_0) / norm[:, np.newaxis], axis=0)
+        levels_done = np.zeros(len(n_coeffs_sparse), dtype=bool)
+
+        for k in range(n_max):
+            score = np.abs(alpha) / norm[:, np.newaxis]
+            score[idx[:, :k].T, out] = -1.
+            j = np.argmax(score, axis=0)
+
+            # residual is orthogonal to all remaining basis functions
+            active &= score[j, out] > tol
+
+            # new row of the Cholesky factor: [w^T, d] with L w = G[idx, j] and d = sqrt(G[j, j] - w^T w)
+            w = np.einsum("okl,ol->ok", chol_inv[:, :k, :k], gram[idx[:, :k], j[:, np.newaxis]])
+            d = gram[j, j] - np.sum(w ** 2, axis=1)
+
+            # selected basis function is linearly dependent on the active set
+            active &= d > 1e-12 * gram[j, j]
+
+            i_active = np.where(active)[0]
+
+            if len(i_active) == 0:
+                break
+
+            d = np.sqrt(d[i_active])
+            chol_inv[i_active, k, :k] = -np.einsum("okl,ok->ol", chol_inv[i_active, :k, :k], w[i_active, ]) / \
+                d[:, np.newaxis]
+            chol_inv[i_active, k, k] = 1. / d
+            idx[i_active, k] = j[i_active]
+
+            # least squares solution on the active set: gamma = L^-T L^-1 alpha_0[idx]
+            idx_active = idx[i_active, :k+1]
+            z = np.einsum("okl,ol->ok", chol_inv[i_active, :k+1, :k+1],
+                          alpha_0[idx_active, i_active[:, np.newaxis]])
+            gamma = np.einsum("olk,ol->ok", chol_inv[i_active, :k+1, :k+1], z)
+
+            x[:, i_active] = 0.
+            x[idx_active, i_active[:, np.newaxis]] = gamma
+            alpha[:, i_active] = alpha_0[:, i_active] - np.matmul(gram, x[:, i_active])
+
+            for i_level, n in enumerate(n_coeffs_sparse):
+                if n == k + 1:
+                    coeffs[i_level][:, i_start:i_start + n_out] = x
+                    levels_done[i_level] = True
+
+        # sparsity levels beyond the last iteration keep the final solution
+        for i_level, n in enumerate(n_coeffs_sparse):
+            if not levels_done[i_level] and n > 0:
+                coeffs[i_level][:, i_start:i_start + n_out] = x
+
+        order[:, i_start:i_start + n_out] = idx.T
+
+    if return_order:
+        return [order]
+
+    return coeffs
+
+
+def omp_gram(gram, corr, n_coeffs_sparse, n_cpu=1):
+    """
+    Batch orthogonal matching pursuit (Batch-OMP) using the precomputed Gram matrix and correlation vectors.
+    The Gram matrix is shared by all outputs and the least squares problems of the active sets are solved by
+    Cholesky updates. The solutions of several sparsity levels are read from the same greedy path.
+
+    The basis functions are selected by their normalized correlation |alpha_j| / ||psi_j|| with the residual, i.e.
+    independent of the scaling of the columns psi_j of the gPC matrix. The previous implementation (fastmat)
+    selected by the raw correlation |alpha_j|. Both coincide for gPC matrices with columns of equal norm, otherwise
+    the selected basis functions and the solutions of a given sparsity level may differ.
+
+    Rubinstein, R., Zibulevsky, M., Elad, M. (2008). Efficient implementation of the K-SVD algorithm using batch
+    orthogonal matching pursuit. Technion, Tech. Rep. CS-2008-08.
+
+    Parameters
+    ----------
+    gram : ndarray of float [n_coeffs x n_coeffs]
+        Gram matrix Psi^T Psi
+    corr : ndarray of float [n_coeffs x n_out]
+        Correlation vectors Psi^T y
+    n_coeffs_sparse : int or list of int
+        Number(s) of non-zero gPC coefficients
+    n_cpu : int, optional, default: 1
+        Number of processes the outputs are distributed to
+
+    Returns
+    -------
+    coeffs : ndarray of float [n_coeffs x n_out] or list of ndarray
+        gPC coefficients (list if several sparsity levels are requested)
+    """
+    levels = n_coeffs_sparse if isinstance(n_coeffs_sparse, list) else [n_coeffs_sparse]
+
+    coeffs = map_outputs(fun=_omp_gram, data=[corr], args=(gram, levels), n_cpu=n_cpu)
+
+    if isinstance(n_coeffs_sparse, list):
+        return coeffs
+    return coeffs[0]
+
+
+def _lars_gram(corr, gram, n_samples, alpha, n_coeffs_sparse):
+    """
+    Least-angle regression (lasso) paths for a block of outputs (see lars_gram).
+    """
+    coeffs = [np.zeros((gram.shape[0], corr.shape[1])) for _ in range(len(alpha) + len(n_coeffs_sparse))]
+
+    if len(n_coeffs_sparse) > 0:
+        alpha_min = 0.
+        max_iter = 2 * max(n_coeffs_sparse)
+    else:
+        alpha_min = min(alpha)
+        max_iter = 500
+
+    for i_out in range(corr.shape[1]):
+        alphas, _, coefs = lars_path_gram(Xy=corr[:, i_out], Gram=gram, n_samples=n_samples, alpha_min=alpha_min,
+                                          max_iter=max_iter, method="lasso")
+
+        # the path is piecewise linear in alpha
+        for i_level, a in enumerate(alpha):
+            k = np.searchsorted(-alphas, -a)
+
+            if k == 0:
+                continue
+            elif k >= len(alphas):
+                coeffs[i_level][:, i_out] = coefs[:, -1]
+            else:
+                t = (alphas[k-1] - a) / (alphas[k-1] - alphas[k])
+                coeffs[i_level][:, i_out] = coefs[:, k-1] + t * (coefs[:, k] - coefs[:, k-1])
+
+        # last point on the path with at most n non-zero coefficients
+        n_nonzero = np.sum(coefs != 0, axis=0)
+
+        for i_level, n in enumerate(n_coeffs_sparse):
+            k = np.where(n_nonzero <= n)[0][-1]
+            coeffs[len(alpha) + i_level][:, i_out] = coefs[:, k]
+
+    return coeffs
+
+
+def lars_gram(gram, corr, n_samples, alpha=None, n_coeffs_sparse=None, n_cpu=1):
+    """
+    Least-angle regression using the lasso modification (LarsLasso) with the precomputed Gram matrix and
+    correlation vectors. The paths of the outputs are determined independently and can be distributed to a
+    process pool. The solutions of several regularization parameters or sparsity levels are read from one path.
+
+    Parameters
+    ----------
+    gram : ndarray of float [n_coeffs x n_coeffs]
+        Gram matrix Psi^T Psi
+    corr : ndarray of float [n_coeffs x n_out]
+        Correlation vectors Psi^T y
+    n_samples : int
+        Number of rows of the gPC matrix (scaling of the regularization parameter as in sklearn's LassoLars)
+    alpha : float or list of float, optional, default: None
+        Regularization parameter(s)
+    n_coeffs_sparse : int or list of int, optional, default: None
+        Number(s) of non-zero gPC coefficients (used if alpha is None)
+    n_cpu : int, optional, default: 1
+        Number of processes the outputs are distributed to
+
+    Returns
+    -------
+    coeffs : ndarray of float [n_coeffs x n_out] or list of ndarray
+        gPC coefficients (list if several regularization parameters or sparsity levels are requested)
+    """
+    if alpha is not None:
+        multiple = isinstance(alpha, (list, tuple, np.ndarray))
+        alpha = [float(a) for a in alpha] if multiple else [float(alpha)]
+        levels = []
+    elif n_coeffs_sparse is not None:
+        multiple = isinstance(n_coeffs_sparse, list)
+        levels = n_coeffs_sparse if multiple else [n_coeffs_sparse]
+        alpha = []
+    else:
+        raise AttributeError("Please specify 'alpha', 'n_coeffs_sparse' or 'sparsity' in solver settings dictionary!")
+
+    coeffs = map_outputs(fun=_lars_gram, data=[corr], args=(gram, n_samples, alpha, levels), n_cpu=n_cpu)
+
+    if multiple:
+        return coeffs
+    return coeffs[0]
+
+
+def _lar_order(corr, gram, n_samples, n_max):
+    """
+    Indices of the basis functions in order of their activation on the least-angle regression (LAR) paths of a
+    block of outputs [n_max x n_out] (-1 after termination).
+    """
+    order = -np.ones((n_max, corr.shape[1]), dtype=int)
+
+    for i_out in range(corr.shape[1]):
+        _, active, _ = lars_path_gram(Xy=corr[:, i_out], Gram=gram, n_samples=n_samples, alpha_min=0.,
+                                      max_iter=n_max, method="lar")
+        active = np.array(active[:n_max], dtype=int)
+        order[:len(active), i_out] = active
+
+    return [order]
+
+
+def _ols_path_cv(results, order, matrix, gram, n_folds):
+    """
+    Least squares solutions and cross validation errors on the nested sets of basis functions given by order for a
+    block of outputs (see ols_path_cv).
+    """
+    n_samples, n_coeffs = matrix.shape
+    n_max = order.shape[0]
+    n_out_total = results.shape[1]
+
+    coeffs = np.zeros((n_coeffs, n_out_total))
+    error_cv = np.inf * np.ones((1, n_out_total))
+    n_coeffs_cv = np.zeros((1, n_out_total), dtype=int)
+
+    var = np.var(results, axis=0, ddof=1)
+    var[var == 0] = 1.
+
+    if n_folds is None:
+        folds = None
+    else:
+        folds = [np.arange(i_fold, n_samples, n_folds) for i_fold in range(n_folds)]
+
+    # limit the size of the stacked orthonormal bases to 2^24 elements
+    n_block = max(1, 2 ** 24 // max(n_samples * n_max, 1))
+
+    for i_start in range(0, n_out_total, n_block):
+        idx_block = np.arange(i_start, min(i_start + n_block, n_out_total))
+        n_out = len(idx_block)
+        order_block = order[:, idx_block]
+
+        # orthonormal basis Q of the active set (Psi_I = Q R), residual, diagonal of the hat matrix and Q^T y
+        q = np.zeros((n_out, n_max, n_samples))
+        r = np.zeros((n_out, n_max, n_max))
+        z = np.zeros((n_out, n_max))
+        res = results[:, idx_block].T.copy()
+        h = np.zeros((n_out, n_samples))
+        active = np.ones(n_out, dtype=bool)
+        error_best = np.inf * np.ones(n_out)
+        k_best = np.zeros(n_out, dtype=int)
+
+        for k in range(n_max):
+            j = order_block[k, :]
+            active &= j >= 0
+            i_active = np.where(active)[0]
+
+            if len(i_active) == 0:
+                break
+
+            # classical Gram-Schmidt with reorthogonalization
+            v = matrix[:, j[i_active]].T.copy()
+            c = np.zeros((len(i_active), k))
+
+            if k > 0:
+                q_active = q[i_active, :k, :]
+
+                for _ in range(2):
+                    dc = np.matmul(q_active, v[:, :, np.newaxis])[:, :, 0]
+                    v -= np.matmul(dc[:, np.newaxis, :], q_active)[:, 0, :]
+                    c += dc
+
+            d = np.linalg.norm(v, axis=1)
+
+            # basis function is linearly dependent on the active set
+            independent = d > 1e-10 * np.sqrt(gram[j[i_active], j[i_active]])
+            active[i_active[~independent]] = False
+            i_active, v, c, d = i_active[independent], v[independent, ], c[independent, ], d[independent]
+
+            if len(i_active) == 0:
+                continue
+
+            q_k = v / d[:, np.newaxis]
+            q[i_active, k, :] = q_k
+            r[i_active, :k, k] = c
+            r[i_active, k, k] = d
+            z[i_active, k] = np.sum(q_k * res[i_active, ], axis=1)
+            res[i_active, ] -= z[i_active, k][:, np.newaxis] * q_k
+            h[i_active, ] += q_k ** 2
+
+            if folds is None:
+                # leave-one-out: e_i = r_i / (1 - h_i)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    error = np.mean((res[i_active, ] / (1. - h[i_active, ])) ** 2, axis=1)
+                error[np.any(h[i_active, ] > 1. - 1e-10, axis=1)] = np.inf
+            else:
+                # k-fold: e_f = (I - Q_f Q_f^T)^-1 r_f
+                error = np.zeros(len(i_active))
+
+                for f in folds:
+                    q_f = q[i_active, :k+1, :][:, :, f]
+                    a = np.eye(len(f))[np.newaxis, :, :] - np.matmul(q_f.transpose(0, 2, 1), q_f)
+                    res_f = res[i_active, ][:, f]
+
+                    for i in range(len(i_active)):
+                        try:
+                            error[i] += np.sum(np.linalg.solve(a[i], res_f[i]) ** 2)
+                        except np.linalg.LinAlgError:
+                            error[i] = np.inf
+
+                error /= n_samples
+
+            error = error / var[idx_block[i_active]]
+
+            better = error < error_best[i_active]
+            error_best[i_active[better]] = error[better]
+            k_best[i_active[better]] = k + 1
+
+        # least squares coefficients of the active sets with the lowest cross validation error
+        for i_out in range(n_out):
+            if k_best[i_out] > 0:
+                gamma = solve_triangular(r[i_out, :k_best[i_out], :k_best[i_out]], z[i_out, :k_best[i_out]],
+                                         lower=False, check_finite=False)
+                coeffs[order_block[:k_best[i_out], i_out], idx_block[i_out]] = gamma
+
+        error_cv[0, idx_block] = error_best
+        n_coeffs_cv[0, idx_block] = k_best
+
+    return [coeffs, error_cv, n_coeffs_cv]
+
+
+def ols_path_cv(matrix, results, gram, corr, n_max, path="OMP", n_folds=None, n_cpu=1):
+    """
+    Selects the number of non-zero gPC coefficients of every output by cross validation along the OMP or LAR path.
+    The path is computed once per output. The least squares solutions on the nested sets of basis functions and
+    their leave-one-out or k-fold errors are determined for all path steps by updating a QR decomposition
+    (hybrid LAR, [1]). The leave-one-out error is computed analytically using the diagonal of the hat matrix:
+
+    .. math::
+       \\epsilon_{LOO} = \\frac{\\frac{1}{N}\\sum_{i=1}^N \\left( \\frac{y_i - \\hat{y}_i}{1-h_i} \\right)^2}
+       {\\frac{1}{N-1}\\sum_{i=1}^N \\left( y_i - \\bar{y} \\right)^2}
+
+    Parameters
+    ----------
+    matrix : ndarray of float [n_grid x n_coeffs]
+        gPC matrix Psi
+    results : ndarray of float [n_grid x n_out]
+        Results
+    gram : ndarray of float [n_coeffs x n_coeffs]
+        Gram matrix Psi^T Psi
+    corr : ndarray of float [n_coeffs x n_out]
+        Correlation vectors Psi^T y
+    n_max : int
+        Maximum number of non-zero gPC coefficients (length of the path)
+    path : str, optional, default: "OMP"
+        Path the sets of basis functions are taken from ("OMP" or "LAR")
+    n_folds : int, optional, default: None
+        Number of folds of k-fold cross validation (None: leave-one-out cross validation)
+    n_cpu : int, optional, default: 1
+        Number of processes the outputs are distributed to
+
+    Returns
+    -------
+    coeffs : ndarray of float [n_coeffs x n_out]
+        gPC coefficients
+    error_cv : ndarray of float [n_out]
+        Normalized cross validation errors of the selected solutions
+    n_coeffs_cv : ndarray of int [n_out]
+        Selected numbers of non-zero gPC coefficients
+
+    Notes
+    -----
+    .. [1] Blatman, G., & Sudret, B. (2011). Adaptive sparse polynomial chaos expansion based on least angle
+       regression. Journal of Computational Physics, 230(6), 2345-2367.
+    """
+    n_max = int(min(n_max, matrix.shape[1]))
+
+    if path == "OMP":
+        order = map_outputs(fun=_omp_gram, data=[corr], args=(gram, [n_max], True), n_cpu=n_cpu)[0]
+    elif path == "LAR":
+        order = map_outputs(fun=_lar_order, data=[corr], args=(gram, matrix.shape[0], n_max), n_cpu=n_cpu)[0]
+    else:
+        raise AttributeError("Unknown path: '{}'!".format(path))
+
+    coeffs, error_cv, n_coeffs_cv = map_outputs(fun=_ols_path_cv, data=[results, order],
+                                                args=(matrix, gram, n_folds), n_cpu=n_cpu)
+
+    return coeffs, error_cv[0, :], n_coeffs_cv[0, :]
+
+
+def get_row_blocks(matrix, results, n_rows_block=None):
+    """
+    Iterates over blocks of rows of vertically stacked matrices (e.g. gPC matrix and gPC gradient matrix) and the
+    corresponding rows of the results. Only one block of the matrices is read into memory at once, i.e. they can also
+    be memory mapped arrays or h5py datasets.
+
+    Parameters
+    ----------
+    matrix : ndarray of float [n_grid x n_coeffs] or list of ndarray
+        gPC matrix Psi or list of matrices, which are stacked vertically
+    results : ndarray of float [n_grid x n_out]
+        Results
+    n_rows_block : int, optional, default: None
+        Number of rows per block (default: blocks of 2^24 elements)
+
+    Yields
+    ------
+    matrix_block : ndarray of float [n_rows_block x n_coeffs]
+        Block of rows of the stacked matrices
+    results_block : ndarray of float [n_rows_block x n_out]
+        Corresponding block of rows of the results
+    """
+    if type(matrix) is not list:
+        matrix = [matrix]
+
+    if n_rows_block is None:
+        n_rows_block = max(2 ** 24 // max(matrix[0].shape[1], 1), 1)
+
+    i_row = 0
+
+    for m in matrix:
+        for i in range(0, m.shape[0], n_rows_block):
+            matrix_block = np.asarray(m[i:(i + n_rows_block), :])
+            yield matrix_block, results[(i_row + i):(i_row + i + matrix_block.shape[0]), ]
+
+        i_row += m.shape[0]
+
+
+def lstsq_tsqr(blocks, loocv=True):
+    """
+    Least squares solution of a gPC matrix, which is streamed in blocks of rows (out-of-core). The matrix is never
+    stacked or kept in memory at once. The R factor of its QR decomposition Psi = Q R and Q^T y are accumulated block
+    by block (tall skinny QR, TSQR):
+
+    .. math::
+       [R_{k}, Q_{k}^T y_{k}] = \\mathrm{qr}\\left( \\begin{bmatrix} R_{k-1} & Q_{k-1}^T y_{k-1} \\\\
+       \\Psi_k & y_k \\end{bmatrix} \\right)
+
+    The coefficients c = R^+ Q^T y are the Moore-Penrose solution. In a second pass over the blocks, the residuals
+    and the diagonal of the hat matrix h_i = ||psi_i R^+||^2 give the normalized leave-one-out error
+    (see ols_path_cv).
+
+    Parameters
+    ----------
+    blocks : callable
+        Function without arguments returning an iterator over the row blocks (matrix_block, results_block) of the
+        gPC matrix [n_rows_block x n_coeffs] and the results [n_rows_block x n_out] (see get_row_blocks). It is called
+        twice if the leave-one-out error is determined.
+    loocv : bool, optional, default: True
+        Determine the leave-one-out errors
+
+    Returns
+    -------
+    coeffs : ndarray of float [n_coeffs x n_out]
+        gPC coefficients
+    error_loocv : ndarray of float [n_out] or None
+        Normalized leave-one-out errors (None if loocv is False)
+    """
+    r = None
+    z = None
+    n_samples = 0
+    results_sum = 0.
+
+    # accumulate R and Q^T y
+    for matrix_block, results_block in blocks():
+        if results_block.ndim == 1:
+            results_block = results_block[:, np.newaxis]
+
+        if r is None:
+            r = np.zeros((0, matrix_block.shape[1]))
+            z = np.zeros((0, results_block.shape[1]))
+
+        q, r = np.linalg.qr(np.vstack((r, matrix_block)))
+        z = np.matmul(q.T, np.vstack((z, results_block)))
+
+        n_samples += matrix_block.shape[0]
+        results_sum = results_sum + np.sum(results_block, axis=0)
+
+    if r is None:
+        raise AttributeError("The gPC matrix does not contain any rows!")
+
+    r_inv = np.linalg.pinv(r)
+    coeffs = np.matmul(r_inv, z)
+
+    if not loocv:
+        return coeffs, None
+
+    # leave-one-out errors e_i = r_i / (1 - h_i)
+    results_mean = results_sum / n_samples
+    error = np.zeros(coeffs.shape[1])
+    var = np.zeros(coeffs.shape[1])
+    singular = False
+
+    for matrix_block, results_block in blocks():
+        if results_block.ndim == 1:
+            results_block = results_block[:, np.newaxis]
+
+        h = np.sum(np.matmul(matrix_block, r_inv) ** 2, axis=1)
+        singular |= np.any(h > 1. - 1e-10)
+
+        res = results_block - np.matmul(matrix_block, coeffs)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            error += np.sum((res / (1. - h[:, np.newaxis])) ** 2, axis=0)
+
+        var += np.sum((results_block - results_mean) ** 2, axis=0)
+
+    var = var / max(n_samples - 1, 1)
+    var[var == 0] = 1.
+    error_loocv = error / n_samples / var
+
+    if singular:
+        error_loocv[:] = np.inf
+
+    return coeffs, error_loocv
@@ -232,7 +232,8 @@ class TestBenchContinuous(TestBench):
         # create validation sets
         for p in problem:
             gpc = GPC(problem=problem[p], options=None, validation=None)
-            gpc.create_validation_set(n_samples=int(1e4), n_cpu=options["n_cpu"])
+            gpc.create_validation_set(n_samples=int(1e4), n_cpu=options["n_cpu"],
+                                      cache_folder=options.get("validation_cache_folder"))
             self.validation[p] = gpc.validation
 
         super(TestBenchContinuous, self).__init__(algorithm, problem, options, repetitions, n_cpu)
@@ -285,7 +286,8 @@ class TestBenchContinuousND(TestBench):
         # create validation sets
         for p in problem:
             gpc = GPC(problem=problem[p], options=None, validation=None)
-            gpc.create_validation_set(n_samples=int(1e4), n_cpu=options["n_cpu"])
+            gpc.create_validation_set(n_samples=int(1e4), n_cpu=options["n_cpu"],
+                                      cache_folder=options.get("validation_cache_folder"))
             self.validation[p] = gpc.validation
 
         super(TestBenchContinuousND, self).__init__(algorithm, problem, options, repetitions, n_cpu)
@@ -322,7 +324,8 @@ class TestBenchContinuousHD(TestBench):
         # create validation sets
         for p in problem:
             gpc = GPC(problem=problem[p], options=None, validation=None)
-            gpc.create_validation_set(n_samples=int(1e4), n_cpu=options["n_cpu"])
+            gpc.create_validation_set(n_samples=int(1e4), n_cpu=options["n_cpu"],
+                                      cache_folder=options.get("validation_cache_folder"))
             self.validation[p] = gpc.validation
 
         super(TestBenchContinuousHD, self).__init__(algorithm, problem, options, repetitions, n_cpu)
@@ -362,7 +365,8 @@ class TestBenchDiscontinuous(TestBench):
         # create validation sets
         for p in problem:
             gpc = GPC(problem=problem[p], options=None, validation=None)
-            gpc.create_validation_set(n_samples=int(1e4), n_cpu=options["n_cpu"])
+            gpc.create_validation_set(n_samples=int(1e4), n_cpu=options["n_cpu"],
+                                      cache_folder=options.get("validation_cache_folder"))
             self.validation[p] = gpc.validation
 
         super(TestBenchDiscontinuous, self).__init__(algorithm, problem, options, repetitions, n_cpu)
@@ -402,7 +406,8 @@ class TestBenchDiscontinuousND(TestBench):
         # create validation sets
         for p in problem:
             gpc = GPC(problem=problem[p], options=None, validation=None)
-            gpc.create_validation_set(n_samples=int(1e4), n_cpu=options["n_cpu"])
+            gpc.create_validation_set(n_samples=int(1e4), n_cpu=options["n_cpu"],
+                                      cache_folder=options.get("validation_cache_folder"))
             self.validation[p] = gpc.validation
 
         super(TestBenchDiscontinuousND, self).__init__(algorithm, problem, options, repetitions, n_cpu)
@@ -440,7 +445,8 @@ class TestBenchNoisy(TestBench):
         # create validation sets
         for p in problem:
             gpc = GPC(problem=problem[p], options=None, validation=None)
-            gpc.create_validation_set(n_samples=int(1e4), n_cpu=options["n_cpu"])
+            gpc.create_validation_set(n_samples=int(1e4), n_cpu=options["n_cpu"],
+                                      cache_folder=options.get("validation_cache_folder"))
             self.validation[p] = gpc.validation
 
         super(TestBenchNoisy, self).__init__(algorithm, problem, options, repetitions, n_cpu)
@@ -478,7 +484,8 @@ class TestBenchNoisyND(TestBench):
         # create validation sets
         for p in problem:
             gpc = GPC(problem=problem[p], options=None, validation=None)
-            gpc.create_validation_set(n_samples=int(1e4), n_cpu=options["n_cpu"])
+            gpc.create_validation_set(n_samples=int(1e4), n_cpu=options["n_cpu"],
+                                      cache_folder=options.get("validation_cache_folder"))
             self.validation[p] = gpc.validation
 
         super(TestBenchNoisyND, self).__init__(algorithm, problem, options, repetitions, n_cpu)
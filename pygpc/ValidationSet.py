@@ -1,8 +1,12 @@
 import h5py
 import os
+import hashlib
+import pickle
+import numpy as np
 from .misc import ten2mat
 from .misc import mat2ten
 from .Grid import Grid
+from .RandomParameter import RandomParameter
 
 
 class ValidationSet(object):
@@ -108,11 +112,130 @@ class ValidationSet(object):
             self.results = f[results_key][:]
 
             try:
-                self.gradient_results = mat2ten(f[gradient_results_key][:])
-                self.gradient_idx = f[gradient_idx_key]
+                self.gradient_results = mat2ten(f[gradient_results_key][:], incr=coords.shape[1])
+                self.gradient_idx = f[gradient_idx_key][:]
             except KeyError:
-                pass
+                self.gradient_results = None
+                self.gradient_idx = None
 
         self.grid = Grid(parameters_random=[None]*coords.shape[1], coords=coords, coords_norm=coords_norm)
 
         return self
+
+    def get_subset(self, n_samples):
+        """
+        Returns a ValidationSet containing the first n_samples grid points.
+
+        validation = ValidationSet.get_subset(n_samples)
+
+        Parameters
+        ----------
+        n_samples : int
+            Number of grid points
+
+        Returns
+        -------
+        validation : ValidationSet Object
+            ValidationSet object containing the first n_samples grid points and results
+        """
+        if n_samples >= self.results.shape[0]:
+            return self
+
+        grid = Grid(parameters_random=self.grid.parameters_random,
+                    coords=self.grid.coords[:n_samples, :],
+                    coords_norm=self.grid.coords_norm[:n_samples, :])
+
+        if self.gradient_results is not None:
+            mask = self.gradient_idx < n_samples
+            gradient_results = self.gradient_results[mask, ]
+            gradient_idx = self.gradient_idx[mask]
+        else:
+            gradient_results = None
+            gradient_idx = None
+
+        return ValidationSet(grid=grid, results=self.results[:n_samples, :], gradient_results=gradient_results,
+                             gradient_idx=gradient_idx)
+
+    def append(self, validation):
+        """
+        Returns a ValidationSet containing the grid points of this and another ValidationSet.
+
+        validation = ValidationSet.append(validation)
+
+        Parameters
+        ----------
+        validation : ValidationSet Object
+            ValidationSet to append
+
+        Returns
+        -------
+        validation : ValidationSet Object
+            ValidationSet object containing the grid points and results of both ValidationSets
+        """
+        n_grid = self.results.shape[0]
+
+        grid = Grid(parameters_random=validation.grid.parameters_random,
+                    coords=np.vstack((self.grid.coords, validation.grid.coords)),
+                    coords_norm=np.vstack((self.grid.coords_norm, validation.grid.coords_norm)))
+
+        if self.gradient_results is not None and validation.gradient_results is not None:
+            gradient_results = np.vstack((self.gradient_results, validation.gradient_results))
+            gradient_idx = np.hstack((self.gradient_idx, validation.gradient_idx + n_grid))
+        else:
+            gradient_results = None
+            gradient_idx = None
+
+        return ValidationSet(grid=grid, results=np.vstack((self.results, validation.results)),
+                             gradient_results=gradient_results, gradient_idx=gradient_idx)
+
+
+def get_validation_set_cache_fn(problem, folder, seed=None, gradient=False):
+    """
+    Determines the filename of a cached validation set. The filename is a stable hash of the problem
+    (model class, constants and distributions of the random parameters), the seed and the gradient flag.
+    The number of samples is not part of the hash, such that cached validation sets can be topped up.
+
+    fn_cache = get_validation_set_cache_fn(problem, folder, seed=None, gradient=False)
+
+    Parameters
+    ----------
+    problem : Problem class instance
+        GPC Problem under investigation
+    folder : str
+        Folder containing the cached validation sets
+    seed : int, optional, default: None
+        Seed of the random grid of the validation set
+    gradient : bool, optional, default: False
+        Validation set contains the gradient of the results
+
+    Returns
+    -------
+    fn_cache : str
+        Filename of the .hdf5 file containing the cached validation set
+    """
+    key = [type(problem.model).__module__, type(problem.model).__name__, str(seed), str(gradient)]
+
+    for p in problem.parameters:
+        key.append(str(p))
+
+        if isinstance(problem.parameters[p], RandomParameter):
+            key += [type(problem.parameters[p]).__name__,
+                    str(problem.parameters[p].pdf_type),
+                    np.asarray(problem.parameters[p].pdf_shape, dtype=float).tobytes().hex(),
+                    np.asarray(problem.parameters[p].pdf_limits, dtype=float).tobytes().hex()]
+
+        elif isinstance(problem.parameters[p], str):
+            key.append(problem.parameters[p])
+
+        else:
+            try:
+                value = np.asarray(problem.parameters[p], dtype=float)
+                key += [str(value.shape), value.tobytes().hex()]
+            except (TypeError, ValueError):
+                # non-numeric constants are identified by their pickled bytes (or their representation)
+                try:
+                    key.append(hashlib.sha1(pickle.dumps(problem.parameters[p])).hexdigest())
+                except (pickle.PicklingError, TypeError, AttributeError):
+                    key.append(repr(problem.parameters[p]))
+
+    return os.path.join(folder, "validation_" + hashlib.sha1("|".join(key).encode()).hexdigest() + ".hdf5")
@@ -36,6 +36,15 @@ def run(obj, matlab_engine=None):
                 d) printing global process
     matlab_engine : Matlab engine object, optional, default: None
         Matlab engine object to run Matlab functions
+
+    Returns
+    -------
+    seq_number : int
+        Sequence number of the task
+    res : ndarray of float [n_sim x n_out]
+        Results of the model
+    gradient_results : ndarray of float [n_sim x n_out x dim] or None
+        Gradient of the results w.r.t. the normalized random parameters (if provided by the model)
     """
     global process_id
 
@@ -46,6 +55,7 @@ def run(obj, matlab_engine=None):
         process_id = 0
 
     res = obj.read_previous_results(obj.coords)
+    gradient_results = None
 
     start_time = 0
     end_time = 0
@@ -67,7 +77,7 @@ def run(obj, matlab_engine=None):
             res = out[0]
 
             # additional data (dict)
-            if len(out) == 2:
+            if len(out) >= 2 and out[1] is not None:
                 # in case of function parallelization transform list of dict to dict containing the lists
                 if type(out[1]) is list:
                     additional_data = list2dict(out[1])
@@ -92,6 +102,19 @@ def run(obj, matlab_engine=None):
 
                     if n_sim == 1 and data_dict[o].shape[0] != 1:
                         data_dict[o] = data_dict[o].transpose()
+
+            # gradient of results w.r.t. the random parameters [n_sim x n_out x dim]
+            if len(out) == 3 and out[2] is not None:
+                gradient_results = np.array(out[2], dtype=float)
+
+                if gradient_results.ndim == 2:
+                    gradient_results = gradient_results[np.newaxis, :, :]
+
+                # transform gradient to normalized parameter space (chain rule)
+                if getattr(obj, "gradient_scale", None) is not None:
+                    gradient_results = gradient_results * obj.gradient_scale[np.newaxis, np.newaxis, :]
+
+                data_dict["model_evaluations/gradient_results"] = gradient_results
         else:
             # results (nparray), no additional data
             res = out
@@ -110,6 +133,9 @@ def run(obj, matlab_engine=None):
         obj.write_results(data_dict=data_dict)
         skip_sim = False
 
+    else:
+        gradient_results = obj.read_previous_gradient_results()
+
     obj.increment_ctr()
 
     # determine function time
@@ -120,4 +146,4 @@ def run(obj, matlab_engine=None):
 
     obj.print_progress(func_time=func_time, read_from_file=skip_sim, )
 
-    return obj.get_seq_number(), res
+    return obj.get_seq_number(), res, gradient_results
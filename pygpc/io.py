@@ -2,7 +2,6 @@ import os
 import re
 import sys
 import h5py
-import uuid
 import pickle
 import inspect
 import logging
@@ -527,6 +526,14 @@ def read_sgpc_from_hdf5(fn_hdf5, folder, verbose=False):
                                                      verbose=verbose)
                     setattr(sgpc_list[i_gpc], key, problem)
 
+                elif "pygpc.OutputReduction" in dtype:
+                    output_reduction = getattr(import_module(".OutputReduction", package="pygpc"),
+                                               "OutputReduction")()
+                    for _key in sgpc_raw[key]:
+                        if _key != "attrs":
+                            setattr(output_reduction, _key, sgpc_raw[key][_key])
+                    setattr(sgpc_list[i_gpc], key, output_reduction)
+
                 else:
                     setattr(sgpc_list[i_gpc], key, sgpc_raw[key])
 
@@ -644,7 +651,7 @@ def read_grid_from_hdf5(fn_hdf5, folder, verbose=False):
             args_dict[a] = grid_dict[a]
 
     # regenerate unique grid IDs
-    args_dict["coords_id"] = [uuid.uuid4() for _ in range(grid_dict["n_grid"])]
+    args_dict["coords_id"] = module.get_grid_ids(grid_dict["n_grid"])
 
     if args_dict["coords_gradient"] is not None:
         args_dict["coords_gradient_id"] = args_dict["coords_id"]
@@ -1044,6 +1051,60 @@ def write_arr_to_hdf5(fn_hdf5, arr_name, data, overwrite_arr=True,verbose=False)
     return
 
 
+def write_matrix_to_hdf5(f, arr_name, data, n_rows_saved=0, n_cols_saved=0, n_rows_block=None):
+    """
+    Writes a 2D array into a chunked and resizable dataset of an opened .hdf5 file. If the leading block
+    data[:n_rows_saved, :n_cols_saved] is already saved in the dataset, it is neither read nor written again and only
+    the appended columns and rows are written. Otherwise, the dataset is (re-)created.
+    The data is written in blocks of rows, such that it can also be a memory mapped array or a h5py dataset.
+
+    Parameters
+    ----------
+    f : h5py.File object
+        Opened .hdf5 file
+    arr_name : str
+        Complete path in .hdf5 file with array name
+    data : ndarray of float [n_rows x n_cols]
+        Matrix to write
+    n_rows_saved : int, optional, default: 0
+        Number of leading rows of data already saved in the dataset
+    n_cols_saved : int, optional, default: 0
+        Number of leading columns of data already saved in the dataset
+    n_rows_block : int, optional, default: None
+        Number of rows written at once (default: blocks of 2^24 elements)
+    """
+    n_rows, n_cols = data.shape
+
+    if n_rows_block is None:
+        n_rows_block = max(2 ** 24 // max(n_cols, 1), 1)
+
+    # the saved block has to match the dataset, otherwise the dataset is created from scratch
+    if arr_name not in f or not isinstance(f[arr_name], h5py.Dataset) or f[arr_name].maxshape != (None, None) or \
+            f[arr_name].shape != (n_rows_saved, n_cols_saved) or n_rows_saved > n_rows or n_cols_saved > n_cols:
+        if arr_name in f:
+            del f[arr_name]
+
+        f.create_dataset(arr_name, (n_rows, n_cols),
+                         maxshape=(None, None),
+                         chunks=(min(max(n_rows, 1), 1024), min(max(n_cols, 1), 128)),
+                         dtype="float64")
+        n_rows_saved = 0
+        n_cols_saved = 0
+
+    else:
+        f[arr_name].resize((n_rows, n_cols))
+
+    # new columns of saved rows
+    if n_cols > n_cols_saved:
+        for i in range(0, n_rows_saved, n_rows_block):
+            f[arr_name][i:min(i + n_rows_block, n_rows_saved), n_cols_saved:] = \
+                data[i:min(i + n_rows_block, n_rows_saved), n_cols_saved:]
+
+    # new rows
+    for i in range(n_rows_saved, n_rows, n_rows_block):
+        f[arr_name][i:min(i + n_rows_block, n_rows), :] = data[i:min(i + n_rows_block, n_rows), :]
+
+
 def get_dtype(obj):
     """
     Get type and datatype of object
@@ -6,7 +6,7 @@ import warnings
 import sys
 import math
 import itertools
-import random
+import weakref
 from .Visualization import plot_beta_pdf_fit
 
 
@@ -116,8 +116,12 @@ def get_cartesian_product(array_list):
     >>> out
     """
 
-    cartesian_product = [element for element in itertools.product(*array_list)]
-    return np.array(cartesian_product)
+    array_list = [np.asarray(a).flatten() for a in array_list]
+
+    # same ordering as itertools.product (last array varies fastest)
+    cartesian_product = np.stack(np.meshgrid(*array_list, indexing="ij"), axis=-1).reshape(-1, len(array_list))
+
+    return cartesian_product
 
 
 def get_rotation_matrix(theta):
@@ -779,6 +783,207 @@ def ten2mat(ten):
     return mat
 
 
+class GrowableArray(object):
+    """
+    Array, which is extended along the first axis (rows) with amortized constant cost. The data is stored in a
+    buffer with spare capacity, which is enlarged geometrically if it is exhausted. The content is accessed by
+    zero-copy views [n_rows x ...] of the buffer. Appending writes behind the current view only, i.e. previously
+    returned views keep their content. The GrowableArray is kept alive by its current view and released with it.
+
+    Parameters
+    ----------
+    array : ndarray [n_rows x ...]
+        Initial content of the buffer (copied)
+    capacity : int, optional, default: None
+        Initial number of rows of the buffer (default: growth * n_rows)
+    growth : float, optional, default: 1.5
+        Factor the capacity is multiplied with if the buffer is exhausted
+
+    Attributes
+    ----------
+    buffer : ndarray [capacity x ...]
+        Buffer containing the data
+    n_rows : int
+        Number of rows in use
+    """
+    # GrowableArray objects by id of their current view (removed when the view is released)
+    _buffers = dict()
+
+    def __init__(self, array, capacity=None, growth=1.5):
+        """
+        Constructor; Initializes GrowableArray class
+        """
+        array = np.asarray(array)
+        self.growth = growth
+
+        if capacity is None:
+            capacity = int(np.ceil(growth * array.shape[0]))
+
+        self.buffer = np.empty((max(capacity, array.shape[0], 1),) + array.shape[1:], dtype=array.dtype)
+        self.buffer[:array.shape[0]] = array
+        self.n_rows = array.shape[0]
+        self._view = None
+        self._finalizer = None
+
+    def get_view(self):
+        """
+        Returns the current content of the buffer.
+
+        Returns
+        -------
+        view : ndarray [n_rows x ...]
+            View of the first n_rows rows of the buffer
+        """
+        if self._view is not None and self._view() is not None:
+            return self._view()
+
+        return self._set_view(self.n_rows)
+
+    def _set_view(self, n_rows):
+        """
+        Creates the view of the first n_rows rows of the buffer and registers it as current view.
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+
+        view = self.buffer[:n_rows]
+        self.n_rows = n_rows
+        self._view = weakref.ref(view)
+        GrowableArray._buffers[id(view)] = self
+        self._finalizer = weakref.finalize(view, GrowableArray._buffers.pop, id(view), None)
+
+        return view
+
+    @staticmethod
+    def get_buffer(array):
+        """
+        Returns the GrowableArray, whose current view is array.
+
+        Parameters
+        ----------
+        array : ndarray
+            Array
+
+        Returns
+        -------
+        buffer : GrowableArray object or None
+            GrowableArray object (None if array is not the current view of a GrowableArray)
+        """
+        buffer = GrowableArray._buffers.get(id(array))
+
+        if buffer is not None and buffer._view() is array:
+            return buffer
+
+        return None
+
+    def append(self, values):
+        """
+        Appends rows to the array.
+
+        Parameters
+        ----------
+        values : ndarray [n_rows_add x ...]
+            Rows to append
+
+        Returns
+        -------
+        view : ndarray [n_rows + n_rows_add x ...]
+            Current content of the buffer (view)
+        """
+        values = np.asarray(values)
+
+        if values.shape[1:] != self.buffer.shape[1:]:
+            raise ValueError("Shape of appended rows {} does not match array {}".format(values.shape[1:],
+                                                                                       self.buffer.shape[1:]))
+
+        n_rows = self.n_rows
+        n_rows_new = n_rows + values.shape[0]
+
+        if n_rows_new > self.buffer.shape[0]:
+            capacity = max(n_rows_new, int(np.ceil(self.growth * self.buffer.shape[0])))
+            buffer = np.empty((capacity,) + self.buffer.shape[1:], dtype=self.buffer.dtype)
+            buffer[:n_rows] = self.buffer[:n_rows]
+            self.buffer = buffer
+
+        self.buffer[n_rows:n_rows_new] = values
+
+        return self._set_view(n_rows_new)
+
+
+def append_rows(array, values):
+    """
+    Appends rows to an array (replaces np.vstack((array, values)) in iteratively growing arrays). If array is the
+    current view of a GrowableArray, the rows are written into its spare capacity without copying the old content.
+    Otherwise, array is copied into a new GrowableArray. The returned array is a view, which can be extended again.
+
+    Parameters
+    ----------
+    array : ndarray [n_rows x ...] or None
+        Array to extend
+    values : ndarray [n_rows_add x ...]
+        Rows to append
+
+    Returns
+    -------
+    array : ndarray [n_rows + n_rows_add x ...]
+        Extended array
+    """
+    if array is None:
+        return GrowableArray(values).get_view()
+
+    buffer = GrowableArray.get_buffer(array)
+
+    if buffer is None or not np.can_cast(np.asarray(values).dtype, buffer.buffer.dtype, casting="safe"):
+        buffer = GrowableArray(array.astype(np.result_type(array, values), copy=False))
+
+    return buffer.append(values)
+
+
+def get_id_index(ids_ref, ids):
+    """
+    Determines the positions of ids in ids_ref (replaces nested search loops). Integer ids are matched vectorised
+    by binary search on the sorted reference ids, all other hashable ids (e.g. UUID objects) by a hash map.
+
+    Parameters
+    ----------
+    ids_ref : ndarray or list [n_ref]
+        Unique reference ids
+    ids : ndarray or list [n_ids]
+        Ids to search in ids_ref
+
+    Returns
+    -------
+    idx : ndarray of int [n_ids]
+        Indices of ids in ids_ref (-1 if an id is not contained in ids_ref)
+    """
+    if len(ids) == 0:
+        return np.zeros(0, dtype=int)
+
+    if len(ids_ref) == 0:
+        return -np.ones(len(ids), dtype=int)
+
+    ids_ref_array = np.asarray(ids_ref)
+    ids_array = np.asarray(ids)
+
+    if ids_ref_array.dtype.kind in "iu" and ids_array.dtype.kind in "iu":
+        # ids are appended in increasing order and are only sorted explicitly if grid points were replaced
+        if np.all(ids_ref_array[1:] > ids_ref_array[:-1]):
+            sorter = np.arange(len(ids_ref_array))
+        else:
+            sorter = np.argsort(ids_ref_array, kind="stable")
+
+        pos = np.searchsorted(ids_ref_array, ids_array, sorter=sorter)
+        pos[pos == len(ids_ref_array)] = 0
+        idx = sorter[pos]
+        idx[ids_ref_array[idx] != ids_array] = -1
+
+        return idx
+
+    id_row = dict(zip(ids_ref, range(len(ids_ref))))
+
+    return np.array([id_row.get(_id, -1) for _id in ids], dtype=int)
+
+
 def list2dict(l):
     """
     Transform list of dicts with same keys to dict of list
@@ -900,10 +1105,16 @@ def get_indices_of_k_smallest(arr, k):
     return tuple(np.unravel_index(idx, arr.shape))
 
 
-def get_coords_discontinuity(classifier, x_min, x_max, n_coords_disc=10, border_sampling="structured"):
+def get_coords_discontinuity(classifier, x_min, x_max, n_coords_disc=10, border_sampling="structured",
+                             n_samples_border=1e4, tol=None):
     """
     Determine n_coords_disc grid points close to discontinuity
 
+    The domains are predicted on a structured grid. Neighboring grid points lying in different domains are
+    determined with a KD-tree. From their midpoints, n_coords_disc well spread points are selected by greedy
+    farthest point sampling and the location of the discontinuity is refined by bisection between the
+    corresponding pairs of neighboring points until their distance is smaller than tol.
+
     Parameters
     ----------
     classifier : Classifier object
@@ -916,75 +1127,75 @@ def get_coords_discontinuity(classifier, x_min, x_max, n_coords_disc=10, border_
         Number of grid points to determine close to discontinuity
     border_sampling : str, optional, default: "structured"
         Sampling method to determine location of discontinuity
-
+    n_samples_border : int, optional, default: 1e4
+        Total number of points of the structured grid used to detect the discontinuity (at least 2 per dimension)
+    tol : float, optional, default: None
+        Tolerance of the bisection (distance between the points in different domains),
+        if None, 1e-3 times the diameter of the search space
 
     Returns
     -------
-    coords_disc : ndarray of float [n_coords_disc]
+    coords_disc : ndarray of float [n_coords_disc x n_dim]
+        Grid points close to the discontinuity (less if fewer neighboring points in different domains are found)
     """
-
-    # if border_sampling == "random":
-    #     coords_border_det = grid_learn_cluster.coords
-    #     domains = model_kmeans.labels_
+    x_min = np.array(x_min, dtype=float)
+    x_max = np.array(x_max, dtype=float)
     dim = len(x_min)
 
+    if tol is None:
+        tol = 1e-3 * np.linalg.norm(x_max - x_min)
+
     # create tensored mesh to find discontinuity
     if border_sampling == "structured":
-        n_samples = int(1E4**(1./dim))
-        eval_str = "np.array(np.meshgrid("
-
-        for i in range(dim):
-            eval_str += "np.linspace(x_min[{}], x_max[{}], {})".format(i, i, n_samples)
+        n_samples = max(2, int(np.round(n_samples_border ** (1. / dim))))
+        dx = (x_max - x_min) / (n_samples - 1)
 
-            if i < dim-1:
-                eval_str += ", "
+        # do not scale dimensions with zero width (x_min == x_max)
+        dx[dx == 0] = 1.
 
-        eval_str += ")).T.reshape(-1, {})".format(dim)
+        coords_border_det = np.array(np.meshgrid(*[np.linspace(x_min[i], x_max[i], n_samples)
+                                                   for i in range(dim)], indexing="ij")).reshape(dim, -1).T
 
-        coords_border_det = eval(eval_str)
-
-        domains = classifier.predict(coords_border_det)
+        domains = np.asarray(classifier.predict(coords_border_det)).flatten()
     else:
         raise NotImplementedError("Please use valid border sampling method (""structured"")")
 
-    # determine mask of not equaling domain points
-    # dom_mat = np.tile(domains[:, np.newaxis], (1, domains.shape[0]))
-    dom_mat = np.broadcast_to(domains, (len(domains), len(domains))).T
-    mask = dom_mat != dom_mat.transpose()
-    mask = np.tril(mask) * False + np.triu(mask)
-
-    # determine distances between grid points in different domains
-    distance_matrix = np.ones(mask.shape) * np.nan
-    for i_c, c in enumerate(coords_border_det):
-        distance_matrix[i_c, mask[i_c, :]] = np.linalg.norm(coords_border_det[mask[i_c, :], :] - c, axis=1)
+    # determine direct neighbors in the structured grid (unit spacing in every dimension) lying in different domains
+    tree = scipy.spatial.cKDTree(coords_border_det / dx)
+    pairs = tree.query_pairs(r=1. + 1e-6, output_type="ndarray")
+    pairs = pairs[domains[pairs[:, 0]] != domains[pairs[:, 1]], :]
 
-    np.fill_diagonal(distance_matrix, np.nan)
+    if pairs.shape[0] == 0:
+        return np.zeros((0, dim))
 
-    # find n_smallest distances and determine midpoints between those points
-    n_smallest = 1000
-    idx = get_indices_of_k_smallest(distance_matrix, n_smallest)
-    coords_border = (coords_border_det[idx[0], :] + coords_border_det[idx[1], :]) / 2
+    coords_a = coords_border_det[pairs[:, 0], :]
+    coords_b = coords_border_det[pairs[:, 1], :]
+    coords_border = (coords_a + coords_b) / 2
 
-    # resample n_coords_disc equally distributed points from n_smallest points on discontinuity
-    n_reps = 1000  # number of repetitions
-    idx = np.zeros((n_coords_disc, n_reps))
-    distance_mean = np.zeros(n_reps)
+    # select n_coords_disc well spread points on the discontinuity by greedy farthest point sampling
+    n_coords_disc = min(n_coords_disc, coords_border.shape[0])
+    idx = np.zeros(n_coords_disc, dtype=int)
+    idx[0] = np.random.randint(coords_border.shape[0])
+    distance_min = np.linalg.norm(coords_border - coords_border[idx[0], :], axis=1)
 
-    # select n_coords_disc points randomly and determine average minimal distance between points
-    for i in range(n_reps):
-        # sample n_resample points from coords_border
-        idx[:, i] = random.sample(list(range(coords_border.shape[0])), n_coords_disc)
+    for i in range(1, n_coords_disc):
+        idx[i] = np.argmax(distance_min)
+        distance_min = np.minimum(distance_min, np.linalg.norm(coords_border - coords_border[idx[i], :], axis=1))
 
-        # determine all to all distances
-        distance_matrix_resample = np.ones((n_coords_disc, n_coords_disc)) * np.nan
+    # refine location of discontinuity by bisection between the neighboring points in different domains
+    coords_a = coords_a[idx, :]
+    coords_b = coords_b[idx, :]
+    domains_a = domains[pairs[idx, 0]]
 
-        for i_c, c in enumerate(coords_border[idx[:, i].astype(int), :]):
-            distance_matrix_resample[i_c, :] = np.linalg.norm(coords_border[idx[:, i].astype(int), :] - c, axis=1)
+    n_bisection = int(max(0, np.ceil(np.log2(np.max(np.linalg.norm(coords_b - coords_a, axis=1)) / tol))))
 
-        np.fill_diagonal(distance_matrix_resample, 1000)
-        distance_mean[i] = np.mean(np.min(distance_matrix_resample, axis=1))
+    for _ in range(n_bisection):
+        coords_mid = (coords_a + coords_b) / 2
+        mask = np.asarray(classifier.predict(coords_mid)).flatten() == domains_a
+        coords_a[mask, :] = coords_mid[mask, :]
+        coords_b[~mask, :] = coords_mid[~mask, :]
 
-    coords_disc = coords_border[idx[:, np.argmax(distance_mean)].astype(int), :]
+    coords_disc = (coords_a + coords_b) / 2
 
     return coords_disc
 
@@ -3,6 +3,7 @@ import numpy as np
 from .io import read_session
 from .Grid import *
 from .MEGPC import *
+from .OutputReduction import OutputReduction
 
 
 def get_sensitivities_hdf5(fn_gpc, output_idx=False, calc_sobol=True, calc_global_sens=False, calc_pdf=False,
@@ -62,6 +63,7 @@ def get_sensitivities_hdf5(fn_gpc, output_idx=False, calc_sobol=True, calc_globa
     pdf_y = None
     grid = None
     res = None
+    output_reduction = None
 
     with h5py.File(fn_gpc + ".hdf5", 'r') as f:
         # filename of associated gPC .pkl files
@@ -86,8 +88,15 @@ def get_sensitivities_hdf5(fn_gpc, output_idx=False, calc_sobol=True, calc_globa
         if not session.qoi_specific and not session.gpc_type == "megpc":
             coeffs = np.array(f['coeffs'][:])
 
+            # coeffs are given in the reduced output space
+            if "output_reduction" in f.keys():
+                output_reduction = OutputReduction().read(fname=fn_gpc + ".hdf5", folder="output_reduction")
+
             if not output_idx:
-                output_idx = np.arange(coeffs.shape[1])
+                if output_reduction is not None:
+                    output_idx = np.arange(output_reduction.n_out)
+                else:
+                    output_idx = np.arange(coeffs.shape[1])
 
         elif not session.qoi_specific and session.gpc_type == "megpc":
 
@@ -136,14 +145,24 @@ def get_sensitivities_hdf5(fn_gpc, output_idx=False, calc_sobol=True, calc_globa
     # start prostprocessing depending on gPC type
     if not session.qoi_specific and not session.gpc_type == "megpc":
 
-        coeffs = coeffs[:, output_idx]
+        if output_reduction is not None:
+            # determine mean and standard deviation from the reduced coefficients
+            mean = output_reduction.get_mean(coeffs=coeffs, output_idx=output_idx)
+            std = output_reduction.get_std(coeffs=coeffs, output_idx=output_idx)
+
+            # map coefficients of the considered QOIs back to the original output space
+            coeffs = output_reduction.get_coeffs(coeffs=coeffs, output_idx=output_idx)
+            session.gpc[0].output_reduction = None
+        else:
+            coeffs = coeffs[:, output_idx]
 
         if algorithm == "standard":
-            # determine mean
-            mean = session.gpc[0].get_mean(coeffs=coeffs)
+            if output_reduction is None:
+                # determine mean
+                mean = session.gpc[0].get_mean(coeffs=coeffs)
 
-            # determine standard deviation
-            std = session.gpc[0].get_std(coeffs=coeffs)
+                # determine standard deviation
+                std = session.gpc[0].get_std(coeffs=coeffs)
 
         elif algorithm == "sampling":
             # run model evaluations
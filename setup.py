@@ -52,8 +52,7 @@ setup(name='pygpc',
                                       'templates.*']),
       install_requires=['scipy>=1.0.0',
                         'numpy>=1.16.4',
-                        'fastmat>=0.1.2.post1',
-                        'scikit-learn>=0.19.1',
+                        'scikit-learn>=0.22.2',
                         'h5py>=2.9.0'],
       ext_modules=extensions,
       package_data={'pygpc': ['*.so', '*.dll', '*.dylib']},
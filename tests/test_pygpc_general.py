@@ -6,6 +6,7 @@ import h5py
 import sys
 import os
 import numpy as np
+from sklearn import linear_model
 from collections import OrderedDict
 
 # disable numpy warnings
@@ -26,6 +27,57 @@ except FileExistsError:
     pass
 
 
+class IshigamiGradient(pygpc.testfunctions.Ishigami):
+    """
+    Ishigami function, which additionally returns the analytical gradient w.r.t. x1, x2 and x3
+    """
+
+    def simulate(self, process_id=None, matlab_engine=None):
+        y = super(IshigamiGradient, self).simulate(process_id=process_id, matlab_engine=matlab_engine)
+
+        x1 = self.p["x1"].flatten()
+        x2 = self.p["x2"].flatten()
+        x3 = self.p["x3"].flatten()
+        a = self.p["a"].flatten()
+        b = self.p["b"].flatten()
+
+        # gradient [n_grid x n_out x dim]
+        gradient = np.zeros((y.shape[0], 1, 3))
+        gradient[:, 0, 0] = np.cos(x1) * (1 + b * x3 ** 4)
+        gradient[:, 0, 1] = 2 * a * np.sin(x2) * np.cos(x2)
+        gradient[:, 0, 2] = 4 * b * x3 ** 3 * np.sin(x1)
+
+        return y, None, gradient
+
+
+class IshigamiField(pygpc.testfunctions.Ishigami):
+    """
+    Ishigami function evaluated for 50 values of the parameter "a" in [1, 10] (field output)
+    """
+
+    def simulate(self, process_id=None, matlab_engine=None):
+        x1 = np.array(self.p["x1"]).flatten()
+        x2 = np.array(self.p["x2"]).flatten()
+        x3 = np.array(self.p["x3"]).flatten()
+        a = np.linspace(1, 10, 50)
+
+        y = np.sin(x1)[:, np.newaxis] + a[np.newaxis, :] * np.sin(x2)[:, np.newaxis] ** 2 + \
+            0.1 * x3[:, np.newaxis] ** 4 * np.sin(x1)[:, np.newaxis]
+
+        return y
+
+
+class IshigamiAdditionalData(pygpc.testfunctions.Ishigami):
+    """
+    Ishigami function, which additionally returns the values of x1 as additional data
+    """
+
+    def simulate(self, process_id=None, matlab_engine=None):
+        y = super(IshigamiAdditionalData, self).simulate(process_id=process_id, matlab_engine=matlab_engine)
+
+        return y, {"additional_data/x1": list(np.array(self.p["x1"]).flatten())}
+
+
 class TestPygpcMethods(unittest.TestCase):
 
     # setup method called before every test-case
@@ -1614,6 +1666,2144 @@ class TestPygpcMethods(unittest.TestCase):
 
         print("done!\n")
 
+    def test_018_pruned_basis(self):
+        """
+        Test evaluation of sparse gPC with pruned basis
+        """
+
+        global folder
+        test_name = 'pygpc_test_018_pruned_basis'
+        print(test_name)
+
+        # define model
+        model = pygpc.testfunctions.Ishigami()
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["x3"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["a"] = 7.
+        parameters["b"] = 0.1
+        problem = pygpc.Problem(model, parameters)
+
+        # gPC options
+        options = dict()
+        options["method"] = "reg"
+        options["solver"] = "LarsLasso"
+        options["settings"] = {"alpha": 1e-3}
+        options["error_type"] = "nrmsd"
+        options["n_cpu"] = 0
+        options["fn_results"] = None
+        options["gradient_enhanced"] = False
+
+        grid = pygpc.Random(parameters_random=problem.parameters_random,
+                            n_grid=200,
+                            seed=1)
+
+        x = pygpc.Random(parameters_random=problem.parameters_random,
+                         n_grid=1000,
+                         seed=2).coords_norm
+
+        for b in ["python", "cpu", "omp"]:
+            options["backend"] = b
+
+            gpc = pygpc.Reg(problem=problem,
+                            order=[8, 8, 8],
+                            order_max=8,
+                            order_max_norm=1,
+                            interaction_order=3,
+                            interaction_order_current=3,
+                            options=options,
+                            validation=None)
+            gpc.grid = grid
+            gpc.init_gpc_matrix()
+
+            com = pygpc.Computation(n_cpu=0)
+            results = com.run(model=problem.model, problem=problem, coords=grid.coords)
+            results = np.hstack((results, grid.coords[:, 0][:, np.newaxis]))
+            coeffs = gpc.solve(results=results, solver=options["solver"], settings=options["settings"])
+
+            pce_full = gpc.get_approximation(coeffs, x)
+            n_active = gpc.prune_basis(coeffs)
+            pce_pruned = gpc.get_approximation(coeffs, x)
+            pce_pruned_0 = gpc.get_approximation(coeffs, x, output_idx=0)
+
+            self.expect_true(n_active < len(gpc.basis.b), msg="No basis functions were pruned ({})".format(b))
+            self.expect_isclose(pce_full, pce_pruned, atol=1e-8,
+                                msg="Pruned gPC approximation differs from full approximation ({})".format(b))
+            self.expect_isclose(pce_full[:, 0][:, np.newaxis], pce_pruned_0, atol=1e-8,
+                                msg="Pruned gPC approximation of output 0 differs ({})".format(b))
+
+            # dense coefficients are evaluated with the full basis again
+            coeffs_dense = np.ones(coeffs.shape)
+            self.expect_true(gpc.get_active_basis_idx(coeffs_dense) is None,
+                             msg="Dense coefficients are evaluated with pruned basis ({})".format(b))
+
+        print("done!\n")
+
+    def test_019_output_reduction(self):
+        """
+        Test gPC of compressed output space (field QOIs)
+        """
+
+        global folder
+        test_name = 'pygpc_test_019_output_reduction'
+        print(test_name)
+
+        # define model
+        model = pygpc.testfunctions.Ishigami()
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["x3"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["a"] = 7.
+        parameters["b"] = 0.1
+        problem = pygpc.Problem(model, parameters)
+
+        # gPC options
+        options = dict()
+        options["method"] = "reg"
+        options["solver"] = "Moore-Penrose"
+        options["settings"] = None
+        options["error_type"] = "loocv"
+        options["n_cpu"] = 0
+        options["fn_results"] = None
+        options["gradient_enhanced"] = False
+        options["backend"] = "python"
+
+        gpc = pygpc.Reg(problem=problem,
+                        order=[6, 6, 6],
+                        order_max=6,
+                        order_max_norm=1,
+                        interaction_order=3,
+                        interaction_order_current=3,
+                        options=options,
+                        validation=None)
+
+        gpc.grid = pygpc.Random(parameters_random=problem.parameters_random,
+                                n_grid=300,
+                                seed=1)
+        gpc.init_gpc_matrix()
+
+        # field output: Ishigami function for 1000 values of parameter "a"
+        x = gpc.grid.coords
+        a = np.linspace(1, 10, 1000)
+        results = np.sin(x[:, 0])[:, np.newaxis] + a[np.newaxis, :] * np.sin(x[:, 1])[:, np.newaxis] ** 2 + \
+                  0.1 * x[:, 2][:, np.newaxis] ** 4 * np.sin(x[:, 0])[:, np.newaxis]
+
+        coeffs = gpc.solve(results=results, solver="Moore-Penrose")
+        sobol, _, _ = gpc.get_sobol_indices(coeffs=coeffs, algorithm="standard")
+
+        x_test = pygpc.Random(parameters_random=problem.parameters_random,
+                              n_grid=500,
+                              seed=2).coords_norm
+
+        pce = gpc.get_approximation(coeffs=coeffs, x=x_test)
+        pce_idx = gpc.get_approximation(coeffs=coeffs, x=x_test, output_idx=[5, 500])
+        mean = gpc.get_mean(coeffs=coeffs)
+        std = gpc.get_std(coeffs=coeffs)
+
+        # reduced gPC
+        gpc.output_reduction = pygpc.OutputReduction(lambda_eps=0.9999)
+        gpc.output_reduction.fit(results[:150, :])
+        gpc.output_reduction.update(results[150:, :])
+
+        coeffs_reduced = gpc.solve(results=gpc.output_reduction.transform(results), solver="Moore-Penrose")
+
+        pce_reduced = gpc.get_approximation(coeffs=coeffs_reduced, x=x_test)
+        sobol_reduced, _, _ = gpc.get_sobol_indices(coeffs=coeffs_reduced, algorithm="standard")
+
+        self.expect_true(coeffs_reduced.shape[1] < 10,
+                         msg="Output space was not compressed ({} modes)".format(coeffs_reduced.shape[1]))
+        self.expect_isclose(pce, pce_reduced, atol=1e-6,
+                            msg="gPC approximation of reduced output space differs from full approximation")
+        self.expect_isclose(pce_idx,
+                            gpc.get_approximation(coeffs=coeffs_reduced, x=x_test, output_idx=[5, 500]), atol=1e-6,
+                            msg="gPC approximation of reduced output space differs for selected output quantities")
+        self.expect_isclose(mean, gpc.get_mean(coeffs=coeffs_reduced),
+                            atol=1e-6, msg="Mean of reduced output space differs")
+        self.expect_isclose(std, gpc.get_std(coeffs=coeffs_reduced),
+                            atol=1e-6, msg="Standard deviation of reduced output space differs")
+        self.expect_isclose(sobol, sobol_reduced, atol=1e-6,
+                            msg="Sobol indices of reduced output space differ")
+
+        # the output space is tracked explicitly and not inferred from the shape of the coefficients
+        try:
+            gpc.get_mean(coeffs=coeffs)
+            raised = False
+        except AssertionError:
+            raised = True
+
+        self.expect_true(raised, msg="Coefficients of the original output space were not rejected")
+
+        # output quantities with NaN results are excluded from the decomposition
+        results_nan = results.copy()
+        results_nan[10, 3] = np.nan
+        results_nan[200, 7] = np.nan
+
+        output_reduction = pygpc.OutputReduction(lambda_eps=0.9999)
+        output_reduction.fit(results_nan[:150, :])
+        output_reduction.update(results_nan[150:, :])
+        results_nan_reduced = output_reduction.transform(results_nan)
+        mask = np.ones(results.shape[1], dtype=bool)
+        mask[[3, 7]] = False
+
+        self.expect_true(not np.isnan(results_nan_reduced).any(),
+                         msg="NaN results were not excluded from the output reduction")
+        self.expect_true(np.isnan(output_reduction.mean[[3, 7]]).all(),
+                         msg="Output quantities with NaN results were not masked")
+        self.expect_isclose(output_reduction.inverse_transform(results_nan_reduced)[:, mask], results[:, mask],
+                            atol=1e-8, msg="Output reduction with NaN results does not reconstruct the results")
+
+        print("done!\n")
+
+    def test_020_early_stopping(self):
+        """
+        Test streaming coefficient updates (recursive least squares) and early stopping of RegAdaptive
+        """
+
+        global folder
+        test_name = 'pygpc_test_020_early_stopping'
+        print(test_name)
+
+        # define model
+        model = pygpc.testfunctions.Ishigami()
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1., 1.], pdf_limits=[-np.pi, np.pi])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1., 1.], pdf_limits=[-np.pi, np.pi])
+        parameters["x3"] = 0.
+        parameters["a"] = 7.
+        parameters["b"] = 0.1
+        problem = pygpc.Problem(model, parameters)
+
+        # gPC options
+        options = dict()
+        options["order_start"] = 2
+        options["order_end"] = 15
+        options["solver"] = "Moore-Penrose"
+        options["settings"] = None
+        options["interaction_order"] = 2
+        options["order_max_norm"] = 1.
+        options["n_cpu"] = 1
+        options["adaptive_sampling"] = False
+        options["matrix_ratio"] = 4
+        options["error_type"] = "loocv"
+        options["eps"] = 0.05
+        options["early_stopping"] = True
+        options["fn_results"] = None
+        options["seed"] = 1
+
+        # run gPC algorithm
+        algorithm = pygpc.RegAdaptive(problem=problem, options=options)
+        gpc, coeffs, results = algorithm.run()
+
+        self.expect_true(gpc.grid.n_grid == results.shape[0] and gpc.grid.n_grid == len(gpc.grid.coords_id),
+                         msg="Grid does not match the performed model evaluations")
+
+        # cancel model evaluations after 5 simulations
+        for n_cpu in [0, 1]:
+            com = pygpc.Computation(n_cpu=n_cpu)
+            res = com.run(model=model,
+                          problem=problem,
+                          coords=gpc.grid.coords,
+                          coords_norm=gpc.grid.coords_norm,
+                          callback=lambda r: r.shape[0] >= 5,
+                          n_block=1)
+            com.close()
+
+            self.expect_true(res.shape[0] == 5 and np.max(com.i_grid) == 5,
+                             msg="Model evaluations were not cancelled (n_cpu={})".format(n_cpu))
+            self.expect_isclose(res, results[:5, :], atol=1e-12,
+                                msg="Results of streamed model evaluations differ (n_cpu={})".format(n_cpu))
+
+        # recursive least squares vs. least squares solution
+        gpc.init_gpc_matrix()
+        n_init = 2 * gpc.basis.n_basis
+        coeffs_rls = gpc.init_rls(matrix=gpc.gpc_matrix[:n_init, :], results=results[:n_init, :])
+
+        for i_start in range(n_init, gpc.grid.n_grid, 10):
+            coeffs_rls = gpc.update_rls(matrix=gpc.gpc_matrix[i_start:(i_start + 10), :],
+                                        results=results[i_start:(i_start + 10), :],
+                                        coeffs=coeffs_rls)
+
+        coeffs_ls = gpc.solve(results=results, solver="Moore-Penrose")
+
+        self.expect_isclose(coeffs_rls, coeffs_ls, atol=1e-8,
+                            msg="Recursive least squares coefficients differ from least squares solution")
+
+        print("done!\n")
+
+    def test_021_model_gradients(self):
+        """
+        Test gradient enhanced gPC using the gradient provided by the model
+        """
+
+        global folder
+        test_name = 'pygpc_test_021_model_gradients'
+        print(test_name)
+
+        # define model
+        model = IshigamiGradient()
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1., 1.], pdf_limits=[-np.pi, np.pi])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1., 1.], pdf_limits=[-np.pi, np.pi])
+        parameters["x3"] = pygpc.Beta(pdf_shape=[1., 1.], pdf_limits=[-np.pi, np.pi])
+        parameters["a"] = 7.
+        parameters["b"] = 0.1
+        problem = pygpc.Problem(model, parameters)
+
+        # gPC options
+        options = dict()
+        options["method"] = "reg"
+        options["solver"] = "Moore-Penrose"
+        options["settings"] = None
+        options["order"] = [9, 9, 9]
+        options["order_max"] = 9
+        options["interaction_order"] = 2
+        options["error_type"] = "nrmsd"
+        options["n_samples_validation"] = 1e3
+        options["n_cpu"] = 0
+        options["fn_results"] = None
+        options["gradient_enhanced"] = True
+        options["gradient_calculation"] = "model"
+
+        n_coeffs = pygpc.get_num_coeffs_sparse(order_dim_max=options["order"],
+                                               order_glob_max=options["order_max"],
+                                               order_inter_max=options["interaction_order"],
+                                               dim=problem.dim)
+
+        grid = pygpc.Random(parameters_random=problem.parameters_random,
+                            n_grid=int(np.ceil(0.5 * n_coeffs)),
+                            seed=1)
+
+        # run gPC algorithm (underdetermined without gradient information)
+        algorithm = pygpc.Static(problem=problem, options=options, grid=grid)
+        gpc, coeffs, results = algorithm.run()
+
+        self.expect_true(gpc.error[-1] < 1e-2,
+                         msg="gPC using the gradient of the model is not accurate (nrmsd={})".format(gpc.error[-1]))
+
+        # compare to finite differences and test reading of gradients from results file
+        for n_cpu in [0, 1]:
+            fn_results = os.path.join(folder, test_name + "_{}".format(n_cpu))
+
+            if os.path.exists(fn_results + ".hdf5"):
+                os.remove(fn_results + ".hdf5")
+
+            gradient = []
+
+            for i_run in range(2):
+                com = pygpc.Computation(n_cpu=n_cpu)
+                res = com.run(model=model, problem=problem, coords=grid.coords, coords_norm=grid.coords_norm,
+                              fn_results=fn_results)
+                gradient.append(com.gradient_results)
+                com.close()
+
+            grid.create_gradient_grid(delta=1e-6)
+            gradient_fd, _ = pygpc.get_gradient(model=model, problem=problem, grid=grid, results=res,
+                                                com=pygpc.Computation(n_cpu=0), method="FD_fwd", dx=1e-6)
+
+            self.expect_isclose(gradient[0], gradient_fd, atol=1e-4,
+                                msg="Gradient of the model differs from finite differences (n_cpu={})".format(n_cpu))
+            self.expect_isclose(gradient[0], gradient[1], atol=1e-12,
+                                msg="Gradient read from results file differs (n_cpu={})".format(n_cpu))
+
+        print("done!\n")
+
+    def test_022_quad_adaptive(self):
+        """
+        Algorithm: QuadAdaptive
+        Method: Quadrature
+        Solver: NumInt
+        Grid: SparseGrid (dimension adaptive)
+        """
+        global folder
+        test_name = 'pygpc_test_022_quad_adaptive'
+        print(test_name)
+
+        # define model
+        model = pygpc.testfunctions.GenzOscillatory()
+
+        # define problem (anisotropic by the different parameter ranges)
+        pdf_limits = [1., 0.5, 0.1]
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1., 1.], pdf_limits=[0., pdf_limits[0]])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1., 1.], pdf_limits=[0., pdf_limits[1]])
+        parameters["x3"] = pygpc.Beta(pdf_shape=[1., 1.], pdf_limits=[0., pdf_limits[2]])
+        problem = pygpc.Problem(model, parameters)
+
+        # analytical mean: E[cos(pi + sum(5 * x_i))]
+        mean = -np.real(np.prod([(np.exp(5j * l) - 1) / (5j * l) for l in pdf_limits]))
+
+        # gPC options
+        options = dict()
+        options["grid_type"] = "clenshaw_curtis"
+        options["level_max"] = 6
+        options["n_grid_max"] = 2000
+        options["eps"] = 1e-6
+        options["error_type"] = "nrmsd"
+        options["n_samples_validation"] = 1e3
+        options["n_cpu"] = 0
+        options["fn_results"] = os.path.join(folder, test_name)
+        options["backend"] = "omp"
+
+        # run gPC algorithm
+        algorithm = pygpc.QuadAdaptive(problem=problem, options=options)
+        gpc, coeffs, results = algorithm.run()
+
+        self.expect_isclose(coeffs[0, 0], mean, atol=1e-6,
+                            msg="Mean of the Genz function is not integrated accurately ({})".format(coeffs[0, 0]))
+        self.expect_true(gpc.error[-1] < 1e-2,
+                         msg="Adaptive quadrature gPC is not accurate (nrmsd={})".format(gpc.error[-1]))
+
+        # each node is simulated only once and the least sensitive parameter is refined the least
+        self.expect_true(gpc.order[2] < gpc.order[0],
+                         msg="Adaptive sparse grid is not anisotropic (order={})".format(gpc.order))
+        self.expect_true(np.unique(gpc.grid.coords_norm, axis=0).shape[0] == results.shape[0],
+                         msg="Nodes of the adaptive sparse grid were simulated several times")
+
+        print("done!\n")
+
+    def test_023_sparse_solvers(self):
+        """
+        Test batch OMP and LarsLasso solvers on a shared Gram matrix (several outputs and sparsity levels)
+        """
+        global folder
+        test_name = 'pygpc_test_023_sparse_solvers'
+        print(test_name)
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-1, 1])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-1, 1])
+        parameters["x3"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-1, 1])
+        problem = pygpc.Problem(pygpc.testfunctions.Ishigami(), parameters)
+
+        # gPC options
+        options = dict()
+        options["method"] = "reg"
+        options["solver"] = "OMP"
+        options["settings"] = {"n_coeffs_sparse": [3, 6, 12]}
+        options["n_cpu"] = 0
+        options["fn_results"] = None
+        options["gradient_enhanced"] = False
+
+        gpc = pygpc.Reg(problem=problem,
+                        order=[6, 6, 6],
+                        order_max=6,
+                        order_max_norm=1,
+                        interaction_order=3,
+                        interaction_order_current=3,
+                        options=options,
+                        validation=None)
+        gpc.grid = pygpc.Random(parameters_random=problem.parameters_random, n_grid=80, seed=1)
+        gpc.init_gpc_matrix()
+
+        # outputs with 6 random non-zero coefficients each
+        np.random.seed(1)
+        coeffs_true = np.zeros((gpc.basis.n_basis, 50))
+
+        for i_out in range(coeffs_true.shape[1]):
+            coeffs_true[np.random.permutation(gpc.basis.n_basis)[:6], i_out] = np.random.randn(6)
+
+        results = np.matmul(gpc.gpc_matrix, coeffs_true)
+
+        # sparsity levels are read from the same OMP path
+        coeffs = gpc.solve(results=results, solver="OMP", settings=options["settings"])
+
+        self.expect_true(len(coeffs) == 3, msg="OMP did not return one solution per sparsity level")
+        self.expect_true(np.max(np.sum(coeffs[0] != 0, axis=0)) <= 3,
+                         msg="OMP solution has more non-zero coefficients than requested")
+        self.expect_isclose(coeffs[1], coeffs_true, atol=1e-8, msg="OMP did not recover the sparse coefficients")
+        self.expect_isclose(coeffs[2], coeffs_true, atol=1e-8, msg="OMP did not recover the sparse coefficients")
+
+        # Gram matrix is updated incrementally if grid points are added
+        gpc.grid.extend_random_grid(n_grid_new=100, seed=2)
+        gpc.update_gpc_matrix()
+        results = np.matmul(gpc.gpc_matrix, coeffs_true)
+        coeffs = gpc.solve(results=results, solver="OMP", settings={"n_coeffs_sparse": 6, "n_cpu": 2})
+
+        self.expect_true(gpc.gram_matrix.n_full == 1, msg="Gram matrix was not updated incrementally")
+        self.expect_isclose(gpc.gram_matrix.gram, np.matmul(gpc.gpc_matrix.T, gpc.gpc_matrix), atol=1e-10,
+                            msg="Incrementally updated Gram matrix is not correct")
+        self.expect_isclose(coeffs, coeffs_true, atol=1e-8, msg="OMP did not recover the sparse coefficients")
+
+        # the Gram matrix is identified by the IDs of the grid points and basis functions, changed results are detected
+        gram, corr = gpc.get_gram_matrix(matrix=gpc.gpc_matrix, results=2 * results)
+
+        self.expect_true(gpc.gram_matrix.n_full == 1, msg="Gram matrix was recomputed for the same gPC matrix")
+        self.expect_isclose(corr, np.matmul(gpc.gpc_matrix.T, 2 * results), atol=1e-10,
+                            msg="Correlation vectors were not updated for changed results")
+
+        # LarsLasso on the Gram matrix is identical to sklearn's LassoLars
+        results = results + 1e-2 * np.random.randn(*results.shape)
+        coeffs = gpc.solve(results=results, solver="LarsLasso", settings={"alpha": [1e-3, 1e-2]})
+        reg = linear_model.LassoLars(alpha=1e-2, fit_intercept=False).fit(gpc.gpc_matrix, results)
+
+        self.expect_isclose(coeffs[1], reg.coef_.T, atol=1e-8, msg="LarsLasso differs from sklearn's LassoLars")
+        self.expect_true(np.sum(coeffs[0] != 0) > np.sum(coeffs[1] != 0),
+                         msg="LarsLasso solutions of different regularization parameters are not read from the path")
+
+        print("done!\n")
+
+    def test_024_sparse_solvers_cv(self):
+        """
+        Test OMP-CV and LARS-CV solvers (sparsity selected by cross validation along the path)
+        """
+        global folder
+        test_name = 'pygpc_test_024_sparse_solvers_cv'
+        print(test_name)
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-1, 1])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-1, 1])
+        parameters["x3"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-1, 1])
+        problem = pygpc.Problem(pygpc.testfunctions.Ishigami(), parameters)
+
+        # gPC options
+        options = dict()
+        options["method"] = "reg"
+        options["solver"] = "OMP-CV"
+        options["settings"] = {"n_coeffs_sparse": 30}
+        options["n_cpu"] = 0
+        options["fn_results"] = None
+        options["gradient_enhanced"] = False
+
+        gpc = pygpc.Reg(problem=problem,
+                        order=[6, 6, 6],
+                        order_max=6,
+                        order_max_norm=1,
+                        interaction_order=3,
+                        interaction_order_current=3,
+                        options=options,
+                        validation=None)
+        gpc.grid = pygpc.Random(parameters_random=problem.parameters_random, n_grid=80, seed=1)
+        gpc.init_gpc_matrix()
+
+        # noisy outputs with 6 random non-zero coefficients each
+        np.random.seed(1)
+        coeffs_true = np.zeros((gpc.basis.n_basis, 20))
+
+        for i_out in range(coeffs_true.shape[1]):
+            coeffs_true[np.random.permutation(gpc.basis.n_basis)[:6], i_out] = np.random.randn(6)
+
+        results = np.matmul(gpc.gpc_matrix, coeffs_true) + 1e-3 * np.random.randn(80, coeffs_true.shape[1])
+
+        for solver in ["OMP-CV", "LARS-CV"]:
+            for n_folds in [None, 5]:
+                settings = {"n_coeffs_sparse": 30, "n_folds": n_folds}
+                coeffs = gpc.solve(results=results, solver=solver, settings=settings)
+
+                self.expect_isclose(coeffs, coeffs_true, atol=1e-2,
+                                    msg="{} ({} folds) did not recover the sparse coefficients".format(solver,
+                                                                                                     n_folds))
+                self.expect_true(np.all(gpc.n_coeffs_cv >= 6) and np.all(gpc.n_coeffs_cv <= 30),
+                                 msg="{} selected wrong number of coefficients".format(solver))
+
+                # cross validation error of the selected solution of the first output (explicit refitting)
+                idx = np.where(coeffs[:, 0] != 0)[0]
+                folds = [np.array([i]) for i in range(80)] if n_folds is None else \
+                    [np.arange(i, 80, n_folds) for i in range(n_folds)]
+                error = 0.
+
+                for f in folds:
+                    mask = np.ones(80, dtype=bool)
+                    mask[f] = False
+                    c = np.linalg.lstsq(gpc.gpc_matrix[mask, :][:, idx], results[mask, 0], rcond=None)[0]
+                    error += np.sum((results[f, 0] - np.matmul(gpc.gpc_matrix[f, :][:, idx], c)) ** 2)
+
+                error = error / 80 / np.var(results[:, 0], ddof=1)
+
+                self.expect_isclose(gpc.error_cv[0], error, atol=1e-12,
+                                    msg="Cross validation error of {} is not correct".format(solver))
+
+        print("done!\n")
+
+    def test_025_tsqr_solver(self):
+        """
+        Test out-of-core least squares solver (TSQR of row blocks, gradient enhanced and hdf5 gPC matrix)
+        """
+        global folder
+        test_name = 'pygpc_test_025_tsqr_solver'
+        print(test_name)
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["x3"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        problem = pygpc.Problem(pygpc.testfunctions.Ishigami(), parameters)
+
+        # gPC options
+        options = dict()
+        options["method"] = "reg"
+        options["solver"] = "TSQR"
+        options["settings"] = {"n_rows_block": 17}
+        options["fn_results"] = os.path.join(folder, test_name)
+        options["gradient_enhanced"] = True
+
+        gpc = pygpc.Reg(problem=problem,
+                        order=[5, 5, 5],
+                        order_max=5,
+                        order_max_norm=1,
+                        interaction_order=3,
+                        interaction_order_current=3,
+                        options=options,
+                        validation=None)
+        gpc.grid = pygpc.Random(parameters_random=problem.parameters_random, n_grid=100, seed=1)
+        gpc.grid.create_gradient_grid()
+        gpc.gradient_idx = np.arange(40)
+        gpc.init_gpc_matrix()
+
+        np.random.seed(1)
+        results = np.random.randn(100, 4)
+        gradient_results = np.random.randn(40, 4, 3)
+
+        # gradient enhanced solution (gPC matrix and gPC gradient matrix are read blockwise)
+        coeffs_mp = gpc.solve(results=results, gradient_results=gradient_results, solver="Moore-Penrose")
+        coeffs = gpc.solve(results=results, gradient_results=gradient_results, solver="TSQR",
+                           settings=options["settings"])
+
+        self.expect_isclose(coeffs, coeffs_mp, atol=1e-12,
+                            msg="TSQR solution differs from Moore-Penrose solution (gradient enhanced)")
+
+        # gPC matrix stored in .hdf5 file, leave-one-out errors (explicit refitting)
+        gpc.save_gpc_matrix_hdf5()
+
+        with h5py.File(options["fn_results"] + ".hdf5", "r") as f:
+            coeffs = gpc.solve(results=results, solver="TSQR", matrix=f["gpc_matrix"], settings={"n_rows_block": 13})
+
+        self.expect_isclose(coeffs, np.matmul(np.linalg.pinv(gpc.gpc_matrix), results), atol=1e-12,
+                            msg="TSQR solution of hdf5 gPC matrix differs from Moore-Penrose solution")
+
+        error = np.zeros(results.shape[1])
+
+        for i in range(100):
+            mask = np.ones(100, dtype=bool)
+            mask[i] = False
+            c = np.linalg.lstsq(gpc.gpc_matrix[mask, :], results[mask, :], rcond=None)[0]
+            error += (results[i, :] - np.matmul(gpc.gpc_matrix[i, :], c)) ** 2
+
+        error = error / 100 / np.var(results, axis=0, ddof=1)
+
+        self.expect_isclose(gpc.error_cv, error, atol=1e-10, msg="Leave-one-out error of TSQR is not correct")
+
+        print("done!\n")
+
+    def test_026_gpc_matrix_hdf5(self):
+        """
+        Test append-only saving of the gPC matrix in .hdf5 files (appended rows/columns, rebuilt matrices)
+        """
+        global folder
+        test_name = 'pygpc_test_026_gpc_matrix_hdf5'
+        print(test_name)
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-1, 1])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-1, 1])
+        problem = pygpc.Problem(pygpc.testfunctions.GenzOscillatory(), parameters)
+
+        # gPC options
+        options = dict()
+        options["method"] = "reg"
+        options["solver"] = "Moore-Penrose"
+        options["settings"] = None
+        options["fn_results"] = os.path.join(folder, test_name)
+        options["gradient_enhanced"] = False
+
+        gpc = pygpc.Reg(problem=problem,
+                        order=[4, 4],
+                        order_max=4,
+                        order_max_norm=1,
+                        interaction_order=2,
+                        interaction_order_current=2,
+                        options=options,
+                        validation=None)
+        gpc.grid = pygpc.Random(parameters_random=problem.parameters_random, n_grid=30, seed=1)
+        gpc.init_gpc_matrix()
+
+        fn_hdf5 = options["fn_results"] + ".hdf5"
+
+        if os.path.exists(fn_hdf5):
+            os.remove(fn_hdf5)
+
+        gpc.save_gpc_matrix_hdf5()
+
+        # mark a saved element to check that the saved block is not written again when rows are appended
+        with h5py.File(fn_hdf5, "a") as f:
+            f["gpc_matrix"][0, 0] = -123.
+
+        gpc.grid.extend_random_grid(n_grid_new=50, seed=2)
+        gpc.update_gpc_matrix()
+        gpc.save_gpc_matrix_hdf5()
+
+        with h5py.File(fn_hdf5, "r") as f:
+            gpc_matrix_hdf5 = f["gpc_matrix"][:]
+
+        self.expect_equal(gpc_matrix_hdf5.shape, gpc.gpc_matrix.shape, msg="Wrong shape of appended gPC matrix")
+        self.expect_isclose(gpc_matrix_hdf5[0, 0], -123., msg="Saved block of the gPC matrix was written again")
+        self.expect_isclose(gpc_matrix_hdf5.flatten()[1:], gpc.gpc_matrix.flatten()[1:], atol=1e-14,
+                            msg="Appended rows of the gPC matrix are not correct")
+
+        # rebuilt matrix with the same ids (new projection of the grid) has to be written completely
+        gpc.save_gpc_matrix_hdf5()
+        p_matrix = np.array([[np.cos(0.3), np.sin(0.3)], [-np.sin(0.3), np.cos(0.3)]])
+        gpc.grid = gpc.grid.get_projected_grid(p_matrix, np.ones(2))
+        gpc.init_gpc_matrix()
+        gpc.save_gpc_matrix_hdf5()
+
+        with h5py.File(fn_hdf5, "r") as f:
+            gpc_matrix_hdf5 = f["gpc_matrix"][:]
+
+        self.expect_isclose(gpc_matrix_hdf5, gpc.gpc_matrix, atol=1e-14,
+                            msg="Rebuilt gPC matrix was not saved completely")
+
+        print("done!\n")
+
+    def test_027_validation_matrix_cache(self):
+        """
+        Test cached gPC matrix of the validation set (column-wise extension, projection change, blockwise evaluation)
+        """
+        global folder
+        test_name = 'pygpc_test_027_validation_matrix_cache'
+        print(test_name)
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-1, 1])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-1, 1])
+        problem = pygpc.Problem(pygpc.testfunctions.GenzOscillatory(), parameters)
+
+        # gPC options
+        options = dict()
+        options["method"] = "reg"
+        options["solver"] = "Moore-Penrose"
+        options["settings"] = None
+        options["fn_results"] = None
+        options["gradient_enhanced"] = False
+
+        validation = pygpc.ValidationSet(grid=pygpc.Random(parameters_random=problem.parameters_random,
+                                                           n_grid=200, seed=2))
+
+        gpc = pygpc.Reg(problem=problem,
+                        order=[3, 3],
+                        order_max=3,
+                        order_max_norm=1,
+                        interaction_order=2,
+                        interaction_order_current=2,
+                        options=options,
+                        validation=validation)
+
+        def get_reference(coeffs):
+            return gpc.get_approximation(coeffs, np.array(validation.grid.coords_norm, copy=True))
+
+        np.random.seed(1)
+        coeffs = np.random.randn(gpc.basis.n_basis, 3)
+        self.expect_isclose(gpc.get_approximation_validation(coeffs), get_reference(coeffs), atol=1e-12,
+                            msg="Cached validation gPC matrix is not correct")
+
+        # extend basis: only the new columns are added to the cache
+        validation_matrix = gpc.validation_matrix
+        gpc.basis.set_basis_poly(order=[5, 5], order_max=5, order_max_norm=1, interaction_order=2,
+                                 interaction_order_current=2, problem=problem)
+        coeffs = np.random.randn(gpc.basis.n_basis, 3)
+        self.expect_isclose(gpc.get_approximation_validation(coeffs), get_reference(coeffs), atol=1e-12,
+                            msg="Extended validation gPC matrix is not correct")
+        self.expect_isclose(gpc.validation_matrix[:, :validation_matrix.shape[1]], validation_matrix, atol=0,
+                            msg="Cached columns of the validation gPC matrix were changed")
+
+        # new projection with the same basis: cache has to be reset
+        for phi in [0.3, 0.7]:
+            gpc.p_matrix = np.array([[np.cos(phi), np.sin(phi)], [-np.sin(phi), np.cos(phi)]])
+            gpc.p_matrix_norm = np.ones(2) * np.sqrt(2)
+            self.expect_isclose(gpc.get_approximation_validation(coeffs), get_reference(coeffs), atol=1e-12,
+                                msg="Validation gPC matrix was not updated after projection change")
+
+        # blockwise evaluation without cache (at least one row per block)
+        gpc.validation_matrix_max_mb = 1e-12
+        self.expect_isclose(gpc.get_approximation_validation(coeffs), get_reference(coeffs), atol=1e-12,
+                            msg="Blockwise evaluation of the validation set is not correct")
+        self.expect_true(gpc.validation_matrix is None, msg="Validation gPC matrix was cached despite memory limit")
+
+        print("done!\n")
+
+    def test_028_algorithm_output_reduction(self):
+        """
+        Test gPC algorithms with compressed output space (options["output_reduction"])
+        """
+
+        global folder
+        test_name = 'pygpc_test_028_algorithm_output_reduction'
+        print(test_name)
+
+        # define model
+        model = IshigamiField()
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1., 1.], pdf_limits=[-np.pi, np.pi])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1., 1.], pdf_limits=[-np.pi, np.pi])
+        parameters["x3"] = pygpc.Beta(pdf_shape=[1., 1.], pdf_limits=[-np.pi, np.pi])
+        parameters["a"] = 7.
+        parameters["b"] = 0.1
+        problem = pygpc.Problem(model, parameters)
+
+        # gPC options
+        options = dict()
+        options["method"] = "reg"
+        options["solver"] = "Moore-Penrose"
+        options["settings"] = None
+        options["order"] = [6, 6, 6]
+        options["order_max"] = 6
+        options["interaction_order"] = 3
+        options["order_start"] = 2
+        options["order_end"] = 6
+        options["order_max_norm"] = 1.
+        options["matrix_ratio"] = 2
+        options["error_type"] = "loocv"
+        options["eps"] = 1e-6
+        options["n_cpu"] = 0
+        options["fn_results"] = None
+        options["backend"] = "python"
+        options["output_reduction"] = True
+        options["output_reduction_options"] = {"lambda_eps": 0.9999}
+        options["adaptive_sampling"] = False
+        options["seed"] = 1
+
+        x_test = pygpc.Random(parameters_random=problem.parameters_random,
+                              n_grid=200,
+                              seed=2).coords_norm
+
+        grid = pygpc.Random(parameters_random=problem.parameters_random,
+                            n_grid=300,
+                            seed=1)
+
+        for algorithm in [pygpc.Static(problem=problem, options=options, grid=grid),
+                          pygpc.RegAdaptive(problem=problem, options=options)]:
+            gpc, coeffs, results = algorithm.run()
+            name = type(algorithm).__name__
+
+            self.expect_true(gpc.output_reduction is not None and coeffs.shape[1] == gpc.output_reduction.n_modes,
+                             msg="Output space was not compressed ({})".format(name))
+            self.expect_true(results.shape[1] == 50,
+                             msg="Results are not given in the original output space ({})".format(name))
+
+            # reference: gPC of the original output space
+            output_reduction = gpc.output_reduction
+            gpc.output_reduction = None
+            coeffs_full = gpc.solve(results=results, solver="Moore-Penrose")
+            pce = gpc.get_approximation(coeffs=coeffs_full, x=x_test)
+            mean = gpc.get_mean(coeffs=coeffs_full)
+            std = gpc.get_std(coeffs=coeffs_full)
+            gpc.output_reduction = output_reduction
+
+            self.expect_isclose(gpc.get_approximation(coeffs=coeffs, x=x_test), pce, atol=1e-6,
+                                msg="gPC approximation of reduced output space differs ({})".format(name))
+            self.expect_isclose(gpc.get_mean(coeffs=coeffs), mean, atol=1e-6,
+                                msg="Mean of reduced output space differs ({})".format(name))
+            self.expect_isclose(gpc.get_std(coeffs=coeffs), std, atol=1e-6,
+                                msg="Standard deviation of reduced output space differs ({})".format(name))
+
+        print("done!\n")
+
+    def test_029_coords_discontinuity(self):
+        """
+        Test the determination of grid points close to a discontinuity (refined border and no border)
+        """
+
+        global folder
+        test_name = 'pygpc_test_029_coords_discontinuity'
+        print(test_name)
+
+        class Classifier(object):
+            def __init__(self, x_disc):
+                self.x_disc = x_disc
+
+            def predict(self, coords):
+                return (coords[:, 0] + 0.5 * coords[:, 1] > self.x_disc).astype(int)
+
+        x_min = [-1., -1., -1.]
+        x_max = [1., 1., 1.]
+        tol = 1e-4
+
+        # refined border: the points lie on the discontinuity within the tolerance of the bisection
+        np.random.seed(1)
+        coords_disc = pygpc.get_coords_discontinuity(classifier=Classifier(x_disc=0.3),
+                                                     x_min=x_min,
+                                                     x_max=x_max,
+                                                     n_coords_disc=10,
+                                                     border_sampling="structured",
+                                                     n_samples_border=1000,
+                                                     tol=tol)
+
+        distance = np.abs(coords_disc[:, 0] + 0.5 * coords_disc[:, 1] - 0.3) / np.sqrt(1.25)
+
+        self.expect_true(coords_disc.shape == (10, 3),
+                         msg="Wrong number of points close to discontinuity ({})".format(coords_disc.shape))
+        self.expect_true((distance <= tol).all(),
+                         msg="Points are not located at the discontinuity (max. distance: {})".format(np.max(distance)))
+        self.expect_true((coords_disc >= -1).all() and (coords_disc <= 1).all(),
+                         msg="Points are located outside the search space")
+        distance_points = np.linalg.norm(coords_disc[:, np.newaxis, :] - coords_disc[np.newaxis, :, :], axis=2)
+
+        self.expect_true(np.min(distance_points[np.triu_indices(10, k=1)]) > 0.1,
+                         msg="Points at the discontinuity are not spread")
+
+        # no border: the classifier predicts a single domain
+        coords_disc = pygpc.get_coords_discontinuity(classifier=Classifier(x_disc=5.),
+                                                     x_min=x_min,
+                                                     x_max=x_max,
+                                                     n_coords_disc=10,
+                                                     border_sampling="structured",
+                                                     n_samples_border=1000)
+
+        self.expect_true(coords_disc.shape == (0, 3),
+                         msg="Points were determined without discontinuity ({})".format(coords_disc.shape))
+
+        # zero width bounds: the third dimension is fixed
+        np.random.seed(1)
+        coords_disc = pygpc.get_coords_discontinuity(classifier=Classifier(x_disc=0.3),
+                                                     x_min=[-1., -1., 0.5],
+                                                     x_max=[1., 1., 0.5],
+                                                     n_coords_disc=10,
+                                                     border_sampling="structured",
+                                                     n_samples_border=1000,
+                                                     tol=tol)
+
+        distance = np.abs(coords_disc[:, 0] + 0.5 * coords_disc[:, 1] - 0.3) / np.sqrt(1.25)
+
+        self.expect_true(coords_disc.shape == (10, 3),
+                         msg="Wrong number of points close to discontinuity with zero width bounds ({})".format(
+                             coords_disc.shape))
+        self.expect_true((distance <= tol).all() and (coords_disc[:, 2] == 0.5).all(),
+                         msg="Points are not located at the discontinuity with zero width bounds")
+
+        print("done!\n")
+
+    def test_030_lhs_extend(self):
+        """
+        Test the extension of LHS designs (Latin Hypercube property and incremental Phi-P criterion)
+        """
+
+        global folder
+        test_name = 'pygpc_test_030_lhs_extend'
+        print(test_name)
+
+        parameters_random = OrderedDict()
+        parameters_random["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[0, 1])
+        parameters_random["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[0, 1])
+        parameters_random["x3"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[0, 1])
+
+        grid = pygpc.LHS(parameters_random=parameters_random, n_grid=20, seed=1)
+
+        n_old = 20
+        np.random.seed(1)
+        array = grid.get_lhs_grid(dim=3, n=n_old)
+
+        for crit in [None, "maximin"]:
+            np.random.seed(2)
+            design = grid.lhs_extend(array.copy(), n_extend=n_old, crit=crit, iterations=200)
+            strata = np.floor(design * 2 * n_old).astype(int)
+
+            self.expect_true(np.array_equal(design[:n_old, :], array),
+                             msg="Existing samples were altered (crit={})".format(crit))
+            self.expect_true(all([np.array_equal(np.sort(strata[:, d]), np.arange(2 * n_old)) for d in range(3)]),
+                             msg="Extended design has not one point per stratum (crit={})".format(crit))
+
+            if crit is None:
+                design_random = design
+            else:
+                self.expect_true(grid.PhiP(design) <= grid.PhiP(design_random),
+                                 msg="Phi-P criterion of the extended design did not improve "
+                                     "({} > {})".format(grid.PhiP(design), grid.PhiP(design_random)))
+
+        print("done!\n")
+
+    def test_031_validation_set_cache(self):
+        """
+        Test the validation set cache (cache hit, top-up, subsets and hash of the problem)
+        """
+
+        global folder
+        test_name = 'pygpc_test_031_validation_set_cache'
+        print(test_name)
+
+        cache_folder = os.path.join(folder, test_name)
+
+        if os.path.exists(cache_folder):
+            shutil.rmtree(cache_folder)
+
+        # define model
+        model = pygpc.testfunctions.Ishigami()
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1., 1.], pdf_limits=[-np.pi, np.pi])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1., 1.], pdf_limits=[-np.pi, np.pi])
+        parameters["x3"] = 0.
+        parameters["a"] = 7.
+        parameters["b"] = 0.1
+        parameters["c"] = np.array(["direct", "fast"])
+        problem = pygpc.Problem(model, parameters)
+
+        # non-numeric constants are part of the hash
+        parameters_other = OrderedDict(parameters)
+        parameters_other["c"] = np.array(["direct", "slow"])
+        problem_other = pygpc.Problem(model, parameters_other)
+
+        self.expect_true(pygpc.get_validation_set_cache_fn(problem=problem, folder=cache_folder) !=
+                         pygpc.get_validation_set_cache_fn(problem=problem_other, folder=cache_folder),
+                         msg="Problems with different non-numeric constants share the validation set cache")
+        self.expect_true(pygpc.get_validation_set_cache_fn(problem=problem, folder=cache_folder) ==
+                         pygpc.get_validation_set_cache_fn(problem=pygpc.Problem(model, OrderedDict(parameters)),
+                                                           folder=cache_folder),
+                         msg="Identical problems do not share the validation set cache")
+
+        # create validation set and save it in the cache
+        gpc = pygpc.GPC(problem=problem, options=None, validation=None)
+        gpc.create_validation_set(n_samples=50, n_cpu=0, cache_folder=cache_folder)
+        validation = gpc.validation
+
+        # cache hit (the grid is random without seed, i.e. it would differ if it was created again)
+        gpc = pygpc.GPC(problem=problem, options=None, validation=None)
+        gpc.create_validation_set(n_samples=50, n_cpu=0, cache_folder=cache_folder)
+
+        self.expect_isclose(gpc.validation.grid.coords, validation.grid.coords, atol=1e-12,
+                            msg="Validation set was not loaded from the cache")
+        self.expect_isclose(gpc.validation.results, validation.results, atol=1e-12,
+                            msg="Results of the cached validation set differ")
+
+        # top-up: the cached samples are kept and extended by new model evaluations
+        gpc = pygpc.GPC(problem=problem, options=None, validation=None)
+        gpc.create_validation_set(n_samples=80, n_cpu=0, cache_folder=cache_folder)
+        validation_cached = pygpc.ValidationSet().read(
+            fname=pygpc.get_validation_set_cache_fn(problem=problem, folder=cache_folder), folder="validation")
+        results_ref = model.set_parameters(p={"x1": gpc.validation.grid.coords[:, 0],
+                                              "x2": gpc.validation.grid.coords[:, 1],
+                                              "x3": np.zeros(80), "a": 7. * np.ones(80), "b": 0.1 * np.ones(80)},
+                                           context=None).simulate()
+
+        self.expect_true(gpc.validation.results.shape[0] == 80 and validation_cached.results.shape[0] == 80,
+                         msg="Validation set was not topped up")
+        self.expect_isclose(gpc.validation.grid.coords[:50, :], validation.grid.coords, atol=1e-12,
+                            msg="Cached samples were not kept during top-up")
+        self.expect_isclose(gpc.validation.results, results_ref, atol=1e-12,
+                            msg="Results of the topped up validation set differ from the model")
+
+        # subset: the first n_samples of the cached validation set
+        gpc = pygpc.GPC(problem=problem, options=None, validation=None)
+        gpc.create_validation_set(n_samples=30, n_cpu=0, cache_folder=cache_folder)
+
+        self.expect_true(gpc.validation.results.shape[0] == 30,
+                         msg="Wrong number of samples of the validation subset")
+        self.expect_isclose(gpc.validation.grid.coords, validation.grid.coords[:30, :], atol=1e-12,
+                            msg="Validation subset does not contain the first samples")
+
+        # subset with gradients: only the gradients of the first n_samples are kept
+        validation_gradient = pygpc.ValidationSet(grid=validation.grid,
+                                                  results=validation.results,
+                                                  gradient_results=np.random.rand(5, 1, 2),
+                                                  gradient_idx=np.array([3, 10, 20, 35, 49]))
+        validation_subset = validation_gradient.get_subset(21)
+
+        self.expect_true(np.array_equal(validation_subset.gradient_idx, np.array([3, 10, 20])),
+                         msg="Gradient indices of the validation subset differ")
+        self.expect_isclose(validation_subset.gradient_results, validation_gradient.gradient_results[:3], atol=1e-12,
+                            msg="Gradients of the validation subset differ")
+
+        print("done!\n")
+
+    def test_032_growable_arrays(self):
+        """
+        Test growable arrays (views, copies of non-current views) and the incremental update of the gPC matrix
+        """
+
+        global folder
+        test_name = 'pygpc_test_032_growable_arrays'
+        print(test_name)
+
+        # appending writes behind the current view, older views keep their content
+        a = pygpc.append_rows(None, np.arange(6.).reshape(3, 2))
+        a_ref = a.copy()
+        b = pygpc.append_rows(a, np.array([[6., 7.]]))
+
+        self.expect_true(np.shares_memory(a, b), msg="Rows were not appended into the spare capacity")
+        self.expect_true(a.shape == (3, 2) and np.array_equal(a, a_ref), msg="Older view was changed by appending")
+        self.expect_true(np.array_equal(b, np.vstack((a_ref, [[6., 7.]]))), msg="Appended array is not correct")
+
+        # appending to a view, which is not the current view of its buffer, copies the array
+        c = pygpc.append_rows(a, np.array([[-1., -1.]]))
+
+        self.expect_true(not np.shares_memory(b, c), msg="Non-current view was not copied")
+        self.expect_true(np.array_equal(b, np.vstack((a_ref, [[6., 7.]]))),
+                         msg="Current view was overwritten by appending to an older view")
+        self.expect_true(np.array_equal(c, np.vstack((a_ref, [[-1., -1.]]))), msg="Appended array is not correct")
+
+        # geometric growth over many appends and dtype promotion
+        d = np.zeros((0, 2), dtype=int)
+        d_ref = np.zeros((0, 2), dtype=int)
+
+        for i in range(50):
+            d = pygpc.append_rows(d, np.array([[i, 2 * i]]))
+            d_ref = np.vstack((d_ref, np.array([[i, 2 * i]])))
+
+        d = pygpc.append_rows(d, np.array([[0.5, 1.5]]))
+        d_ref = np.vstack((d_ref, np.array([[0.5, 1.5]])))
+
+        self.expect_true(np.array_equal(d, d_ref) and d.dtype == d_ref.dtype,
+                         msg="Growable array differs from np.vstack")
+
+        # grid ids and coordinates of the grid before the extension are kept
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["x3"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["a"] = 7.
+        parameters["b"] = 0.1
+        problem = pygpc.Problem(pygpc.testfunctions.Ishigami(), parameters)
+
+        options = dict()
+        options["method"] = "reg"
+        options["solver"] = "Moore-Penrose"
+        options["settings"] = None
+        options["n_cpu"] = 0
+        options["fn_results"] = None
+        options["gradient_enhanced"] = False
+        options["backend"] = "python"
+
+        gpc = pygpc.Reg(problem=problem,
+                        order=[4, 4, 4],
+                        order_max=4,
+                        order_max_norm=1,
+                        interaction_order=3,
+                        interaction_order_current=3,
+                        options=options,
+                        validation=None)
+        gpc.grid = pygpc.Random(parameters_random=problem.parameters_random, n_grid=40, seed=1)
+        gpc.init_gpc_matrix()
+
+        coords_id = gpc.grid.coords_id
+        coords_id_ref = coords_id.copy()
+        coords_norm_ref = gpc.grid.coords_norm.copy()
+        gpc_matrix = gpc.gpc_matrix
+        gpc_matrix_ref = gpc_matrix.copy()
+
+        for n_grid in [60, 61, 100]:
+            gpc.grid.extend_random_grid(n_grid_new=n_grid, seed=n_grid)
+            gpc.update_gpc_matrix()
+
+        self.expect_true(np.array_equal(coords_id, coords_id_ref) and
+                         np.array_equal(gpc.grid.coords_id[:40], coords_id_ref),
+                         msg="Grid IDs before the extension were changed")
+        self.expect_true(len(np.unique(gpc.grid.coords_id)) == 100, msg="Grid IDs are not unique")
+        self.expect_true(np.array_equal(gpc.grid.coords_norm[:40, :], coords_norm_ref),
+                         msg="Grid points before the extension were changed")
+        self.expect_true(np.array_equal(gpc_matrix, gpc_matrix_ref),
+                         msg="gPC matrix before the extension was changed")
+
+        # appended rows of the gPC matrix (fast path) are identical to the initialized gPC matrix
+        self.expect_true(pygpc.GrowableArray.get_buffer(gpc.gpc_matrix) is not None,
+                         msg="Rows were not appended to the gPC matrix")
+
+        gpc_matrix_updated = gpc.gpc_matrix.copy()
+        gpc.init_gpc_matrix()
+
+        self.expect_true(np.array_equal(gpc.gpc_matrix_coords_id, gpc.grid.coords_id),
+                         msg="Grid IDs of the gPC matrix differ from the grid")
+        self.expect_isclose(gpc_matrix_updated, gpc.gpc_matrix, atol=1e-12,
+                            msg="Updated gPC matrix differs from initialized gPC matrix")
+
+        print("done!\n")
+
+    def test_033_megpc_parallel_domains(self):
+        """
+        Algorithm: MEStatic
+        Method: Regression
+        Solver: Moore-Penrose
+        Grid: Random
+        Testing concurrent processing of the sub-gPCs (n_cpu_domains > 1) vs. the serial path
+        """
+        global folder
+        test_name = 'pygpc_test_033_megpc_parallel_domains'
+        print(test_name)
+
+        # define model
+        model = pygpc.testfunctions.SurfaceCoverageSpecies()
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["rho_0"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[0, 1])
+        parameters["beta"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[0, 20])
+        parameters["alpha"] = 1.
+        problem = pygpc.Problem(model, parameters)
+
+        # gPC options
+        options = dict()
+        options["method"] = "reg"
+        options["solver"] = "Moore-Penrose"
+        options["settings"] = None
+        options["order"] = [5, 5]
+        options["order_max"] = 5
+        options["interaction_order"] = 2
+        options["matrix_ratio"] = 2
+        options["n_cpu"] = 0
+        options["n_cpu_domains"] = 1
+        options["gradient_enhanced"] = False
+        options["error_type"] = "nrmsd"
+        options["n_samples_validation"] = 1e3
+        options["qoi"] = "all"
+        options["classifier"] = "learning"
+        options["classifier_options"] = {"clusterer": "KMeans",
+                                         "n_clusters": 2,
+                                         "classifier": "MLPClassifier",
+                                         "classifier_solver": "lbfgs"}
+        options["fn_results"] = os.path.join(folder, test_name)
+        options["save_session_format"] = ".pkl"
+        options["grid"] = pygpc.Random
+        options["grid_options"] = None
+
+        # generate grid
+        grid = pygpc.Random(parameters_random=problem.parameters_random,
+                            n_grid=300,
+                            seed=1)
+
+        # run serial gPC algorithm
+        algorithm = pygpc.MEStatic(problem=problem, options=options, grid=grid)
+        session = pygpc.Session(algorithm=algorithm)
+        session, coeffs, results = session.run()
+
+        megpc = session.gpc[0]
+        self.expect_true(len(np.unique(megpc.domains)) > 1, msg="Only one domain was found")
+
+        # solve and validate the sub-gPCs serially and concurrently
+        coeffs_domains = dict()
+        error_domains = dict()
+        approx_domains = dict()
+
+        for n_cpu_domains in [1, 2, -1]:
+            megpc.n_cpu_domains = n_cpu_domains
+            coeffs_domains[n_cpu_domains] = megpc.solve(results=results, solver="Moore-Penrose", settings=None)
+            error_domains[n_cpu_domains] = megpc.validate_domains(coeffs=coeffs_domains[n_cpu_domains],
+                                                                  results=results)
+            approx_domains[n_cpu_domains] = megpc.get_approximation(coeffs=coeffs_domains[n_cpu_domains],
+                                                                    x=grid.coords_norm)
+
+            # the domains are returned in order
+            self.expect_true(megpc.map_domains(lambda d: d, [3, 0, 2, 1]) == [3, 0, 2, 1],
+                             msg="map_domains changed the order of the domains")
+
+        for n_cpu_domains in [2, -1]:
+            for d in np.unique(megpc.domains):
+                self.expect_isclose(coeffs_domains[1][d], coeffs_domains[n_cpu_domains][d], atol=1e-10,
+                                    msg="Coefficients of domain {} differ (n_cpu_domains={})".format(
+                                        d, n_cpu_domains))
+
+            self.expect_isclose(np.array(error_domains[1]), np.array(error_domains[n_cpu_domains]), atol=1e-10,
+                                msg="Errors of the domains differ (n_cpu_domains={})".format(n_cpu_domains))
+            self.expect_isclose(approx_domains[1], approx_domains[n_cpu_domains], atol=1e-10,
+                                msg="gPC approximations differ (n_cpu_domains={})".format(n_cpu_domains))
+
+        print("done!\n")
+
+    def test_034_classifier_incremental_update(self):
+        """
+        Testing the incremental (warm started) update of the classifier (stable labels, refit on drift)
+        """
+        global folder
+        test_name = 'pygpc_test_034_classifier_incremental_update'
+        print(test_name)
+
+        np.random.seed(1)
+
+        def step_function(coords, border=0.):
+            return np.where(coords[:, 0] < border, 0., 10.)[:, np.newaxis] + 0.1 * np.random.rand(coords.shape[0], 1)
+
+        def predict_step_function(clf, coords, border=0.):
+            domain_left = clf.domains[clf.coords[:, 0] < border][0]
+            domain_right = clf.domains[clf.coords[:, 0] >= border][0]
+            return np.where(coords[:, 0] < border, domain_left, domain_right)
+
+        coords = np.random.rand(400, 2) * 2 - 1
+        coords_test = np.random.rand(1000, 2) * 2 - 1
+        results = step_function(coords)
+
+        clf = pygpc.ClassifierLearning(coords=coords,
+                                       results=results,
+                                       options={"incremental": True, "n_replay": 100, "drift_tol": 0.05})
+        domains_init = clf.domains.copy()
+
+        # incremental update without drift keeps the labels of the previous grid points
+        coords = np.vstack((coords, np.random.rand(100, 2) * 2 - 1))
+        results = np.vstack((results, step_function(coords[400:, ])))
+        clf.update(coords=coords, results=results)
+
+        self.expect_true((clf.domains[:400] == domains_init).all(),
+                         msg="Labels of the previous grid points changed in the incremental update")
+        self.expect_true(clf.n_refit == 0, msg="Clusterer and classifier were refitted without drift")
+        self.expect_true(clf.clf.warm_start, msg="Classifier was not warm started")
+        self.expect_true(clf.version == 1, msg="Version of the classifier was not incremented")
+        self.expect_true(np.mean(clf.predict(coords_test) == predict_step_function(clf, coords_test)) > 0.95,
+                         msg="Classifier does not predict the domains after the incremental update")
+
+        # drift of the domain border (> drift_tol of the previous grid points change their domain) triggers a refit
+        coords = np.vstack((coords, np.random.rand(100, 2) * 2 - 1))
+        results = step_function(coords, border=0.3)
+        clf.update(coords=coords, results=results)
+
+        self.expect_true(clf.n_refit == 1, msg="Clusterer and classifier were not refitted after drift")
+        self.expect_true(not clf.clf.warm_start, msg="Classifier was warm started after drift")
+        self.expect_true(np.mean(clf.predict(coords_test) ==
+                                 predict_step_function(clf, coords_test, border=0.3)) > 0.95,
+                         msg="Classifier does not predict the domains after the refit")
+
+        # full fit of the classifier if the incremental training is not possible
+        coords = np.vstack((coords, np.random.rand(100, 2) * 2 - 1))
+        results = step_function(coords, border=0.3)
+        clf.clf.warm_start = True
+        clf.update_classifier_incremental = lambda n_grid_old: False
+        clf.update(coords=coords, results=results)
+
+        self.expect_true(clf.n_refit == 1, msg="Clusterer and classifier were refitted without drift")
+        self.expect_true(not clf.clf.warm_start, msg="Full fit of the classifier was warm started")
+
+        print("done!\n")
+
+    def test_035_megpc_domains_cache(self):
+        """
+        Testing the cached domain assignments of the multi-element gPC (cache hit, extension of a cached
+        coordinate set, invalidation after an update of the classifier)
+        """
+        global folder
+        test_name = 'pygpc_test_035_megpc_domains_cache'
+        print(test_name)
+
+        np.random.seed(1)
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-1, 1])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-1, 1])
+        problem = pygpc.Problem(pygpc.testfunctions.Peaks(), parameters)
+
+        coords = np.random.rand(400, 2) * 2 - 1
+        results = np.where(coords[:, 0] < 0, 0., 10.)[:, np.newaxis] + 0.1 * np.random.rand(400, 1)
+
+        megpc = pygpc.MEGPC(problem=problem, options={"gradient_enhanced": False, "matlab_model": False})
+        megpc.classifier = pygpc.ClassifierLearning(coords=coords, results=results, options={"incremental": True})
+
+        # record the number of grid points passed to the classifier
+        n_grid_predicted = []
+        predict = megpc.classifier.predict
+
+        def predict_counted(x, **kwargs):
+            n_grid_predicted.append(x.shape[0])
+            return predict(x, **kwargs)
+
+        megpc.classifier.predict = predict_counted
+
+        coords_test = np.random.rand(1000, 2) * 2 - 1
+
+        # first call predicts all points, second call is a cache hit
+        domains = megpc.predict_domains(coords_test)
+        domains_cached = megpc.predict_domains(coords_test.copy())
+
+        self.expect_true(n_grid_predicted == [1000], msg="Cached domains were not reused")
+        self.expect_true((domains == predict(coords_test)).all(), msg="Domains differ from the classifier")
+        self.expect_true((domains == domains_cached).all(), msg="Cached domains differ")
+
+        # changed coordinates are not taken from the cache
+        coords_changed = coords_test.copy()
+        coords_changed[0, 0] = 0.5
+        megpc.predict_domains(coords_changed)
+        self.expect_true(n_grid_predicted == [1000, 1000], msg="Domains of changed coordinates taken from the cache")
+
+        # extension of a cached coordinate set only predicts the appended points
+        coords_extended = np.vstack((coords_test, np.random.rand(200, 2) * 2 - 1))
+        domains_extended = megpc.predict_domains(coords_extended)
+
+        self.expect_true(n_grid_predicted == [1000, 1000, 200], msg="Cached prefix was not reused")
+        self.expect_true((domains_extended == predict(coords_extended)).all(),
+                         msg="Domains of extended coordinate set differ from the classifier")
+
+        # update of the classifier invalidates the cache
+        coords = np.vstack((coords, np.random.rand(100, 2) * 2 - 1))
+        results = np.where(coords[:, 0] < 0, 0., 10.)[:, np.newaxis] + 0.1 * np.random.rand(500, 1)
+        megpc.update_classifier(coords=coords, results=results)
+
+        domains_updated = megpc.predict_domains(coords_test)
+
+        self.expect_true(n_grid_predicted == [1000, 1000, 200, 1000],
+                         msg="Cached domains were reused after the update of the classifier")
+        self.expect_true((domains_updated == predict(coords_test)).all(),
+                         msg="Domains differ from the updated classifier")
+        self.expect_true(all([c["version"] == megpc.classifier.version for c in megpc.domains_cache]),
+                         msg="Cache contains entries of previous classifier versions")
+
+        print("done!\n")
+
+    def test_036_projected_grid(self):
+        """
+        Testing that the projected grid of a projection gPC leaves the base grid untouched
+        """
+        global folder
+        test_name = 'pygpc_test_036_projected_grid'
+        print(test_name)
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-1, 1])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[0, 2])
+        parameters["x3"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-3, 3])
+        problem = pygpc.Problem(pygpc.testfunctions.Ishigami(), parameters)
+
+        grid = pygpc.Random(parameters_random=problem.parameters_random, n_grid=50, seed=1)
+        grid.create_gradient_grid()
+
+        coords = grid.coords.copy()
+        coords_norm = grid.coords_norm.copy()
+        coords_id = list(grid.coords_id)
+        coords_gradient_norm = grid.coords_gradient_norm.copy()
+
+        p_matrix = np.array([[0.6, 0.8, 0.], [0., 0.6, 0.8]])
+        p_matrix_norm = np.sum(np.abs(p_matrix), axis=1)
+
+        grid_projected = grid.get_projected_grid(p_matrix=p_matrix, p_matrix_norm=p_matrix_norm)
+
+        # projected coordinates
+        self.expect_true(grid_projected.coords_norm.shape == (50, 2) and grid_projected.n_grid == 50,
+                         msg="Wrong shape of the projected grid")
+        self.expect_isclose(grid_projected.coords, np.matmul(coords, p_matrix.transpose()), atol=1e-12,
+                            msg="Projected coords differ")
+        self.expect_isclose(grid_projected.coords_norm,
+                            np.matmul(coords_norm, p_matrix.transpose() / p_matrix_norm[np.newaxis, :]),
+                            atol=1e-12, msg="Projected coords_norm differ")
+        self.expect_true(grid_projected.coords_id is grid.coords_id, msg="Grid ids are not shared")
+
+        # base grid is untouched
+        self.expect_true(grid.coords.shape == (50, 3) and grid.n_grid == 50, msg="Base grid changed its shape")
+        self.expect_isclose(grid.coords, coords, atol=0, msg="Base grid coords changed")
+        self.expect_isclose(grid.coords_norm, coords_norm, atol=0, msg="Base grid coords_norm changed")
+        self.expect_isclose(grid.coords_gradient_norm, coords_gradient_norm, atol=0,
+                            msg="Base gradient grid changed")
+        self.expect_true(list(grid.coords_id) == coords_id, msg="Base grid ids changed")
+        self.expect_true(not np.shares_memory(grid.coords_norm, grid_projected.coords_norm),
+                         msg="Projected coords_norm share memory with the base grid")
+
+        # changing the projected grid leaves the base grid untouched
+        grid_projected.coords_norm = np.zeros((50, 2))
+        self.expect_isclose(grid.coords_norm, coords_norm, atol=0,
+                            msg="Base grid coords_norm changed with the projected grid")
+
+        # extension of the base grid leaves the projected grid (snapshot) untouched
+        grid_projected = grid.get_projected_grid(p_matrix=p_matrix, p_matrix_norm=p_matrix_norm)
+        coords_norm_projected = grid_projected.coords_norm.copy()
+        grid.extend_random_grid(n_grid_new=80)
+
+        self.expect_true(grid.n_grid == 80 and grid_projected.n_grid == 50, msg="Wrong number of grid points")
+        self.expect_isclose(grid.coords_norm[:50, ], coords_norm, atol=0, msg="Previous grid points changed")
+        self.expect_isclose(grid_projected.coords_norm, coords_norm_projected, atol=0,
+                            msg="Projected grid changed with the extension of the base grid")
+        self.expect_true(list(grid_projected.coords_id) == coords_id,
+                         msg="Ids of the projected grid changed with the extension of the base grid")
+
+        print("done!\n")
+
+    def test_037_grid_id_index(self):
+        """
+        Testing the vectorised lookup of grid point and basis function ids (get_id_index) against nested loops,
+        also with unsorted ids after replacing samples of the gPC matrix
+        """
+        global folder
+        test_name = 'pygpc_test_037_grid_id_index'
+        print(test_name)
+
+        def get_id_index_loops(ids_ref, ids):
+            # reference: nested loops previously used in GPC._update_gpc_matrix
+            idx = -np.ones(len(ids), dtype=int)
+            for i, id_old in enumerate(ids):
+                for j, id_new in enumerate(ids_ref):
+                    if id_old == id_new:
+                        idx[i] = j
+                        break
+            return idx
+
+        np.random.seed(1)
+
+        # sorted, unsorted and missing integer ids and UUIDs
+        ids_ref = pygpc.get_grid_ids(50)
+        ids_ref_unsorted = np.random.permutation(ids_ref)
+        ids = np.hstack((np.random.permutation(ids_ref)[:30], pygpc.get_grid_ids(5)))
+        uuids_ref = pygpc.get_grid_uuids(ids_ref_unsorted)
+        uuids = pygpc.get_grid_uuids(ids)
+
+        for _ids_ref, _ids in [(ids_ref, ids), (ids_ref_unsorted, ids), (uuids_ref, uuids),
+                               (ids_ref, ids[:0]), (ids_ref[:0], ids)]:
+            self.expect_true(np.array_equal(pygpc.get_id_index(ids_ref=_ids_ref, ids=_ids),
+                                            get_id_index_loops(ids_ref=_ids_ref, ids=_ids)),
+                             msg="get_id_index differs from nested loops")
+
+        # gPC with replaced samples (unsorted grid ids) and extended basis and grid
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["x3"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["a"] = 7.
+        parameters["b"] = 0.1
+        problem = pygpc.Problem(pygpc.testfunctions.Ishigami(), parameters)
+
+        options = dict()
+        options["method"] = "reg"
+        options["solver"] = "Moore-Penrose"
+        options["settings"] = None
+        options["n_cpu"] = 0
+        options["fn_results"] = None
+        options["gradient_enhanced"] = False
+        options["backend"] = "python"
+
+        gpc = pygpc.Reg(problem=problem,
+                        order=[3, 3, 3],
+                        order_max=3,
+                        order_max_norm=1,
+                        interaction_order=3,
+                        interaction_order_current=3,
+                        options=options,
+                        validation=None)
+        gpc.grid = pygpc.Random(parameters_random=problem.parameters_random, n_grid=60, seed=1)
+        gpc.init_gpc_matrix()
+
+        # replaced grid points get new (larger) ids, the ids are not sorted anymore
+        idx_replace = np.array([3, 17, 42])
+        gpc.replace_gpc_matrix_samples(idx=idx_replace, seed=2)
+
+        self.expect_true(not np.all(np.diff(gpc.grid.coords_id) > 0), msg="Grid IDs are still sorted")
+        self.expect_true(np.array_equal(pygpc.get_id_index(ids_ref=gpc.grid.coords_id,
+                                                           ids=gpc.gpc_matrix_coords_id), np.arange(60)),
+                         msg="Grid IDs of the gPC matrix are not found after replacing samples")
+        self.expect_true(np.array_equal(pygpc.get_id_index(ids_ref=gpc.grid.coords_id,
+                                                           ids=gpc.grid.coords_id[idx_replace]), idx_replace),
+                         msg="Replaced grid IDs are not found")
+
+        gpc_matrix_replaced = gpc.gpc_matrix.copy()
+        gpc.init_gpc_matrix()
+        self.expect_isclose(gpc_matrix_replaced, gpc.gpc_matrix, atol=1e-12,
+                            msg="gPC matrix with replaced samples differs from initialized gPC matrix")
+
+        # extend basis (new columns) and grid (new rows), the old entries are mapped by their ids
+        coords_id_old = gpc.gpc_matrix_coords_id
+        b_id_old = list(gpc.gpc_matrix_b_id)
+
+        gpc.basis.set_basis_poly(order=[4, 4, 4], order_max=4, order_max_norm=1, interaction_order=3,
+                                 interaction_order_current=3, problem=gpc.problem)
+        gpc.grid.extend_random_grid(n_grid_new=80, seed=3)
+
+        self.expect_true(np.array_equal(pygpc.get_id_index(ids_ref=gpc.grid.coords_id, ids=coords_id_old),
+                                        get_id_index_loops(ids_ref=gpc.grid.coords_id, ids=coords_id_old)),
+                         msg="Row mapping of the gPC matrix differs from nested loops")
+        self.expect_true(np.array_equal(pygpc.get_id_index(ids_ref=gpc.basis.b_id, ids=b_id_old),
+                                        get_id_index_loops(ids_ref=gpc.basis.b_id, ids=b_id_old)),
+                         msg="Column mapping of the gPC matrix differs from nested loops")
+
+        gpc.update_gpc_matrix()
+        gpc_matrix_updated = gpc.gpc_matrix.copy()
+        gpc.init_gpc_matrix()
+
+        self.expect_true(gpc_matrix_updated.shape == (80, gpc.basis.n_basis), msg="Wrong shape of the gPC matrix")
+        self.expect_isclose(gpc_matrix_updated, gpc.gpc_matrix, atol=1e-12,
+                            msg="Updated gPC matrix differs from initialized gPC matrix")
+
+        print("done!\n")
+
+    def test_038_batched_fd_gradients(self):
+        """
+        Testing the batched finite difference gradient estimation (KD-tree neighbors, stacked least squares problems)
+        against the previous implementation with one least squares problem per grid point
+        """
+        global folder
+        test_name = 'pygpc_test_038_batched_fd_gradients'
+        print(test_name)
+
+        def FD_1st_loop(coords_norm, coord_idx, results, dx, distance_weight):
+            # reference: previous implementation of pygpc.FD_1st
+            gradient_results = np.zeros((len(coord_idx), results.shape[1], coords_norm.shape[1])) * np.nan
+
+            for i, i_c in enumerate(coord_idx):
+                mask = np.linalg.norm(coords_norm - coords_norm[i_c, :], axis=1) < dx
+                mask[i_c] = False
+                D = coords_norm[mask, ] - coords_norm[i_c, :]
+                df = results[mask, ] - results[i_c, ]
+                W = np.diag(np.linalg.norm(D, axis=1) ** distance_weight)
+                gradient_results[i, :, :] = np.matmul(np.linalg.pinv(np.matmul(W, D)), np.matmul(W, df)).transpose()
+
+            return gradient_results
+
+        def FD_2nd_loop(coords_norm, coord_idx, results, dx, distance_weight):
+            # reference: previous implementation of pygpc.FD_2nd
+            n_dim = coords_norm.shape[1]
+            n_2nd_order = np.sum(np.arange(n_dim + 1))
+            gradient_results = np.zeros((len(coord_idx), results.shape[1], n_dim)) * np.nan
+
+            for i, i_c in enumerate(coord_idx):
+                mask = np.linalg.norm(coords_norm - coords_norm[i_c, :], axis=1) < dx
+                mask[i_c] = False
+                D = coords_norm[mask, ] - coords_norm[i_c, :]
+                M = np.zeros((D.shape[0], n_2nd_order))
+
+                for i_dim in range(n_dim):
+                    M[:, i_dim] = 0.5 * D[:, i_dim] ** 2
+
+                for j, idx_row in enumerate(pygpc.get_all_combinations(np.arange(n_dim), 2)):
+                    M[:, j + n_dim] = D[:, idx_row[0]] * D[:, idx_row[1]]
+
+                df = results[mask, ] - results[i_c, ]
+                W = np.diag(np.linalg.norm(D, axis=1) ** distance_weight)
+                D = np.matmul(W, D)
+                M = np.matmul(W, M)
+                df = np.matmul(W, df)
+                Q, T = np.linalg.qr(M, mode="complete")
+                QtD_inv = np.linalg.pinv(np.matmul(Q.transpose(), D)[n_2nd_order:, ])
+                rhs = np.matmul(Q.transpose(), df)[n_2nd_order:, ]
+                gradient_results[i, :, :] = np.matmul(QtD_inv, rhs).transpose()
+
+            return gradient_results
+
+        np.random.seed(1)
+
+        n_dim = 3
+        n_2nd_order = np.sum(np.arange(n_dim + 1))
+        dx = 0.4
+        coords_norm = np.random.rand(500, n_dim) * 2 - 1
+        results = np.vstack((np.sin(2 * coords_norm[:, 0]) * coords_norm[:, 1] ** 2 + coords_norm[:, 2],
+                             np.exp(coords_norm[:, 0] * coords_norm[:, 2]),
+                             coords_norm[:, 1] ** 3)).transpose()
+
+        # neighbors (KD-tree) vs. brute force distances
+        coord_idx = np.arange(coords_norm.shape[0])
+        neighbors = pygpc.get_neighbors(coords_norm=coords_norm, coord_idx=coord_idx, dx=dx)
+        neighbors_ref = [np.setdiff1d(np.where(np.linalg.norm(coords_norm - x0, axis=1) < dx)[0], i)
+                         for i, x0 in enumerate(coords_norm)]
+
+        self.expect_true(all([np.array_equal(n, n_ref) for n, n_ref in zip(neighbors, neighbors_ref)]),
+                         msg="Neighbors differ from brute force search")
+
+        # groups of grid points with equal number of neighbors (chunked) cover every grid point once
+        n_neighbors = np.array([len(n) for n in neighbors])
+        i_groups = []
+
+        for i_group, idx_neighbors in pygpc.get_neighbor_groups(neighbors=neighbors, n_qoi=3, n_max=3000):
+            self.expect_true(idx_neighbors.size * 3 <= 3000 or len(i_group) == 1, msg="Chunk exceeds n_max")
+            self.expect_true(np.array_equal(idx_neighbors, np.vstack([neighbors[i] for i in i_group])),
+                             msg="Wrong neighbors in group")
+            i_groups.append(i_group)
+
+        self.expect_true(np.array_equal(np.sort(np.hstack(i_groups)), np.where(n_neighbors > 0)[0]),
+                         msg="Groups do not cover all grid points")
+        self.expect_true(len(np.unique(n_neighbors)) > 5, msg="Test grid has too few different neighbor counts")
+
+        # batched vs. per point least squares problems (only points with enough neighbors)
+        for distance_weight in [-2, 0, 1]:
+            idx_1st = coord_idx[n_neighbors >= n_dim]
+            gradient = pygpc.FD_1st(coords_norm=coords_norm, coord_idx=idx_1st, results=results, dx=dx,
+                                    distance_weight=distance_weight)
+            gradient_ref = FD_1st_loop(coords_norm=coords_norm, coord_idx=idx_1st, results=results, dx=dx,
+                                       distance_weight=distance_weight)
+
+            self.expect_isclose(gradient, gradient_ref, atol=1e-10,
+                                msg="FD_1st differs from per point implementation "
+                                    "(distance_weight={})".format(distance_weight))
+
+            idx_2nd = coord_idx[n_neighbors >= n_2nd_order + n_dim]
+            gradient = pygpc.FD_2nd(coords_norm=coords_norm, coord_idx=idx_2nd, results=results, dx=dx,
+                                    distance_weight=distance_weight)
+            gradient_ref = FD_2nd_loop(coords_norm=coords_norm, coord_idx=idx_2nd, results=results, dx=dx,
+                                       distance_weight=distance_weight)
+
+            self.expect_isclose(gradient, gradient_ref, atol=1e-10,
+                                msg="FD_2nd differs from per point implementation "
+                                    "(distance_weight={})".format(distance_weight))
+
+        print("done!\n")
+
+    def test_039_grid_samples_domain(self):
+        """
+        Testing the batched rejection sampling of grid points in a domain of the classifier
+        """
+        global folder
+        test_name = 'pygpc_test_039_grid_samples_domain'
+        print(test_name)
+
+        class ClassifierHalfPlane(object):
+            # classifier mock: domain 1 for xi_1 < -0.6 (acceptance rate 20%), counts the calls of predict()
+            def __init__(self):
+                self.n_predict = 0
+
+            def predict(self, coords):
+                self.n_predict += 1
+                return (coords[:, 0] < -0.6).astype(int)
+
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[0, 10])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-1, 1])
+        problem = pygpc.Problem(pygpc.testfunctions.Peaks(), parameters)
+
+        # random grid
+        grid = pygpc.Random(parameters_random=problem.parameters_random, n_grid=20, seed=1)
+        classifier = ClassifierHalfPlane()
+        coords, coords_norm = grid.get_samples_domain(n_grid_add=500, classifier=classifier, domain=1, seed=1)
+
+        self.expect_true(coords_norm.shape == (500, 2), msg="Wrong number of grid points")
+        self.expect_true((classifier.predict(coords_norm) == 1).all(), msg="Grid points lie outside of the domain")
+        self.expect_isclose(coords, grid.get_denormalized_coordinates(coords_norm), atol=1e-12,
+                            msg="Grid points in model space differ")
+        self.expect_true(classifier.n_predict - 1 <= 5,
+                         msg="Candidates were not classified blockwise ({} calls)".format(classifier.n_predict - 1))
+        self.expect_true(np.abs(np.mean(coords_norm[:, 1])) < 0.1 and np.mean(coords_norm[:, 0]) < -0.7,
+                         msg="Grid points are not uniformly distributed in the domain")
+
+        # seeded sampling is reproducible
+        _, coords_norm_seed = grid.get_samples_domain(n_grid_add=500, classifier=ClassifierHalfPlane(), domain=1,
+                                                      seed=1)
+        self.expect_isclose(coords_norm_seed, coords_norm, atol=0, msg="Seeded sampling is not reproducible")
+
+        # without classifier all candidates are accepted
+        coords, coords_norm = grid.get_samples_domain(n_grid_add=30, classifier=None, domain=None, seed=1)
+        self.expect_true(coords_norm.shape == (30, 2), msg="Wrong number of grid points without classifier")
+
+        # empty domain
+        try:
+            grid.get_samples_domain(n_grid_add=10, classifier=ClassifierHalfPlane(), domain=2, n_candidates_max=1000)
+            self.expect_true(False, msg="No error raised for an empty domain")
+        except AssertionError as e:
+            self.expect_true("Could not find" in str(e), msg="Wrong error raised for an empty domain")
+
+        # extension of random and LHS grids in a domain
+        for grid in [pygpc.Random(parameters_random=problem.parameters_random, n_grid=20, seed=1),
+                     pygpc.LHS(parameters_random=problem.parameters_random, n_grid=20, seed=1)]:
+            coords_norm_old = grid.coords_norm.copy()
+            grid.extend_random_grid(n_grid_new=120, classifier=ClassifierHalfPlane(), domain=1, seed=2)
+
+            self.expect_true(grid.n_grid == 120 and len(grid.coords_id) == 120,
+                             msg="Wrong number of grid points after extension ({})".format(type(grid).__name__))
+            self.expect_isclose(grid.coords_norm[:20, ], coords_norm_old, atol=0,
+                                msg="Previous grid points changed ({})".format(type(grid).__name__))
+            self.expect_true((grid.coords_norm[20:, 0] < -0.6).all(),
+                             msg="Appended grid points lie outside of the domain ({})".format(type(grid).__name__))
+
+        print("done!\n")
+
+    def test_040_lhs_criteria(self):
+        """
+        Testing the vectorised LHS criteria (CL2, log_R, PhiP, PhiP of candidate exchanges) against
+        reference implementations with loops
+        """
+        global folder
+        test_name = 'pygpc_test_040_lhs_criteria'
+        print(test_name)
+
+        def CL2_loop(array):
+            # reference: centered L2 discrepancy after eq. (5.1b) in Hickernell (1998)
+            n, dim = array.shape
+            sum_1 = 0.
+            sum_2 = 0.
+            for i in range(n):
+                sum_1 += np.prod(1 + 0.5 * np.abs(array[i, :] - 0.5) - 0.5 * np.abs(array[i, :] - 0.5) ** 2)
+                for j in range(n):
+                    sum_2 += np.prod(1 + 0.5 * np.abs(array[i, :] - 0.5) + 0.5 * np.abs(array[j, :] - 0.5)
+                                     - 0.5 * np.abs(array[i, :] - array[j, :]))
+            return (13. / 12.) ** dim - 2. / n * sum_1 + 1. / n ** 2 * sum_2
+
+        def log_R_loop(array):
+            # reference: previous implementation of LHS.log_R
+            R = np.corrcoef(array.T)
+            for i in range(0, np.shape(array)[1]):
+                for j in range(0, np.shape(array)[1]):
+                    R[i, j] = np.exp((R[i, :] * np.abs(array[i, :] - array[j, :]) ** 2).sum())
+            return np.log(np.linalg.norm(R))
+
+        def PhiP_loop(x, p):
+            # reference: Phi-p criterion from all pairwise distances
+            phip = 0.
+            for i in range(x.shape[0]):
+                phip += (np.linalg.norm(x[i + 1:, :] - x[i, :], axis=1) ** (-p)).sum()
+            return phip ** (1. / p)
+
+        np.random.seed(1)
+
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[0, 1])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[0, 1])
+        parameters["x3"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[0, 1])
+        problem = pygpc.Problem(pygpc.testfunctions.Ishigami(), parameters)
+        grid = pygpc.LHS(parameters_random=problem.parameters_random, n_grid=10, seed=1)
+
+        # CL2 (small design and blockwise evaluated large design)
+        array = grid.lhs_initial(dim=3, n=40)
+        self.expect_isclose(grid.CL2(array), CL2_loop(array), atol=1e-12, msg="CL2 differs from reference")
+
+        array = np.random.rand(2000, 3)
+        array_abs = np.abs(array - 0.5)
+        cl2_ref = (13. / 12.) ** 3 - 2. / 2000 * np.sum(np.prod(1 + 0.5 * array_abs - 0.5 * array_abs ** 2, axis=1)) \
+            + 1. / 2000 ** 2 * np.sum(np.prod(1 + 0.5 * array_abs[:, np.newaxis, :] + 0.5 * array_abs[np.newaxis, :, :]
+                                              - 0.5 * np.abs(array[:, np.newaxis, :] - array[np.newaxis, :, :]),
+                                              axis=2))
+        self.expect_isclose(grid.CL2(array), cl2_ref, atol=1e-12, msg="Blockwise CL2 differs from reference")
+
+        # the regular grid in the cell centers has a lower discrepancy than a clustered design
+        self.expect_true(grid.CL2((np.arange(10)[:, np.newaxis] + 0.5) / 10 * np.ones((1, 3))) <
+                         grid.CL2(0.1 * np.random.rand(10, 3)), msg="CL2 does not measure the uniformity")
+
+        # log_R
+        for array in [grid.lhs_initial(dim=3, n=20), np.random.rand(5, 5), np.random.rand(30, 4)]:
+            self.expect_isclose(grid.log_R(array), log_R_loop(array), atol=1e-10, msg="log_R differs from reference")
+
+        # PhiP (small design and blockwise evaluated large design)
+        for array in [grid.lhs_initial(dim=3, n=50), np.random.rand(3500, 2)]:
+            self.expect_isclose(grid.PhiP(array, p=10), PhiP_loop(array, p=10), atol=1e-8 * PhiP_loop(array, p=10),
+                                msg="PhiP differs from reference (n={})".format(array.shape[0]))
+
+        # PhiP of candidate exchanges (distance matrix update) vs. PhiP of the exchanged designs
+        P = grid.lhs_initial(dim=3, n=30)
+        P_ref = P.copy()
+        D = np.sqrt(np.sum((P[:, np.newaxis, :] - P[np.newaxis, :, :]) ** 2, axis=2))
+        phip, i1, i2 = grid.PhiP_exchange_dist(P, D, k=1, Phi=grid.PhiP(P, p=10), p=10, n_exchange=20,
+                                               fixed_index=[0, 1, 2])
+
+        self.expect_true(np.array_equal(P, P_ref), msg="Design was altered by PhiP_exchange_dist")
+        self.expect_true((i1 != i2).all() and (i1 > 2).all() and (i2 > 2).all(),
+                         msg="Wrong rows chosen for the exchanges")
+
+        for j in range(20):
+            P_exchanged = P.copy()
+            P_exchanged[i1[j], 1], P_exchanged[i2[j], 1] = P[i2[j], 1], P[i1[j], 1]
+            self.expect_isclose(phip[j], PhiP_loop(P_exchanged, p=10), atol=1e-8 * phip[j],
+                                msg="PhiP of exchange {} differs from reference".format(j))
+
+        # ESE optimization (candidates evaluated at once and one after another) keeps the LHS property
+        for parallel in [True, False]:
+            design = grid.lhs_ese(dim=3, n=20, parallel=parallel)
+            self.expect_true(all([np.array_equal(np.sort(np.floor(design[:, i] * 20)), np.arange(20))
+                                  for i in range(3)]), msg="ESE design is not a LHS (parallel={})".format(parallel))
+
+        print("done!\n")
+
+    def test_041_sparse_grid_merge(self):
+        """
+        Testing the hash-based merging of the sub-grids of sparse grids against the previous tolerance-based merging
+        and the weights of the 1D quadrature rules
+        """
+        global folder
+        test_name = 'pygpc_test_041_sparse_grid_merge'
+        print(test_name)
+
+        def merge_sub_grids_loop(grid):
+            # reference: previous merging of the full tensor product sub-grids with tolerance epsilon_k
+            dll_k, dll_w = grid.calc_tensor_products()
+            point_number_list = np.zeros(dll_w.shape[0]) - 1
+            point_no = 0
+            coords_norm = []
+
+            while any(point_number_list < 0):
+                not_found = point_number_list < 0
+                dll_k_nf = dll_k[not_found]
+                point_temp = np.zeros(dll_k_nf.shape[0]) - 1
+                point_temp[np.sum(np.abs(dll_k_nf - dll_k_nf[0]), axis=1) < 1e-6] = point_no
+                point_number_list[not_found] = point_temp
+                point_no = point_no + 1
+                coords_norm.append(dll_k_nf[0, :])
+
+            coords_norm = np.array(coords_norm)
+            point_number_list = np.asarray(point_number_list, dtype=int)
+            weights = np.array([np.sum(dll_w[point_number_list == i]) for i in range(point_no)])
+            keep_point = np.abs(weights) > 1e-8 / grid.dim
+
+            return coords_norm[keep_point], weights[keep_point] / 2 ** grid.dim
+
+        def sort_points(coords_norm, weights):
+            idx = np.lexsort(np.round(coords_norm, 8).transpose()[::-1])
+            return coords_norm[idx], weights[idx]
+
+        # 1D quadrature rules: weights sum up to 2 and the rules integrate polynomials exactly on [-1, 1]
+        for n in range(1, 12):
+            for fun, n_exact in [(pygpc.get_quadrature_clenshaw_curtis_1d, n),
+                                 (pygpc.get_quadrature_fejer2_1d, n),
+                                 (lambda _n: pygpc.get_quadrature_jacobi_1d(_n, 0, 0), 2 * n)]:
+                knots, weights = fun(n)
+                knots = np.atleast_1d(knots)
+                weights = np.atleast_1d(weights)
+
+                self.expect_isclose(np.sum(weights), 2., atol=1e-12,
+                                    msg="Weights of {} (n={}) do not sum up to 2".format(fun.__name__, n))
+
+                for k in range(n_exact):
+                    self.expect_isclose(np.sum(weights * knots ** k), (1 + (-1) ** k) / (k + 1.), atol=1e-12,
+                                        msg="{} (n={}) does not integrate x^{}".format(fun.__name__, n, k))
+
+        for n in [1, 3, 7, 15]:
+            self.expect_isclose(np.sum(pygpc.get_quadrature_patterson_1d(n)[1]), 2., atol=1e-12,
+                                msg="Weights of Gauss-Patterson rule (n={}) do not sum up to 2".format(n))
+
+        knots, weights = pygpc.get_quadrature_clenshaw_curtis_1d(2)
+        self.expect_isclose(np.sort(knots), np.array([-1., 1.]), atol=1e-14,
+                            msg="Wrong knots of Clenshaw Curtis rule (n=2)")
+
+        # sparse grids: hash-based vs. tolerance-based merging of the sub-grids
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[0, 1])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[2, 3], pdf_limits=[-1, 2])
+        parameters["x3"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-2, 2])
+        problem = pygpc.Problem(pygpc.testfunctions.Ishigami(), parameters)
+
+        for grid_type, level in [(["clenshaw_curtis"] * 3, [4, 4, 4]),
+                                 (["fejer2"] * 3, [4, 4, 4]),
+                                 (["jacobi"] * 3, [3, 3, 3])]:
+            grid = pygpc.SparseGrid(parameters_random=problem.parameters_random,
+                                    options={"grid_type": grid_type,
+                                             "level": level,
+                                             "level_max": max(level),
+                                             "interaction_order": 3,
+                                             "order_sequence_type": "exp"})
+
+            coords_norm_ref, weights_ref = sort_points(*merge_sub_grids_loop(grid))
+            coords_norm, weights = sort_points(grid.coords_norm, grid.weights)
+
+            self.expect_true(coords_norm.shape == coords_norm_ref.shape,
+                             msg="Number of grid points differs from reference ({})".format(grid_type))
+            if coords_norm.shape == coords_norm_ref.shape:
+                self.expect_isclose(coords_norm, coords_norm_ref, atol=1e-10,
+                                    msg="Sparse grid points differ from reference ({})".format(grid_type))
+                self.expect_isclose(weights, weights_ref, atol=1e-12,
+                                    msg="Sparse grid weights differ from reference ({})".format(grid_type))
+
+            self.expect_isclose(np.sum(grid.weights), 1., atol=1e-10,
+                                msg="Normalized sparse grid weights do not sum up to 1 ({})".format(grid_type))
+
+        print("done!\n")
+
+    def test_042_golub_welsch_quadrature(self):
+        """
+        Testing the Golub-Welsch Jacobi and Hermite quadrature rules against the previous rules and the cache of
+        the 1D quadrature rules
+        """
+        global folder
+        test_name = 'pygpc_test_042_golub_welsch_quadrature'
+        print(test_name)
+
+        def get_quadrature_jacobi_1d_eig(n, p, q):
+            # reference: previous implementation (general eigensolver of the companion matrix)
+            n_arr = np.arange(1, n)
+            t01 = 1.0 * (p - q) / (2 + q + p)
+            t02 = 1.0 * ((p - q) * (q + p)) / ((2 * n_arr + q + p) * (2 * n_arr + 2 + q + p))
+            t1 = np.append(t01, t02)
+            t2 = np.sqrt((4.0 * n_arr * (n_arr + q) * (n_arr + p) * (n_arr + q + p)) / (
+                    (2 * n_arr - 1 + q + p) * (2 * n_arr + q + p) ** 2 * (2 * n_arr + 1 + q + p)))
+            t = np.diag(t1) + np.diag(t2, 1) + np.diag(t2, -1)
+            eigvals, eigvecs = np.linalg.eig(t)
+            idx_sorted = np.argsort(eigvals)
+            return eigvals[idx_sorted], 2.0 * eigvecs[0, idx_sorted] ** 2
+
+        def get_quadrature_hermite_1d_numpy(n):
+            # reference: previous implementation (numpy Gauss-Hermite rule, normalized weights)
+            knots, weights = np.polynomial.hermite_e.hermegauss(n)
+            return knots, 2.0 * weights / np.sum(weights)
+
+        pygpc.clear_quadrature_cache()
+
+        for n in range(1, 31):
+            for p, q in [(0, 0), (1, 2), (0.5, 3.5), (4, 1)]:
+                knots, weights = pygpc.get_quadrature_jacobi_1d(n, p, q)
+                knots_ref, weights_ref = get_quadrature_jacobi_1d_eig(n, p, q)
+
+                self.expect_isclose(knots, knots_ref, atol=1e-12,
+                                    msg="Jacobi knots differ from reference (n={}, p={}, q={})".format(n, p, q))
+                self.expect_isclose(weights, weights_ref, atol=1e-12,
+                                    msg="Jacobi weights differ from reference (n={}, p={}, q={})".format(n, p, q))
+
+            knots, weights = pygpc.get_quadrature_hermite_1d(n)
+            knots_ref, weights_ref = get_quadrature_hermite_1d_numpy(n)
+
+            self.expect_isclose(knots, knots_ref, atol=1e-10 * max(1, np.max(np.abs(knots_ref))),
+                                msg="Hermite knots differ from reference (n={})".format(n))
+            self.expect_isclose(weights, weights_ref, atol=1e-12,
+                                msg="Hermite weights differ from reference (n={})".format(n))
+
+        # Gauss-Legendre rule of the Jacobi polynomials (p=q=0)
+        knots, weights = pygpc.get_quadrature_jacobi_1d(10, 0, 0)
+        knots_ref, weights_ref = np.polynomial.legendre.leggauss(10)
+        self.expect_isclose(knots, knots_ref, atol=1e-13, msg="Jacobi knots differ from Gauss-Legendre rule")
+        self.expect_isclose(weights, weights_ref, atol=1e-13, msg="Jacobi weights differ from Gauss-Legendre rule")
+
+        # cache: hits, misses and copies of the stored rules
+        pygpc.clear_quadrature_cache()
+        knots, weights = pygpc.get_quadrature_jacobi_1d(5, 1, 2)
+        knots[:] = 0
+        knots, _ = pygpc.get_quadrature_jacobi_1d(n=5, p=1, q=2)
+        info = pygpc.get_quadrature_cache_info()
+
+        self.expect_true(info["hits"] == 1 and info["misses"] == 1 and info["size"] == 1,
+                         msg="Wrong cache statistics: {}".format(info))
+        self.expect_isclose(knots, get_quadrature_jacobi_1d_eig(5, 1, 2)[0], atol=1e-12,
+                            msg="Stored quadrature rule was modified by the caller")
+
+        # bounded cache (least recently used rules are removed)
+        pygpc.clear_quadrature_cache(maxsize=3)
+        for n in [1, 2, 3, 1, 4]:
+            pygpc.get_quadrature_hermite_1d(n)
+        info = pygpc.get_quadrature_cache_info()
+        pygpc.get_quadrature_hermite_1d(2)
+        info_evicted = pygpc.get_quadrature_cache_info()
+
+        self.expect_true(info["size"] == 3 and info["hits"] == 1 and info["misses"] == 4,
+                         msg="Wrong cache statistics: {}".format(info))
+        self.expect_true(info_evicted["misses"] == 5, msg="Least recently used rule was not removed from the cache")
+
+        pygpc.clear_quadrature_cache(maxsize=1024)
+
+        print("done!\n")
+
+    def test_043_numint_accumulator(self):
+        """
+        Testing the streaming accumulation of the gPC coefficients determined by numerical integration
+        (NumIntAccumulator) against GPC.solve(solver="NumInt")
+        """
+        global folder
+        test_name = 'pygpc_test_043_numint_accumulator'
+        print(test_name)
+
+        # define model
+        model = pygpc.testfunctions.Peaks()
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[1.2, 2])
+        parameters["x2"] = 1.25
+        parameters["x3"] = pygpc.Beta(pdf_shape=[2, 2], pdf_limits=[0, 0.6])
+        problem = pygpc.Problem(model, parameters)
+
+        options = dict()
+        options["method"] = "quad"
+        options["solver"] = "NumInt"
+        options["settings"] = None
+        options["n_cpu"] = 0
+        options["fn_results"] = None
+        options["gradient_enhanced"] = False
+        options["backend"] = "python"
+
+        gpc = pygpc.Quad(problem=problem,
+                         order=[6, 6],
+                         order_max=6,
+                         order_max_norm=1,
+                         interaction_order=2,
+                         options=options,
+                         validation=None)
+        gpc.grid = pygpc.TensorGrid(parameters_random=problem.parameters_random,
+                                    options={"grid_type": ["jacobi", "jacobi"], "n_dim": [8, 8]})
+        gpc.init_gpc_matrix()
+
+        com = pygpc.Computation(n_cpu=0)
+        results = com.run(model=model, problem=problem, coords=gpc.grid.coords, coords_norm=gpc.grid.coords_norm)
+        coeffs_ref = gpc.solve(results=results, solver="NumInt", settings=None)
+
+        # results added blockwise (in arbitrary order and block sizes)
+        accumulator = pygpc.NumIntAccumulator(gpc=gpc)
+        idx = np.random.RandomState(1).permutation(gpc.grid.n_grid)
+
+        for idx_block in np.split(idx, [1, 10, 11, 40]):
+            accumulator.add(results=results[idx_block, :], idx=idx_block)
+
+        self.expect_true(accumulator.n_added == gpc.grid.n_grid, msg="Wrong number of added grid points")
+        self.expect_isclose(accumulator.coeffs, coeffs_ref, atol=1e-12,
+                            msg="Blockwise accumulated coefficients differ from GPC.solve(solver='NumInt')")
+
+        # results passed by Computation.run() as they arrive (callback)
+        accumulator = pygpc.NumIntAccumulator(gpc=gpc)
+        results_callback = com.run(model=model, problem=problem, coords=gpc.grid.coords,
+                                   coords_norm=gpc.grid.coords_norm, callback=accumulator, n_block=7)
+
+        self.expect_isclose(results_callback, results, atol=1e-14, msg="Results of Computation.run() differ")
+        self.expect_true(accumulator.n_added == gpc.grid.n_grid, msg="Wrong number of added grid points")
+        self.expect_isclose(accumulator.coeffs, coeffs_ref, atol=1e-12,
+                            msg="Coefficients accumulated in callback differ from GPC.solve(solver='NumInt')")
+
+        # partial coefficients of the first grid points
+        accumulator = pygpc.NumIntAccumulator(gpc=gpc)
+        accumulator(results[:20, :])
+        coeffs_partial = accumulator.coeffs.copy()
+        accumulator(results)
+
+        weights = gpc.get_weights_numint(coords_norm=gpc.grid.coords_norm[:20, :], weights=gpc.grid.weights[:20])
+        self.expect_isclose(coeffs_partial, np.matmul(gpc.gpc_matrix[:20, :].transpose(),
+                                                      weights[:, np.newaxis] * results[:20, :]), atol=1e-12,
+                            msg="Partial coefficients differ")
+        self.expect_isclose(accumulator.coeffs, coeffs_ref, atol=1e-12,
+                            msg="Coefficients differ after the remaining results were added")
+
+        print("done!\n")
+
+    def test_044_quad_adaptive_results_file(self):
+        """
+        Algorithm: QuadAdaptive
+        Method: Quadrature
+        Solver: NumInt
+        Grid: SparseGrid (dimension adaptive)
+        Testing that the model evaluations of the adaptive quadrature gPC are saved in the results file
+        """
+        global folder
+        test_name = 'pygpc_test_044_quad_adaptive_results_file'
+        print(test_name)
+
+        # define model (returns additional data, which is saved by the workers only)
+        model = IshigamiAdditionalData()
+
+        # define problem
+        parameters = OrderedDict()
+        parameters["x1"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["x2"] = pygpc.Beta(pdf_shape=[1, 1], pdf_limits=[-np.pi, np.pi])
+        parameters["x3"] = 0.
+        parameters["a"] = 7.
+        parameters["b"] = 0.1
+        problem = pygpc.Problem(model, parameters)
+
+        # gPC options
+        options = dict()
+        options["grid_type"] = "clenshaw_curtis"
+        options["level_max"] = 4
+        options["n_grid_max"] = 200
+        options["eps"] = 1e-3
+        options["error_type"] = "quadrature"
+        options["n_cpu"] = 0
+        options["fn_results"] = os.path.join(folder, test_name)
+        options["backend"] = "python"
+
+        # run gPC algorithm twice (the results file of the previous run is replaced)
+        for i_run in range(2):
+            algorithm = pygpc.QuadAdaptive(problem=problem, options=options)
+            gpc, coeffs, results = algorithm.run()
+
+        with h5py.File(options["fn_results"] + ".hdf5", "r") as f:
+            self.expect_true("additional_data/x1" in f,
+                             msg="Model evaluations were not saved during the computation")
+
+            if "additional_data/x1" in f:
+                self.expect_isclose(f["additional_data/x1"][:, 0], gpc.grid.coords[:, 0], atol=1e-14,
+                                    msg="Saved additional data differs")
+
+            self.expect_isclose(f["model_evaluations/results"][:], results, atol=1e-14,
+                                msg="Saved results differ")
+            self.expect_isclose(f["grid/coords"][:], gpc.grid.coords, atol=1e-14, msg="Saved grid differs")
+            self.expect_isclose(f["grid/coords_norm"][:], gpc.grid.coords_norm, atol=1e-14,
+                                msg="Saved normalized grid differs")
+            self.expect_isclose(f["coeffs"][:], coeffs, atol=1e-14, msg="Saved coefficients differ")
+
+        print("done!\n")
+
 
 if __name__ == '__main__':
     unittest.main()